@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+(c) Charlie Collier, all rights reserved
+
+Benchmark of the construction of a wide Schema, measuring the time to build (and validate) the Schema with timeit
+and the memory allocated with tracemalloc. DTypes are interned, so the columns share one instance per distinct type.
+
+Usage:
+    python benchmarks/bench_schema_construction.py [--columns 10000] [--runs 20]
+"""
+
+import argparse
+import timeit
+import tracemalloc
+from typing import Callable, List
+
+from simpleboto.athena.utils.data_types import (
+    BaseDType,
+    StringDType,
+    BigIntDType,
+    DecimalDType,
+    VarCharDType
+)
+from simpleboto.athena.utils.schema import Schema
+
+DTYPES: List[Callable[[], BaseDType]] = [
+    lambda: StringDType(),
+    lambda: BigIntDType(),
+    lambda: DecimalDType(10, 2),
+    lambda: VarCharDType(255)
+]
+
+
+def build_schema(
+    columns: int
+) -> Schema:
+    """
+    Function to build a Schema of the given number of columns, constructing a new DType for each column.
+
+    :param columns: the number of columns of the Schema
+    """
+    return Schema(schema={f'col_{i}': DTYPES[i % len(DTYPES)]() for i in range(columns)})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the construction of a wide Schema')
+    parser.add_argument('--columns', type=int, default=10_000, help='the number of columns of the Schema')
+    parser.add_argument('--runs', type=int, default=20, help='the number of Schemas to build for each timing')
+    args = parser.parse_args()
+
+    timings = timeit.repeat(lambda: build_schema(args.columns), number=args.runs, repeat=5)
+    seconds = min(timings) / args.runs
+
+    tracemalloc.start()
+    schema = build_schema(args.columns)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f'columns:           {args.columns}')
+    print(f'time per Schema:   {seconds * 1000:.2f} ms')
+    print(f'throughput:        {args.columns / seconds:,.0f} columns/s')
+    print(f'memory retained:   {current / 1024 ** 2:.2f} MB')
+    print(f'memory peak:       {peak / 1024 ** 2:.2f} MB')
+    print(f'distinct DTypes:   {len({id(dtype) for dtype in schema.raw.values()})}')
+
+
+if __name__ == '__main__':
+    main()
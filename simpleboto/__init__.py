@@ -1,10 +1,12 @@
 from simpleboto.athena import AthenaClient
+from simpleboto.glue import GlueClient
 from simpleboto.logs import CLogger
 from simpleboto.s3 import S3Url, S3Client
 
 __all__ = [
     'AthenaClient',
     'CLogger',
+    'GlueClient',
     'S3Client',
     'S3Url'
 ]
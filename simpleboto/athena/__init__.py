@@ -1,8 +1,12 @@
 from simpleboto.athena.athena_client import AthenaClient
 from simpleboto.athena.constants import C
+from simpleboto.athena.schema_compactor import SchemaCompactor
+from simpleboto.athena.schema_repartitioner import SchemaRepartitioner
 from simpleboto.athena.utils import (
     Schema,
     StringDType,
+    TinyIntDType,
+    SmallIntDType,
     IntegerDType,
     BigIntDType,
     DoubleDType,
@@ -10,9 +14,15 @@ from simpleboto.athena.utils import (
     BooleanDType,
     DecimalDType,
     VarCharDType,
+    CharDType,
     TimestampDType,
     DateDType,
-    DTypes
+    DTypes,
+    QueryCache,
+    QueryMetrics,
+    SchemaReader,
+    SchemaRegistry,
+    SchemaWriter
 )
 
 __all__ = [
@@ -20,6 +30,8 @@ __all__ = [
     'Schema',
     'C',
     'StringDType',
+    'TinyIntDType',
+    'SmallIntDType',
     'IntegerDType',
     'BigIntDType',
     'DoubleDType',
@@ -27,7 +39,15 @@ __all__ = [
     'BooleanDType',
     'DecimalDType',
     'VarCharDType',
+    'CharDType',
     'TimestampDType',
     'DateDType',
-    'DTypes'
+    'DTypes',
+    'QueryCache',
+    'QueryMetrics',
+    'SchemaCompactor',
+    'SchemaReader',
+    'SchemaRegistry',
+    'SchemaRepartitioner',
+    'SchemaWriter'
 ]
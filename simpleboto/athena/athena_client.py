@@ -3,18 +3,47 @@
 (c) Charlie Collier, all rights reserved
 """
 
+import datetime
+import functools
+import json
+import math
 import os
-from typing import Optional, Dict, Any
+import re
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from decimal import Decimal
+from typing import Optional, Dict, Any, List, Union, Iterator, Tuple, Callable
+from urllib.parse import quote, unquote
 
 import boto3
 
 from simpleboto.athena.constants import C
+from simpleboto.athena.utils.data_types import (
+    BaseDType,
+    TinyIntDType,
+    SmallIntDType,
+    IntegerDType,
+    BigIntDType,
+    BooleanDType,
+    DoubleDType,
+    FloatDType,
+    DecimalDType,
+    DateDType,
+    TimestampDType
+)
+from simpleboto.athena.utils.query_cache import QueryCache
+from simpleboto.athena.utils.query_metrics import QueryMetrics
+from simpleboto.athena.utils.schema_registry import SchemaRegistry
 from simpleboto.athena.utils.schema import Schema, SchemaType
 from simpleboto.boto3_base import Boto3Base
 from simpleboto.exceptions import (
     UnexpectedParameterError,
-    NoParameterError
+    NoParameterError,
+    QueryExecutionError,
+    QueryCostError
 )
+from simpleboto.s3.s3_client import S3Client
 from simpleboto.s3.s3_url import S3Url
 from simpleboto.utils import Utils
 
@@ -24,18 +53,82 @@ class AthenaClient(Boto3Base):
     Wrapper for the boto3 Athena client.
     """
     SQL_DIR = os.path.join(os.path.dirname(__file__), 'sql')
+    PROJECTION_DATE_FORMATS = {
+        'yyyy-MM-dd': 'DAYS',
+        'yyyyMMdd': 'DAYS',
+        'yyyy-MM-dd-HH': 'HOURS',
+        'yyyyMMddHH': 'HOURS',
+        'yyyy-MM-dd HH:mm:ss': 'SECONDS',
+        'yyyy-MM': 'MONTHS',
+        'yyyyMM': 'MONTHS'
+    }
+    CONVERT_FORMATS = [C.PARQUET_, C.ORC_, C.AVRO_, C.JSON_]
+    MAX_CTAS_PARTITIONS = 100
+    INTEGER_DTYPES = (TinyIntDType, SmallIntDType, IntegerDType, BigIntDType)
+    COMPRESSION_PROPERTIES = {
+        C.PARQUET_: 'parquet.compression',
+        C.ORC_: 'orc.compress'
+    }
+    CREATE_TABLE_TEMPLATES = {
+        C.HIVE_: 'create_table.sql',
+        C.ICEBERG_: 'create_iceberg_table.sql'
+    }
+    PARTITION_TRANSFORMS = [
+        'col',
+        'year(col)',
+        'month(col)',
+        'day(col)',
+        'hour(col)',
+        'bucket(n, col)',
+        'truncate(n, col)'
+    ]
+    PARTITION_TRANSFORM_PATTERN = re.compile(
+        r'^(?:(?:year|month|day|hour)\(\w+\)|(?:bucket|truncate)\(\d+,\s*\w+\)|\w+)$',
+        flags=re.IGNORECASE
+    )
+    MIGRATION_RECREATE_FIELDS = [
+        C.DATABASE_NAME,
+        C.TABLE_NAME,
+        C.FILE_FORMAT,
+        C.PARTITION_SCHEMA,
+        C.BUCKETED_BY,
+        C.BUCKET_COUNT,
+        C.TABLE_TYPE,
+        C.PARTITION_TRANSFORMS,
+        C.SERDE_INFO
+    ]
+    SYMLINK_TEMPLATE = 'create_symlink_table.sql'
+    SYMLINK_MANIFEST = 'symlink.txt'
+    TBL_PROPERTIES_DEFAULTS = {
+        "'projection.enabled'": "'FALSE'",
+        "'skip.header.line.count'": "'0'"
+    }
 
     def __init__(
         self,
         region_name: Optional[str] = None,
-        boto3_session: Optional[boto3.Session] = None
+        boto3_session: Optional[boto3.Session] = None,
+        query_cache: Optional[QueryCache] = None,
+        query_metrics: Optional[QueryMetrics] = None,
+        schema_registry: Optional[SchemaRegistry] = None
     ) -> None:
         """
         :param region_name: the name of the AWS region (if not provided, ensure credentials have been exported)
         :param boto3_session: a provided boto3_session
+        :param query_cache: a QueryCache to reuse the executions and results of repeated SELECT queries
+        :param query_metrics: a QueryMetrics store to record the statistics of each query in (a new one if not given)
+        :param schema_registry: a SchemaRegistry of the Schemas applied to each table, to skip unchanged tables in
+            create_tables and migrate_table
         """
         super().__init__('athena', region_name, boto3_session)
         self.athena = self.client
+        self.query_cache = query_cache
+        self.query_metrics = query_metrics if query_metrics else QueryMetrics()
+        self.schema_registry = schema_registry
+        self.prepared_statements = {}
+        self.query_plans = {}
+
+        self.s3_client = S3Client(region_name=self.client.meta.region_name, boto3_session=self.session)
 
     @staticmethod
     def get_key(
@@ -51,6 +144,1083 @@ class AthenaClient(Boto3Base):
         value = dict_.get(key)
         return value.lower() if isinstance(value, str) else value
 
+    def start_query(
+        self,
+        sql: str,
+        database: Optional[str] = None,
+        workgroup: Optional[str] = None,
+        output_location: Optional[S3Url] = None,
+        params: Optional[List[Any]] = None,
+        use_cache: Optional[bool] = True
+    ) -> str:
+        """
+        Function to start the execution of a query in Athena, without waiting for it to finish.
+        The Athena ResultReuseConfiguration of the QueryCache is only set for queries which only read data,
+        so EXPLAIN, CTAS, UNLOAD and DDL queries always run.
+
+        Required IAM permissions:
+            athena:StartQueryExecution
+
+        :param sql: the SQL query to execute
+        :param database: the database to run the query in (if not specified in the query)
+        :param workgroup: the Athena workgroup to run the query in
+        :param output_location: the S3Url to save the query results to (if not set by the workgroup)
+        :param params: the values for the ? placeholders in the query, in order; see format_parameter
+        :param use_cache: whether to let Athena reuse previous results, as set by the QueryCache of the client
+        :return: the QueryExecutionId of the query
+        """
+        kwargs = {}
+        if database:
+            kwargs['QueryExecutionContext'] = {'Database': database}
+        if workgroup:
+            kwargs['WorkGroup'] = workgroup
+        if output_location:
+            kwargs['ResultConfiguration'] = {'OutputLocation': output_location.url}
+        if params:
+            kwargs['ExecutionParameters'] = [self.format_parameter(param) for param in params]
+
+        reuse_configuration = self.query_cache.get_reuse_configuration() if use_cache and self.query_cache else None
+        if reuse_configuration and QueryCache.is_cacheable(sql):
+            kwargs['ResultReuseConfiguration'] = reuse_configuration
+
+        response = self.athena.start_query_execution(QueryString=sql, **kwargs)
+
+        return response['QueryExecutionId']
+
+    def wait_for_query(
+        self,
+        query_execution_id: str,
+        poll_interval: Optional[float] = 1.0,
+        tag: Optional[str] = None
+    ) -> dict:
+        """
+        Function to wait for a query to finish, raising a QueryExecutionError if it did not succeed.
+        The statistics of the finished query are recorded in the QueryMetrics of the client.
+
+        Required IAM permissions:
+            athena:GetQueryExecution
+
+        :param query_execution_id: the QueryExecutionId of the query
+        :param poll_interval: the number of seconds to wait between checking the query state
+        :param tag: the tag to record the query statistics under
+        :return: the QueryExecution dictionary as per the get_query_execution response in boto3
+        """
+        while True:
+            execution = self.athena.get_query_execution(QueryExecutionId=query_execution_id)['QueryExecution']
+            status = execution['Status']
+
+            if status['State'] in [C.SUCCEEDED_, C.FAILED_, C.CANCELLED_]:
+                self.query_metrics.record(query_execution=execution, tag=tag)
+
+            if status['State'] == C.SUCCEEDED_:
+                return execution
+            if status['State'] in [C.FAILED_, C.CANCELLED_]:
+                raise QueryExecutionError(
+                    query_execution_id=query_execution_id,
+                    state=status['State'],
+                    reason=status.get('StateChangeReason')
+                )
+
+            time.sleep(poll_interval)
+
+    def execute(
+        self,
+        sql: str,
+        database: Optional[str] = None,
+        workgroup: Optional[str] = None,
+        output_location: Optional[S3Url] = None,
+        params: Optional[List[Any]] = None,
+        use_cache: Optional[bool] = True,
+        tag: Optional[str] = None,
+        max_scan_bytes: Optional[int] = None,
+        on_exceed: Optional[str] = 'raise'
+    ) -> str:
+        """
+        Function to execute a query in Athena and wait for it to finish.
+        If the client has a QueryCache, repeated SELECT queries return the cached QueryExecutionId without running.
+        If max_scan_bytes is given, the query is first checked with explain, and is not run if it is estimated
+        to scan more than max_scan_bytes (unless on_exceed is 'warn').
+
+        Required IAM permissions:
+            athena:StartQueryExecution
+            athena:GetQueryExecution
+            athena:GetQueryResults (if max_scan_bytes is given)
+
+        :param sql: the SQL query to execute
+        :param database: the database to run the query in (if not specified in the query)
+        :param workgroup: the Athena workgroup to run the query in
+        :param output_location: the S3Url to save the query results to (if not set by the workgroup)
+        :param params: the values for the ? placeholders in the query, in order; see format_parameter
+        :param use_cache: whether to use the QueryCache of the client (if there is one)
+        :param tag: the tag to record the query statistics under in the QueryMetrics of the client
+        :param max_scan_bytes: the maximum number of bytes the query is allowed to scan, as estimated by explain
+            (queries with an unknown estimate are always run)
+        :param on_exceed: what to do if the estimate is over max_scan_bytes; either raise a QueryCostError ('raise')
+            or emit a warning and run the query anyway ('warn')
+        :return: the QueryExecutionId of the query
+        """
+        cache_key = None
+        if use_cache and self.query_cache and QueryCache.is_cacheable(sql):
+            cache_key = QueryCache.get_key(sql=sql, database=database, workgroup=workgroup, params=params)
+            entry = self.query_cache.get(cache_key)
+
+            if entry:
+                return entry['QueryExecutionId']
+
+        if max_scan_bytes is not None:
+            self.check_scan_bytes(
+                sql=sql,
+                max_scan_bytes=max_scan_bytes,
+                on_exceed=on_exceed,
+                database=database,
+                workgroup=workgroup,
+                output_location=output_location,
+                params=params
+            )
+
+        query_execution_id = self.start_query(
+            sql=sql,
+            database=database,
+            workgroup=workgroup,
+            output_location=output_location,
+            params=params,
+            use_cache=use_cache
+        )
+        execution = self.wait_for_query(query_execution_id=query_execution_id, tag=tag)
+
+        if cache_key:
+            self.query_cache.put(
+                key=cache_key,
+                query_execution_id=query_execution_id,
+                output_location=execution.get('ResultConfiguration', {}).get('OutputLocation')
+            )
+
+        return query_execution_id
+
+    def check_scan_bytes(
+        self,
+        sql: str,
+        max_scan_bytes: int,
+        on_exceed: Optional[str] = 'raise',
+        database: Optional[str] = None,
+        workgroup: Optional[str] = None,
+        output_location: Optional[S3Url] = None,
+        params: Optional[List[Any]] = None
+    ) -> Optional[float]:
+        """
+        Function to check the estimated number of bytes a query scans is within max_scan_bytes, see execute.
+
+        Required IAM permissions:
+            athena:StartQueryExecution
+            athena:GetQueryExecution
+            athena:GetQueryResults
+
+        :param sql: the SQL query to check
+        :param max_scan_bytes: the maximum number of bytes the query is allowed to scan
+        :param on_exceed: either 'raise' to raise a QueryCostError, or 'warn' to emit a warning
+        :param database: the database to run the query in (if not specified in the query)
+        :param workgroup: the Athena workgroup to run the query in
+        :param output_location: the S3Url to save the query results to (if not set by the workgroup)
+        :param params: the values for the ? placeholders in the query, in order
+        :return: the estimated number of bytes, or None if unknown
+        """
+        if on_exceed not in ['raise', 'warn']:
+            raise UnexpectedParameterError(param=on_exceed, possible_values=['raise', 'warn'], context='on_exceed')
+
+        estimate = self.explain(
+            sql=sql,
+            database=database,
+            workgroup=workgroup,
+            output_location=output_location,
+            params=params
+        )
+        estimated_bytes = estimate['EstimatedInputBytes']
+
+        if estimated_bytes is not None and estimated_bytes > max_scan_bytes:
+            error = QueryCostError(estimated_bytes=estimated_bytes, max_scan_bytes=max_scan_bytes)
+            if on_exceed == 'raise':
+                raise error
+            warnings.warn(error.err_msg, RuntimeWarning)
+
+        return estimated_bytes
+
+    def explain(
+        self,
+        sql: str,
+        database: Optional[str] = None,
+        workgroup: Optional[str] = None,
+        output_location: Optional[S3Url] = None,
+        params: Optional[List[Any]] = None
+    ) -> dict:
+        """
+        Function to estimate the data a query reads with EXPLAIN (TYPE IO, FORMAT JSON), without running it.
+        The estimates are cached by the hash of the normalised SQL, so repeated queries only run EXPLAIN once.
+
+        Required IAM permissions:
+            athena:StartQueryExecution
+            athena:GetQueryExecution
+            athena:GetQueryResults
+
+        :param sql: the SQL query to explain
+        :param database: the database to run the query in (if not specified in the query)
+        :param workgroup: the Athena workgroup to run the query in
+        :param output_location: the S3Url to save the query results to (if not set by the workgroup)
+        :param params: the values for the ? placeholders in the query, in order
+        :return: the estimate, see get_plan_estimate
+        """
+        plan_key = QueryCache.get_key(sql=sql, database=database, workgroup=workgroup, params=params)
+
+        if plan_key not in self.query_plans:
+            query_execution_id = self.execute(
+                sql=f'EXPLAIN (TYPE IO, FORMAT JSON) {sql}',
+                database=database,
+                workgroup=workgroup,
+                output_location=output_location,
+                params=params,
+                use_cache=False
+            )
+            plan = json.loads('\n'.join(row[0] for row in self.iter_query_results(query_execution_id)))
+
+            self.query_plans[plan_key] = self.get_plan_estimate(plan)
+
+        return self.query_plans[plan_key]
+
+    @staticmethod
+    def get_plan_estimate(
+        plan: dict
+    ) -> dict:
+        """
+        Function to summarise an EXPLAIN (TYPE IO, FORMAT JSON) plan, i.e. the estimated number of bytes read from
+        each table and the partitions (the values or ranges of each constrained column) it is read from.
+
+        :param plan: the parsed JSON plan
+        :return: a dictionary of the form
+            {
+                'EstimatedInputBytes': 1024.0 (None if unknown for any table),
+                'Tables': [
+                    {
+                        'Table': 'database.table',
+                        'EstimatedInputBytes': 1024.0 (None if unknown),
+                        'Partitions': {'dt': 2} (the number of values/ranges read of each constrained column)
+                    }
+                ],
+                'Plan': plan
+            }
+        """
+        tables = []
+        for info in plan.get('inputTableColumnInfos', []):
+            schema_table = info.get('table', {}).get('schemaTable', {})
+            constraint = info.get('constraint', {})
+            size = info.get('estimate', {}).get('outputSizeInBytes')
+
+            tables.append({
+                'Table': f"{schema_table.get('schema')}.{schema_table.get('table')}",
+                'EstimatedInputBytes': AthenaClient.parse_estimate(size),
+                'Partitions': {
+                    col['columnName']: 0 if constraint.get('none') else len(col.get('domain', {}).get('ranges', []))
+                    for col in constraint.get('columnConstraints', [])
+                }
+            })
+
+        sizes = [table['EstimatedInputBytes'] for table in tables]
+
+        return {
+            'EstimatedInputBytes': None if None in sizes else sum(sizes),
+            'Tables': tables,
+            'Plan': plan
+        }
+
+    @staticmethod
+    def parse_estimate(
+        size: Any
+    ) -> Optional[float]:
+        """
+        Function to parse an estimated size from an EXPLAIN plan, which Athena gives as the string NaN for tables
+        without statistics.
+
+        :param size: the estimated size, e.g. 1024.0, '1024' or 'NaN'
+        :return: the size as a float, or None if it is missing, not a number or NaN
+        """
+        try:
+            size = float(size)
+        except (TypeError, ValueError):
+            return None
+
+        return None if math.isnan(size) else size
+
+    @staticmethod
+    def format_parameter(
+        param: Any
+    ) -> str:
+        """
+        Function to format a Python value as a SQL literal for the ExecutionParameters of a query.
+        Strings are quoted and escaped, so values can never be interpreted as SQL.
+        NaN and infinite floats (or Decimals) are formatted as the nan(), infinity() and -infinity() functions.
+
+        :param param: the value to format; one of None, bool, int, float, Decimal, str, date or datetime
+        """
+        if param is None:
+            return 'NULL'
+        if isinstance(param, bool):
+            return 'true' if param else 'false'
+        if isinstance(param, (float, Decimal)) and not math.isfinite(param):
+            return 'nan()' if math.isnan(param) else ('-infinity()' if param < 0 else 'infinity()')
+        if isinstance(param, (int, float, Decimal)):
+            return str(param)
+        if isinstance(param, datetime.datetime):
+            return f"TIMESTAMP '{param.isoformat(sep=' ', timespec='milliseconds')}'"
+        if isinstance(param, datetime.date):
+            return f"DATE '{param.isoformat()}'"
+
+        value = str(param).replace("'", "''")
+
+        return f"'{value}'"
+
+    def prepare(
+        self,
+        name: str,
+        sql: str,
+        workgroup: Optional[str] = C.PRIMARY_WORKGROUP_
+    ) -> None:
+        """
+        Function to create (or update) a prepared statement in Athena.
+        The client remembers which statements it has prepared, so preparing the same statement again is a no-op.
+
+        Required IAM permissions:
+            athena:CreatePreparedStatement
+            athena:UpdatePreparedStatement
+
+        :param name: the name of the prepared statement
+        :param sql: the SQL query of the statement, with ? placeholders for the parameters
+        :param workgroup: the Athena workgroup to create the statement in
+        """
+        if self.prepared_statements.get((workgroup, name)) == sql:
+            return
+
+        kwargs = {'StatementName': name, 'WorkGroup': workgroup, 'QueryStatement': sql}
+
+        try:
+            self.athena.create_prepared_statement(**kwargs)
+        except self.athena.exceptions.InvalidRequestException:
+            self.athena.update_prepared_statement(**kwargs)
+
+        self.prepared_statements[(workgroup, name)] = sql
+
+    def execute_prepared(
+        self,
+        name: str,
+        params: Optional[List[Any]] = None,
+        database: Optional[str] = None,
+        workgroup: Optional[str] = C.PRIMARY_WORKGROUP_,
+        output_location: Optional[S3Url] = None,
+        tag: Optional[str] = None
+    ) -> str:
+        """
+        Function to execute a prepared statement and wait for it to finish.
+
+        Required IAM permissions:
+            athena:StartQueryExecution
+            athena:GetQueryExecution
+            athena:GetPreparedStatement
+
+        :param name: the name of the prepared statement, as given to prepare
+        :param params: the values for the ? placeholders in the statement, in order
+        :param database: the database to run the query in (if not specified in the statement)
+        :param workgroup: the Athena workgroup the statement was prepared in
+        :param output_location: the S3Url to save the query results to (if not set by the workgroup)
+        :param tag: the tag to record the query statistics under in the QueryMetrics of the client
+        :return: the QueryExecutionId of the query
+        """
+        return self.execute(
+            sql=f'EXECUTE {name}',
+            database=database,
+            workgroup=workgroup,
+            output_location=output_location,
+            params=params,
+            tag=tag
+        )
+
+    def get_query_results(
+        self,
+        query_execution_id: str,
+        columnar: Optional[bool] = False
+    ) -> Union[List[tuple], Dict[str, Any]]:
+        """
+        Function to return the results of a finished query.
+
+        Required IAM permissions:
+            athena:GetQueryResults
+            s3:GetObject
+
+        :param query_execution_id: the QueryExecutionId of the query
+        :param columnar: whether to return the results by column (True) or by row (False)
+            if True, will return a dictionary of {column: numpy.ma.MaskedArray}, where each array is typed by the
+                DType of the column and null values are masked (requires numpy)
+            if False, will return a list of tuples of the string values, with None for null values
+        """
+        if self.query_cache:
+            results = self.query_cache.get_results(query_execution_id=query_execution_id, columnar=columnar)
+            if results is not None:
+                return results
+
+        results = self.fetch_query_results(query_execution_id=query_execution_id, columnar=columnar)
+
+        if self.query_cache:
+            self.query_cache.put_results(query_execution_id=query_execution_id, columnar=columnar, results=results)
+
+        return results
+
+    def fetch_query_results(
+        self,
+        query_execution_id: str,
+        columnar: Optional[bool] = False
+    ) -> Union[List[tuple], Dict[str, Any]]:
+        """
+        Function to fetch and decode the results of a finished query from Athena, see get_query_results.
+
+        Required IAM permissions:
+            athena:GetQueryResults
+            s3:GetObject
+
+        :param query_execution_id: the QueryExecutionId of the query
+        :param columnar: whether to return the results by column (True) or by row (False)
+        """
+        column_info, columns = [], []
+        for column_info, rows in self.iter_result_pages(query_execution_id=query_execution_id):
+            if not columns:
+                columns = [[] for _ in column_info]
+
+            for i, column in enumerate(columns):
+                column.extend(row['Data'][i].get('VarCharValue') for row in rows)
+
+        if not columnar:
+            return list(zip(*columns))
+
+        return {
+            col['Name']: BaseDType.from_athena(
+                athena_type=col['Type'],
+                precision=col.get('Precision', 0),
+                scale=col.get('Scale', 0)
+            ).to_numpy(values)
+            for col, values in zip(column_info, columns)
+        }
+
+    def iter_result_pages(
+        self,
+        query_execution_id: str
+    ) -> Iterator[Tuple[List[dict], List[dict]]]:
+        """
+        Function to iterate over the pages of the results of a finished query, without the header row.
+
+        Required IAM permissions:
+            athena:GetQueryResults
+            s3:GetObject
+
+        :param query_execution_id: the QueryExecutionId of the query
+        :return: an iterator of (column_info, rows) as per the get_query_results ResultSet in boto3
+        """
+        paginator = self.athena.get_paginator('get_query_results')
+        response_iter = paginator.paginate(QueryExecutionId=query_execution_id)
+
+        column_info = []
+        for page in response_iter:
+            result_set = page['ResultSet']
+            rows = result_set['Rows']
+
+            if not column_info:
+                column_info = result_set['ResultSetMetadata']['ColumnInfo']
+
+                header = [{'VarCharValue': col['Name']} for col in column_info]
+                if rows and rows[0]['Data'] == header:
+                    rows = rows[1:]
+
+            yield column_info, rows
+
+    def iter_query_results(
+        self,
+        query_execution_id: str
+    ) -> Iterator[tuple]:
+        """
+        Function to stream the rows of the results of a finished query, one page at a time.
+
+        Required IAM permissions:
+            athena:GetQueryResults
+            s3:GetObject
+
+        :param query_execution_id: the QueryExecutionId of the query
+        :return: an iterator of tuples of the string values, with None for null values
+        """
+        for _, rows in self.iter_result_pages(query_execution_id=query_execution_id):
+            for row in rows:
+                yield tuple(ele.get('VarCharValue') for ele in row['Data'])
+
+    def execute_sharded(
+        self,
+        sql_template: str,
+        schema: Schema,
+        shard_by: str,
+        ranges: Optional[List[Any]] = None,
+        max_concurrency: Optional[int] = 4,
+        max_retries: Optional[int] = 2,
+        workgroup: Optional[str] = None,
+        output_location: Optional[S3Url] = None,
+        tag: Optional[str] = None
+    ) -> Iterator[tuple]:
+        """
+        Function to split a query over a partitioned table into one query per shard of a partition column,
+        run the shards concurrently and stream the merged rows as each shard finishes.
+        Each shard is retried up to max_retries times if it fails.
+
+        Required IAM permissions:
+            athena:StartQueryExecution
+            athena:GetQueryExecution
+            athena:GetQueryResults
+            s3:GetObject
+
+        :param sql_template: the SQL query, containing a {predicate} placeholder for the shard filter, e.g.
+            SELECT * FROM table_name WHERE {predicate} AND col1 > 0
+        :param schema: the Schema of the table, containing the PARTITION_SCHEMA and PARTITION_PROJECTION
+        :param shard_by: the partition column to shard the query by
+        :param ranges: the shards, see get_partition_predicate; one (start, end) tuple per shard for DATE and
+            INTEGER projections (see split_date_range), or values for ENUM projections (default each value)
+        :param max_concurrency: the maximum number of shards to run at once
+        :param max_retries: the number of times to retry a failed shard
+        :param workgroup: the Athena workgroup to run the queries in
+        :param output_location: the S3Url to save the query results to (if not set by the workgroup)
+        :param tag: the tag to record the query statistics under in the QueryMetrics of the client
+        :return: an iterator of tuples of the string values, with None for null values
+        """
+        partition_schema = schema.metadata.get(C.PARTITION_SCHEMA, {})
+        if shard_by not in partition_schema:
+            raise UnexpectedParameterError(
+                param=shard_by,
+                possible_values=list(partition_schema),
+                context='execute_sharded'
+            )
+
+        if ranges is None:
+            projection = schema.metadata.get(C.PARTITION_PROJECTION, {}).get(shard_by, {})
+            if self.get_key('type', projection) != 'enum':
+                raise NoParameterError(param='ranges', context=f'execute_sharded on column {shard_by}')
+            ranges = projection.get('values')
+
+        kwargs = {
+            'database': schema.metadata.get(C.DATABASE_NAME),
+            'workgroup': workgroup,
+            'output_location': output_location,
+            'tag': tag
+        }
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            futures = [
+                executor.submit(
+                    self._execute_shard,
+                    sql=sql_template.replace('{predicate}', self.get_partition_predicate(schema, shard_by, shard)),
+                    max_retries=max_retries,
+                    **kwargs
+                )
+                for shard in ranges
+            ]
+
+            for future in as_completed(futures):
+                yield from self.iter_query_results(query_execution_id=future.result())
+
+    def _execute_shard(
+        self,
+        sql: str,
+        max_retries: int,
+        **kwargs
+    ) -> str:
+        """
+        Function to execute a query, retrying it up to max_retries times if it fails.
+
+        :param sql: the SQL query to execute
+        :param max_retries: the number of times to retry the query
+        :param kwargs: the keyword arguments for execute
+        """
+        for attempt in range(max_retries + 1):
+            try:
+                return self.execute(sql=sql, **kwargs)
+            except QueryExecutionError:
+                if attempt == max_retries:
+                    raise
+
+    @staticmethod
+    def split_date_range(
+        start: datetime.date,
+        end: datetime.date,
+        days: Optional[int] = 1
+    ) -> List[Tuple[datetime.date, datetime.date]]:
+        """
+        Function to split a date range into consecutive (start, end) shards, for use with execute_sharded.
+        Shards of string partitions with a date format which does not sort like dates (e.g. dd-MM-yyyy) are compared
+        with date_parse by get_partition_predicate.
+
+        :param start: the first date of the range
+        :param end: the last date of the range (inclusive)
+        :param days: the number of days in each shard
+        """
+        shards = []
+        while start <= end:
+            shard_end = min(start + datetime.timedelta(days=days - 1), end)
+            shards.append((start, shard_end))
+            start = shard_end + datetime.timedelta(days=1)
+
+        return shards
+
+    @classmethod
+    def get_partition_predicate(
+        cls,
+        schema: Schema,
+        column: str,
+        shard: Any
+    ) -> str:
+        """
+        Function to return the SQL predicate selecting a shard of a partition column.
+        Ranges of string partitions are compared as strings, unless the strings do not sort like their values, i.e.
+        a date format which is not year first (compared with date_parse) or integers which are not zero padded.
+
+        :param schema: the Schema of the table, containing the PARTITION_SCHEMA and PARTITION_PROJECTION
+        :param column: the partition column
+        :param shard: either a (start, end) tuple for an inclusive range, a list of values or a single value
+        """
+        if isinstance(shard, tuple):
+            dtype = {**schema.raw, **schema.metadata.get(C.PARTITION_SCHEMA, {})}[column]
+            projection = schema.metadata.get(C.PARTITION_PROJECTION, {}).get(column, {})
+            type_ = cls.get_key('type', projection)
+            is_string = not isinstance(dtype, (DateDType, TimestampDType, *cls.INTEGER_DTYPES))
+
+            # strings only sort like dates if the format is year first, e.g. not dd-MM-yyyy
+            if is_string and type_ == 'date' and not cls.is_sortable_date_format(projection['format']):
+                date_format = cls.to_strftime(projection['format'])
+                start, end = [cls.format_parameter(cls.to_datetime(value, date_format)) for value in shard]
+                return f'date_parse("{column}", \'{date_format.replace("%M", "%i")}\') BETWEEN {start} AND {end}'
+
+            # strings only sort like integers if they are zero padded to the same number of digits
+            if is_string and type_ == 'integer' and 'digits' not in projection:
+                start, end = [cls.format_parameter(int(value)) for value in shard]
+                return f'CAST("{column}" AS bigint) BETWEEN {start} AND {end}'
+
+            start, end = [cls.format_partition_value(schema, column, value) for value in shard]
+            return f'"{column}" BETWEEN {start} AND {end}'
+
+        if isinstance(shard, list):
+            values = ', '.join(cls.format_partition_value(schema, column, value) for value in shard)
+            return f'"{column}" IN ({values})'
+
+        return f'"{column}" = {cls.format_partition_value(schema, column, shard)}'
+
+    @classmethod
+    def format_partition_value(
+        cls,
+        schema: Schema,
+        column: str,
+        value: Any
+    ) -> str:
+        """
+        Function to format a value of a partition column as a SQL literal matching the data type of the column
+        and its PARTITION_PROJECTION, e.g. the date format or the number of digits of an integer. Values of
+        boolean, numeric, date and timestamp columns (e.g. the strings of a query result) are typed, so they are not
+        compared as strings. Columns of the Schema itself (e.g. the source columns of ICEBERG PARTITION_TRANSFORMS)
+        are also supported.
+
+        :param schema: the Schema of the table, containing the PARTITION_SCHEMA and PARTITION_PROJECTION
+        :param column: the partition column
+        :param value: the value to format
+        """
+        dtype = {**schema.raw, **schema.metadata.get(C.PARTITION_SCHEMA, {})}[column]
+        projection = schema.metadata.get(C.PARTITION_PROJECTION, {}).get(column, {})
+        type_ = cls.get_key('type', projection)
+
+        if isinstance(dtype, (DateDType, TimestampDType)):
+            if isinstance(value, str):
+                return f'{dtype.ATHENA.upper()} {cls.format_parameter(value)}'
+            return cls.format_parameter(value)
+        if isinstance(dtype, cls.INTEGER_DTYPES):
+            return cls.format_parameter(int(value))
+        if isinstance(dtype, BooleanDType):
+            return cls.format_parameter(str(value).lower() == 'true' if isinstance(value, str) else bool(value))
+        if isinstance(dtype, (DoubleDType, FloatDType)):
+            return cls.format_parameter(float(value))
+        if isinstance(dtype, DecimalDType):
+            return cls.format_parameter(Decimal(str(value)))
+
+        if type_ == 'date' and isinstance(value, datetime.date):
+            value = value.strftime(cls.to_strftime(projection['format']))
+        elif type_ == 'integer' and 'digits' in projection:
+            value = str(value).zfill(int(projection['digits']))
+
+        return cls.format_parameter(str(value))
+
+    @staticmethod
+    def to_strftime(
+        date_format: str
+    ) -> str:
+        """
+        Function to convert a Java date format (as used by DATE partition projection) to a Python strftime format.
+
+        :param date_format: the Java date format, e.g. yyyy-MM-dd
+        """
+        tokens = {'yyyy': '%Y', 'yy': '%y', 'MM': '%m', 'dd': '%d', 'HH': '%H', 'mm': '%M', 'ss': '%S'}
+
+        return re.sub('|'.join(tokens), lambda match: tokens[match.group(0)], date_format).replace("'", '')
+
+    @staticmethod
+    def is_sortable_date_format(
+        date_format: str
+    ) -> bool:
+        """
+        Function to check if the strings of a Java date format sort in date order, i.e. the year comes first and each
+        unit is followed by the next smaller one, e.g. yyyy-MM-dd or yyyy/MM/dd/HH but not dd-MM-yyyy.
+
+        :param date_format: the Java date format, e.g. yyyy-MM-dd
+        """
+        units = ['y', 'MM', 'dd', 'HH', 'mm', 'ss']
+        tokens = re.findall('yyyy|yy|MM|dd|HH|mm|ss', re.sub("'[^']*'", '', date_format))
+        tokens = ['y' if token.startswith('y') else token for token in tokens]
+
+        return tokens == units[:len(tokens)]
+
+    @staticmethod
+    def to_datetime(
+        value: Union[str, datetime.date],
+        date_format: str
+    ) -> datetime.datetime:
+        """
+        Function to convert a date, or a string in the given format, to a datetime.
+
+        :param value: the date, datetime or string to convert
+        :param date_format: the Python strftime format of the string, e.g. %d-%m-%Y
+        """
+        if isinstance(value, str):
+            return datetime.datetime.strptime(value, date_format)
+        if isinstance(value, datetime.datetime):
+            return value
+
+        return datetime.datetime.combine(value, datetime.time())
+
+    @classmethod
+    def get_select_query(
+        cls,
+        schema: Schema,
+        columns: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        where: Optional[str] = None,
+        limit: Optional[int] = None,
+        allow_full_scan: Optional[bool] = False
+    ) -> str:
+        """
+        Function to return a SELECT query on the table of a Schema, which only reads the given columns and
+        filters the partition columns with literals matching the PARTITION_PROJECTION (e.g. the date format),
+        so that Athena only scans the columns and partitions needed.
+
+        :param schema: the Schema of the table, containing the TABLE_NAME (and PARTITION_SCHEMA)
+        :param columns: the columns to select, from the Schema or its PARTITION_SCHEMA (default all columns)
+        :param filters: a dictionary of {partition column: shard}, see get_partition_predicate, e.g.
+            {'dt': (datetime.date(2023, 1, 1), datetime.date(2023, 1, 31)), 'region': ['EU', 'US']}
+        :param where: any other predicate to filter the rows by, e.g. "col1" > 0
+        :param limit: the maximum number of rows to return
+        :param allow_full_scan: whether to allow a query on a partitioned table without any partition filters
+        """
+        context = 'get_select_query'
+        table = cls.get_table_identifier(metadata=schema.metadata, context=context)
+
+        partition_schema = schema.metadata.get(C.PARTITION_SCHEMA, {})
+        all_columns = [*schema.raw, *partition_schema]
+        columns = all_columns if columns is None else columns
+        filters = filters if filters else {}
+
+        missing_columns = [col for col in columns if col not in all_columns]
+        if missing_columns:
+            raise UnexpectedParameterError(param=missing_columns, possible_values=all_columns, context=context)
+
+        missing_filters = [col for col in filters if col not in partition_schema]
+        if missing_filters:
+            raise UnexpectedParameterError(
+                param=missing_filters,
+                possible_values=list(partition_schema),
+                context=f'{context} filters'
+            )
+
+        if partition_schema and not filters and not allow_full_scan:
+            raise NoParameterError(
+                param='filters',
+                context=f'{context} on the partitioned table {table} (or set allow_full_scan)'
+            )
+
+        predicates = [cls.get_partition_predicate(schema, col, shard) for col, shard in filters.items()]
+        if where:
+            predicates.append(f'({where})')
+
+        select_columns = cls.format_dict({f'"{col}"': '' for col in columns}, kv_delimiter='')
+        sql = f'SELECT\n\t{select_columns}\nFROM {table}'
+
+        if predicates:
+            sql += f"\nWHERE {' AND '.join(predicates)}"
+        if limit is not None:
+            sql += f'\nLIMIT {int(limit)}'
+
+        return sql
+
+    def select(
+        self,
+        schema: Schema,
+        columns: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        where: Optional[str] = None,
+        limit: Optional[int] = None,
+        allow_full_scan: Optional[bool] = False,
+        columnar: Optional[bool] = False,
+        workgroup: Optional[str] = None,
+        output_location: Optional[S3Url] = None,
+        tag: Optional[str] = None
+    ) -> Union[List[tuple], Dict[str, Any]]:
+        """
+        Function to run the SELECT query of get_select_query and return its results.
+
+        Required IAM permissions:
+            athena:StartQueryExecution
+            athena:GetQueryExecution
+            athena:GetQueryResults
+            s3:GetObject
+
+        :param schema: the Schema of the table, containing the TABLE_NAME (and PARTITION_SCHEMA)
+        :param columns: the columns to select (default all columns)
+        :param filters: a dictionary of {partition column: shard}, see get_select_query
+        :param where: any other predicate to filter the rows by
+        :param limit: the maximum number of rows to return
+        :param allow_full_scan: whether to allow a query on a partitioned table without any partition filters
+        :param columnar: whether to return the results by column (True) or by row (False), see get_query_results
+        :param workgroup: the Athena workgroup to run the query in
+        :param output_location: the S3Url to save the query results to (if not set by the workgroup)
+        :param tag: the tag to record the query statistics under in the QueryMetrics of the client
+        """
+        sql = self.get_select_query(
+            schema=schema,
+            columns=columns,
+            filters=filters,
+            where=where,
+            limit=limit,
+            allow_full_scan=allow_full_scan
+        )
+        query_execution_id = self.execute(sql=sql, workgroup=workgroup, output_location=output_location, tag=tag)
+
+        return self.get_query_results(query_execution_id=query_execution_id, columnar=columnar)
+
+    def unload(
+        self,
+        sql: str,
+        destination: S3Url,
+        format: Optional[str] = C.PARQUET_,
+        compression: Optional[str] = C.SNAPPY_,
+        partitioned_by: Optional[List[str]] = None,
+        database: Optional[str] = None,
+        workgroup: Optional[str] = None,
+        output_location: Optional[S3Url] = None
+    ) -> List[S3Url]:
+        """
+        Function to export the results of a query to S3 with UNLOAD, which writes compressed columnar files
+        in parallel rather than a single CSV result file.
+        The files written are read from the manifest of the query, rather than listed from the destination.
+
+        Required IAM permissions:
+            athena:StartQueryExecution
+            athena:GetQueryExecution
+            s3:ListBucket
+            s3:GetObject
+            s3:PutObject
+
+        :param sql: the SELECT query to export the results of
+        :param destination: the S3Url of the directory to write the files to; this must be empty
+        :param format: the file format of the exported files; one of parquet, orc, avro, json or textfile
+        :param compression: the compression of the exported files; one of Schema.ATHENA_FORMAT_COMPRESSION for the
+            format (textfile as csv), or None for the Athena default of the format (e.g. gzip for parquet, rather
+            than snappy)
+        :param partitioned_by: the columns to partition the exported files by (must be the last columns of the query)
+        :param database: the database to run the query in (if not specified in the query)
+        :param workgroup: the Athena workgroup to run the query in
+        :param output_location: the S3Url to save the query metadata to (if not set by the workgroup)
+        :return: the list of S3Url objects of the exported files
+        """
+        supported_formats = ['parquet', 'orc', 'avro', 'json', 'textfile']
+
+        format = format.lower()
+        if format not in supported_formats:
+            raise UnexpectedParameterError(param=format, possible_values=supported_formats, context='UNLOAD')
+
+        properties = {'format': f"'{format.upper()}'"}
+        if compression:
+            compressions = Schema.ATHENA_FORMAT_COMPRESSION[C.CSV_ if format == 'textfile' else format]
+
+            if compression.lower() not in compressions:
+                raise UnexpectedParameterError(
+                    param=compression,
+                    possible_values=compressions,
+                    context=f'UNLOAD in {format}'
+                )
+
+            properties['compression'] = f"'{compression.upper()}'"
+        if partitioned_by:
+            columns = ', '.join(f"'{col}'" for col in partitioned_by)
+            properties['partitioned_by'] = f'ARRAY[{columns}]'
+
+        if not destination.url.endswith('/'):
+            destination = S3Url(f'{destination.url}/')
+        if self.s3_client.list(s3_url=destination, max_keys=1):
+            raise UnexpectedParameterError(param=destination.url, context='UNLOAD; the destination must be empty')
+
+        query = sql.strip().rstrip(';')
+        unload_sql = (
+            f"UNLOAD ({query})\n"
+            f"TO '{destination.url}'\n"
+            f"WITH ({self.format_dict(properties, kv_delimiter=' = ', line_delimiter=', ')})"
+        )
+
+        query_execution_id = self.start_query(
+            sql=unload_sql,
+            database=database,
+            workgroup=workgroup,
+            output_location=output_location,
+            use_cache=False
+        )
+        execution = self.wait_for_query(query_execution_id=query_execution_id)
+
+        manifest_location = execution.get('Statistics', {}).get('DataManifestLocation')
+        if not manifest_location:
+            results_location = execution['ResultConfiguration']['OutputLocation'].rsplit('/', 1)[0]
+            manifest_location = f'{results_location}/{query_execution_id}-manifest.csv'
+
+        manifest = self.s3_client.read_range(S3Url(manifest_location)).decode('utf-8')
+
+        return [S3Url(line.strip()) for line in manifest.splitlines() if line.strip()]
+
+    def optimize(
+        self,
+        schema: Schema,
+        where: Optional[str] = None,
+        column: Optional[str] = None,
+        ranges: Optional[List[Any]] = None,
+        max_concurrency: Optional[int] = 2,
+        workgroup: Optional[str] = None,
+        output_location: Optional[S3Url] = None
+    ) -> List[str]:
+        """
+        Function to compact the small files of an ICEBERG table with OPTIMIZE ... REWRITE DATA USING BIN_PACK.
+        Large tables can be compacted in shards of a partition column (one query per range) to keep each query
+        within the Athena limits, running at most max_concurrency queries at once.
+
+        Required IAM permissions:
+            athena:StartQueryExecution
+            athena:GetQueryExecution
+            glue:GetTable
+            glue:UpdateTable
+            s3:GetObject
+            s3:ListBucket
+            s3:PutObject
+
+        :param schema: the Schema of the table, containing the TABLE_NAME and TABLE_TYPE ICEBERG
+        :param where: a predicate on the partition columns to only compact some of the files,
+            e.g. dt >= DATE '2023-01-01'
+        :param column: the partition column to shard the compaction by (required if ranges is given)
+        :param ranges: the shards of column, see get_partition_predicate, e.g. from split_date_range
+        :param max_concurrency: the maximum number of queries to run at once
+        :param workgroup: the Athena workgroup to run the queries in
+        :param output_location: the S3Url to save the query metadata to (if not set by the workgroup)
+        :return: the list of QueryExecutionIds, in the same order as the ranges
+        """
+        table = self.get_iceberg_table(metadata=schema.metadata, context='OPTIMIZE')
+
+        predicates = [where]
+        if ranges is not None:
+            if column is None:
+                raise NoParameterError(param='column', context='OPTIMIZE if ranges are given')
+
+            predicates = [
+                self.get_partition_predicate(schema, column, shard) + (f' AND ({where})' if where else '')
+                for shard in ranges
+            ]
+
+        queries = [
+            f'OPTIMIZE {table} REWRITE DATA USING BIN_PACK' + (f'\nWHERE {predicate}' if predicate else '')
+            for predicate in predicates
+        ]
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            return list(executor.map(
+                lambda sql: self.execute(sql=sql, workgroup=workgroup, output_location=output_location),
+                queries
+            ))
+
+    def vacuum(
+        self,
+        schema: Schema,
+        workgroup: Optional[str] = None,
+        output_location: Optional[S3Url] = None
+    ) -> str:
+        """
+        Function to expire the old snapshots of an ICEBERG table and delete the files which are no longer needed
+        (e.g. the small files rewritten by optimize) with VACUUM.
+
+        Required IAM permissions:
+            athena:StartQueryExecution
+            athena:GetQueryExecution
+            glue:GetTable
+            glue:UpdateTable
+            s3:DeleteObject
+            s3:GetObject
+            s3:ListBucket
+
+        :param schema: the Schema of the table, containing the TABLE_NAME and TABLE_TYPE ICEBERG
+        :param workgroup: the Athena workgroup to run the query in
+        :param output_location: the S3Url to save the query metadata to (if not set by the workgroup)
+        :return: the QueryExecutionId of the query
+        """
+        table = self.get_iceberg_table(metadata=schema.metadata, context='VACUUM')
+
+        return self.execute(sql=f'VACUUM {table}', workgroup=workgroup, output_location=output_location)
+
+    @classmethod
+    def get_iceberg_table(
+        cls,
+        metadata: dict,
+        context: str
+    ) -> str:
+        """
+        Function to return the name of an ICEBERG table, i.e. {database}.{table}, checking the TABLE_TYPE.
+
+        :param metadata: the Schema metadata containing the DATABASE_NAME, TABLE_NAME and TABLE_TYPE
+        :param context: the base context for exception logging
+        """
+        table = cls.get_table_identifier(metadata=metadata, context=context)
+
+        if cls.get_key(C.TABLE_TYPE, metadata) != C.ICEBERG_:
+            raise UnexpectedParameterError(
+                param=metadata.get(C.TABLE_TYPE, C.HIVE_),
+                context=f'{C.TABLE_TYPE} for {context}',
+                possible_values=[C.ICEBERG_]
+            )
+
+        return table
+
+    @staticmethod
+    def get_table_identifier(
+        metadata: dict,
+        context: str
+    ) -> str:
+        """
+        Function to return the name of a table to use in a query, i.e. {database}.{table} (or {table} if the
+        DATABASE_NAME is not in the Schema metadata).
+
+        :param metadata: the Schema metadata containing the DATABASE_NAME and TABLE_NAME
+        :param context: the base context for exception logging
+        """
+        if C.TABLE_NAME not in metadata:
+            raise NoParameterError(param=C.TABLE_NAME, context=context)
+
+        database_name = f'{metadata[C.DATABASE_NAME]}.' if C.DATABASE_NAME in metadata else ''
+
+        return f'{database_name}{metadata[C.TABLE_NAME]}'
+
     @classmethod
     def get_create_table(
         cls,
@@ -61,22 +1231,655 @@ class AthenaClient(Boto3Base):
 
         :param schema: the Schema class used to generate the information needed for the query
         """
+        return cls.get_create_tables(schemas=[schema])[0]
+
+    @classmethod
+    def get_create_tables(
+        cls,
+        schemas: List[Schema]
+    ) -> List[str]:
+        """
+        Function to return the CREATE TABLE queries for many Schemas at once.
+        The SQL template is loaded once, and the validation and query fragments (e.g. the SERDE and TBLPROPERTIES)
+        are only derived once for each distinct set of metadata.
+
+        :param schemas: the list of Schemas to generate the queries for
+        """
+        fragments = {}
+
+        return [
+            cls.get_sql_template(name=cls.get_create_table_template(schema.metadata)).format(
+                **cls.get_create_table_kwargs(schema, fragments)
+            )
+            for schema in schemas
+        ]
+
+    @classmethod
+    def get_create_table_template(
+        cls,
+        metadata: dict
+    ) -> str:
+        """
+        Function to return the name of the CREATE TABLE template for the TABLE_TYPE of the Schema (HIVE by default).
+
+        :param metadata: the Schema metadata
+        """
+        table_type = cls.get_key(C.TABLE_TYPE, metadata)
+
+        return cls.CREATE_TABLE_TEMPLATES.get(table_type, cls.CREATE_TABLE_TEMPLATES[C.HIVE_])
+
+    @classmethod
+    def get_create_table_kwargs(
+        cls,
+        schema: Schema,
+        fragments: Optional[dict] = None
+    ) -> Dict[str, str]:
+        """
+        Function to return the values to fill the CREATE TABLE template with for the Schema.
+
+        :param schema: the Schema class used to generate the information needed for the query
+        :param fragments: a dictionary to cache the derived fragments in, shared between Schemas
+        """
+        fragments = {} if fragments is None else fragments
         metadata = schema.metadata
-        cls.validate_metadata(metadata)
 
-        sql_template = Utils.get_file(location=os.path.join(cls.SQL_DIR, 'create_table.sql'))
+        def _get_fragment(name: str, keys: List[str], func: Callable[[dict], Any]) -> Any:
+            fragment_key = (name, json.dumps([metadata.get(k) for k in keys], default=repr))
+            if fragment_key not in fragments:
+                fragments[fragment_key] = func(metadata)
+            return fragments[fragment_key]
 
-        kwargs = {
+        given_required_fields = tuple(k for k in Schema.REQUIRED_ATHENA_FIELDS if k in metadata)
+        _get_fragment(f'validate{given_required_fields}', Schema.VALIDATED_ATHENA_FIELDS, cls.validate_metadata)
+        storage_format = Schema.GLUE_FORMATS[cls.get_key(C.FILE_FORMAT, metadata)]
+
+        return {
             'database_name': cls.get_key(C.DATABASE_NAME, metadata) + '.' if C.DATABASE_NAME in metadata else '',
             'table_name': cls.get_key(C.TABLE_NAME, metadata),
             'column_schema': cls.get_column_schema(schema.raw),
-            'row_format_serde': cls.get_serde(metadata),
+            'row_format_serde': _get_fragment('serde', [C.FILE_FORMAT, C.SERDE_INFO], cls.get_serde),
+            'serde_properties': _get_fragment('serde_properties', [C.SERDE_INFO], cls.get_serde_properties),
+            'input_format': storage_format['InputFormat'],
+            'output_format': storage_format['OutputFormat'],
             'location': cls.get_s3_location(metadata),
-            'partitioned_by': cls.get_partition_info(metadata),
-            'tbl_properties': cls.format_dict(cls.get_tbl_properties(metadata), kv_delimiter=' = ')
+            'partitioned_by': _get_fragment(
+                'partitioned_by',
+                [C.TABLE_TYPE, C.PARTITION_SCHEMA, C.PARTITION_TRANSFORMS],
+                cls.get_partition_info
+            ),
+            'clustered_by': _get_fragment('clustered_by', [C.BUCKETED_BY, C.BUCKET_COUNT], cls.get_bucket_info),
+            'tbl_properties': _get_fragment(
+                'tbl_properties',
+                Schema.TBL_PROPERTIES_FIELDS,
+                lambda m: cls.format_dict(cls.get_tbl_properties(m), kv_delimiter=' = ')
+            ) + cls.get_avro_properties(schema)
+        }
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def get_sql_template(
+        cls,
+        name: str
+    ) -> str:
+        """
+        Function to return the contents of a SQL template in SQL_DIR; each template is only read from disk once.
+
+        :param name: the file name of the template, e.g. create_table.sql
+        """
+        return Utils.get_file(location=os.path.join(cls.SQL_DIR, name))
+
+    def create_tables(
+        self,
+        schemas: List[Schema],
+        max_concurrency: Optional[int] = 5,
+        workgroup: Optional[str] = None,
+        output_location: Optional[S3Url] = None
+    ) -> List[str]:
+        """
+        Function to run the CREATE TABLE queries for many Schemas concurrently.
+        If the client has a SchemaRegistry, tables whose Schema fingerprint is already applied are skipped, and the
+        fingerprints are recorded once all the queries have succeeded. Tables registered with a different Schema
+        are rejected before any query is run, as CREATE TABLE IF NOT EXISTS would not change them (see migrate_table).
+
+        Required IAM permissions:
+            athena:StartQueryExecution
+            athena:GetQueryExecution
+            glue:CreateTable
+            glue:GetTable
+
+        :param schemas: the list of Schemas to create the tables for
+        :param max_concurrency: the maximum number of queries to run at once
+        :param workgroup: the Athena workgroup to run the queries in
+        :param output_location: the S3Url to save the query results to (if not set by the workgroup)
+        :return: the list of QueryExecutionIds, in the same order as the schemas (None for skipped tables)
+        """
+        registry = self.schema_registry
+        pending = [schema for schema in schemas if not (registry and registry.is_applied(schema))]
+
+        changed = [registry.get_key(schema) for schema in pending if registry.is_registered(schema)] if registry else []
+        if changed:
+            raise UnexpectedParameterError(
+                param=changed,
+                context='create_tables as the tables exist with a different Schema; use migrate_table to change them'
+            )
+
+        queries = dict(zip(map(id, pending), self.get_create_tables(schemas=pending)))
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            query_ids = dict(zip(queries, executor.map(
+                lambda sql: self.execute(sql=sql, workgroup=workgroup, output_location=output_location),
+                queries.values()
+            )))
+
+        if registry:
+            registry.put(schemas=pending)
+
+        return [query_ids.get(id(schema)) for schema in schemas]
+
+    @classmethod
+    def get_migration(
+        cls,
+        old_schema: Schema,
+        new_schema: Schema
+    ) -> List[str]:
+        """
+        Function to return the ALTER TABLE queries to change a table from the old Schema to the new Schema in place,
+        instead of dropping and recreating it (which needs all the partitions to be registered again).
+        For HIVE tables, columns which are only appended are added with ADD COLUMNS, and any other column change
+        uses REPLACE COLUMNS; ICEBERG tables use ADD COLUMNS, DROP COLUMN and CHANGE COLUMN, and keep their column
+        order. Changed table properties (e.g. the PARTITION_PROJECTION ranges) are set with SET TBLPROPERTIES.
+        Athena does not support SET SERDEPROPERTIES, so a change of the SERDE_INFO needs the table to be recreated.
+
+        :param old_schema: the Schema the table was created with
+        :param new_schema: the Schema to change the table to
+        :return: the list of queries to run in order, which is empty if there are no changes
+        """
+        for schema in [old_schema, new_schema]:
+            cls.validate_metadata(schema.metadata)
+
+        diff = old_schema.diff(new_schema)
+        is_iceberg = cls.get_key(C.TABLE_TYPE, new_schema.metadata) == C.ICEBERG_
+        location_keys = [k for k in [C.S3_BUCKET, C.S3_PREFIX] if k in diff['metadata']]
+
+        recreate_keys = [k for k in cls.MIGRATION_RECREATE_FIELDS if k in diff['metadata']]
+        recreate_keys += location_keys if is_iceberg else []
+        if recreate_keys:
+            raise UnexpectedParameterError(param=recreate_keys, context='get_migration, as the table must be recreated')
+
+        table = cls.get_table_identifier(metadata=old_schema.metadata, context='get_migration')
+        queries = cls.get_column_migration(table, old_schema, new_schema, diff, is_iceberg)
+
+        if location_keys:
+            queries.append(f"ALTER TABLE {table} SET LOCATION '{cls.get_s3_location(new_schema.metadata)}'")
+
+        old_properties = cls.get_tbl_properties(old_schema.metadata)
+        new_properties = cls.get_tbl_properties(new_schema.metadata)
+
+        properties = {k: v for k, v in new_properties.items() if old_properties.get(k) != v}
+        properties.update({
+            k: v for k, v in cls.TBL_PROPERTIES_DEFAULTS.items() if k in old_properties and k not in new_properties
+        })
+        if cls.get_avro_properties(old_schema) != cls.get_avro_properties(new_schema):
+            properties["'avro.schema.literal'"] = f"'{cls.get_avro_schema(new_schema)}'"
+
+        if properties:
+            tbl_properties = cls.format_dict(properties, kv_delimiter=' = ')
+            queries.append(f'ALTER TABLE {table} SET TBLPROPERTIES (\n\t{tbl_properties}\n)')
+
+        return queries
+
+    @classmethod
+    def get_column_migration(
+        cls,
+        table: str,
+        old_schema: Schema,
+        new_schema: Schema,
+        diff: dict,
+        is_iceberg: bool
+    ) -> List[str]:
+        """
+        Function to return the ALTER TABLE queries to change the columns of a table, see get_migration.
+
+        :param table: the name of the table, i.e. {database}.{table}
+        :param old_schema: the Schema the table was created with
+        :param new_schema: the Schema to change the table to
+        :param diff: the differences between the Schemas, as returned by Schema.diff
+        :param is_iceberg: whether the table is an ICEBERG table
+        """
+        added, removed, changed = diff['added'], diff['removed'], diff['changed']
+        add_columns = f'ALTER TABLE {table} ADD COLUMNS (\n\t{cls.get_column_schema(added)}\n)'
+
+        if is_iceberg:
+            return [
+                *(f'ALTER TABLE {table} DROP COLUMN `{col}`' for col in removed),
+                *(
+                    f'ALTER TABLE {table} CHANGE COLUMN `{col}` `{col}` {new_dtype.ATHENA}'
+                    for col, (_, new_dtype) in changed.items()
+                ),
+                *([add_columns] if added else [])
+            ]
+
+        if not (added or removed or changed or diff['reordered']):
+            return []
+
+        if not (removed or changed) and list(new_schema.raw)[:len(old_schema.raw)] == list(old_schema.raw):
+            return [add_columns]
+
+        return [f'ALTER TABLE {table} REPLACE COLUMNS (\n\t{cls.get_column_schema(new_schema.raw)}\n)']
+
+    def migrate_table(
+        self,
+        old_schema: Schema,
+        new_schema: Schema,
+        workgroup: Optional[str] = None,
+        output_location: Optional[S3Url] = None
+    ) -> List[str]:
+        """
+        Function to run the ALTER TABLE queries to change a table from the old Schema to the new Schema,
+        see get_migration. If the client has a SchemaRegistry, the new Schema is skipped if it is already applied,
+        and is recorded once all the queries have succeeded.
+
+        Required IAM permissions:
+            athena:StartQueryExecution
+            athena:GetQueryExecution
+            glue:GetTable
+            glue:UpdateTable
+
+        :param old_schema: the Schema the table was created with
+        :param new_schema: the Schema to change the table to
+        :param workgroup: the Athena workgroup to run the queries in
+        :param output_location: the S3Url to save the query results to (if not set by the workgroup)
+        :return: the list of QueryExecutionIds of the queries run
+        """
+        registry = self.schema_registry
+        if registry and registry.is_applied(new_schema):
+            return []
+
+        queries = self.get_migration(old_schema=old_schema, new_schema=new_schema)
+        query_ids = [self.execute(sql=sql, workgroup=workgroup, output_location=output_location) for sql in queries]
+
+        if registry:
+            registry.put(schemas=[new_schema])
+
+        return query_ids
+
+    @classmethod
+    def get_file_partitions(
+        cls,
+        schema: Schema,
+        files: Union[List[S3Url], Dict[Tuple[str, ...], List[S3Url]]]
+    ) -> Dict[Tuple[str, ...], List[S3Url]]:
+        """
+        Function to group files by the values of their partition columns, found from the Hive-style directories
+        (col=value/) in their keys, e.g. s3://bucket/prefix/dt=2023-01-01/region=EU/file.parquet.
+
+        :param schema: the Schema of the table, containing the PARTITION_SCHEMA (if partitioned)
+        :param files: the list of the S3Urls of the files, or a dictionary of {partition values: S3Urls} if the
+            partitions are already known
+        :return: a dictionary of {partition values: S3Urls}, e.g. {('2023-01-01', 'EU'): [...]} (or {(): files}
+            if the table is not partitioned)
+        """
+        if isinstance(files, dict):
+            return files
+
+        columns = list(schema.metadata.get(C.PARTITION_SCHEMA, {}))
+        partitions = {}
+
+        for s3_url in files:
+            directories = dict(ele.partition('=')[::2] for ele in s3_url.key.split('/')[:-1] if '=' in ele)
+            missing_columns = [col for col in columns if col not in directories]
+
+            if missing_columns:
+                raise NoParameterError(param=missing_columns, context=f'the partition of {s3_url.url}')
+
+            partitions.setdefault(tuple(unquote(directories[col]) for col in columns), []).append(s3_url)
+
+        return partitions
+
+    @classmethod
+    def get_symlink_manifests(
+        cls,
+        schema: Schema,
+        files: Union[List[S3Url], Dict[Tuple[str, ...], List[S3Url]]],
+        manifest_url: S3Url
+    ) -> Dict[Tuple[str, ...], Tuple[S3Url, str]]:
+        """
+        Function to return the symlink manifests listing the files of each partition of a table, one S3 URL per line,
+        under Hive-style directories of the manifest URL, e.g. s3://bucket/manifests/dt=2023-01-01/symlink.txt.
+
+        :param schema: the Schema of the table, containing the PARTITION_SCHEMA (if partitioned)
+        :param files: the list of the S3Urls of the files, or a dictionary of {partition values: S3Urls},
+            see get_file_partitions
+        :param manifest_url: the S3Url of the directory to write the manifests to, i.e. the location of the table
+        :return: a dictionary of {partition values: (S3Url of the directory of the manifest, contents of the manifest)}
+        """
+        columns = list(schema.metadata.get(C.PARTITION_SCHEMA, {}))
+        manifests = {}
+
+        for values, urls in cls.get_file_partitions(schema=schema, files=files).items():
+            partition_path = ''.join(f'{col}={quote(str(value), safe="")}/' for col, value in zip(columns, values))
+            manifests[values] = (manifest_url.join(partition_path), ''.join(f'{url.url}\n' for url in urls))
+
+        return manifests
+
+    @classmethod
+    def get_symlink_table(
+        cls,
+        schema: Schema,
+        manifest_url: S3Url
+    ) -> str:
+        """
+        Function to return the CREATE TABLE query of a table reading the exact files listed in symlink manifests,
+        using the SymlinkTextInputFormat, so no prefix has to be listed when a query is planned.
+
+        :param schema: the Schema of the files (a HIVE table), containing the TABLE_NAME and FILE_FORMAT
+        :param manifest_url: the S3Url of the directory of the manifests, see get_symlink_manifests
+        """
+        if cls.get_key(C.TABLE_TYPE, schema.metadata) == C.ICEBERG_:
+            raise UnexpectedParameterError(param=C.TABLE_TYPE, context='get_symlink_table, which is for HIVE tables')
+
+        metadata = {**schema.metadata, C.S3_BUCKET: manifest_url.bucket, C.S3_PREFIX: manifest_url.key}
+        kwargs = cls.get_create_table_kwargs(Schema(schema=schema.raw, metadata=metadata))
+
+        return cls.get_sql_template(name=cls.SYMLINK_TEMPLATE).format(**kwargs)
+
+    @classmethod
+    def get_add_partitions(
+        cls,
+        schema: Schema,
+        locations: Dict[Tuple[str, ...], S3Url],
+        batch_size: Optional[int] = 100
+    ) -> List[str]:
+        """
+        Function to return the ALTER TABLE ADD PARTITION queries to register partitions at the given locations,
+        with up to batch_size partitions in each query.
+
+        :param schema: the Schema of the table, containing the TABLE_NAME and PARTITION_SCHEMA
+        :param locations: a dictionary of {partition values: S3Url of the directory of the partition}
+        :param batch_size: the maximum number of partitions per query
+        """
+        table = cls.get_table_identifier(schema.metadata, context='get_add_partitions')
+        columns = list(schema.metadata.get(C.PARTITION_SCHEMA, {}))
+
+        partitions = [
+            f"PARTITION ({cls.get_partition_spec(columns, values)}) LOCATION '{url.url}'"
+            for values, url in locations.items()
+        ]
+
+        return [
+            f'ALTER TABLE {table} ADD IF NOT EXISTS\n' + '\n'.join(partitions[i:i + batch_size])
+            for i in range(0, len(partitions), batch_size)
+        ]
+
+    @staticmethod
+    def get_partition_spec(
+        columns: List[str],
+        values: Tuple[str, ...]
+    ) -> str:
+        """
+        Function to return the partition spec of a partition for an ALTER TABLE query, e.g. `dt` = '2023-01-01'.
+
+        :param columns: the partition columns
+        :param values: the values of the partition columns
+        """
+        return ', '.join(
+            "`{}` = '{}'".format(col, str(value).replace("'", "''")) for col, value in zip(columns, values)
+        )
+
+    def create_symlink_table(
+        self,
+        schema: Schema,
+        files: Union[List[S3Url], Dict[Tuple[str, ...], List[S3Url]]],
+        manifest_url: S3Url,
+        max_concurrency: Optional[int] = 8,
+        workgroup: Optional[str] = None,
+        output_location: Optional[S3Url] = None
+    ) -> List[str]:
+        """
+        Function to create a table reading an exact list of files (e.g. those written by one ingestion run), by
+        writing a symlink manifest for each partition and running the CREATE TABLE and ADD PARTITION queries.
+        Partitions are not registered if the Schema has a PARTITION_PROJECTION, as the manifests follow the default
+        Hive-style layout under the manifest URL.
+
+        Required IAM permissions:
+            s3:PutObject
+            athena:StartQueryExecution
+            athena:GetQueryExecution
+            glue:CreateTable
+            glue:GetTable
+            glue:BatchCreatePartition
+
+        :param schema: the Schema of the files (a HIVE table), containing the TABLE_NAME, FILE_FORMAT and
+            PARTITION_SCHEMA (if partitioned)
+        :param files: the list of the S3Urls of the files, or a dictionary of {partition values: S3Urls},
+            see get_file_partitions
+        :param manifest_url: the S3Url of the directory to write the manifests to, i.e. the location of the table
+        :param max_concurrency: the maximum number of manifests to write at once
+        :param workgroup: the Athena workgroup to run the queries in
+        :param output_location: the S3Url to save the query results to (if not set by the workgroup)
+        :return: the list of QueryExecutionIds of the queries run
+        """
+        manifests = self.get_symlink_manifests(schema=schema, files=files, manifest_url=manifest_url)
+        queries = [self.get_symlink_table(schema=schema, manifest_url=manifest_url)]
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            list(executor.map(
+                lambda ele: self.s3_client.s3.put_object(
+                    Bucket=ele[0].bucket,
+                    Key=ele[0].join(self.SYMLINK_MANIFEST).key,
+                    Body=ele[1].encode()
+                ),
+                manifests.values()
+            ))
+
+        if schema.metadata.get(C.PARTITION_SCHEMA) and C.PARTITION_PROJECTION not in schema.metadata:
+            locations = {values: url for values, (url, _) in manifests.items()}
+            queries += self.get_add_partitions(schema=schema, locations=locations)
+
+        return [self.execute(sql=sql, workgroup=workgroup, output_location=output_location) for sql in queries]
+
+    def convert_table(
+        self,
+        source_schema: Schema,
+        target_prefix: S3Url,
+        format: Optional[str] = C.PARQUET_,
+        compression: Optional[str] = C.SNAPPY_,
+        partitioned_by: Optional[List[str]] = None,
+        bucketed_by: Optional[List[str]] = None,
+        bucket_count: Optional[int] = None,
+        table_name: Optional[str] = None,
+        max_partitions: Optional[int] = MAX_CTAS_PARTITIONS,
+        partitions: Optional[List[tuple]] = None,
+        workgroup: Optional[str] = None,
+        output_location: Optional[S3Url] = None
+    ) -> Schema:
+        """
+        Function to convert a table (e.g. CSV files) to a new table with CREATE TABLE AS SELECT (CTAS).
+        A single CTAS query can only write 100 partitions, so larger tables are created from the first
+        max_partitions partitions and the rest are added with one INSERT INTO query per batch of partitions.
+        Athena does not support INSERT INTO for bucketed tables, so bucketed tables must fit in a single CTAS query.
+
+        Required IAM permissions:
+            athena:StartQueryExecution
+            athena:GetQueryExecution
+            athena:GetQueryResults
+            glue:CreateTable
+            glue:GetTable
+            glue:BatchCreatePartition
+            s3:GetObject
+            s3:ListBucket
+            s3:PutObject
+
+        :param source_schema: the Schema of the table to convert, containing the DATABASE_NAME and TABLE_NAME
+        :param target_prefix: the S3Url to write the files of the new table to; this must be empty
+        :param format: the file format of the new table; one of CONVERT_FORMATS
+        :param compression: the compression of the new table; one of Schema.ATHENA_FORMAT_COMPRESSION for the format
+            (None for no compression)
+        :param partitioned_by: the columns to partition the new table by (default the partition columns of the source)
+        :param bucketed_by: the columns to bucket the data in each partition by
+        :param bucket_count: the number of buckets (required if bucketed_by is given)
+        :param table_name: the name of the new table (default {source table name}_{format})
+        :param max_partitions: the maximum number of partitions to write in each query (at most 100)
+        :param partitions: the values of the partitioned_by columns of every partition of the source, e.g. from
+            GlueClient.get_partition_values; if not given, they are found with a SELECT DISTINCT query, which can scan
+            the whole source table (see get_partition_batch_predicates)
+        :param workgroup: the Athena workgroup to run the queries in
+        :param output_location: the S3Url to save the query metadata to (if not set by the workgroup)
+        :return: the Schema of the new table
+        """
+        context = 'convert_table'
+
+        if not 1 <= max_partitions <= self.MAX_CTAS_PARTITIONS:
+            raise UnexpectedParameterError(
+                param=f'max_partitions={max_partitions}',
+                context=f'{context}; must be between 1 and {self.MAX_CTAS_PARTITIONS}, the partition limit of CTAS '
+                        f'and INSERT INTO queries'
+            )
+        source_metadata = source_schema.metadata
+
+        missing_keys = [k for k in [C.DATABASE_NAME, C.TABLE_NAME] if k not in source_metadata]
+        if missing_keys:
+            raise NoParameterError(param=missing_keys, context=context)
+
+        format = format.lower()
+        if format not in self.CONVERT_FORMATS:
+            raise UnexpectedParameterError(param=format, possible_values=self.CONVERT_FORMATS, context=context)
+
+        source_partitions = source_metadata.get(C.PARTITION_SCHEMA, {})
+        columns = {**source_schema.raw, **source_partitions}
+        partitioned_by = list(source_partitions) if partitioned_by is None else partitioned_by
+
+        missing_columns = [col for col in [*partitioned_by, *(bucketed_by or [])] if col not in columns]
+        if missing_columns:
+            raise UnexpectedParameterError(param=missing_columns, possible_values=list(columns), context=context)
+        if bucketed_by and not bucket_count:
+            raise NoParameterError(param='bucket_count', context=f'{context} if bucketed_by is used')
+
+        metadata = {
+            C.DATABASE_NAME: source_metadata[C.DATABASE_NAME],
+            C.TABLE_NAME: table_name if table_name else f'{source_metadata[C.TABLE_NAME]}_{format}',
+            C.S3_BUCKET: target_prefix.bucket,
+            C.S3_PREFIX: target_prefix.key.rstrip('/'),
+            C.FILE_FORMAT: format
+        }
+        if compression:
+            metadata[C.FILE_COMPRESSION] = compression.lower()
+        if partitioned_by:
+            metadata[C.PARTITION_SCHEMA] = {col: columns[col] for col in partitioned_by}
+        if partitioned_by == list(source_partitions) and C.PARTITION_PROJECTION in source_metadata:
+            metadata[C.PARTITION_PROJECTION] = source_metadata[C.PARTITION_PROJECTION]
+        if bucketed_by:
+            metadata.update({C.BUCKETED_BY: bucketed_by, C.BUCKET_COUNT: bucket_count})
+
+        target_schema = Schema(
+            schema={col: dtype for col, dtype in columns.items() if col not in partitioned_by},
+            metadata=metadata
+        )
+        self.validate_metadata(metadata)
+
+        source = f"{source_metadata[C.DATABASE_NAME]}.{source_metadata[C.TABLE_NAME]}"
+        select_columns = [*target_schema.raw, *partitioned_by]
+
+        properties = {
+            'format': f"'{format.upper()}'",
+            'external_location': f"'{self.get_s3_location(metadata)}'"
+        }
+        if compression:
+            properties['write_compression'] = f"'{compression.upper()}'"
+        if partitioned_by:
+            properties['partitioned_by'] = 'ARRAY[' + ', '.join(f"'{col}'" for col in partitioned_by) + ']'
+        if bucketed_by:
+            properties['bucketed_by'] = 'ARRAY[' + ', '.join(f"'{col}'" for col in bucketed_by) + ']'
+            properties['bucket_count'] = str(bucket_count)
+
+        predicates = self.get_partition_batch_predicates(
+            schema=target_schema,
+            source=source,
+            max_partitions=max_partitions,
+            partitions=partitions,
+            workgroup=workgroup,
+            output_location=output_location
+        )
+        if bucketed_by and len(predicates) > 1:
+            raise UnexpectedParameterError(
+                param='bucketed_by',
+                context=f'{context} with more than max_partitions ({max_partitions}) partitions, as INSERT INTO is '
+                        f'not supported for bucketed tables'
+            )
+
+        kwargs = {
+            'database_name': f'{metadata[C.DATABASE_NAME]}.',
+            'table_name': metadata[C.TABLE_NAME],
+            'columns': ',\n\t'.join(f'"{col}"' for col in select_columns),
+            'source': source
         }
+        for i, predicate in enumerate(predicates):
+            template = self.get_sql_template(name='insert_into.sql' if i else 'create_table_as.sql')
+            sql = template.format(
+                properties=self.format_dict(properties, kv_delimiter=' = ', line_delimiter=',\n\t'),
+                where=f'\nWHERE {predicate}' if predicate else '',
+                **kwargs
+            )
+
+            self.execute(sql=sql, workgroup=workgroup, output_location=output_location, use_cache=False)
+
+        return target_schema
+
+    def get_partition_batch_predicates(
+        self,
+        schema: Schema,
+        source: str,
+        max_partitions: Optional[int] = MAX_CTAS_PARTITIONS,
+        partitions: Optional[List[tuple]] = None,
+        workgroup: Optional[str] = None,
+        output_location: Optional[S3Url] = None
+    ) -> List[Optional[str]]:
+        """
+        Function to return the SQL predicates selecting the partitions of a table in batches of max_partitions.
+        Unless the partitions are given, they are found with a SELECT DISTINCT query on the source table; this is
+        only cheap if the columns are partition columns of the source, and otherwise scans the whole source table
+        (the partitions registered in Glue, e.g. from GlueClient.get_partition_values, can be given instead).
+
+        Required IAM permissions:
+            athena:StartQueryExecution
+            athena:GetQueryExecution
+            athena:GetQueryResults
+            s3:GetObject
+
+        :param schema: the Schema with the PARTITION_SCHEMA (and PARTITION_PROJECTION) to format the values with
+        :param source: the full name of the source table, i.e. {database}.{table}
+        :param max_partitions: the maximum number of partitions in each batch
+        :param partitions: the values of the partition columns of every partition, in the order of the PARTITION_SCHEMA
+        :param workgroup: the Athena workgroup to run the query in
+        :param output_location: the S3Url to save the query results to (if not set by the workgroup)
+        :return: the list of predicates, or [None] if the table is not partitioned or is empty
+        """
+        partition_columns = list(schema.metadata.get(C.PARTITION_SCHEMA, {}))
+        if not partition_columns:
+            return [None]
+
+        if partitions is None:
+            select_columns = ', '.join(f'"{col}"' for col in partition_columns)
+            query_execution_id = self.execute(
+                sql=f'SELECT DISTINCT {select_columns} FROM {source}',
+                workgroup=workgroup,
+                output_location=output_location,
+                use_cache=False
+            )
+            partitions = list(self.iter_query_results(query_execution_id=query_execution_id))
+        else:
+            partitions = sorted(partitions, key=str)
+
+        def _get_predicate(values: tuple) -> str:
+            return ' AND '.join(
+                f'"{col}" IS NULL' if value is None else
+                f'"{col}" = {self.format_partition_value(schema, col, value)}'
+                for col, value in zip(partition_columns, values)
+            )
+
+        batches = [partitions[i:i + max_partitions] for i in range(0, len(partitions), max_partitions)]
 
-        return sql_template.format(**kwargs)
+        return [' OR '.join(f'({_get_predicate(values)})' for values in batch) for batch in batches] or [None]
 
     @classmethod
     def validate_metadata(
@@ -105,14 +1908,78 @@ class AthenaClient(Boto3Base):
             )
 
         if C.FILE_COMPRESSION in metadata:
-            if cls.get_key(C.FILE_COMPRESSION, metadata) not in Schema.REQUIRED_ATHENA_COMPRESSION:
+            compressions = Schema.ATHENA_FORMAT_COMPRESSION[cls.get_key(C.FILE_FORMAT, metadata)]
+
+            if cls.get_key(C.FILE_COMPRESSION, metadata) not in compressions:
                 raise UnexpectedParameterError(
                     param=C.FILE_COMPRESSION,
                     context=context,
-                    possible_values=Schema.REQUIRED_ATHENA_COMPRESSION
+                    possible_values=compressions
                 )
 
+        if (C.BUCKETED_BY in metadata) != (C.BUCKET_COUNT in metadata):
+            raise NoParameterError(
+                param=[k for k in [C.BUCKETED_BY, C.BUCKET_COUNT] if k not in metadata],
+                context=f'{context} if bucketing is used'
+            )
+
         cls.validate_metadata_partition(metadata=metadata, context=context)
+        cls.validate_metadata_table_type(metadata=metadata, context=context)
+
+    @classmethod
+    def validate_metadata_table_type(
+        cls,
+        metadata: dict,
+        context: str
+    ) -> None:
+        """
+        Function to validate the TABLE_TYPE part of the Schema metadata; ICEBERG tables only support the
+        ICEBERG_FORMAT file formats and use PARTITION_TRANSFORMS instead of the Hive partitioning and bucketing keys.
+
+        :param metadata: the dictionary of metadata values
+        :param context: the base context for exception logging
+        """
+        table_type = cls.get_key(C.TABLE_TYPE, metadata) or C.HIVE_
+
+        if table_type not in cls.CREATE_TABLE_TEMPLATES:
+            raise UnexpectedParameterError(
+                param=C.TABLE_TYPE,
+                context=context,
+                possible_values=list(cls.CREATE_TABLE_TEMPLATES)
+            )
+
+        if table_type == C.HIVE_:
+            if C.PARTITION_TRANSFORMS in metadata:
+                raise UnexpectedParameterError(
+                    param=C.PARTITION_TRANSFORMS,
+                    context=f'{context} if {C.TABLE_TYPE} is not {C.ICEBERG_}'
+                )
+            return
+
+        iceberg_context = f'{context} if {C.TABLE_TYPE} is {C.ICEBERG_}'
+
+        if cls.get_key(C.FILE_FORMAT, metadata) not in Schema.ICEBERG_FORMAT:
+            raise UnexpectedParameterError(
+                param=C.FILE_FORMAT,
+                context=iceberg_context,
+                possible_values=Schema.ICEBERG_FORMAT
+            )
+
+        hive_keys = [
+            C.SKIP_HEADER, C.PARTITION_SCHEMA, C.PARTITION_PROJECTION, C.BUCKETED_BY, C.BUCKET_COUNT, C.SERDE_INFO
+        ]
+        unsupported_keys = [k for k in hive_keys if k in metadata]
+        if unsupported_keys:
+            raise UnexpectedParameterError(param=unsupported_keys, context=iceberg_context)
+
+        transforms = metadata.get(C.PARTITION_TRANSFORMS, [])
+        invalid_transforms = [t for t in transforms if not cls.PARTITION_TRANSFORM_PATTERN.match(t)]
+        if invalid_transforms:
+            raise UnexpectedParameterError(
+                param=invalid_transforms,
+                context=f'{C.PARTITION_TRANSFORMS} for {context}',
+                possible_values=cls.PARTITION_TRANSFORMS
+            )
 
     @staticmethod
     def validate_metadata_partition(
@@ -182,17 +2049,39 @@ class AthenaClient(Boto3Base):
         metadata: dict
     ) -> str:
         """
-        Function to return the SERDE for the CREATE TABLE query.
+        Function to return the SERDE for the CREATE TABLE query; the SERDE_INFO if given, else the default SerDe
+        of the FILE_FORMAT.
 
-        :param metadata: the Schema metadata containing the S3 bucket and prefix keys
+        :param metadata: the Schema metadata containing the FILE_FORMAT (and SERDE_INFO)
         """
-        serde = {
-            C.PARQUET_: 'ql.io.parquet.serde.ParquetHiveSerDe',
-            C.CSV_: 'serde2.OpenCSVSerde'
-        }
+        if C.SERDE_INFO in metadata:
+            return metadata[C.SERDE_INFO]['SerializationLibrary']
+
         f_format = cls.get_key(C.FILE_FORMAT, metadata)
 
-        return f'org.apache.hadoop.hive.{serde[f_format]}'
+        return Schema.GLUE_FORMATS[f_format]['SerializationLibrary']
+
+    @classmethod
+    def get_serde_properties(
+        cls,
+        metadata: dict
+    ) -> str:
+        """
+        Function to return the WITH SERDEPROPERTIES clause for the CREATE TABLE query, from the Parameters of the
+        SERDE_INFO (e.g. field.delim); the values are escaped, so e.g. a tab is written as \\t.
+
+        :param metadata: the Schema metadata
+        """
+        parameters = metadata.get(C.SERDE_INFO, {}).get('Parameters')
+        if not parameters:
+            return ''
+
+        properties = {
+            f"'{k}'": "'" + str(v).encode('unicode_escape').decode().replace("'", "\\'") + "'"
+            for k, v in parameters.items()
+        }
+
+        return f"\nWITH SERDEPROPERTIES (\n    {cls.format_dict(properties, kv_delimiter=' = ')}\n)"
 
     @staticmethod
     def get_s3_location(
@@ -217,18 +2106,78 @@ class AthenaClient(Boto3Base):
         """
         Function to return the PARTITIONED BY part of the CREATE TABLE query.
 
-        :param metadata: the Schema metadata containing the S3 bucket and prefix keys
+        :param metadata: the Schema metadata containing the PARTITION_SCHEMA (or PARTITION_TRANSFORMS for ICEBERG)
         :return: the formatted string containing the partition column schema, or '' if no partition columns are present
         """
         partition_str = ''
         partition_schema = metadata.get(C.PARTITION_SCHEMA)
+        partition_transforms = metadata.get(C.PARTITION_TRANSFORMS)
 
-        if partition_schema:
+        if cls.get_key(C.TABLE_TYPE, metadata) == C.ICEBERG_:
+            if partition_transforms:
+                transforms = cls.format_dict({t: '' for t in partition_transforms}, kv_delimiter='')
+                partition_str = f'\nPARTITIONED BY (\n\t{transforms}\n)'
+        elif partition_schema:
             column_schema = cls.get_column_schema(column_schema=partition_schema)
             partition_str = f'\nPARTITIONED BY (\n\t{column_schema}\n)'
 
         return partition_str
 
+    @classmethod
+    def get_bucket_info(
+        cls,
+        metadata: dict
+    ) -> str:
+        """
+        Function to return the CLUSTERED BY part of the CREATE TABLE query.
+
+        :param metadata: the Schema metadata containing the BUCKETED_BY and BUCKET_COUNT keys
+        :return: the formatted string containing the bucket columns and count, or '' if the table is not bucketed
+        """
+        bucket_str = ''
+        bucketed_by = metadata.get(C.BUCKETED_BY)
+
+        if bucketed_by:
+            columns = cls.format_dict({f'`{col}`': '' for col in bucketed_by}, kv_delimiter='')
+            bucket_str = f'\nCLUSTERED BY (\n\t{columns}\n) INTO {metadata[C.BUCKET_COUNT]} BUCKETS'
+
+        return bucket_str
+
+    @classmethod
+    def get_avro_properties(
+        cls,
+        schema: Schema
+    ) -> str:
+        """
+        Function to return the avro.schema.literal table property required by AVRO tables, describing the columns
+        of the Schema (all nullable), to append to the TBLPROPERTIES of the CREATE TABLE query.
+
+        :param schema: the Schema of the table
+        :return: the formatted property, or '' if the table is not an AVRO table
+        """
+        metadata = schema.metadata
+        if cls.get_key(C.FILE_FORMAT, metadata) != C.AVRO_ or cls.get_key(C.TABLE_TYPE, metadata) == C.ICEBERG_:
+            return ''
+
+        return f",\n\t'avro.schema.literal' = '{cls.get_avro_schema(schema)}'"
+
+    @staticmethod
+    def get_avro_schema(
+        schema: Schema
+    ) -> str:
+        """
+        Function to return the Avro schema (as JSON) describing the columns of the Schema, all of which are nullable.
+
+        :param schema: the Schema of the table, containing the TABLE_NAME
+        """
+        return json.dumps({
+            'type': 'record',
+            'name': schema.metadata[C.TABLE_NAME],
+            'fields': [
+                {'name': col, 'type': ['null', dtype.AVRO], 'default': None} for col, dtype in schema.raw.items()
+            ]
+        })
+
     @classmethod
     def get_tbl_properties(
         cls,
@@ -240,15 +2189,41 @@ class AthenaClient(Boto3Base):
 
         :param metadata: the Schema metadata containing the S3 bucket and prefix keys
         """
+        return {f"'{k}'": f"'{prop}'" for k, prop in cls.get_table_parameters(metadata).items()}
+
+    @classmethod
+    def get_table_parameters(
+        cls,
+        metadata: dict
+    ) -> Dict[str, str]:
+        """
+        Function to return the (unquoted) table properties of the Schema metadata, e.g. for the TBLPROPERTIES of the
+        CREATE TABLE query or the Parameters of a Glue TableInput (see Schema.to_glue_input). The compression is set
+        with the property of the format (COMPRESSION_PROPERTIES), or compressionType for the other formats.
+
+        :param metadata: the Schema metadata containing the FILE_FORMAT and optionally the FILE_COMPRESSION,
+            SKIP_HEADER, PARTITION_PROJECTION and TABLE_TYPE
+        """
         tbl_props = {}
 
         f_format = cls.get_key(C.FILE_FORMAT, metadata)
         f_compression = cls.get_key(C.FILE_COMPRESSION, metadata)
 
+        if cls.get_key(C.TABLE_TYPE, metadata) == C.ICEBERG_:
+            tbl_props.update({'table_type': 'ICEBERG', 'format': f_format})
+
+            if f_compression:
+                tbl_props.update({'write_compression': f_compression})
+
+            return tbl_props
+
         tbl_props.update({'classification': f_format})
 
         if f_compression:
-            tbl_props.update({'compressionType': f_compression})
+            if f_format in cls.COMPRESSION_PROPERTIES:
+                tbl_props.update({cls.COMPRESSION_PROPERTIES[f_format]: f_compression.upper()})
+            else:
+                tbl_props.update({'compressionType': f_compression})
 
         if f_format == C.CSV_ and metadata.get(C.SKIP_HEADER):
             tbl_props.update({'skip.header.line.count': '1'})
@@ -257,7 +2232,7 @@ class AthenaClient(Boto3Base):
             tbl_props.update({'projection.enabled': 'TRUE'})
             tbl_props.update(cls.get_partition_proj_properties(projection_dict=metadata[C.PARTITION_PROJECTION]))
 
-        return {f"'{k}'": f"'{prop}'" for k, prop in tbl_props.items()}
+        return tbl_props
 
     @classmethod
     def get_partition_proj_properties(
@@ -389,3 +2364,114 @@ class AthenaClient(Boto3Base):
         return {
             f'projection.{column}.type': 'injected'
         }
+
+    def infer_partition_projection(
+        self,
+        schema: Schema,
+        sample: Optional[int] = 10,
+        max_enum_values: Optional[int] = 100,
+        now_end: Optional[bool] = False
+    ) -> dict:
+        """
+        Function to derive the PARTITION_PROJECTION for a table from the partition directories (col=value/)
+        under its S3 location, see infer_projection for how each column is inferred.
+
+        Required IAM permissions:
+            s3:ListBucket
+
+        :param schema: the Schema of the table, containing the S3_BUCKET, S3_PREFIX and PARTITION_SCHEMA
+        :param sample: only list the next partition column under this many directories of each partition column
+        :param max_enum_values: the maximum number of values for an ENUM projection; INJECTED is used above this
+        :param now_end: whether DATE projections should have a range ending at NOW, rather than the latest value
+        :return: the metadata of the Schema with the inferred PARTITION_PROJECTION, validated for get_create_table
+        """
+        metadata = schema.metadata
+        missing_keys = [k for k in [C.S3_BUCKET, C.S3_PREFIX, C.PARTITION_SCHEMA] if k not in metadata]
+
+        if missing_keys:
+            raise NoParameterError(param=missing_keys, context='infer_partition_projection')
+
+        partition_schema = metadata[C.PARTITION_SCHEMA]
+        table_url = S3Url(bucket=metadata[C.S3_BUCKET], prefix=metadata[C.S3_PREFIX])
+        levels = self.s3_client.iter_partition_levels(s3_url=table_url, columns=list(partition_schema), sample=sample)
+
+        projection = {}
+        for column, level in zip(partition_schema, levels):
+            values = sorted({partition_values[-1] for partition_values in level})
+
+            if not values:
+                raise NoParameterError(param=f'{column}=', context=f'partition directories under {table_url}')
+
+            projection[column] = self.infer_projection(
+                values=values,
+                dtype=partition_schema[column],
+                max_enum_values=max_enum_values,
+                now_end=now_end
+            )
+
+        output = {**metadata, C.PARTITION_PROJECTION: projection}
+
+        Schema.validate_metadata(output)
+        self.validate_metadata(output)
+        self.get_partition_proj_properties(projection)
+
+        return output
+
+    @classmethod
+    def infer_projection(
+        cls,
+        values: List[str],
+        dtype: Optional[BaseDType] = None,
+        max_enum_values: Optional[int] = 100,
+        now_end: Optional[bool] = False
+    ) -> Dict[str, Any]:
+        """
+        Function to infer the partition projection of a column from a sample of its values:
+            DATE     if all the values have the same format in PROJECTION_DATE_FORMATS (yyyy-MM-dd for DateDType)
+            INTEGER  if all the values are digits, with the number of digits if they are zero-padded
+            ENUM     if there are at most max_enum_values distinct values
+            INJECTED otherwise
+
+        :param values: the values of the partition column
+        :param dtype: the data type of the partition column in PARTITION_SCHEMA
+        :param max_enum_values: the maximum number of values for an ENUM projection; INJECTED is used above this
+        :param now_end: whether DATE projections should have a range ending at NOW, rather than the latest value
+        """
+        values = sorted(set(values))
+        date_formats = ['yyyy-MM-dd'] if isinstance(dtype, DateDType) else cls.PROJECTION_DATE_FORMATS
+
+        for date_format in date_formats:
+            strftime = cls.to_strftime(date_format)
+            try:
+                dates = sorted(datetime.datetime.strptime(value, strftime) for value in values)
+            except ValueError:
+                continue
+
+            if all(date.strftime(strftime) in values for date in dates):
+                end = 'NOW' if now_end else dates[-1].strftime(strftime)
+                return {
+                    'type': 'date',
+                    'format': date_format,
+                    'range': f'{dates[0].strftime(strftime)},{end}',
+                    'interval': 1,
+                    'interval.unit': cls.PROJECTION_DATE_FORMATS.get(date_format, 'DAYS')
+                }
+
+        if all(value.isdigit() for value in values):
+            integers = sorted(int(value) for value in values)
+            projection = {'type': 'integer', 'range': f'{integers[0]},{integers[-1]}'}
+
+            lengths = {len(value) for value in values}
+            if len(lengths) == 1 and any(value.startswith('0') and len(value) > 1 for value in values):
+                projection['digits'] = lengths.pop()
+
+            interval = functools.reduce(math.gcd, [b - a for a, b in zip(integers, integers[1:])], 0)
+            if interval > 1:
+                projection['interval'] = interval
+
+            return projection
+
+        if len(values) <= max_enum_values:
+            return {'type': 'enum', 'values': values}
+
+        return {'type': 'injected'}
@@ -18,10 +18,31 @@ class C:
     SKIP_HEADER = 'SKIP_HEADER'
     PARTITION_SCHEMA = 'PARTITION_SCHEMA'
     PARTITION_PROJECTION = 'PARTITION_PROJECTION'
+    BUCKETED_BY = 'BUCKETED_BY'
+    BUCKET_COUNT = 'BUCKET_COUNT'
+    TABLE_TYPE = 'TABLE_TYPE'
+    PARTITION_TRANSFORMS = 'PARTITION_TRANSFORMS'
+    SERDE_INFO = 'SERDE_INFO'
 
     # Miscellaneous
     PARQUET_ = 'parquet'
     CSV_ = 'csv'
+    ORC_ = 'orc'
+    AVRO_ = 'avro'
+    JSON_ = 'json'
 
     SNAPPY_ = 'snappy'
     GZIP_ = 'gzip'
+    ZLIB_ = 'zlib'
+    ZSTD_ = 'zstd'
+    DEFLATE_ = 'deflate'
+
+    HIVE_ = 'hive'
+    ICEBERG_ = 'iceberg'
+
+    PRIMARY_WORKGROUP_ = 'primary'
+
+    # Query Execution States
+    SUCCEEDED_ = 'SUCCEEDED'
+    FAILED_ = 'FAILED'
+    CANCELLED_ = 'CANCELLED'
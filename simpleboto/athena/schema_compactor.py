@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+(c) Charlie Collier, all rights reserved
+"""
+
+import gzip
+import json
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Tuple
+
+from simpleboto.athena.athena_client import AthenaClient
+from simpleboto.athena.constants import C
+from simpleboto.athena.utils.schema import Schema
+from simpleboto.athena.utils.schema_reader import SchemaReader
+from simpleboto.athena.utils.schema_writer import SchemaWriter
+from simpleboto.exceptions import NoParameterError, S3DeleteError
+from simpleboto.s3.s3_client import S3Client
+from simpleboto.s3.s3_multipart_upload import S3MultipartUpload
+from simpleboto.s3.s3_url import S3Url
+from simpleboto.utils import Utils
+
+PartitionValues = Tuple[str, ...]
+
+
+class SchemaCompactor:
+    """
+    Compactor of the small files under the S3 location of a Schema, merging the small files of each partition into
+    files of about target_file_size bytes, with the partitions compacted in parallel.
+    CSV and JSON files without a header row (optionally gzipped, as concatenated gzip members are a valid gzip file)
+    are concatenated server-side with UploadPartCopy, with a newline added after any file whose last row is not
+    terminated; Parquet files and CSV files with a header row are read, re-encoded and merged by a SchemaWriter.
+    """
+    CONCAT_FORMATS = [C.CSV_, C.JSON_]
+
+    def __init__(
+        self,
+        schema: Schema,
+        s3_url: Optional[S3Url] = None,
+        target_file_size: Optional[int] = 128 * 1024 ** 2,
+        part_size: Optional[int] = 8 * 1024 ** 2,
+        manifest_url: Optional[S3Url] = None,
+        delete_sources: Optional[bool] = True,
+        newline_terminated: Optional[bool] = True,
+        max_concurrency: Optional[int] = 8,
+        s3_client: Optional[S3Client] = None
+    ) -> None:
+        """
+        :param schema: the Schema of the files, containing the FILE_FORMAT (csv, json or parquet) and optionally the
+            FILE_COMPRESSION, SKIP_HEADER and PARTITION_SCHEMA
+        :param s3_url: the S3Url of the directory of the table (default the S3_BUCKET and S3_PREFIX of the Schema)
+        :param target_file_size: the size of the files to merge the small files into; files at least this size
+            are left as they are
+        :param part_size: the size of each part of the multipart uploads in bytes
+        :param manifest_url: the S3Url of the symlink manifests of the table (see AthenaClient.create_symlink_table);
+            if given, the manifest of each partition is replaced by one listing the compacted files, before any
+            source is deleted
+        :param delete_sources: whether to delete the small files once they have been compacted
+        :param newline_terminated: whether the gzipped files of at least MIN_PART_SIZE bytes (which are copied without
+            being read) can be assumed to end with a newline; if False, a gzip member of a single newline is added
+            after each of them, which is read as an empty row if the file was already terminated
+        :param max_concurrency: the maximum number of partitions to compact at once
+        :param s3_client: the S3Client to use (a new one if not given)
+        """
+        metadata = schema.metadata
+        self.file_format = str(metadata.get(C.FILE_FORMAT)).lower()
+        self.compression = metadata[C.FILE_COMPRESSION].lower() if metadata.get(C.FILE_COMPRESSION) else None
+        SchemaWriter.validate_format(self.file_format, self.compression)
+
+        if s3_url is None:
+            missing_keys = [k for k in [C.S3_BUCKET, C.S3_PREFIX] if k not in metadata]
+            if missing_keys:
+                raise NoParameterError(param=missing_keys, context='SchemaCompactor if s3_url is not given')
+
+            s3_url = S3Url(bucket=metadata[C.S3_BUCKET], prefix=metadata[C.S3_PREFIX])
+
+        self.schema = schema
+        self.s3_url = s3_url
+        self.partition_columns = list(metadata.get(C.PARTITION_SCHEMA, {}))
+        self.header = self.file_format == C.CSV_ and bool(metadata.get(C.SKIP_HEADER))
+        self.concatenate = self.file_format in self.CONCAT_FORMATS and not self.header
+
+        self.target_file_size = target_file_size
+        self.part_size = part_size
+        self.manifest_url = manifest_url
+        self.delete_sources = delete_sources
+        self.newline_terminated = newline_terminated
+        self.max_concurrency = max_concurrency
+        self.s3_client = s3_client if s3_client else S3Client()
+        self.reader = SchemaReader(schema=schema, s3_client=self.s3_client)
+
+        self._file_prefix = f'part-{uuid.uuid4().hex[:12]}'
+
+    def compact(
+        self,
+        since: Optional[str] = None
+    ) -> Dict[PartitionValues, dict]:
+        """
+        Function to compact the small files of every partition of the table, in parallel.
+
+        Required IAM permissions:
+            s3:ListBucket
+            s3:GetObject
+            s3:PutObject
+            s3:DeleteObject
+
+        :param since: only compact partitions where the first partition column is at least this value
+        :return: a dictionary of {partition values: {'sources': [S3Urls compacted], 'outputs': [S3Urls written],
+            'undeleted': [S3Urls of the sources which could not be deleted]}} for the partitions which were compacted;
+            any undeleted sources must be deleted (or the manifest used) so their rows are not read twice
+        """
+        if self.partition_columns:
+            partitions = self.s3_client.list_partitions(
+                s3_url=self.s3_url,
+                columns=self.partition_columns,
+                since=since,
+                max_concurrency=self.max_concurrency
+            )
+        else:
+            partitions = {(): self.s3_url}
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            results = dict(zip(partitions, executor.map(self.compact_partition, partitions, partitions.values())))
+
+        return {values: result for values, result in results.items() if result['sources']}
+
+    def get_groups(
+        self,
+        objects: List[dict]
+    ) -> List[List[dict]]:
+        """
+        Function to group the files smaller than target_file_size (in order) into groups of about target_file_size
+        bytes, each of which is merged into one file; groups of a single file are left as they are.
+
+        :param objects: the list of objects as per the list_objects_v2 response in boto3
+        """
+        groups = [[]]
+        total_size = 0
+
+        for obj in objects:
+            if obj['Size'] >= self.target_file_size:
+                continue
+
+            groups[-1].append(obj)
+            total_size += obj['Size']
+
+            if total_size >= self.target_file_size:
+                groups.append([])
+                total_size = 0
+
+        return [group for group in groups if len(group) > 1]
+
+    def compact_partition(
+        self,
+        values: PartitionValues,
+        s3_url: S3Url
+    ) -> dict:
+        """
+        Function to compact the small files of a partition. The files written are deleted again if any group fails,
+        so the partition is left unchanged (an S3DeleteError is raised if they cannot all be deleted).
+
+        :param values: the values of the partition columns
+        :param s3_url: the S3Url of the directory of the partition
+        :return: a dictionary of {'sources': [S3Urls compacted], 'outputs': [S3Urls written],
+            'undeleted': [S3Urls of the sources which could not be deleted, so are read as well as the outputs]}
+        """
+        objects = [
+            obj for obj in self.s3_client.list(s3_url=s3_url, with_meta=True)
+            if obj['Size'] and not os.path.basename(obj['Key']).startswith(('_', '.'))
+        ]
+        groups = self.get_groups(objects)
+
+        sources = [S3Url(bucket=s3_url.bucket, key=obj['Key']) for group in groups for obj in group]
+        outputs = []
+
+        try:
+            for i, group in enumerate(groups):
+                if self.concatenate:
+                    outputs.append(self.concatenate_files(s3_url.join(self.get_file_name(values, i)), group))
+                else:
+                    self.merge_files(s3_url, group, outputs)
+        except Exception as error:
+            errors = self.s3_client.delete(outputs)
+            if errors:
+                raise S3DeleteError(errors=errors, context=f'the outputs of the partition {s3_url}') from error
+            raise
+
+        if sources and self.manifest_url:
+            compacted = {obj['Key'] for group in groups for obj in group}
+            files = [S3Url(bucket=s3_url.bucket, key=obj['Key']) for obj in objects if obj['Key'] not in compacted]
+            self.write_manifest(values, files + outputs)
+
+        undeleted = []
+        if sources and self.delete_sources:
+            errors = self.s3_client.delete(sources)
+            undeleted = [S3Url(bucket=s3_url.bucket, key=error['Key']) for error in errors]
+
+        return {'sources': sources, 'outputs': outputs, 'undeleted': undeleted}
+
+    def get_file_name(
+        self,
+        values: PartitionValues,
+        index: int
+    ) -> str:
+        """
+        Function to return the name of a concatenated file, unique to the partition and group.
+
+        :param values: the values of the partition columns
+        :param index: the index of the group in the partition
+        """
+        partition_hash = Utils.get_hash(json.dumps(values))[:8]
+        extension = SchemaWriter.get_extension(self.file_format, self.compression)
+
+        return f'{self._file_prefix}-{partition_hash}-{index:05d}{extension}'
+
+    def concatenate_files(
+        self,
+        output: S3Url,
+        group: List[dict]
+    ) -> S3Url:
+        """
+        Function to concatenate a group of files into one file server-side, see S3MultipartUpload.copy.
+        Files smaller than MIN_PART_SIZE (which are buffered rather than copied) are read in full, so a newline can be
+        added if their last row is not terminated. For larger files, the last byte is read if they are uncompressed,
+        and gzipped files are assumed to end with a newline unless newline_terminated is False, in which case a gzip
+        member of a newline is added after them.
+
+        :param output: the S3Url of the file to write
+        :param group: the list of objects to concatenate, as per the list_objects_v2 response in boto3
+        :return: the S3Url of the file written
+        """
+        upload = S3MultipartUpload(s3_url=output, part_size=self.part_size, s3_client=self.s3_client)
+        newline = gzip.compress(b'\n') if self.compression else b'\n'
+
+        try:
+            for obj in group:
+                source = S3Url(bucket=output.bucket, key=obj['Key'])
+
+                if obj['Size'] < S3MultipartUpload.MIN_PART_SIZE:
+                    body = self.s3_client.read_range(source)
+                    upload.write(body)
+                    terminated = (gzip.decompress(body) if self.compression else body).endswith(b'\n')
+                else:
+                    upload.copy(s3_url=source, size=obj['Size'])
+                    if self.compression:
+                        terminated = self.newline_terminated
+                    else:
+                        terminated = self.s3_client.read_range(source, start=-1) == b'\n'
+
+                if not terminated:
+                    upload.write(newline)
+
+            upload.close()
+        except Exception:
+            upload.abort()
+            raise
+
+        return output
+
+    def merge_files(
+        self,
+        s3_url: S3Url,
+        group: List[dict],
+        outputs: List[S3Url]
+    ) -> None:
+        """
+        Function to read a group of files and re-encode their rows into files of about target_file_size bytes.
+
+        :param s3_url: the S3Url of the directory of the partition
+        :param group: the list of objects to merge, as per the list_objects_v2 response in boto3
+        :param outputs: the list to add the S3Urls of the files written to (including when the merge fails)
+        """
+        metadata = {k: v for k, v in self.schema.metadata.items() if k != C.PARTITION_SCHEMA}
+        writer = SchemaWriter(
+            schema=Schema(schema=self.schema.raw, metadata=metadata),
+            s3_url=s3_url,
+            target_file_size=self.target_file_size,
+            part_size=self.part_size,
+            max_open_files=1,
+            s3_client=self.s3_client
+        )
+
+        try:
+            with writer:
+                for obj in group:
+                    for rows in self.reader.iter_rows(S3Url(bucket=s3_url.bucket, key=obj['Key'])):
+                        writer.write(rows)
+        finally:
+            outputs.extend(writer.written)
+
+    def write_manifest(
+        self,
+        values: PartitionValues,
+        files: List[S3Url]
+    ) -> None:
+        """
+        Function to replace the symlink manifest of a partition, which is atomic as it is a single PutObject.
+
+        Required IAM permissions:
+            s3:PutObject
+
+        :param values: the values of the partition columns
+        :param files: the S3Urls of all the files of the partition
+        """
+        manifests = AthenaClient.get_symlink_manifests(
+            schema=self.schema,
+            files={values: files},
+            manifest_url=self.manifest_url
+        )
+        directory, body = manifests[values]
+        manifest = directory.join(AthenaClient.SYMLINK_MANIFEST)
+
+        self.s3_client.s3.put_object(Bucket=manifest.bucket, Key=manifest.key, Body=body.encode())
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+(c) Charlie Collier, all rights reserved
+"""
+
+import os
+import pickle
+import tempfile
+from collections import defaultdict
+from typing import Optional, List, Callable, Iterator, Tuple
+
+from simpleboto.athena.athena_client import AthenaClient
+from simpleboto.athena.constants import C
+from simpleboto.athena.utils.schema import Schema
+from simpleboto.athena.utils.schema_reader import SchemaReader
+from simpleboto.athena.utils.schema_writer import SchemaWriter
+from simpleboto.exceptions import NoParameterError
+from simpleboto.s3.s3_client import S3Client
+from simpleboto.s3.s3_url import S3Url
+
+PartitionValues = Tuple[str, ...]
+
+
+class SchemaRepartitioner:
+    """
+    Rewriter of flat data (all files under one prefix) into the Hive-style partition layout (col=value/) of a Schema,
+    so queries can prune partitions, e.g. with the PARTITION_PROJECTION returned by get_create_table.
+    The source files are streamed in parallel in batches of rows. Up to max_open_files partitions are written while the
+    sources are read: a partition is given an open file once it has a part (or a file, if smaller) of rows buffered,
+    and its rows are then written straight to the file, which is only closed once it reaches target_file_size.
+    The rows of the other partitions are buffered (pickled), spilling the largest buffers to local disk when
+    max_memory is exceeded, and are written in turn once every source is read, so files are only closed before
+    reaching target_file_size at the end of a partition. The memory used is bounded by max_memory plus the parts of
+    the open files and the batches read ahead, whereas the local disk used can reach the size of all the partitions
+    which are not open.
+    """
+
+    def __init__(
+        self,
+        schema: Schema,
+        source_schema: Schema,
+        source_url: Optional[S3Url] = None,
+        s3_url: Optional[S3Url] = None,
+        transform: Optional[Callable[[dict], dict]] = None,
+        target_file_size: Optional[int] = 128 * 1024 ** 2,
+        part_size: Optional[int] = 8 * 1024 ** 2,
+        max_open_files: Optional[int] = 8,
+        max_memory: Optional[int] = 256 * 1024 ** 2,
+        spill_dir: Optional[str] = None,
+        max_concurrency: Optional[int] = 8,
+        s3_client: Optional[S3Client] = None
+    ) -> None:
+        """
+        :param schema: the Schema of the partitioned data, containing the PARTITION_SCHEMA, FILE_FORMAT and optionally
+            the FILE_COMPRESSION and SKIP_HEADER
+        :param source_schema: the Schema of the flat data, containing the FILE_FORMAT and optionally the
+            FILE_COMPRESSION and SKIP_HEADER; its columns should include the partition columns (unless transform adds
+            them)
+        :param source_url: the S3Url of the directory of the flat data (default the S3_BUCKET and S3_PREFIX of the
+            source_schema)
+        :param s3_url: the S3Url of the directory to write to (default the S3_BUCKET and S3_PREFIX of the schema)
+        :param transform: a function applied to each row before it is routed to its partition, e.g. to derive the
+            partition columns from a timestamp, or to cast the (string) values of CSV files for a Parquet schema
+        :param target_file_size: the number of (compressed) bytes after which a file is closed and a new one started
+        :param part_size: the size of each part of the multipart uploads in bytes
+        :param max_open_files: the maximum number of partitions to write to while the sources are read
+        :param max_memory: the maximum number of (pickled) bytes of rows to buffer before spilling to local disk
+        :param spill_dir: the local directory to create the spill files in (default the system temporary directory)
+        :param max_concurrency: the maximum number of source files to read at once
+        :param s3_client: the S3Client to use (a new one if not given)
+        """
+        if C.PARTITION_SCHEMA not in schema.metadata:
+            raise NoParameterError(param=C.PARTITION_SCHEMA, context='SchemaRepartitioner')
+
+        if source_url is None:
+            missing_keys = [k for k in [C.S3_BUCKET, C.S3_PREFIX] if k not in source_schema.metadata]
+            if missing_keys:
+                raise NoParameterError(param=missing_keys, context='SchemaRepartitioner if source_url is not given')
+
+            source_url = S3Url(bucket=source_schema.metadata[C.S3_BUCKET], prefix=source_schema.metadata[C.S3_PREFIX])
+
+        self.schema = schema
+        self.source_url = source_url
+        self.transform = transform
+        self.partition_columns = list(schema.metadata[C.PARTITION_SCHEMA])
+        self.flush_size = min(part_size, target_file_size)
+        self.max_open_files = max_open_files
+        self.max_memory = max_memory
+        self.spill_dir = spill_dir
+        self.s3_client = s3_client if s3_client else S3Client()
+
+        self.reader = SchemaReader(schema=source_schema, max_concurrency=max_concurrency, s3_client=self.s3_client)
+        self.writer = SchemaWriter(
+            schema=schema,
+            s3_url=s3_url,
+            target_file_size=target_file_size,
+            part_size=part_size,
+            max_open_files=max_open_files,
+            s3_client=self.s3_client
+        )
+
+        self.partitions = set()
+        self.buffers = defaultdict(list)
+        self.buffer_sizes = defaultdict(int)
+        self.pending_sizes = defaultdict(int)
+        self.spill_files = {}
+        self._spill_path = None
+        self._spill_count = 0
+
+    def repartition(
+        self
+    ) -> List[S3Url]:
+        """
+        Function to rewrite all the files under the source_url into the partitions of the schema.
+        Files with names starting with _ or . (e.g. _SUCCESS) are skipped, and the source files are not deleted.
+
+        Required IAM permissions:
+            s3:ListBucket
+            s3:GetObject
+            s3:PutObject
+
+        :return: the list of the S3Urls of the files written
+        """
+        objects = [
+            S3Url(bucket=self.source_url.bucket, key=obj['Key'])
+            for obj in self.s3_client.list(s3_url=self.source_url, with_meta=True)
+            if obj['Size'] and not os.path.basename(obj['Key']).startswith(('_', '.'))
+        ]
+
+        with tempfile.TemporaryDirectory(dir=self.spill_dir) as spill_path, self.writer:
+            self._spill_path = spill_path
+
+            for _, rows in self.reader.read(objects):
+                self.route(rows)
+
+            for values in sorted(self.pending_sizes, key=str):
+                self.flush(values)
+
+        return self.writer.written
+
+    def route(
+        self,
+        rows: List[dict]
+    ) -> None:
+        """
+        Function to write a batch of rows to the open files of their partitions, or else add them to the buffers of
+        their partitions. A partition with at least flush_size bytes buffered (in memory or spilled) is written while
+        fewer than max_open_files files are open, so no file is closed before it reaches target_file_size. The largest
+        buffers are then spilled to local disk while more than max_memory bytes are buffered.
+
+        :param rows: a batch of rows of a source file
+        """
+        partitions = defaultdict(list)
+        for row in rows:
+            row = self.transform(row) if self.transform else row
+            partitions[tuple(row.get(col) for col in self.partition_columns)].append(row)
+
+        for values, partition_rows in partitions.items():
+            self.partitions.add(values)
+
+            if values in self.writer.files:
+                self.writer.write(partition_rows)
+                continue
+
+            chunk = pickle.dumps(partition_rows, protocol=pickle.HIGHEST_PROTOCOL)
+            self.buffers[values].append(chunk)
+            self.buffer_sizes[values] += len(chunk)
+            self.pending_sizes[values] += len(chunk)
+
+            if self.pending_sizes[values] >= self.flush_size and len(self.writer.files) < self.max_open_files:
+                self.flush(values)
+
+        while sum(self.buffer_sizes.values()) > self.max_memory:
+            self.spill(max(self.buffer_sizes, key=self.buffer_sizes.get))
+
+    def spill(
+        self,
+        values: PartitionValues
+    ) -> None:
+        """
+        Function to append the buffered rows of a partition to its spill file and free the buffer.
+
+        :param values: the values of the partition columns
+        """
+        if values not in self.spill_files:
+            self.spill_files[values] = os.path.join(self._spill_path, f'{self._spill_count:06d}.pkl')
+            self._spill_count += 1
+
+        with open(self.spill_files[values], 'ab') as f:
+            f.writelines(self.buffers.pop(values))
+
+        del self.buffer_sizes[values]
+
+    def flush(
+        self,
+        values: PartitionValues
+    ) -> None:
+        """
+        Function to write the buffered (and spilled) rows of a partition.
+
+        :param values: the values of the partition columns
+        """
+        for rows in self.iter_rows(values):
+            self.writer.write(rows)
+
+    def iter_rows(
+        self,
+        values: PartitionValues
+    ) -> Iterator[List[dict]]:
+        """
+        Function to yield the batches of rows of a partition, from its spill file then its buffer, emptying both.
+        The spill file is deleted once read, so only the partitions still pending use local disk.
+
+        :param values: the values of the partition columns
+        """
+        if values in self.spill_files:
+            spill_file = self.spill_files.pop(values)
+
+            with open(spill_file, 'rb') as f:
+                while f.peek(1):
+                    yield pickle.load(f)
+
+            os.remove(spill_file)
+
+        for chunk in self.buffers.pop(values, []):
+            yield pickle.loads(chunk)
+
+        self.buffer_sizes.pop(values, None)
+        self.pending_sizes.pop(values, None)
+
+    def get_create_table(
+        self,
+        max_enum_values: Optional[int] = 100
+    ) -> str:
+        """
+        Function to return the CREATE TABLE query of the partitioned data, with the S3 location written to and the
+        PARTITION_PROJECTION inferred from the partition values written (see AthenaClient.infer_projection).
+        Rows with a null partition value are written to __HIVE_DEFAULT_PARTITION__, which is not projected.
+
+        :param max_enum_values: the maximum number of values for an ENUM projection; INJECTED is used above this
+        :return: the CREATE TABLE query; the schema must contain the TABLE_NAME
+        """
+        metadata = self.schema.metadata
+        partition_schema = metadata[C.PARTITION_SCHEMA]
+
+        projection = {}
+        for i, column in enumerate(partition_schema):
+            values = [SchemaWriter.format_value(v[i]) for v in self.partitions if v[i] is not None]
+
+            if not values:
+                raise NoParameterError(param=f'{column}=', context='the partitions written by SchemaRepartitioner')
+
+            projection[column] = AthenaClient.infer_projection(
+                values=values,
+                dtype=partition_schema[column],
+                max_enum_values=max_enum_values
+            )
+
+        metadata = {
+            **metadata,
+            C.S3_BUCKET: self.writer.s3_url.bucket,
+            C.S3_PREFIX: self.writer.s3_url.key.rstrip('/'),
+            C.PARTITION_PROJECTION: projection
+        }
+
+        return AthenaClient.get_create_table(Schema(schema=self.schema.raw, metadata=metadata))
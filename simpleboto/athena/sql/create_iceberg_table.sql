@@ -0,0 +1,8 @@
+CREATE TABLE IF NOT EXISTS {database_name}{table_name} (
+    {column_schema}
+){partitioned_by}
+LOCATION
+    '{location}'
+TBLPROPERTIES (
+    {tbl_properties}
+)
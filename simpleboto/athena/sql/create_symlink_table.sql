@@ -0,0 +1,14 @@
+CREATE EXTERNAL TABLE IF NOT EXISTS {database_name}{table_name} (
+    {column_schema}
+){partitioned_by}
+ROW FORMAT SERDE
+    '{row_format_serde}'{serde_properties}
+STORED AS INPUTFORMAT
+    'org.apache.hadoop.hive.ql.io.SymlinkTextInputFormat'
+OUTPUTFORMAT
+    'org.apache.hadoop.hive.ql.io.HiveIgnoreKeyTextOutputFormat'
+LOCATION
+    '{location}'
+TBLPROPERTIES (
+    {tbl_properties}
+)
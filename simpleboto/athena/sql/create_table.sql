@@ -1,8 +1,12 @@
 CREATE EXTERNAL TABLE IF NOT EXISTS {database_name}{table_name} (
     {column_schema}
-){partitioned_by}
+){partitioned_by}{clustered_by}
 ROW FORMAT SERDE
-    '{row_format_serde}'
+    '{row_format_serde}'{serde_properties}
+STORED AS INPUTFORMAT
+    '{input_format}'
+OUTPUTFORMAT
+    '{output_format}'
 LOCATION
     '{location}'
 TBLPROPERTIES (
@@ -0,0 +1,7 @@
+CREATE TABLE {database_name}{table_name}
+WITH (
+    {properties}
+) AS
+SELECT
+    {columns}
+FROM {source}{where}
@@ -0,0 +1,4 @@
+INSERT INTO {database_name}{table_name}
+SELECT
+    {columns}
+FROM {source}{where}
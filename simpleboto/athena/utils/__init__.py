@@ -1,5 +1,7 @@
 from simpleboto.athena.utils.data_types import (
     StringDType,
+    TinyIntDType,
+    SmallIntDType,
     IntegerDType,
     BigIntDType,
     DoubleDType,
@@ -7,14 +9,22 @@ from simpleboto.athena.utils.data_types import (
     BooleanDType,
     DecimalDType,
     VarCharDType,
+    CharDType,
     TimestampDType,
     DateDType,
     DTypes
 )
+from simpleboto.athena.utils.query_cache import QueryCache
+from simpleboto.athena.utils.query_metrics import QueryMetrics
 from simpleboto.athena.utils.schema import Schema
+from simpleboto.athena.utils.schema_reader import SchemaReader
+from simpleboto.athena.utils.schema_registry import SchemaRegistry
+from simpleboto.athena.utils.schema_writer import SchemaWriter
 
 __all__ = [
     'StringDType',
+    'TinyIntDType',
+    'SmallIntDType',
     'IntegerDType',
     'BigIntDType',
     'DoubleDType',
@@ -22,8 +32,14 @@ __all__ = [
     'BooleanDType',
     'DecimalDType',
     'VarCharDType',
+    'CharDType',
     'TimestampDType',
     'DateDType',
     'DTypes',
-    'Schema'
+    'QueryCache',
+    'QueryMetrics',
+    'Schema',
+    'SchemaReader',
+    'SchemaRegistry',
+    'SchemaWriter'
 ]
@@ -3,81 +3,841 @@
 (c) Charlie Collier, all rights reserved
 """
 
+import datetime
+import re
 import sys
-from typing import Optional
+from decimal import Decimal
+from typing import Optional, List, Any, Dict, Tuple
+
+from simpleboto.utils import Utils
 
 
 class BaseDType:
+    """
+    Base class of the data types of a Schema. Data types are immutable and interned, so e.g. every StringDType()
+    and every DecimalDType(10, 6) is the same object, and instances have no __dict__ (only __slots__).
+    """
+    __slots__ = ()
+
+    NUMPY = 'object'
+    FILL = ''
+    PARAMETERS: Tuple[str, ...] = ()
+
+    _INSTANCES: Dict[tuple, 'BaseDType'] = {}
+
+    INTEGER_PATTERN = re.compile(r'^[+-]?\d+$')
+    DECIMAL_PATTERN = re.compile(r'^[+-]?(\d*)\.(\d+)$|^[+-]?(\d+)\.()$')
+    LEADING_ZERO_PATTERN = re.compile(r'^[+-]?0\d+(\.\d*)?$')
+    DOUBLE_PATTERN = re.compile(r'^[+-]?(\d+\.?\d*|\.\d+)[eE][+-]?\d+$|^[+-]?(nan|inf|infinity)$', flags=re.IGNORECASE)
+    DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+    TIMESTAMP_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(\.\d{1,9})?$')
+    GLUE_PATTERN = re.compile(r'^(\w+)(?:\((\d+)(?:,\s*(\d+))?\))?$')
+
+    def __new__(
+        cls
+    ) -> 'BaseDType':
+        return cls._intern()
+
+    @classmethod
+    def _intern(
+        cls,
+        *parameters
+    ) -> 'BaseDType':
+        """
+        Function to return the single instance of the data type with the given PARAMETERS, creating it on first use.
+
+        :param parameters: the values of the PARAMETERS of the data type, e.g. (precision, scale) for DecimalDType
+        """
+        key = (cls, *parameters)
+        instance = BaseDType._INSTANCES.get(key)
+
+        if instance is None:
+            instance = object.__new__(cls)
+            for name, value in cls.get_attributes(*parameters).items():
+                object.__setattr__(instance, name, value)
+
+            instance = BaseDType._INSTANCES.setdefault(key, instance)
+
+        return instance
+
+    @classmethod
+    def get_attributes(
+        cls,
+        *parameters
+    ) -> Dict[str, Any]:
+        """
+        Function to return the values of the __slots__ of a new instance of the data type.
+
+        :param parameters: the values of the PARAMETERS of the data type
+        """
+        return dict(zip(cls.PARAMETERS, parameters))
+
+    def __setattr__(
+        self,
+        name: str,
+        value: Any
+    ) -> None:
+        raise AttributeError(f'{self!r} is immutable')
+
+    def __delattr__(
+        self,
+        name: str
+    ) -> None:
+        raise AttributeError(f'{self!r} is immutable')
+
+    def __reduce__(
+        self
+    ) -> tuple:
+        return self.__class__, tuple(getattr(self, name) for name in self.PARAMETERS)
+
     def __repr__(
         self
     ) -> str:
         return self.__class__.__name__
 
+    @staticmethod
+    def from_athena(
+        athena_type: str,
+        precision: Optional[int] = 0,
+        scale: Optional[int] = 0
+    ) -> 'BaseDType':
+        """
+        Function to return the data type matching the type of a column in an Athena result set.
+        Unknown types (e.g. arrays, maps, structs) are returned as a StringDType.
+
+        :param athena_type: the Athena type name, as given by the ResultSetMetadata ColumnInfo Type
+        :param precision: the precision of the column (decimal only)
+        :param scale: the scale of the column (decimal only)
+        """
+        athena_type = athena_type.lower()
+
+        if athena_type == 'decimal':
+            return DecimalDType(precision, scale)
+
+        dtypes = {
+            'varchar': StringDType,
+            'char': StringDType,
+            'real': FloatDType,
+            **{dtype.ATHENA: dtype for dtype in DTypes if isinstance(getattr(dtype, 'ATHENA', None), str)}
+        }
+
+        return dtypes.get(athena_type, StringDType)()
+
+    @staticmethod
+    def from_glue(
+        glue_type: str
+    ) -> 'BaseDType':
+        """
+        Function to return the data type matching the type of a column in the Glue Data Catalog (Hive DDL),
+        e.g. int, decimal(10,2) or varchar(10). Unknown and complex types (e.g. array<int>) are returned as
+        a StringDType (see Schema.from_glue_columns, which raises for them instead).
+
+        :param glue_type: the Type of the column, as given by the get_table response in boto3
+        """
+        match = BaseDType.GLUE_PATTERN.match(glue_type.strip().lower())
+
+        if not match:
+            return StringDType()
+
+        name, *parameters = match.groups()
+        parameters = [int(parameter) for parameter in parameters if parameter is not None]
+
+        if name == 'int':
+            return IntegerDType()
+        if name == 'varchar' and parameters:
+            return VarCharDType(*parameters)
+        if name == 'char' and parameters:
+            return CharDType(*parameters)
+        if name == 'decimal':
+            return DecimalDType(*(parameters or [10]))
+
+        return BaseDType.from_athena(name)
+
+    @classmethod
+    def from_values(
+        cls,
+        values: List[Optional[str]]
+    ) -> 'BaseDType':
+        """
+        Function to infer the narrowest data type which can hold all the string values of a column, e.g. from a
+        sample of a CSV file. Decimals are given the precision and scale needed for the values, and strings a
+        VarCharDType of the maximum length. Numbers padded with leading zeros (e.g. '007') are kept as strings, as
+        they are usually codes. Columns with only null values are returned as a StringDType.
+
+        :param values: the string values of the column, with None or '' for nulls
+        """
+        values = [value for value in values if value]
+
+        if not values:
+            return StringDType()
+
+        if all(value.lower() in ['true', 'false'] for value in values):
+            return BooleanDType()
+
+        if not any(cls.LEADING_ZERO_PATTERN.match(value) for value in values):
+            if all(cls.INTEGER_PATTERN.match(value) for value in values):
+                integers = [int(value) for value in values]
+                if all(-2 ** 31 <= value < 2 ** 31 for value in integers):
+                    return IntegerDType()
+                if all(-2 ** 63 <= value < 2 ** 63 for value in integers):
+                    return BigIntDType()
+                digits = max(len(str(abs(value))) for value in integers)
+                return DecimalDType(digits) if digits <= 38 else DoubleDType()
+
+            if all(cls.INTEGER_PATTERN.match(value) or cls.DECIMAL_PATTERN.match(value) for value in values):
+                parts = [value.lstrip('+-').partition('.') for value in values]
+                integer_digits = max(len(integer.lstrip('0')) for integer, _, _ in parts)
+                scale = max(len(fraction) for _, _, fraction in parts)
+
+                if integer_digits + scale <= 38:
+                    return DecimalDType(max(integer_digits + scale, 1), scale)
+                return DoubleDType()
+
+            numeric_patterns = [cls.INTEGER_PATTERN, cls.DECIMAL_PATTERN, cls.DOUBLE_PATTERN]
+            if all(any(pattern.match(value) for pattern in numeric_patterns) for value in values):
+                return DoubleDType()
+
+        try:
+            if all(cls.DATE_PATTERN.match(value) and datetime.date.fromisoformat(value) for value in values):
+                return DateDType()
+        except ValueError:
+            pass
+
+        if all(cls.TIMESTAMP_PATTERN.match(value) for value in values):
+            return TimestampDType()
+
+        length = max(len(value) for value in values)
+
+        return VarCharDType(length) if length <= 65535 else StringDType()
+
+    @staticmethod
+    def from_arrow(
+        arrow_type: Any
+    ) -> 'BaseDType':
+        """
+        Function to return the data type matching a column type of an Apache Arrow schema, e.g. from the footer of
+        a Parquet file (requires pyarrow). Unknown types (e.g. lists, maps, structs) are returned as a StringDType.
+
+        :param arrow_type: the pyarrow DataType of the column
+        """
+        pa = Utils.import_module('pyarrow')
+
+        if pa.types.is_decimal(arrow_type):
+            return DecimalDType(arrow_type.precision, arrow_type.scale)
+
+        dtypes = [
+            (pa.types.is_boolean, BooleanDType),
+            (pa.types.is_int64, BigIntDType),
+            (pa.types.is_uint32, BigIntDType),
+            (pa.types.is_integer, IntegerDType),
+            (pa.types.is_float32, FloatDType),
+            (pa.types.is_floating, DoubleDType),
+            (pa.types.is_timestamp, TimestampDType),
+            (pa.types.is_date, DateDType)
+        ]
+
+        return next((dtype for is_type, dtype in dtypes if is_type(arrow_type)), StringDType)()
+
+    def get_invalid_mask(
+        self,
+        values: Any
+    ) -> Any:
+        """
+        Function to check a column of values against the constraints of this data type (e.g. the range of an
+        IntegerDType or the length of a VarCharDType) with vectorised NumPy operations.
+        Values can be typed (e.g. int64 or datetime64) arrays, or lists/object arrays of strings or Python values;
+        nulls (None, '', NaN, NaT and masked values) are always valid.
+
+        :param values: a list, NumPy array or NumPy masked array of the values of the column
+        :return: the boolean NumPy array which is True where the value is invalid
+        """
+        np = Utils.import_module('numpy')
+
+        raw = np.asarray(np.ma.getdata(values))
+        null = {
+            'O': lambda: np.equal(raw, None) | np.equal(raw, ''),
+            'U': lambda: raw == '',
+            'f': lambda: np.isnan(raw),
+            'M': lambda: np.isnat(raw)
+        }.get(raw.dtype.kind, lambda: np.zeros(raw.shape, dtype=bool))()
+        null |= np.ma.getmaskarray(values) if np.ma.isMaskedArray(values) else False
+
+        invalid = np.zeros(raw.shape, dtype=bool)
+        invalid[~null] = self.find_invalid(raw[~null])
+
+        return invalid
+
+    def find_invalid(
+        self,
+        values: Any
+    ) -> Any:
+        """
+        Function to return the boolean array which is True where a (non-null) value is invalid for this data type.
+
+        :param values: the NumPy array of the non-null values of the column
+        """
+        np = Utils.import_module('numpy')
+
+        return np.zeros(values.shape, dtype=bool)
+
+    @staticmethod
+    def is_string_kind(
+        values: Any
+    ) -> bool:
+        """
+        Function to check if a NumPy array holds strings or Python objects (rather than typed values).
+
+        :param values: the NumPy array to check
+        """
+        return values.dtype.kind in 'OUS'
+
+    @staticmethod
+    def split_numbers(
+        strings: Any
+    ) -> Dict[str, Any]:
+        """
+        Function to split an array of strings into the parts of a number ([+-]integer.fraction[e[+-]exponent])
+        with vectorised NumPy string operations.
+
+        :param strings: the NumPy array of strings
+        :return: a dictionary of arrays, with the keys:
+            is_number    [bool] Whether the string is a valid number
+            integer      [str]  The digits before the decimal point
+            fraction     [str]  The digits after the decimal point
+            has_exponent [bool] Whether the string has an exponent
+        """
+        np = Utils.import_module('numpy')
+        str_len = np.char.str_len
+
+        unsigned = np.char.lstrip(strings, '+-')
+        mantissa, exponent = unsigned, np.full(strings.shape, '', dtype=unsigned.dtype)
+
+        has_exponent = (np.char.count(unsigned, 'e') + np.char.count(unsigned, 'E')) > 0
+        if has_exponent.any():
+            mantissa = unsigned.copy()
+            split = np.char.partition(np.char.lower(unsigned[has_exponent]), 'e')
+            mantissa[has_exponent], exponent[has_exponent] = split[:, 0], split[:, 2]
+
+        integer, _, fraction = np.moveaxis(np.char.partition(mantissa, '.'), -1, 0)
+        unsigned_exponent = np.char.lstrip(exponent, '+-')
+        valid_exponent = np.char.isdigit(unsigned_exponent) & (str_len(exponent) - str_len(unsigned_exponent) <= 1)
+
+        is_number = (
+            (str_len(strings) - str_len(unsigned) <= 1)
+            & (np.char.isdigit(integer) | (integer == ''))
+            & (np.char.isdigit(fraction) | (fraction == ''))
+            & ((integer != '') | (fraction != ''))
+            & (~has_exponent | valid_exponent)
+        )
+
+        return {'is_number': is_number, 'integer': integer, 'fraction': fraction, 'has_exponent': has_exponent}
+
+    @staticmethod
+    def parse_strings(
+        strings: Any,
+        numpy_type: str
+    ) -> Tuple[Any, Any]:
+        """
+        Function to cast an array of strings to a NumPy type. If the cast fails, the array is bisected to find the
+        values which cannot be cast, so the cast stays vectorised when only a few values are invalid.
+
+        :param strings: the NumPy array of strings
+        :param numpy_type: the NumPy type to cast to, e.g. float64 or datetime64[D]
+        :return: the cast values (0 where the cast failed), and the boolean array which is True where the cast failed
+        """
+        np = Utils.import_module('numpy')
+
+        parsed = np.zeros(strings.shape, dtype=numpy_type)
+        failed = np.zeros(strings.shape, dtype=bool)
+        chunks = [(0, len(strings))]
+
+        while chunks:
+            start, end = chunks.pop()
+            try:
+                parsed[start:end] = strings[start:end].astype(numpy_type)
+            except (ValueError, OverflowError):
+                if end - start == 1:
+                    failed[start] = True
+                else:
+                    middle = (start + end) // 2
+                    chunks.extend([(start, middle), (middle, end)])
+
+        return parsed, failed
+
+    def find_invalid_number(
+        self,
+        values: Any,
+        limit: float,
+        integer: Optional[bool] = False
+    ) -> Any:
+        """
+        Function to return the boolean array which is True where a value is not a number within the limit.
+
+        :param values: the NumPy array of the non-null values of the column
+        :param limit: the limit of the absolute value; integers must be in [-limit, limit)
+        :param integer: whether the values must be integers
+        """
+        np = Utils.import_module('numpy')
+
+        if self.is_string_kind(values):
+            strings = values.astype(str)
+
+            if integer:
+                return self.find_invalid_integer_strings(strings, limit)
+            return self.find_invalid_float_strings(strings, limit)
+
+        if values.dtype.kind not in 'biuf':
+            return np.ones(values.shape, dtype=bool)
+
+        with np.errstate(invalid='ignore'):
+            if not integer:
+                return np.isfinite(values) & (np.abs(values) > limit)
+
+            invalid = (values < -limit) | (values >= limit)
+            if values.dtype.kind == 'f':
+                invalid |= ~np.isfinite(values) | (values != np.floor(values))
+
+            return invalid
+
+    @staticmethod
+    def find_invalid_integer_strings(
+        strings: Any,
+        limit: int
+    ) -> Any:
+        """
+        Function to return the boolean array which is True where a string is not an integer in [-limit, limit).
+        The range is checked by comparing the digits as strings, so the strings are never cast.
+
+        :param strings: the NumPy array of strings
+        :param limit: the limit of the integers, e.g. 2 ** 31
+        """
+        np = Utils.import_module('numpy')
+        str_len = np.char.str_len
+
+        unsigned = np.char.lstrip(strings, '+-')
+        digits = np.char.lstrip(unsigned, '0')
+        max_digits = np.where(np.char.startswith(strings, '-'), str(limit), str(limit - 1))
+        length = str_len(digits)
+
+        return (
+            ~np.char.isdigit(unsigned)
+            | (str_len(strings) - str_len(unsigned) > 1)
+            | (length > len(str(limit)))
+            | ((length == len(str(limit))) & (digits > max_digits))
+        )
+
+    def find_invalid_float_strings(
+        self,
+        strings: Any,
+        limit: float
+    ) -> Any:
+        """
+        Function to return the boolean array which is True where a string is not a number (or nan/inf) within the
+        limit. Only the strings which could exceed the limit (i.e. with an exponent or many digits) are cast.
+
+        :param strings: the NumPy array of strings
+        :param limit: the limit of the absolute value of finite numbers
+        """
+        np = Utils.import_module('numpy')
+
+        parts = self.split_numbers(strings)
+        invalid = ~parts['is_number']
+
+        if invalid.any():
+            specials = np.char.lower(np.char.lstrip(strings[invalid], '+-'))
+            invalid[invalid] = ~np.isin(specials, ['nan', 'inf', 'infinity'])
+
+        if np.isfinite(limit):
+            digits = np.char.str_len(np.char.lstrip(parts['integer'], '0'))
+            check = ~invalid & (parts['has_exponent'] | (digits >= len(str(int(limit)))))
+
+            parsed, _ = self.parse_strings(strings[check], 'float64')
+            invalid[check] = np.isfinite(parsed) & (np.abs(parsed) > limit)
+
+        return invalid
+
+    def find_invalid_datetime(
+        self,
+        values: Any,
+        unit: str
+    ) -> Any:
+        """
+        Function to return the boolean array which is True where a value is not a valid date or timestamp.
+
+        :param values: the NumPy array of the non-null values of the column
+        :param unit: the NumPy datetime unit of the data type, i.e. D for dates or ms for timestamps
+        """
+        np = Utils.import_module('numpy')
+
+        if values.dtype.kind == 'M':
+            return values != values.astype(f'datetime64[{unit}]')
+
+        if not self.is_string_kind(values):
+            return np.ones(values.shape, dtype=bool)
+
+        strings = values.astype(str)
+        parsed, failed = self.parse_strings(strings, f'datetime64[{unit}]')
+        invalid = failed | np.isnat(parsed)
+
+        return invalid | (np.char.str_len(strings) != 10) if unit == 'D' else invalid
+
+    def to_glue(
+        self
+    ) -> str:
+        """
+        Function to return the type of this data type in the Glue Data Catalog (Hive DDL), e.g. int or decimal(10,2).
+        """
+        return 'int' if isinstance(self, IntegerDType) else self.ATHENA.replace(', ', ',')
+
+    def to_arrow(
+        self
+    ) -> Any:
+        """
+        Function to return the Apache Arrow type of this data type, e.g. to write Parquet files (requires pyarrow).
+        """
+        pa = Utils.import_module('pyarrow')
+
+        if isinstance(self, DecimalDType):
+            return pa.decimal128(self.precision, self.scale)
+
+        arrow_types = {
+            'tinyint': pa.int8,
+            'smallint': pa.int16,
+            'integer': pa.int32,
+            'bigint': pa.int64,
+            'double': pa.float64,
+            'float': pa.float32,
+            'boolean': pa.bool_,
+            'date': pa.date32,
+            'timestamp': lambda: pa.timestamp('ms')
+        }
+
+        return arrow_types.get(self.ATHENA, pa.string)()
+
+    def to_numpy(
+        self,
+        values: List[Optional[str]]
+    ) -> Any:
+        """
+        Function to decode a column of Athena string values into a typed NumPy masked array.
+        Null values (None) are masked.
+
+        :param values: the string values of the column, with None for nulls
+        """
+        np = Utils.import_module('numpy')
+
+        raw = np.array(values, dtype=object)
+        mask = np.equal(raw, None)
+
+        return np.ma.MaskedArray(self.decode(raw, mask), mask=mask)
+
+    def decode(
+        self,
+        raw: Any,
+        mask: Any
+    ) -> Any:
+        """
+        Function to cast the object array of string values to the NumPy type of this data type.
+
+        :param raw: the object array of string values
+        :param mask: the boolean array which is True where the value is null
+        """
+        if self.NUMPY == 'object':
+            return raw
+
+        filled = raw.copy()
+        filled[mask] = self.FILL
+
+        return filled.astype(str).astype(self.NUMPY)
+
 
 class StringDType(BaseDType):
+    __slots__ = ()
+
     ATHENA = 'string'
+    AVRO = 'string'
+
+
+class TinyIntDType(BaseDType):
+    __slots__ = ()
+
+    ATHENA = 'tinyint'
+    AVRO = 'int'
+    NUMPY = 'int8'
+    FILL = '0'
+
+    def find_invalid(
+        self,
+        values: Any
+    ) -> Any:
+        return self.find_invalid_number(values, limit=2 ** 7, integer=True)
+
+
+class SmallIntDType(BaseDType):
+    __slots__ = ()
+
+    ATHENA = 'smallint'
+    AVRO = 'int'
+    NUMPY = 'int16'
+    FILL = '0'
+
+    def find_invalid(
+        self,
+        values: Any
+    ) -> Any:
+        return self.find_invalid_number(values, limit=2 ** 15, integer=True)
 
 
 class IntegerDType(BaseDType):
+    __slots__ = ()
+
     ATHENA = 'integer'
+    AVRO = 'int'
+    NUMPY = 'int32'
+    FILL = '0'
+
+    def find_invalid(
+        self,
+        values: Any
+    ) -> Any:
+        return self.find_invalid_number(values, limit=2 ** 31, integer=True)
 
 
 class BigIntDType(BaseDType):
+    __slots__ = ()
+
     ATHENA = 'bigint'
+    AVRO = 'long'
+    NUMPY = 'int64'
+    FILL = '0'
+
+    def find_invalid(
+        self,
+        values: Any
+    ) -> Any:
+        return self.find_invalid_number(values, limit=2 ** 63, integer=True)
 
 
 class DoubleDType(BaseDType):
+    __slots__ = ()
+
     ATHENA = 'double'
+    AVRO = 'double'
+    NUMPY = 'float64'
+    FILL = 'NaN'
+
+    def find_invalid(
+        self,
+        values: Any
+    ) -> Any:
+        return self.find_invalid_number(values, limit=float('inf'))
 
 
 class FloatDType(BaseDType):
+    __slots__ = ()
+
     ATHENA = 'float'
+    AVRO = 'float'
+    NUMPY = 'float32'
+    FILL = 'NaN'
+
+    def find_invalid(
+        self,
+        values: Any
+    ) -> Any:
+        np = Utils.import_module('numpy')
+
+        return self.find_invalid_number(values, limit=np.finfo(np.float32).max)
 
 
 class BooleanDType(BaseDType):
+    __slots__ = ()
+
     ATHENA = 'boolean'
+    AVRO = 'boolean'
+    NUMPY = 'bool'
 
+    def decode(
+        self,
+        raw: Any,
+        mask: Any
+    ) -> Any:
+        return (raw == 'true').astype(self.NUMPY)
 
-class DecimalDType(BaseDType):
-    def __init__(
+    def find_invalid(
         self,
+        values: Any
+    ) -> Any:
+        np = Utils.import_module('numpy')
+
+        if self.is_string_kind(values):
+            return ~np.isin(np.char.lower(values.astype(str)), ['true', 'false'])
+
+        return ~np.isin(values, [0, 1]) if values.dtype.kind in 'biuf' else np.ones(values.shape, dtype=bool)
+
+
+class DecimalDType(BaseDType):
+    __slots__ = ('precision', 'scale', 'ATHENA', 'AVRO')
+
+    PARAMETERS = ('precision', 'scale')
+
+    def __new__(
+        cls,
         precision: int,
         scale: Optional[int] = 0
-    ) -> None:
-        assert precision >= scale, 'PRECISION must be greater than or equal to SCALE for DecimalDType'
+    ) -> 'DecimalDType':
+        return cls._intern(precision, scale)
 
-        self.precision = precision
-        self.scale = scale
+    @classmethod
+    def get_attributes(
+        cls,
+        precision: int,
+        scale: int
+    ) -> Dict[str, Any]:
+        assert precision >= scale, 'PRECISION must be greater than or equal to SCALE for DecimalDType'
 
-        self.ATHENA = f'decimal({self.precision}, {self.scale})'
+        return {
+            'precision': precision,
+            'scale': scale,
+            'ATHENA': f'decimal({precision}, {scale})',
+            'AVRO': {'type': 'bytes', 'logicalType': 'decimal', 'precision': precision, 'scale': scale}
+        }
 
     def __repr__(
         self
     ) -> str:
         return f'{super().__repr__()}({self.precision}, {self.scale})'
 
+    def decode(
+        self,
+        raw: Any,
+        mask: Any
+    ) -> Any:
+        decoded = raw.copy()
+        decoded[~mask] = [Decimal(value) for value in raw[~mask]]
+
+        return decoded
+
+    def find_invalid(
+        self,
+        values: Any
+    ) -> Any:
+        np = Utils.import_module('numpy')
+        limit = 10 ** (self.precision - self.scale)
+
+        if values.dtype.kind in 'biu':
+            return (values <= -limit) | (values >= limit)
+
+        if values.dtype.kind == 'f':
+            return ~np.isfinite(values) | (np.abs(values) >= limit)
+
+        if not self.is_string_kind(values):
+            return np.ones(values.shape, dtype=bool)
+
+        parts = self.split_numbers(values.astype(str))
+        integer_digits = np.char.str_len(np.char.lstrip(parts['integer'], '0'))
+        scale = np.char.str_len(np.char.rstrip(parts['fraction'], '0'))
+
+        return (
+            ~parts['is_number']
+            | parts['has_exponent']
+            | (integer_digits > self.precision - self.scale)
+            | (scale > self.scale)
+        )
+
 
 class VarCharDType(BaseDType):
-    def __init__(
+    __slots__ = ('length', 'ATHENA', 'AVRO')
+
+    PARAMETERS = ('length',)
+
+    def __new__(
+        cls,
+        length: int
+    ) -> 'VarCharDType':
+        return cls._intern(length)
+
+    @classmethod
+    def get_attributes(
+        cls,
+        length: int
+    ) -> Dict[str, Any]:
+        return {'length': length, 'ATHENA': f'varchar({length})', 'AVRO': 'string'}
+
+    def __repr__(
+        self
+    ) -> str:
+        return f'{super().__repr__()}({self.length})'
+
+    def find_invalid(
         self,
+        values: Any
+    ) -> Any:
+        np = Utils.import_module('numpy')
+
+        return np.char.str_len(values.astype(str)) > self.length
+
+
+class CharDType(BaseDType):
+    __slots__ = ('length', 'ATHENA', 'AVRO')
+
+    PARAMETERS = ('length',)
+
+    def __new__(
+        cls,
         length: int
-    ) -> None:
-        self.length = length
+    ) -> 'CharDType':
+        return cls._intern(length)
 
-        self.ATHENA = f'varchar({length})'
+    @classmethod
+    def get_attributes(
+        cls,
+        length: int
+    ) -> Dict[str, Any]:
+        return {'length': length, 'ATHENA': f'char({length})', 'AVRO': 'string'}
 
     def __repr__(
         self
     ) -> str:
         return f'{super().__repr__()}({self.length})'
 
+    def find_invalid(
+        self,
+        values: Any
+    ) -> Any:
+        np = Utils.import_module('numpy')
+
+        return np.char.str_len(values.astype(str)) > self.length
+
 
 class TimestampDType(BaseDType):
+    __slots__ = ()
+
     ATHENA = 'timestamp'
+    AVRO = {'type': 'long', 'logicalType': 'timestamp-millis'}
+    NUMPY = 'datetime64[ms]'
+    FILL = 'NaT'
+
+    def find_invalid(
+        self,
+        values: Any
+    ) -> Any:
+        return self.find_invalid_datetime(values, unit='ms')
 
 
 class DateDType(BaseDType):
+    __slots__ = ()
+
     ATHENA = 'date'
+    AVRO = {'type': 'int', 'logicalType': 'date'}
+    NUMPY = 'datetime64[D]'
+    FILL = 'NaT'
+
+    def find_invalid(
+        self,
+        values: Any
+    ) -> Any:
+        return self.find_invalid_datetime(values, unit='D')
 
 
 DTypes = [getattr(sys.modules[__name__], cls) for cls in dir() if cls.endswith('DType') and 'Base' not in cls]
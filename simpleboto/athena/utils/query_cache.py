@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+(c) Charlie Collier, all rights reserved
+"""
+
+import json
+import os
+import pickle
+import re
+import threading
+import time
+from typing import Optional, Any, List
+
+from simpleboto.utils import Utils
+
+
+class QueryCache:
+    """
+    Cache for Athena queries, keyed by a hash of the normalised SQL, database, workgroup and parameters.
+    Each entry stores the QueryExecutionId and result location of the query, and expires after the TTL.
+    The decoded results can optionally be stored on local disk, with least recently used (LRU) eviction.
+    """
+    MAX_REUSE_MINUTES = 10080
+    SQL_TOKEN_PATTERN = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")|(?:/\*.*?\*/|--[^\n]*|\s)+""", flags=re.DOTALL)
+
+    def __init__(
+        self,
+        ttl: Optional[float] = 3600,
+        cache_dir: Optional[str] = None,
+        max_size_bytes: Optional[int] = None,
+        result_reuse: Optional[bool] = True
+    ) -> None:
+        """
+        :param ttl: the number of seconds an entry is valid for
+        :param cache_dir: the local directory to store decoded results in (if not provided, results are not stored)
+        :param max_size_bytes: the maximum total size of the results in cache_dir; the least recently used
+            results are deleted when this is exceeded
+        :param result_reuse: whether to also set the Athena ResultReuseConfiguration for queries (Athena engine v3)
+        """
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self.result_reuse = result_reuse
+
+        if self.cache_dir and not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+        self.entries = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def normalize_sql(
+        cls,
+        sql: str
+    ) -> str:
+        """
+        Function to normalise a SQL query, so that queries which only differ by comments,
+        whitespace or a trailing semicolon are treated as the same query.
+        String literals and quoted identifiers are kept as they are, e.g. '--x' or 'x  y'.
+
+        :param sql: the SQL query to normalise
+        """
+        sql = cls.SQL_TOKEN_PATTERN.sub(lambda match: match.group(1) or ' ', sql)
+
+        return sql.strip().rstrip(';').strip()
+
+    @classmethod
+    def is_cacheable(
+        cls,
+        sql: str
+    ) -> bool:
+        """
+        Function to check if a query only reads data (SELECT or WITH), and so its results can be cached.
+
+        :param sql: the SQL query to check
+        """
+        return cls.normalize_sql(sql).lower().startswith(('select', 'with', '('))
+
+    @classmethod
+    def get_key(
+        cls,
+        sql: str,
+        database: Optional[str] = None,
+        workgroup: Optional[str] = None,
+        params: Optional[List[Any]] = None
+    ) -> str:
+        """
+        Function to return the cache key of a query.
+
+        :param sql: the SQL query
+        :param database: the database the query is run in
+        :param workgroup: the workgroup the query is run in
+        :param params: the execution parameters of the query
+        """
+        key = json.dumps([cls.normalize_sql(sql), database, workgroup, params], default=str)
+
+        return Utils.get_hash(key)
+
+    def get_reuse_configuration(
+        self
+    ) -> Optional[dict]:
+        """
+        Function to return the ResultReuseConfiguration for start_query_execution, or None if disabled.
+        """
+        if not self.result_reuse:
+            return None
+
+        max_age = min(max(int(self.ttl // 60), 1), self.MAX_REUSE_MINUTES)
+
+        return {'ResultReuseByAgeConfiguration': {'Enabled': True, 'MaxAgeInMinutes': max_age}}
+
+    def get(
+        self,
+        key: str
+    ) -> Optional[dict]:
+        """
+        Function to return the cache entry for the key, or None if there is no valid entry.
+
+        :param key: the cache key, as returned by get_key
+        :return: a dictionary containing the QueryExecutionId and OutputLocation of the query
+        """
+        with self._lock:
+            entry = self.entries.get(key)
+
+            if entry and time.time() - entry['Time'] > self.ttl:
+                del self.entries[key]
+                entry = None
+
+        return entry
+
+    def put(
+        self,
+        key: str,
+        query_execution_id: str,
+        output_location: Optional[str] = None
+    ) -> None:
+        """
+        Function to add a finished query to the cache, removing any expired entries so the cache does not grow
+        with queries which are never repeated.
+
+        :param key: the cache key, as returned by get_key
+        :param query_execution_id: the QueryExecutionId of the query
+        :param output_location: the S3 URL of the query results
+        """
+        now = time.time()
+
+        with self._lock:
+            for expired_key in [k for k, entry in self.entries.items() if now - entry['Time'] > self.ttl]:
+                del self.entries[expired_key]
+
+            self.entries[key] = {
+                'QueryExecutionId': query_execution_id,
+                'OutputLocation': output_location,
+                'Time': now
+            }
+
+    def get_results_path(
+        self,
+        query_execution_id: str,
+        columnar: bool
+    ) -> str:
+        """
+        Function to return the local path of the decoded results of a query.
+
+        :param query_execution_id: the QueryExecutionId of the query
+        :param columnar: whether the results are columnar or not
+        """
+        mode = 'columnar' if columnar else 'rows'
+
+        return os.path.join(self.cache_dir, f'{query_execution_id}.{mode}.pkl')
+
+    def get_results(
+        self,
+        query_execution_id: str,
+        columnar: bool
+    ) -> Optional[Any]:
+        """
+        Function to load the decoded results of a query from local disk, or None if they are not stored.
+        The file is read under the lock (so it cannot be evicted meanwhile), but unpickled outside it.
+
+        :param query_execution_id: the QueryExecutionId of the query
+        :param columnar: whether the results are columnar or not
+        """
+        if not self.cache_dir:
+            return None
+
+        path = self.get_results_path(query_execution_id, columnar)
+
+        with self._lock:
+            if not os.path.exists(path):
+                return None
+
+            os.utime(path)
+            with open(path, 'rb') as f:
+                data = f.read()
+
+        return pickle.loads(data)
+
+    def put_results(
+        self,
+        query_execution_id: str,
+        columnar: bool,
+        results: Any
+    ) -> None:
+        """
+        Function to store the decoded results of a query on local disk, evicting the least recently used results
+        if the cache is larger than max_size_bytes.
+
+        :param query_execution_id: the QueryExecutionId of the query
+        :param columnar: whether the results are columnar or not
+        :param results: the decoded results to store
+        """
+        if not self.cache_dir:
+            return
+
+        with self._lock:
+            with open(self.get_results_path(query_execution_id, columnar), 'wb') as f:
+                pickle.dump(results, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+            self._evict()
+
+    def _evict(
+        self
+    ) -> None:
+        """
+        Function to delete the least recently used results until the cache is within max_size_bytes.
+        """
+        if self.max_size_bytes is None:
+            return
+
+        paths = [os.path.join(self.cache_dir, f) for f in os.listdir(self.cache_dir) if f.endswith('.pkl')]
+        stats = sorted(((os.stat(p).st_mtime, os.stat(p).st_size, p) for p in paths), reverse=True)
+
+        total_size = 0
+        for _, size, path in stats:
+            total_size += size
+            if total_size > self.max_size_bytes:
+                os.remove(path)
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+(c) Charlie Collier, all rights reserved
+"""
+
+import json
+import math
+import time
+from collections import deque, defaultdict
+from typing import Optional, List, Dict, Iterable
+
+from simpleboto.athena.utils.query_cache import QueryCache
+from simpleboto.exceptions import UnexpectedParameterError
+from simpleboto.utils import Utils
+
+
+class QueryMetrics:
+    """
+    In-process store of the statistics of Athena query executions, e.g. the bytes scanned and queue time.
+    Records can be filtered, aggregated by query tag (with percentiles) and exported to JSON lines.
+    """
+    STATISTICS = [
+        'DataScannedInBytes',
+        'EngineExecutionTimeInMillis',
+        'QueryQueueTimeInMillis',
+        'QueryPlanningTimeInMillis',
+        'ServiceProcessingTimeInMillis',
+        'TotalExecutionTimeInMillis'
+    ]
+
+    def __init__(
+        self,
+        max_records: Optional[int] = 100_000
+    ) -> None:
+        """
+        :param max_records: the maximum number of records to keep; the oldest records are dropped first
+        """
+        self.records = deque(maxlen=max_records)
+
+    def record(
+        self,
+        query_execution: dict,
+        tag: Optional[str] = None
+    ) -> dict:
+        """
+        Function to record the statistics of a finished query execution.
+
+        :param query_execution: the QueryExecution dictionary as per the get_query_execution response in boto3
+        :param tag: the tag to group the query by, e.g. the name of the dashboard or job running it
+        :return: the record added to the store
+        """
+        statistics = query_execution.get('Statistics', {})
+
+        record = {
+            'QueryExecutionId': query_execution.get('QueryExecutionId'),
+            'Tag': tag,
+            'SqlHash': Utils.get_hash(QueryCache.normalize_sql(query_execution.get('Query', ''))),
+            'State': query_execution.get('Status', {}).get('State'),
+            'WorkGroup': query_execution.get('WorkGroup'),
+            'ReusedPreviousResult': statistics.get('ResultReuseInformation', {}).get('ReusedPreviousResult', False),
+            'Time': time.time(),
+            **{stat: statistics.get(stat, 0) for stat in self.STATISTICS}
+        }
+        self.records.append(record)
+
+        return record
+
+    def query(
+        self,
+        tag: Optional[str] = None,
+        state: Optional[str] = None,
+        sql_hash: Optional[str] = None
+    ) -> List[dict]:
+        """
+        Function to return the records matching all the given filters.
+
+        :param tag: the tag of the queries
+        :param state: the final state of the queries, e.g. SUCCEEDED
+        :param sql_hash: the hash of the normalised SQL of the queries
+        """
+        filters = {'Tag': tag, 'State': state, 'SqlHash': sql_hash}
+        filters = {k: v for k, v in filters.items() if v is not None}
+
+        return [r for r in list(self.records) if all(r[k] == v for k, v in filters.items())]
+
+    def top(
+        self,
+        metric: Optional[str] = 'DataScannedInBytes',
+        n: Optional[int] = 10
+    ) -> List[dict]:
+        """
+        Function to return the records with the largest values of the metric, e.g. the most expensive queries.
+
+        :param metric: the statistic to sort by; one of STATISTICS
+        :param n: the number of records to return
+        """
+        self.validate_metric(metric)
+
+        return sorted(list(self.records), key=lambda r: r[metric], reverse=True)[:n]
+
+    def aggregate(
+        self,
+        metric: Optional[str] = 'DataScannedInBytes',
+        percentiles: Optional[Iterable[float]] = (50, 90, 99)
+    ) -> Dict[Optional[str], dict]:
+        """
+        Function to aggregate the metric for each query tag.
+
+        :param metric: the statistic to aggregate; one of STATISTICS
+        :param percentiles: the percentiles (between 0 and 100) to calculate
+        :return: a dictionary of {tag: {'count', 'sum', 'mean', 'max', 'p50', ...}}
+        """
+        self.validate_metric(metric)
+
+        grouped = defaultdict(list)
+        for record in list(self.records):
+            grouped[record['Tag']].append(record[metric])
+
+        output = {}
+        for tag, values in grouped.items():
+            values = sorted(values)
+            output[tag] = {
+                'count': len(values),
+                'sum': sum(values),
+                'mean': sum(values) / len(values),
+                'max': values[-1],
+                **{f'p{p:g}': self.percentile(values, p) for p in percentiles}
+            }
+
+        return output
+
+    @staticmethod
+    def percentile(
+        sorted_values: List[float],
+        percentile: float
+    ) -> float:
+        """
+        Function to return the percentile of the sorted values, using linear interpolation between the closest ranks.
+
+        :param sorted_values: the values to calculate the percentile of, in ascending order
+        :param percentile: the percentile to calculate, between 0 and 100
+        """
+        rank = (len(sorted_values) - 1) * percentile / 100
+        lower, upper = math.floor(rank), math.ceil(rank)
+
+        return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+    def validate_metric(
+        self,
+        metric: str
+    ) -> None:
+        """
+        Function to check the metric is one of the recorded statistics.
+
+        :param metric: the name of the statistic
+        """
+        if metric not in self.STATISTICS:
+            raise UnexpectedParameterError(param=metric, possible_values=self.STATISTICS)
+
+    def to_json_lines(
+        self,
+        location: str
+    ) -> None:
+        """
+        Function to export all records to a JSON lines file (one record per line).
+
+        :param location: the location of the file to write to
+        """
+        with open(location, 'w') as f:
+            for record in list(self.records):
+                f.write(json.dumps(record) + '\n')
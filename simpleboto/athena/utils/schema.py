@@ -3,19 +3,33 @@
 (c) Charlie Collier, all rights reserved
 """
 
-from typing import Dict, Optional, TypeVar
+import csv
+import io
+import json
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, TypeVar, List, Tuple, Any
 
 from simpleboto.athena.constants import C
 from simpleboto.athena.utils.data_types import (
     DTypes,
+    BaseDType,
     DecimalDType,
-    VarCharDType
+    VarCharDType,
+    CharDType,
+    StringDType
 )
+from simpleboto.athena.utils.schema_reader import SchemaReader
+from simpleboto.athena.utils.schema_writer import SchemaWriter
 from simpleboto.exceptions import (
     InvalidSchemaTypeError,
     AttributeConditionError,
-    UnexpectedParameterError
+    UnexpectedParameterError,
+    NoParameterError
 )
+from simpleboto.s3.s3_client import S3Client
+from simpleboto.s3.s3_url import S3Url
 from simpleboto.utils import Utils
 
 DataTypes = TypeVar('DataTypes')
@@ -34,12 +48,92 @@ class Schema:
     ]
     REQUIRED_ATHENA_FORMAT = [
         C.PARQUET_,
-        C.CSV_
+        C.CSV_,
+        C.ORC_,
+        C.AVRO_,
+        C.JSON_
     ]
     REQUIRED_ATHENA_COMPRESSION = [
         C.SNAPPY_,
-        C.GZIP_
+        C.GZIP_,
+        C.ZLIB_,
+        C.ZSTD_,
+        C.DEFLATE_
     ]
+    ATHENA_FORMAT_COMPRESSION = {
+        C.PARQUET_: [C.SNAPPY_, C.GZIP_, C.ZSTD_],
+        C.CSV_: [C.SNAPPY_, C.GZIP_, C.ZSTD_],
+        C.ORC_: [C.SNAPPY_, C.ZLIB_, C.ZSTD_],
+        C.AVRO_: [C.SNAPPY_, C.DEFLATE_],
+        C.JSON_: [C.SNAPPY_, C.GZIP_, C.ZSTD_]
+    }
+    ICEBERG_FORMAT = [
+        C.PARQUET_,
+        C.ORC_,
+        C.AVRO_
+    ]
+    VALIDATED_ATHENA_FIELDS = [
+        C.FILE_FORMAT,
+        C.FILE_COMPRESSION,
+        C.SKIP_HEADER,
+        C.PARTITION_SCHEMA,
+        C.PARTITION_PROJECTION,
+        C.BUCKETED_BY,
+        C.BUCKET_COUNT,
+        C.TABLE_TYPE,
+        C.PARTITION_TRANSFORMS,
+        C.SERDE_INFO
+    ]
+    TBL_PROPERTIES_FIELDS = [
+        C.FILE_FORMAT,
+        C.FILE_COMPRESSION,
+        C.SKIP_HEADER,
+        C.PARTITION_PROJECTION,
+        C.TABLE_TYPE
+    ]
+    GLUE_FORMATS = {
+        C.PARQUET_: {
+            'SerializationLibrary': 'org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe',
+            'InputFormat': 'org.apache.hadoop.hive.ql.io.parquet.MapredParquetInputFormat',
+            'OutputFormat': 'org.apache.hadoop.hive.ql.io.parquet.MapredParquetOutputFormat'
+        },
+        C.CSV_: {
+            'SerializationLibrary': 'org.apache.hadoop.hive.serde2.OpenCSVSerde',
+            'InputFormat': 'org.apache.hadoop.mapred.TextInputFormat',
+            'OutputFormat': 'org.apache.hadoop.hive.ql.io.HiveIgnoreKeyTextOutputFormat'
+        },
+        C.ORC_: {
+            'SerializationLibrary': 'org.apache.hadoop.hive.ql.io.orc.OrcSerde',
+            'InputFormat': 'org.apache.hadoop.hive.ql.io.orc.OrcInputFormat',
+            'OutputFormat': 'org.apache.hadoop.hive.ql.io.orc.OrcOutputFormat'
+        },
+        C.AVRO_: {
+            'SerializationLibrary': 'org.apache.hadoop.hive.serde2.avro.AvroSerDe',
+            'InputFormat': 'org.apache.hadoop.hive.ql.io.avro.AvroContainerInputFormat',
+            'OutputFormat': 'org.apache.hadoop.hive.ql.io.avro.AvroContainerOutputFormat'
+        },
+        C.JSON_: {
+            'SerializationLibrary': 'org.openx.data.jsonserde.JsonSerDe',
+            'InputFormat': 'org.apache.hadoop.mapred.TextInputFormat',
+            'OutputFormat': 'org.apache.hadoop.hive.ql.io.HiveIgnoreKeyTextOutputFormat'
+        }
+    }
+    GLUE_SERDE_FORMATS = {
+        'org.apache.hadoop.hive.serde2.lazy.LazySimpleSerDe': C.CSV_,
+        'org.apache.hive.hcatalog.data.JsonSerDe': C.JSON_,
+        **{serde['SerializationLibrary']: f_format for f_format, serde in GLUE_FORMATS.items()}
+    }
+    GLUE_COMPRESSION_PARAMETERS = [
+        'write_compression',
+        'compressionType',
+        'parquet.compression',
+        'orc.compress'
+    ]
+    DTYPE_CLASSES = frozenset(DTypes)
+    INFER_MAX_KEYS = 1000
+    PARQUET_MAGIC = b'PAR1'
+
+    _VALID_DTYPES = set()
 
     def __init__(
         self,
@@ -73,12 +167,21 @@ class Schema:
                     }
                 see the documentation for a full explanation of the allowed values:
                 https://docs.aws.amazon.com/athena/latest/ug/partition-projection-supported-types.html
+            BUCKETED_BY          [list]       The columns to bucket the data in each partition by
+            BUCKET_COUNT         [int]        The number of buckets (required if BUCKETED_BY is given)
+            TABLE_TYPE           [str]        The type of the table; HIVE (default) or ICEBERG
+            PARTITION_TRANSFORMS [list]       The partition transforms of an ICEBERG table, e.g. ['day(ts)', 'region']
+                see the documentation for a full explanation of the allowed transforms:
+                https://docs.aws.amazon.com/athena/latest/ug/querying-iceberg-creating-tables.html
+            SERDE_INFO           [dict]       The SerDe of the table, if not the default for the FILE_FORMAT or if it
+                has properties, e.g. {'SerializationLibrary': '...LazySimpleSerDe', 'Parameters': {'field.delim': ','}}
         """
         self.validate_schema(schema)
         self.raw = schema
 
         metadata = metadata if metadata else {}
         self.validate_metadata(metadata)
+        self.validate_bucketing(schema, metadata)
         self.metadata = metadata
 
     @classmethod
@@ -88,16 +191,18 @@ class Schema:
     ) -> None:
         """
         Function to validate the input Schema, for example checking the correct data types are specified.
+        The class of each data type is looked up in DTYPE_CLASSES, and as data types are interned and immutable,
+        each distinct data type is only validated once.
 
         :param schema: the Schema to validate
         """
-        for key in schema:
-            c_dtype = schema[key]
-
-            if not any(isinstance(c_dtype, dtype) for dtype in DTypes):
+        for key, c_dtype in schema.items():
+            if type(c_dtype) not in cls.DTYPE_CLASSES:
                 raise InvalidSchemaTypeError(column=key, dtype=c_dtype)
 
-            cls.validate_dtype(c_dtype)
+            if c_dtype not in cls._VALID_DTYPES:
+                cls.validate_dtype(c_dtype)
+                cls._VALID_DTYPES.add(c_dtype)
 
     @classmethod
     def validate_dtype(
@@ -130,6 +235,13 @@ class Schema:
                     class_=VarCharDType,
                     condition=f'0 < x ({current_dtype.length}) <= 65535'
                 )
+        elif isinstance(current_dtype, CharDType):
+            if not 0 < current_dtype.length <= 255:
+                raise AttributeConditionError(
+                    attribute='length',
+                    class_=CharDType,
+                    condition=f'0 < x ({current_dtype.length}) <= 255'
+                )
 
     @classmethod
     def validate_metadata(
@@ -163,3 +275,491 @@ class Schema:
                     value=metadata[C.PARTITION_PROJECTION][column],
                     expected_type=dict
                 )
+
+        if C.BUCKETED_BY in keys:
+            Utils.check_type(key=C.BUCKETED_BY, value=metadata[C.BUCKETED_BY], expected_type=list)
+
+        if C.BUCKET_COUNT in keys:
+            Utils.check_type(key=C.BUCKET_COUNT, value=metadata[C.BUCKET_COUNT], expected_type=int)
+
+        if C.TABLE_TYPE in keys:
+            Utils.check_type(key=C.TABLE_TYPE, value=metadata[C.TABLE_TYPE], expected_type=str)
+
+        if C.PARTITION_TRANSFORMS in keys:
+            Utils.check_type(key=C.PARTITION_TRANSFORMS, value=metadata[C.PARTITION_TRANSFORMS], expected_type=list)
+
+        if C.SERDE_INFO in keys:
+            Utils.check_type(key=C.SERDE_INFO, value=metadata[C.SERDE_INFO], expected_type=dict)
+
+    @staticmethod
+    def validate_bucketing(
+        schema: SchemaType,
+        metadata: dict
+    ) -> None:
+        """
+        Function to validate the BUCKETED_BY columns are columns of the Schema (and not partition columns).
+
+        :param schema: the Schema dictionary
+        :param metadata: the metadata dictionary to validate
+        """
+        missing_columns = [col for col in metadata.get(C.BUCKETED_BY, []) if col not in schema]
+
+        if missing_columns:
+            raise UnexpectedParameterError(param=missing_columns, possible_values=list(schema), context=C.BUCKETED_BY)
+
+    def validate_batch(
+        self,
+        columns: Dict[str, Any]
+    ) -> Dict[str, dict]:
+        """
+        Function to check a batch of data against the data types of the Schema before it is uploaded, e.g. to find
+        strings in BigIntDType columns, decimals outside the precision or strings longer than a VarCharDType,
+        see BaseDType.get_invalid_mask. Partition columns (PARTITION_SCHEMA) can also be checked.
+
+        :param columns: a dictionary of {column: values}, where the values are a list or NumPy (masked) array
+        :return: a dictionary of {column: {'mask': the boolean array which is True where a value is invalid,
+            'count': the number of invalid values}}
+        """
+        dtypes = {**self.raw, **self.metadata.get(C.PARTITION_SCHEMA, {})}
+        unexpected_columns = [col for col in columns if col not in dtypes]
+
+        if unexpected_columns:
+            raise UnexpectedParameterError(
+                param=unexpected_columns,
+                possible_values=list(dtypes),
+                context='validate_batch'
+            )
+
+        output = {}
+        for col, values in columns.items():
+            mask = dtypes[col].get_invalid_mask(values)
+            output[col] = {'mask': mask, 'count': int(mask.sum())}
+
+        return output
+
+    def writer(
+        self,
+        s3_url: Optional[S3Url] = None,
+        **kwargs
+    ) -> SchemaWriter:
+        """
+        Function to return a SchemaWriter, to stream batches of rows to S3 in the format of this Schema.
+
+        :param s3_url: the S3Url of the prefix to write to (default the S3_BUCKET and S3_PREFIX of the Schema)
+        :param kwargs: the other parameters of the SchemaWriter, e.g. target_file_size
+        """
+        return SchemaWriter(schema=self, s3_url=s3_url, **kwargs)
+
+    def reader(
+        self,
+        **kwargs
+    ) -> SchemaReader:
+        """
+        Function to return a SchemaReader, to read the rows of files in S3 in the format of this Schema.
+
+        :param kwargs: the parameters of the SchemaReader, e.g. max_concurrency
+        """
+        return SchemaReader(schema=self, **kwargs)
+
+    def diff(
+        self,
+        other: 'Schema'
+    ) -> dict:
+        """
+        Function to return the differences between this Schema and another (e.g. a newer version of the same table).
+        Data types are compared by their Athena type, so e.g. DecimalDType(10, 2) and DecimalDType(12, 2) differ.
+
+        :param other: the Schema to compare against
+        :return: a dictionary of the differences, with the keys:
+            added     [SchemaType] The columns only in the other Schema
+            removed   [SchemaType] The columns only in this Schema
+            changed   [dict]       The columns with a different data type, as {column: (dtype, other dtype)}
+            reordered [bool]       Whether the columns in both Schemas are in a different order
+            metadata  [dict]       The metadata keys with a different value, as {key: (value, other value)}
+        """
+        common = [col for col in self.raw if col in other.raw]
+        metadata_keys = [*self.metadata, *(k for k in other.metadata if k not in self.metadata)]
+
+        return {
+            'added': {col: dtype for col, dtype in other.raw.items() if col not in self.raw},
+            'removed': {col: dtype for col, dtype in self.raw.items() if col not in other.raw},
+            'changed': {
+                col: (self.raw[col], other.raw[col]) for col in common if self.raw[col].ATHENA != other.raw[col].ATHENA
+            },
+            'reordered': common != [col for col in other.raw if col in self.raw],
+            'metadata': {
+                k: (self.metadata.get(k), other.metadata.get(k)) for k in metadata_keys
+                if self.get_metadata_value(self.metadata, k) != self.get_metadata_value(other.metadata, k)
+            }
+        }
+
+    def fingerprint(
+        self
+    ) -> str:
+        """
+        Function to return a stable hash of the columns, data types and metadata of the Schema, which only changes
+        if the table definition changes (the order of the metadata keys is ignored at every level, except for the
+        order of the partition columns).
+        """
+        columns = [[col, dtype.ATHENA] for col, dtype in self.raw.items()]
+        metadata = dict(self.metadata)
+        if isinstance(metadata.get(C.PARTITION_SCHEMA), dict):
+            metadata[C.PARTITION_SCHEMA] = [[col, dtype] for col, dtype in metadata[C.PARTITION_SCHEMA].items()]
+
+        return Utils.get_hash(json.dumps([columns, metadata], sort_keys=True, default=str))
+
+    @staticmethod
+    def get_metadata_value(
+        metadata: dict,
+        key: str
+    ) -> str:
+        """
+        Function to return a comparable representation of a metadata value, with data types given by their repr.
+
+        :param metadata: the metadata dictionary
+        :param key: the metadata key
+        """
+        return json.dumps(metadata.get(key), default=repr)
+
+    @classmethod
+    def from_glue(
+        cls,
+        table: dict
+    ) -> 'Schema':
+        """
+        Function to create the Schema of a table from its definition in the Glue Data Catalog,
+        see GlueClient.get_schema. The FILE_FORMAT is found from the SerDe of the table, and the FILE_COMPRESSION,
+        SKIP_HEADER and PARTITION_PROJECTION from the table parameters. A SerDe which is not the default for the
+        FILE_FORMAT (e.g. LazySimpleSerDe for csv) or which has properties (e.g. field.delim) is kept as the SERDE_INFO,
+        so the table is written back unchanged by to_glue_input and AthenaClient.get_create_table.
+
+        :param table: the Table dictionary as per the get_table (or get_tables) response in boto3
+        """
+        storage = table.get('StorageDescriptor', {})
+        parameters = {**storage.get('Parameters', {}), **table.get('Parameters', {})}
+
+        metadata = {C.DATABASE_NAME: table['DatabaseName'], C.TABLE_NAME: table['Name']}
+
+        if storage.get('Location'):
+            s3_url = S3Url(storage['Location'])
+            metadata.update({C.S3_BUCKET: s3_url.bucket, C.S3_PREFIX: s3_url.key.rstrip('/')})
+
+        if parameters.get('table_type', '').lower() == C.ICEBERG_:
+            metadata[C.TABLE_TYPE] = C.ICEBERG_
+            file_format = parameters.get('format', C.PARQUET_).lower()
+        else:
+            serde_info = storage.get('SerdeInfo', {})
+            serde = serde_info.get('SerializationLibrary')
+            file_format = cls.GLUE_SERDE_FORMATS.get(serde, parameters.get('classification', '').lower())
+
+            default_serde = cls.GLUE_FORMATS.get(file_format, {}).get('SerializationLibrary')
+            if serde and file_format in cls.GLUE_FORMATS and (serde != default_serde or serde_info.get('Parameters')):
+                metadata[C.SERDE_INFO] = {
+                    'SerializationLibrary': serde,
+                    'Parameters': dict(serde_info.get('Parameters', {}))
+                }
+
+        if file_format in cls.REQUIRED_ATHENA_FORMAT:
+            metadata[C.FILE_FORMAT] = file_format
+
+        compression = next((parameters[k].lower() for k in cls.GLUE_COMPRESSION_PARAMETERS if k in parameters), None)
+        if compression in cls.REQUIRED_ATHENA_COMPRESSION:
+            metadata[C.FILE_COMPRESSION] = compression
+
+        if file_format == C.CSV_ and parameters.get('skip.header.line.count') == '1':
+            metadata[C.SKIP_HEADER] = True
+
+        if table.get('PartitionKeys'):
+            metadata[C.PARTITION_SCHEMA] = cls.from_glue_columns(table['PartitionKeys'])
+
+        if storage.get('BucketColumns') and storage.get('NumberOfBuckets', 0) > 0:
+            metadata.update({C.BUCKETED_BY: storage['BucketColumns'], C.BUCKET_COUNT: storage['NumberOfBuckets']})
+
+        if parameters.get('projection.enabled', '').lower() == 'true':
+            metadata[C.PARTITION_PROJECTION] = cls.get_glue_projection(parameters, metadata.get(C.PARTITION_SCHEMA, {}))
+
+        return cls(schema=cls.from_glue_columns(storage.get('Columns', [])), metadata=metadata)
+
+    @staticmethod
+    def from_glue_columns(
+        columns: List[dict]
+    ) -> SchemaType:
+        """
+        Function to return the Schema dictionary of a list of Glue columns.
+        An InvalidSchemaTypeError is raised for unknown and complex types (e.g. array<int>), rather than reading them
+        as strings, as the type of the column would change when the Schema is written back to Glue.
+
+        :param columns: the list of {'Name': ..., 'Type': ...} dictionaries of the columns
+        """
+        schema = {}
+        for col in columns:
+            dtype = BaseDType.from_glue(col['Type'])
+            if dtype is StringDType() and col['Type'].strip().lower() != 'string':
+                raise InvalidSchemaTypeError(dtype=col['Type'], column=col['Name'])
+
+            schema[col['Name']] = dtype
+
+        return schema
+
+    @staticmethod
+    def get_glue_projection(
+        parameters: Dict[str, str],
+        partition_schema: SchemaType
+    ) -> dict:
+        """
+        Function to return the PARTITION_PROJECTION of a table from its projection.* table parameters.
+
+        :param parameters: the parameters of the table
+        :param partition_schema: the PARTITION_SCHEMA of the table
+        """
+        projection = {}
+
+        for column in partition_schema:
+            prefix = f'projection.{column}.'
+            properties = {k[len(prefix):]: v for k, v in parameters.items() if k.startswith(prefix)}
+
+            if properties:
+                if properties.get('type', '').lower() == 'enum':
+                    properties['values'] = properties.get('values', '').split(',')
+
+                projection[column] = properties
+
+        return projection
+
+    def to_glue_input(
+        self,
+        parameters: Optional[Dict[str, str]] = None
+    ) -> dict:
+        """
+        Function to return the TableInput of the Schema for the Glue CreateTable and UpdateTable APIs,
+        see GlueClient.put_table. ICEBERG tables must be created with Athena instead, see AthenaClient.create_tables.
+        The SerDe is the SERDE_INFO if given, else the default SerDe of the FILE_FORMAT.
+
+        :param parameters: any other parameters of the table, e.g. the compression and partition projection properties
+            as given by AthenaClient.get_table_parameters
+        """
+        metadata = self.metadata
+        missing_keys = [k for k in self.REQUIRED_ATHENA_FIELDS if k not in metadata]
+
+        if missing_keys:
+            raise NoParameterError(param=missing_keys, context='Schema.to_glue_input')
+
+        file_format = metadata[C.FILE_FORMAT].lower()
+        if file_format not in self.GLUE_FORMATS:
+            raise UnexpectedParameterError(
+                param=file_format,
+                possible_values=list(self.GLUE_FORMATS),
+                context='Schema.to_glue_input'
+            )
+
+        if str(metadata.get(C.TABLE_TYPE, C.HIVE_)).lower() == C.ICEBERG_:
+            raise UnexpectedParameterError(
+                param=C.TABLE_TYPE,
+                context='Schema.to_glue_input, as ICEBERG tables must be created with Athena'
+            )
+
+        serde = self.GLUE_FORMATS[file_format]
+        storage = {
+            'Columns': self.to_glue_columns(self.raw),
+            'Location': S3Url(bucket=metadata[C.S3_BUCKET], prefix=metadata[C.S3_PREFIX]).url,
+            'InputFormat': serde['InputFormat'],
+            'OutputFormat': serde['OutputFormat'],
+            'SerdeInfo': dict(metadata.get(C.SERDE_INFO, {'SerializationLibrary': serde['SerializationLibrary']}))
+        }
+
+        if metadata.get(C.BUCKETED_BY):
+            storage.update({'BucketColumns': metadata[C.BUCKETED_BY], 'NumberOfBuckets': metadata[C.BUCKET_COUNT]})
+
+        return {
+            'Name': metadata[C.TABLE_NAME].lower(),
+            'TableType': 'EXTERNAL_TABLE',
+            'StorageDescriptor': storage,
+            'PartitionKeys': self.to_glue_columns(metadata.get(C.PARTITION_SCHEMA, {})),
+            'Parameters': {'EXTERNAL': 'TRUE', 'classification': file_format, **(parameters or {})}
+        }
+
+    @staticmethod
+    def to_glue_columns(
+        schema: SchemaType
+    ) -> List[dict]:
+        """
+        Function to return the list of Glue columns of a Schema dictionary.
+
+        :param schema: the Schema dictionary
+        """
+        return [{'Name': col, 'Type': dtype.to_glue()} for col, dtype in schema.items()]
+
+    @classmethod
+    def infer(
+        cls,
+        s3_url: S3Url,
+        sample_files: Optional[int] = 5,
+        sample_bytes: Optional[int] = 65536,
+        file_format: Optional[str] = None,
+        header: Optional[bool] = True,
+        max_concurrency: Optional[int] = 8,
+        s3_client: Optional[S3Client] = None
+    ) -> 'Schema':
+        """
+        Function to infer the Schema of the files under an S3 URL from a sample of (evenly spaced) files.
+        Only the first sample_bytes of each CSV file (optionally gzipped), or only the footer of each Parquet file
+        (requires pyarrow), are read with ranged GETs, in parallel.
+
+        Required IAM permissions:
+            s3:ListBucket
+            s3:GetObject
+
+        :param s3_url: the S3Url object of the directory of the files
+        :param sample_files: the number of files to sample
+        :param sample_bytes: the number of bytes to read from each file
+        :param file_format: the format of the files; either parquet or csv (default parquet if the files end
+            with .parquet, else csv)
+        :param header: whether the CSV files have a header row with the column names (if not, the columns are
+            named col1, col2, ...)
+        :param max_concurrency: the maximum number of files to read at once
+        :param s3_client: the S3Client to read the files with (default a new S3Client)
+        :return: the Schema, with the S3_BUCKET, S3_PREFIX, FILE_FORMAT, FILE_COMPRESSION and SKIP_HEADER metadata
+        """
+        s3_client = s3_client if s3_client else S3Client()
+
+        objects = [
+            obj for obj in s3_client.list(s3_url=s3_url, with_meta=True, max_keys=cls.INFER_MAX_KEYS)
+            if obj['Size'] and not os.path.basename(obj['Key']).startswith(('_', '.'))
+        ]
+        if not objects:
+            raise NoParameterError(param='files', context=f'Schema.infer under {s3_url.url}')
+
+        if len(objects) > sample_files:
+            step = (len(objects) - 1) / max(sample_files - 1, 1)
+            objects = [objects[round(k * step)] for k in range(sample_files)]
+        urls = [S3Url(bucket=s3_url.bucket, key=obj['Key']) for obj in objects]
+
+        if file_format is None:
+            file_format = C.PARQUET_ if urls[0].key.endswith('.parquet') else C.CSV_
+
+        file_format = file_format.lower()
+        if file_format not in [C.PARQUET_, C.CSV_]:
+            raise UnexpectedParameterError(
+                param=file_format,
+                possible_values=[C.PARQUET_, C.CSV_],
+                context='Schema.infer'
+            )
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            if file_format == C.PARQUET_:
+                footers = list(executor.map(lambda url: cls.read_parquet_footer(s3_client, url, sample_bytes), urls))
+            else:
+                samples = list(executor.map(lambda url: s3_client.read_range(url, end=sample_bytes - 1), urls))
+
+        if file_format == C.PARQUET_:
+            schema, compression = cls.infer_parquet(footers=footers)
+        else:
+            schema, compression = cls.infer_csv(urls=urls, samples=samples, sample_bytes=sample_bytes, header=header)
+
+        metadata = {C.S3_BUCKET: s3_url.bucket, C.S3_PREFIX: s3_url.key.rstrip('/'), C.FILE_FORMAT: file_format}
+        if compression:
+            metadata[C.FILE_COMPRESSION] = compression
+        if file_format == C.CSV_ and header:
+            metadata[C.SKIP_HEADER] = True
+
+        return cls(schema=schema, metadata=metadata)
+
+    @classmethod
+    def read_parquet_footer(
+        cls,
+        s3_client: S3Client,
+        s3_url: S3Url,
+        sample_bytes: Optional[int] = 65536
+    ) -> bytes:
+        """
+        Function to read the footer (the file metadata) of a Parquet file with ranged GETs; the last sample_bytes
+        of the file are read first, and the rest of the footer only if it is larger.
+
+        Required IAM permissions:
+            s3:GetObject
+
+        :param s3_client: the S3Client to read the file with
+        :param s3_url: the S3Url object of the Parquet file
+        :param sample_bytes: the number of bytes to read first
+        :return: the footer, as a minimal Parquet file which can be read by pyarrow.parquet.read_metadata
+        """
+        tail = s3_client.read_range(s3_url=s3_url, start=-max(sample_bytes, 8))
+
+        if tail[-4:] != cls.PARQUET_MAGIC:
+            raise UnexpectedParameterError(param=s3_url.url, context=f'{C.PARQUET_} files in Schema.infer')
+
+        footer_length = int.from_bytes(tail[-8:-4], 'little') + 8
+        if footer_length > len(tail):
+            tail = s3_client.read_range(s3_url=s3_url, start=-footer_length)
+
+        return cls.PARQUET_MAGIC + tail[-footer_length:]
+
+    @staticmethod
+    def infer_parquet(
+        footers: List[bytes]
+    ) -> Tuple[SchemaType, Optional[str]]:
+        """
+        Function to infer the Schema dictionary and compression of Parquet files from their footers (requires pyarrow).
+        The columns of all the files are combined, with the data type of the first file containing each column.
+
+        :param footers: the footers of the files, as returned by read_parquet_footer
+        :return: a tuple of the Schema dictionary and the FILE_COMPRESSION (None if uncompressed or not supported)
+        """
+        pa = Utils.import_module('pyarrow')
+        pq = Utils.import_module('pyarrow.parquet')
+
+        schema, compression = {}, None
+        for footer in footers:
+            metadata = pq.read_metadata(pa.BufferReader(footer))
+
+            for field in metadata.schema.to_arrow_schema():
+                schema.setdefault(field.name, BaseDType.from_arrow(field.type))
+
+            if compression is None and metadata.num_row_groups and metadata.num_columns:
+                compression = metadata.row_group(0).column(0).compression.lower()
+
+        return schema, compression if compression in Schema.ATHENA_FORMAT_COMPRESSION[C.PARQUET_] else None
+
+    @staticmethod
+    def infer_csv(
+        urls: List[S3Url],
+        samples: List[bytes],
+        sample_bytes: int,
+        header: Optional[bool] = True
+    ) -> Tuple[SchemaType, Optional[str]]:
+        """
+        Function to infer the Schema dictionary and compression of CSV files from the first bytes of each file,
+        see BaseDType.from_values; files ending with .gz are decompressed. The last row of each sample is
+        ignored if the sample does not contain the whole file, as it may be incomplete.
+
+        :param urls: the S3Url objects of the files
+        :param samples: the first bytes of each file
+        :param sample_bytes: the number of bytes read from each file
+        :param header: whether the files have a header row with the column names
+        :return: a tuple of the Schema dictionary and the FILE_COMPRESSION (None if uncompressed)
+        """
+        compression = C.GZIP_ if all(url.key.endswith('.gz') for url in urls) else None
+
+        columns, rows = [], []
+        for url, sample in zip(urls, samples):
+            truncated = len(sample) >= sample_bytes
+
+            if url.key.endswith('.gz'):
+                sample = zlib.decompressobj(wbits=31).decompress(sample)
+
+            sample_rows = list(csv.reader(io.StringIO(sample.decode('utf-8', errors='replace'))))
+            if truncated:
+                sample_rows = sample_rows[:-1]
+
+            if header and sample_rows:
+                columns = columns if columns else [col.strip() for col in sample_rows[0]]
+                sample_rows = sample_rows[1:]
+
+            rows.extend(sample_rows)
+
+        if not header:
+            columns = [f'col{i + 1}' for i in range(max((len(row) for row in rows), default=0))]
+
+        values = [[row[i] if i < len(row) else None for row in rows] for i in range(len(columns))]
+
+        return {col: BaseDType.from_values(col_values) for col, col_values in zip(columns, values)}, compression
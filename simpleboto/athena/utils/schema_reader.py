@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+(c) Charlie Collier, all rights reserved
+"""
+
+import csv
+import gzip
+import io
+import itertools
+import json
+import queue
+import shutil
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Iterable, Iterator, Tuple, TYPE_CHECKING
+
+from simpleboto.athena.constants import C
+from simpleboto.athena.utils.schema_writer import SchemaWriter
+from simpleboto.s3.s3_client import S3Client
+from simpleboto.s3.s3_url import S3Url
+from simpleboto.utils import Utils
+
+if TYPE_CHECKING:
+    from simpleboto.athena.utils.schema import Schema
+
+
+class SchemaReader:
+    """
+    Reader of the files of a Schema in S3 (in the formats written by SchemaWriter), returning the rows of each file
+    as dictionaries of {column: value}. Parquet values are typed, whereas CSV values are the strings decoded.
+    Files are streamed in batches of rows: CSV and JSON files are decoded from the response body as it is received,
+    whereas Parquet files (which are read from their footer) are downloaded to a local temporary file first.
+    """
+
+    def __init__(
+        self,
+        schema: 'Schema',
+        max_concurrency: Optional[int] = 8,
+        s3_client: Optional[S3Client] = None
+    ) -> None:
+        """
+        :param schema: the Schema of the files, containing the FILE_FORMAT (csv, json or parquet) and optionally the
+            FILE_COMPRESSION and SKIP_HEADER
+        :param max_concurrency: the maximum number of files to read at once
+        :param s3_client: the S3Client to use (a new one if not given)
+        """
+        metadata = schema.metadata
+        self.file_format = str(metadata.get(C.FILE_FORMAT)).lower()
+        self.compression = metadata[C.FILE_COMPRESSION].lower() if metadata.get(C.FILE_COMPRESSION) else None
+        SchemaWriter.validate_format(self.file_format, self.compression)
+
+        self.columns = list(schema.raw)
+        self.header = self.file_format == C.CSV_ and bool(metadata.get(C.SKIP_HEADER))
+        self.max_concurrency = max_concurrency
+        self.s3_client = s3_client if s3_client else S3Client()
+
+    def read_rows(
+        self,
+        s3_url: S3Url
+    ) -> List[dict]:
+        """
+        Function to read all the rows of a file.
+
+        Required IAM permissions:
+            s3:GetObject
+
+        :param s3_url: the S3Url of the file
+        """
+        return [row for rows in self.iter_rows(s3_url) for row in rows]
+
+    def iter_rows(
+        self,
+        s3_url: S3Url,
+        batch_size: Optional[int] = 10_000
+    ) -> Iterator[List[dict]]:
+        """
+        Function to stream the rows of a file in batches, so only a batch of rows is held in memory at once.
+
+        Required IAM permissions:
+            s3:GetObject
+
+        :param s3_url: the S3Url of the file
+        :param batch_size: the maximum number of rows in each batch
+        """
+        body = self.s3_client.s3.get_object(Bucket=s3_url.bucket, Key=s3_url.key)['Body']
+
+        if self.file_format == C.PARQUET_:
+            pq = Utils.import_module('pyarrow.parquet')
+
+            with tempfile.TemporaryFile() as f:
+                with body:
+                    shutil.copyfileobj(body, f)
+
+                for batch in pq.ParquetFile(f).iter_batches(batch_size=batch_size):
+                    yield batch.to_pylist()
+            return
+
+        with body:
+            stream = gzip.GzipFile(fileobj=body) if self.compression else body
+            text = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+
+            if self.file_format == C.JSON_:
+                rows = (json.loads(line) for line in text if line.strip())
+            else:
+                lines = csv.reader(text)
+                if self.header:
+                    next(lines, None)
+                rows = (dict(zip(self.columns, row)) for row in lines)
+
+            for batch in iter(lambda: list(itertools.islice(rows, batch_size)), []):
+                yield batch
+
+    def read(
+        self,
+        s3_urls: Iterable[S3Url],
+        batch_size: Optional[int] = 10_000
+    ) -> Iterator[Tuple[S3Url, List[dict]]]:
+        """
+        Function to read many files in parallel, yielding the batches of rows of each file in order. Files are
+        streamed by max_concurrency threads, each holding at most two batches ahead of the rows consumed, so the
+        memory used is bounded however many (and however large) the files are.
+
+        Required IAM permissions:
+            s3:GetObject
+
+        :param s3_urls: the S3Urls of the files
+        :param batch_size: the maximum number of rows in each batch
+        :return: an iterator of (S3Url, rows) tuples, with one or more tuples for each file (none if it is empty)
+        """
+        stop = threading.Event()
+        readers = deque()
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            try:
+                for s3_url in s3_urls:
+                    batches = queue.Queue(maxsize=2)
+                    future = executor.submit(self._read_batches, s3_url, batches, stop, batch_size)
+                    readers.append((s3_url, batches, future))
+
+                    if len(readers) >= self.max_concurrency:
+                        yield from self._get_batches(readers)
+
+                while readers:
+                    yield from self._get_batches(readers)
+            finally:
+                stop.set()
+
+                # drain the queues, so the files blocked on a full queue can finish
+                for _, batches, _ in readers:
+                    while batches.get() is not None:
+                        pass
+
+    def _read_batches(
+        self,
+        s3_url: S3Url,
+        batches: queue.Queue,
+        stop: threading.Event,
+        batch_size: int
+    ) -> None:
+        """
+        Function to stream the batches of rows of a file onto a queue, followed by None once finished.
+
+        :param s3_url: the S3Url of the file
+        :param batches: the queue to put the batches of rows on
+        :param stop: the event set when no more batches are needed
+        :param batch_size: the maximum number of rows in each batch
+        """
+        try:
+            for rows in self.iter_rows(s3_url, batch_size=batch_size):
+                batches.put(rows)
+
+                if stop.is_set():
+                    break
+        finally:
+            batches.put(None)
+
+    @staticmethod
+    def _get_batches(
+        readers: deque
+    ) -> Iterator[Tuple[S3Url, List[dict]]]:
+        """
+        Function to yield the batches of the first file being read until it is finished, raising its error if any.
+
+        :param readers: the deque of (S3Url, queue of batches, Future) of the files being read
+        """
+        s3_url, batches, future = readers[0]
+
+        for rows in iter(batches.get, None):
+            yield s3_url, rows
+
+        readers.popleft()
+        future.result()
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+(c) Charlie Collier, all rights reserved
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Optional, Union, List, Dict
+
+from simpleboto.athena.constants import C
+from simpleboto.athena.utils.schema import Schema
+from simpleboto.exceptions import NoParameterError
+from simpleboto.s3.s3_client import S3Client
+from simpleboto.s3.s3_url import S3Url
+
+
+class SchemaRegistry:
+    """
+    Registry of the Schema fingerprint last applied to each table ({database}.{table}), stored as JSON in a local
+    file or an S3 object, so the DDL of tables which have not changed can be skipped (e.g. on deploy).
+    """
+    def __init__(
+        self,
+        location: Union[str, S3Url],
+        s3_client: Optional[S3Client] = None
+    ) -> None:
+        """
+        :param location: the local path or S3Url of the JSON file of the registry (created on the first save)
+        :param s3_client: the S3Client to use if the location is an S3Url (a new one if not given)
+        """
+        self.location = location
+        self.s3_client = s3_client if s3_client or not isinstance(location, S3Url) else S3Client()
+
+        self._lock = threading.Lock()
+        self.entries = self.load()
+
+    @staticmethod
+    def get_key(
+        schema: Schema
+    ) -> str:
+        """
+        Function to return the registry key of the table of a Schema, i.e. {database}.{table} in lowercase.
+
+        :param schema: the Schema containing the DATABASE_NAME and TABLE_NAME
+        """
+        missing_keys = [k for k in [C.DATABASE_NAME, C.TABLE_NAME] if k not in schema.metadata]
+
+        if missing_keys:
+            raise NoParameterError(param=missing_keys, context='SchemaRegistry')
+
+        return f'{schema.metadata[C.DATABASE_NAME]}.{schema.metadata[C.TABLE_NAME]}'.lower()
+
+    def load(
+        self
+    ) -> Dict[str, dict]:
+        """
+        Function to read the entries of the registry from its location, or return no entries if it does not exist.
+
+        Required IAM permissions (S3 only):
+            s3:GetObject
+        """
+        if isinstance(self.location, S3Url):
+            try:
+                body = self.s3_client.s3.get_object(Bucket=self.location.bucket, Key=self.location.key)['Body']
+            except self.s3_client.s3.exceptions.NoSuchKey:
+                return {}
+
+            return json.loads(body.read())
+
+        if not os.path.exists(self.location):
+            return {}
+
+        with open(self.location, 'r') as f:
+            return json.load(f)
+
+    def save(
+        self
+    ) -> None:
+        """
+        Function to write the entries of the registry to its location.
+
+        Required IAM permissions (S3 only):
+            s3:PutObject
+        """
+        body = json.dumps(self.entries, indent=2, sort_keys=True)
+
+        if isinstance(self.location, S3Url):
+            self.s3_client.s3.put_object(Bucket=self.location.bucket, Key=self.location.key, Body=body.encode())
+            return
+
+        with open(self.location, 'w') as f:
+            f.write(body)
+
+    def is_registered(
+        self,
+        schema: Schema
+    ) -> bool:
+        """
+        Function to check if any Schema has been applied to the table of the Schema, i.e. the table exists.
+
+        :param schema: the Schema of the table
+        """
+        with self._lock:
+            return self.get_key(schema) in self.entries
+
+    def is_applied(
+        self,
+        schema: Schema
+    ) -> bool:
+        """
+        Function to check if the fingerprint of the Schema is the one last applied to its table.
+
+        :param schema: the Schema of the table
+        """
+        with self._lock:
+            entry = self.entries.get(self.get_key(schema), {})
+
+        return entry.get('Fingerprint') == schema.fingerprint()
+
+    def put(
+        self,
+        schemas: List[Schema]
+    ) -> None:
+        """
+        Function to record the fingerprints of Schemas which have been applied, and save the registry.
+
+        :param schemas: the list of Schemas applied to their tables
+        """
+        if not schemas:
+            return
+
+        with self._lock:
+            for schema in schemas:
+                self.entries[self.get_key(schema)] = {'Fingerprint': schema.fingerprint(), 'Time': time.time()}
+
+            self.save()
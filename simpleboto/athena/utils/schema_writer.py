@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""
+(c) Charlie Collier, all rights reserved
+"""
+
+import csv
+import gzip
+import io
+import json
+import uuid
+from collections import OrderedDict, defaultdict
+from typing import Optional, List, Dict, Any, Iterable, TYPE_CHECKING
+from urllib.parse import quote
+
+from simpleboto.athena.constants import C
+from simpleboto.exceptions import UnexpectedParameterError, NoParameterError
+from simpleboto.s3.s3_client import S3Client
+from simpleboto.s3.s3_multipart_upload import S3MultipartUpload
+from simpleboto.s3.s3_url import S3Url
+from simpleboto.utils import Utils
+
+if TYPE_CHECKING:
+    from simpleboto.athena.utils.schema import Schema
+
+
+class SchemaWriter:
+    """
+    Writer of batches of rows to S3 in the FILE_FORMAT and FILE_COMPRESSION of a Schema, in one pass.
+    Rows are routed to the Hive-style partition (col=value/) of their PARTITION_SCHEMA values, and the file of each
+    partition is streamed to S3 with a multipart upload, rolling to a new file once target_file_size bytes are written.
+    """
+    FILE_EXTENSIONS = {
+        C.CSV_: '.csv',
+        C.JSON_: '.json',
+        C.PARQUET_: '.parquet'
+    }
+    TEXT_COMPRESSION = [C.GZIP_]
+    NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+    def __init__(
+        self,
+        schema: 'Schema',
+        s3_url: Optional[S3Url] = None,
+        target_file_size: Optional[int] = 128 * 1024 ** 2,
+        part_size: Optional[int] = 8 * 1024 ** 2,
+        row_group_size: Optional[int] = 100_000,
+        max_open_files: Optional[int] = 32,
+        max_concurrency: Optional[int] = 4,
+        s3_client: Optional[S3Client] = None
+    ) -> None:
+        """
+        :param schema: the Schema of the data, containing the FILE_FORMAT (csv, json or parquet) and optionally the
+            FILE_COMPRESSION, SKIP_HEADER (csv only) and PARTITION_SCHEMA
+        :param s3_url: the S3Url of the prefix to write to (default the S3_BUCKET and S3_PREFIX of the Schema)
+        :param target_file_size: the number of (compressed) bytes after which a file is closed and a new one started
+        :param part_size: the size of each part of the multipart uploads in bytes
+        :param row_group_size: the number of rows to buffer for each Parquet row group
+        :param max_open_files: the maximum number of files (partitions) to keep open; the least recently written
+            file is closed when exceeded, which bounds the memory used
+        :param max_concurrency: the maximum number of parts to upload at once for each file
+        :param s3_client: the S3Client to use (a new one if not given)
+        """
+        metadata = schema.metadata
+        self.file_format = str(metadata.get(C.FILE_FORMAT)).lower()
+        self.compression = metadata[C.FILE_COMPRESSION].lower() if metadata.get(C.FILE_COMPRESSION) else None
+        self.validate_format(self.file_format, self.compression)
+
+        if s3_url is None:
+            missing_keys = [k for k in [C.S3_BUCKET, C.S3_PREFIX] if k not in metadata]
+            if missing_keys:
+                raise NoParameterError(param=missing_keys, context='SchemaWriter if s3_url is not given')
+
+            s3_url = S3Url(bucket=metadata[C.S3_BUCKET], prefix=metadata[C.S3_PREFIX])
+
+        self.schema = schema
+        self.s3_url = s3_url
+        self.columns = list(schema.raw)
+        self.partition_columns = list(metadata.get(C.PARTITION_SCHEMA, {}))
+        self.header = self.file_format == C.CSV_ and bool(metadata.get(C.SKIP_HEADER))
+
+        self.target_file_size = target_file_size
+        self.part_size = part_size
+        self.row_group_size = row_group_size
+        self.max_open_files = max_open_files
+        self.max_concurrency = max_concurrency
+        self.s3_client = s3_client if s3_client else S3Client()
+
+        self.files: Dict[tuple, dict] = OrderedDict()
+        self.written: List[S3Url] = []
+        self._file_prefix = f'part-{uuid.uuid4().hex[:12]}'
+        self._file_count = 0
+
+    def __enter__(
+        self
+    ) -> 'SchemaWriter':
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Any,
+        exc_val: Any,
+        exc_tb: Any
+    ) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    @classmethod
+    def validate_format(
+        cls,
+        file_format: str,
+        compression: Optional[str]
+    ) -> None:
+        """
+        Function to check the file format and compression can be written.
+
+        :param file_format: the FILE_FORMAT of the Schema
+        :param compression: the FILE_COMPRESSION of the Schema (or None)
+        """
+        if file_format not in cls.FILE_EXTENSIONS:
+            raise UnexpectedParameterError(
+                param=file_format,
+                context=f'{C.FILE_FORMAT} for SchemaWriter',
+                possible_values=list(cls.FILE_EXTENSIONS)
+            )
+
+        compressions = [C.SNAPPY_, C.GZIP_, C.ZSTD_] if file_format == C.PARQUET_ else cls.TEXT_COMPRESSION
+        if compression is not None and compression not in compressions:
+            raise UnexpectedParameterError(
+                param=compression,
+                context=f'{C.FILE_COMPRESSION} for SchemaWriter with {file_format} files',
+                possible_values=compressions
+            )
+
+    @classmethod
+    def get_extension(
+        cls,
+        file_format: str,
+        compression: Optional[str]
+    ) -> str:
+        """
+        Function to return the extension of the files written, e.g. .csv.gz for gzipped CSV files.
+
+        :param file_format: the FILE_FORMAT of the Schema
+        :param compression: the FILE_COMPRESSION of the Schema (or None)
+        """
+        extension = cls.FILE_EXTENSIONS[file_format]
+
+        return f'{extension}.gz' if file_format != C.PARQUET_ and compression else extension
+
+    @classmethod
+    def format_value(
+        cls,
+        value: Any
+    ) -> str:
+        """
+        Function to return the text of a value for CSV files and partition paths (booleans in lowercase).
+
+        :param value: the value to format
+        """
+        if value is None:
+            return ''
+
+        return str(value).lower() if isinstance(value, bool) else str(value)
+
+    def get_partition_path(
+        self,
+        values: tuple
+    ) -> str:
+        """
+        Function to return the Hive-style path of a partition, e.g. dt=2023-01-01/region=EU/.
+        Values are percent-encoded (e.g. EU/West is EU%2FWest), as read by S3Client.iter_partition_levels.
+
+        :param values: the values of the partition columns
+        """
+        return ''.join(
+            f"{col}={self.NULL_PARTITION if value is None else quote(self.format_value(value), safe='')}/"
+            for col, value in zip(self.partition_columns, values)
+        )
+
+    def write(
+        self,
+        rows: Iterable[dict]
+    ) -> None:
+        """
+        Function to write a batch of rows, each a dictionary of {column: value} (missing columns are null).
+        For Parquet files the values must match the data types, e.g. int, Decimal, datetime.date or datetime.datetime.
+
+        :param rows: the rows to write, including the values of the partition columns
+        """
+        partitions = defaultdict(list)
+        for row in rows:
+            partitions[tuple(row.get(col) for col in self.partition_columns)].append(row)
+
+        for values, partition_rows in partitions.items():
+            file = self.files.get(values) or self.open_file(values)
+            self.files.move_to_end(values)
+
+            self.write_rows(file, partition_rows)
+
+            if file['upload'].tell() >= self.target_file_size:
+                self.close_file(values)
+
+        while len(self.files) > self.max_open_files:
+            self.close_file(next(iter(self.files)))
+
+    def open_file(
+        self,
+        values: tuple
+    ) -> dict:
+        """
+        Function to start a new file in a partition.
+
+        :param values: the values of the partition columns
+        :return: the dictionary of the open file, containing its upload and encoder
+        """
+        name = f'{self._file_prefix}-{self._file_count:05d}{self.get_extension(self.file_format, self.compression)}'
+        self._file_count += 1
+
+        upload = S3MultipartUpload(
+            s3_url=self.s3_url.join(f'{self.get_partition_path(values)}{name}'),
+            part_size=self.part_size,
+            max_concurrency=self.max_concurrency,
+            s3_client=self.s3_client
+        )
+        file = {'upload': upload, 'rows': []}
+
+        if self.file_format == C.PARQUET_:
+            pq = Utils.import_module('pyarrow.parquet')
+            pa = Utils.import_module('pyarrow')
+
+            file['schema'] = pa.schema([(col, dtype.to_arrow()) for col, dtype in self.schema.raw.items()])
+            file['encoder'] = pq.ParquetWriter(upload, file['schema'], compression=self.compression or 'none')
+        else:
+            stream = gzip.GzipFile(fileobj=upload, mode='wb') if self.compression else upload
+            file['encoder'] = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+
+            if self.header:
+                csv.writer(file['encoder']).writerow(self.columns)
+
+        self.files[values] = file
+
+        return file
+
+    def write_rows(
+        self,
+        file: dict,
+        rows: List[dict]
+    ) -> None:
+        """
+        Function to encode rows into an open file; Parquet rows are buffered until a row group is full.
+
+        :param file: the dictionary of the open file
+        :param rows: the rows to write
+        """
+        if self.file_format == C.CSV_:
+            csv.writer(file['encoder']).writerows(
+                [self.format_value(row.get(col)) for col in self.columns] for row in rows
+            )
+        elif self.file_format == C.JSON_:
+            file['encoder'].write(''.join(
+                json.dumps({col: row.get(col) for col in self.columns}, default=str) + '\n' for row in rows
+            ))
+        else:
+            file['rows'].extend(rows)
+
+            if len(file['rows']) >= self.row_group_size:
+                self.flush_row_group(file)
+
+    def flush_row_group(
+        self,
+        file: dict
+    ) -> None:
+        """
+        Function to write the buffered rows of a Parquet file as a row group.
+
+        :param file: the dictionary of the open file
+        """
+        pa = Utils.import_module('pyarrow')
+
+        if file['rows']:
+            rows = [{col: row.get(col) for col in self.columns} for row in file['rows']]
+            file['encoder'].write_table(pa.Table.from_pylist(rows, schema=file['schema']))
+            file['rows'] = []
+
+    def close_file(
+        self,
+        values: tuple
+    ) -> None:
+        """
+        Function to finish the open file of a partition and complete its upload.
+
+        :param values: the values of the partition columns
+        """
+        file = self.files.pop(values)
+
+        if self.file_format == C.PARQUET_:
+            self.flush_row_group(file)
+
+        file['encoder'].close()
+        file['upload'].close()
+
+        self.written.append(file['upload'].s3_url)
+
+    def close(
+        self
+    ) -> List[S3Url]:
+        """
+        Function to finish all the open files.
+
+        :return: the list of the S3Urls of all the files written
+        """
+        while self.files:
+            self.close_file(next(iter(self.files)))
+
+        return self.written
+
+    def abort(
+        self
+    ) -> None:
+        """
+        Function to abort the uploads of all the open files (the files already closed are kept).
+        """
+        while self.files:
+            _, file = self.files.popitem()
+            file['upload'].abort()
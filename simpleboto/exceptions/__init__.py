@@ -4,7 +4,13 @@ from simpleboto.exceptions.custom_exceptions import (
     NoParameterError,
     InvalidSchemaTypeError,
     AttributeConditionError,
-    UnexpectedParameterError
+    UnexpectedParameterError,
+    MissingDependencyError,
+    QueryExecutionError,
+    QueryCostError,
+    S3DeleteError,
+    PartitionCreateError,
+    S3PartLimitError
 )
 
 __all__ = [
@@ -13,5 +19,11 @@ __all__ = [
     'NoParameterError',
     'InvalidSchemaTypeError',
     'AttributeConditionError',
-    'UnexpectedParameterError'
+    'UnexpectedParameterError',
+    'MissingDependencyError',
+    'QueryExecutionError',
+    'QueryCostError',
+    'S3DeleteError',
+    'PartitionCreateError',
+    'S3PartLimitError'
 ]
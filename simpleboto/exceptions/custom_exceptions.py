@@ -9,6 +9,7 @@ from typing import (
     Any,
     Type,
     Iterable,
+    List,
     Optional
 )
 
@@ -168,3 +169,147 @@ class InvalidSchemaTypeError(Exception):
         self.err_msg = f"The data type {dtype} is not valid for column {column}"
 
         super().__init__(self.err_msg)
+
+
+class MissingDependencyError(Exception):
+    """
+    Exception class for when an optional dependency is required but not installed.
+    """
+    def __init__(
+        self,
+        module: str
+    ) -> None:
+        """
+        :param module: the name of the module which is not installed
+        """
+        self.module = module
+
+        self.err_msg = f"The module {self.module} is required for this functionality; install it with pip"
+
+        super().__init__(self.err_msg)
+
+
+class QueryExecutionError(Exception):
+    """
+    Exception class for an Athena query which did not complete successfully.
+    """
+    def __init__(
+        self,
+        query_execution_id: str,
+        state: str,
+        reason: Optional[str] = None
+    ) -> None:
+        """
+        :param query_execution_id: the ID of the Athena query execution
+        :param state: the final state of the query execution, e.g. FAILED
+        :param reason: the reason for the state change, as given by Athena
+        """
+        self.query_execution_id = query_execution_id
+        self.state = state
+        self.reason = reason
+
+        reason_str = f': {self.reason}' if reason else ''
+
+        self.err_msg = f"The query {self.query_execution_id} finished with state {self.state}{reason_str}"
+
+        super().__init__(self.err_msg)
+
+
+class QueryCostError(Exception):
+    """
+    Exception class for an Athena query which is estimated to scan more data than allowed.
+    """
+    def __init__(
+        self,
+        estimated_bytes: float,
+        max_scan_bytes: int
+    ) -> None:
+        """
+        :param estimated_bytes: the number of bytes the query is estimated to scan, as given by EXPLAIN
+        :param max_scan_bytes: the maximum number of bytes the query is allowed to scan
+        """
+        self.estimated_bytes = estimated_bytes
+        self.max_scan_bytes = max_scan_bytes
+
+        self.err_msg = (
+            f"The query is estimated to scan {self.estimated_bytes:.0f} bytes, "
+            f"which is more than the limit of {self.max_scan_bytes} bytes"
+        )
+
+        super().__init__(self.err_msg)
+
+
+class S3DeleteError(Exception):
+    """
+    Exception class for S3 objects which could not be deleted.
+    """
+    def __init__(
+        self,
+        errors: List[dict],
+        context: Optional[str] = None
+    ) -> None:
+        """
+        :param errors: the list of Errors as per the delete_objects response in boto3
+        :param context: the context for the error, e.g. a method name
+        """
+        self.errors = errors
+        self.context = context
+        self.keys = [error['Key'] for error in errors]
+
+        context_str = f' for {context}' if context else ''
+
+        self.err_msg = f"Failed to delete the objects {self.keys}{context_str}"
+
+        super().__init__(self.err_msg)
+
+
+class PartitionCreateError(Exception):
+    """
+    Exception class for Glue partitions which could not be created.
+    """
+    def __init__(
+        self,
+        errors: List[dict],
+        context: Optional[str] = None
+    ) -> None:
+        """
+        :param errors: the list of Errors as per the batch_create_partition response in boto3
+        :param context: the context for the error, e.g. a method name
+        """
+        self.errors = errors
+        self.context = context
+        self.values = [tuple(error['PartitionValues']) for error in errors]
+        self.error_codes = sorted({error.get('ErrorDetail', {}).get('ErrorCode') or 'Unknown' for error in errors})
+
+        context_str = f' for {context}' if context else ''
+
+        self.err_msg = f"Failed to create the partitions {self.values}{context_str}: {', '.join(self.error_codes)}"
+
+        super().__init__(self.err_msg)
+
+
+class S3PartLimitError(Exception):
+    """
+    Exception class for an S3 multipart upload which would need more parts than S3 allows.
+    """
+    def __init__(
+        self,
+        url: str,
+        max_parts: int,
+        part_size: int
+    ) -> None:
+        """
+        :param url: the S3 URL of the object being uploaded
+        :param max_parts: the maximum number of parts in a multipart upload
+        :param part_size: the size of each part in bytes
+        """
+        self.url = url
+        self.max_parts = max_parts
+        self.part_size = part_size
+
+        self.err_msg = (
+            f"The multipart upload to {self.url} exceeds the limit of {self.max_parts} parts "
+            f"of {self.part_size} bytes; use a larger part_size"
+        )
+
+        super().__init__(self.err_msg)
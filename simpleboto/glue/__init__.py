@@ -0,0 +1,5 @@
+from simpleboto.glue.glue_client import GlueClient
+
+__all__ = [
+    'GlueClient'
+]
@@ -0,0 +1,528 @@
+# -*- coding: utf-8 -*-
+"""
+(c) Charlie Collier, all rights reserved
+"""
+
+import queue
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Set, Tuple, Any, Iterator
+
+import boto3
+
+from simpleboto.athena.athena_client import AthenaClient
+from simpleboto.athena.constants import C
+from simpleboto.athena.utils.data_types import (
+    BaseDType,
+    TinyIntDType,
+    SmallIntDType,
+    IntegerDType,
+    BigIntDType,
+    DoubleDType,
+    FloatDType,
+    DecimalDType
+)
+from simpleboto.athena.utils.schema import Schema
+from simpleboto.boto3_base import Boto3Base
+from simpleboto.exceptions import NoParameterError, UnexpectedParameterError, PartitionCreateError
+from simpleboto.s3.s3_client import S3Client
+from simpleboto.s3.s3_url import S3Url
+
+PartitionValues = Tuple[str, ...]
+TableKey = Tuple[str, str]
+
+
+class GlueClient(Boto3Base):
+    """
+    Wrapper for the boto3 Glue client.
+    """
+    MAX_SEGMENTS = 10
+    NUMERIC_DTYPES = (TinyIntDType, SmallIntDType, IntegerDType, BigIntDType, DoubleDType, FloatDType, DecimalDType)
+
+    def __init__(
+        self,
+        region_name: Optional[str] = None,
+        boto3_session: Optional[boto3.Session] = None
+    ) -> None:
+        """
+        :param region_name: the name of the AWS region (if not provided, ensure credentials have been exported)
+        :param boto3_session: a provided boto3_session
+        """
+        super().__init__('glue', region_name, boto3_session)
+        self.glue = self.client
+
+        self.s3_client = S3Client(region_name=self.client.meta.region_name, boto3_session=self.session)
+
+        self.schemas: Dict[TableKey, Schema] = {}
+        self._loaded_databases = set()
+
+    @staticmethod
+    def get_table_names(
+        schema: Schema,
+        context: str,
+        required: Optional[List[str]] = None
+    ) -> Tuple[str, str]:
+        """
+        Function to return the (lowercase) database and table names from the Schema metadata.
+
+        :param schema: the Schema of the table
+        :param context: the base context for exception logging
+        :param required: any other metadata keys which are required
+        """
+        metadata = schema.metadata
+        missing_keys = [k for k in [C.DATABASE_NAME, C.TABLE_NAME, *(required or [])] if k not in metadata]
+
+        if missing_keys:
+            raise NoParameterError(param=missing_keys, context=context)
+
+        return metadata[C.DATABASE_NAME].lower(), metadata[C.TABLE_NAME].lower()
+
+    def get_table(
+        self,
+        database: str,
+        table: str
+    ) -> dict:
+        """
+        Function to return the definition of a table in the Glue Data Catalog.
+
+        Required IAM permissions:
+            glue:GetTable
+
+        :param database: the name of the database
+        :param table: the name of the table
+        :return: the Table dictionary as per the get_table response in boto3
+        """
+        return self.glue.get_table(DatabaseName=database, Name=table)['Table']
+
+    def get_schema(
+        self,
+        database: str,
+        table: str,
+        refresh: Optional[bool] = False
+    ) -> Schema:
+        """
+        Function to return the Schema of a table in the Glue Data Catalog, see Schema.from_glue.
+        Schemas are cached, so the table is only fetched once unless refresh is given.
+
+        Required IAM permissions:
+            glue:GetTable
+
+        :param database: the name of the database
+        :param table: the name of the table
+        :param refresh: whether to fetch the table again, even if its Schema is cached
+        """
+        key = (database.lower(), table.lower())
+
+        if refresh or key not in self.schemas:
+            self.schemas[key] = Schema.from_glue(self.get_table(database=key[0], table=key[1]))
+
+        return self.schemas[key]
+
+    def get_schemas(
+        self,
+        databases: List[str],
+        refresh: Optional[bool] = False,
+        max_concurrency: Optional[int] = 4
+    ) -> Dict[str, Schema]:
+        """
+        Function to return the Schemas of all the tables (not views) in the databases, fetching up to 100 tables
+        per request with the paginated GetTables API, and the databases in parallel. Schemas are cached, so each
+        database is only fetched once unless refresh is given, which also evicts the tables which have been dropped.
+        Tables which cannot be read as a Schema (e.g. with complex column types) are skipped with a RuntimeWarning.
+
+        Required IAM permissions:
+            glue:GetTables
+
+        :param databases: the names of the databases
+        :param refresh: whether to fetch the databases again, even if they are cached
+        :param max_concurrency: the maximum number of databases to fetch at once
+        :return: a dictionary of {database.table: Schema}
+        """
+        databases = [database.lower() for database in databases]
+        new_databases = [database for database in databases if refresh or database not in self._loaded_databases]
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            for database, tables in zip(new_databases, executor.map(self.get_tables, new_databases)):
+                for key in [key for key in self.schemas if key[0] == database]:
+                    del self.schemas[key]
+
+                for table in tables:
+                    if table.get('TableType') == 'VIRTUAL_VIEW':
+                        continue
+
+                    try:
+                        self.schemas[(database, table['Name'].lower())] = Schema.from_glue(table)
+                    except Exception as error:
+                        warnings.warn(f"Skipping the table {database}.{table['Name']}: {error}", RuntimeWarning)
+
+        self._loaded_databases.update(new_databases)
+
+        return {f'{db}.{table}': schema for (db, table), schema in self.schemas.items() if db in databases}
+
+    def get_tables(
+        self,
+        database: str
+    ) -> List[dict]:
+        """
+        Function to return the definitions of all the tables in a database, up to 100 tables per request.
+
+        Required IAM permissions:
+            glue:GetTables
+
+        :param database: the name of the database
+        :return: the list of Table dictionaries as per the get_tables response in boto3
+        """
+        paginator = self.glue.get_paginator('get_tables')
+        response_iter = paginator.paginate(DatabaseName=database, PaginationConfig={'PageSize': 100})
+
+        return [table for ele in response_iter for table in ele['TableList']]
+
+    def put_table(
+        self,
+        schema: Schema
+    ) -> None:
+        """
+        Function to create a (HIVE) table in the Glue Data Catalog from its Schema, or update it if it exists,
+        with the same table properties as AthenaClient.get_create_table.
+
+        Required IAM permissions:
+            glue:CreateTable
+            glue:UpdateTable
+
+        :param schema: the Schema of the table, containing the DATABASE_NAME, TABLE_NAME, S3_BUCKET, S3_PREFIX
+            and FILE_FORMAT
+        """
+        database, table = self.get_table_names(schema=schema, context='put_table')
+
+        parameters = AthenaClient.get_table_parameters(schema.metadata)
+        if AthenaClient.get_key(C.FILE_FORMAT, schema.metadata) == C.AVRO_:
+            parameters['avro.schema.literal'] = AthenaClient.get_avro_schema(schema)
+
+        table_input = schema.to_glue_input(parameters={k: str(v) for k, v in parameters.items()})
+
+        try:
+            self.glue.create_table(DatabaseName=database, TableInput=table_input)
+        except self.glue.exceptions.AlreadyExistsException:
+            self.glue.update_table(DatabaseName=database, TableInput=table_input)
+
+        self.schemas[(database, table)] = schema
+
+    def get_partition_values(
+        self,
+        database: str,
+        table: str,
+        expression: Optional[str] = None
+    ) -> Set[PartitionValues]:
+        """
+        Function to return the values of all the partitions registered for a table, see iter_partitions.
+
+        Required IAM permissions:
+            glue:GetPartitions
+
+        :param database: the name of the database
+        :param table: the name of the table
+        :param expression: the Glue expression to filter the partitions by on the server (see get_partition_expression)
+        :return: the set of partition values, e.g. {('2023-01-01', 'EU'), ...}
+        """
+        return {values for values, _ in self.iter_partitions(database=database, table=table, expression=expression)}
+
+    def iter_partitions(
+        self,
+        database: str,
+        table: str,
+        expression: Optional[str] = None,
+        segments: Optional[int] = MAX_SEGMENTS
+    ) -> Iterator[Tuple[PartitionValues, Optional[S3Url]]]:
+        """
+        Function to iterate over the partitions registered for a table. The partitions are split into (at most 10)
+        segments which are paged through concurrently, and each page is yielded as soon as it is received, in no
+        particular order. At most two pages per segment are buffered, so the segments are only paged as fast as the
+        partitions are consumed. The column schema of the partitions is not requested, to keep the responses small.
+
+        Required IAM permissions:
+            glue:GetPartitions
+
+        :param database: the name of the database
+        :param table: the name of the table
+        :param expression: the Glue expression to filter the partitions by on the server, e.g. "dt >= '2023-01-01'"
+            (see get_partition_expression)
+        :param segments: the number of segments to scan concurrently (between 1 and 10)
+        :return: an iterator of (partition values, S3Url of the partition or None if it has no location)
+        """
+        segments = min(max(segments, 1), self.MAX_SEGMENTS)
+        kwargs = {'DatabaseName': database, 'TableName': table, 'ExcludeColumnSchema': True}
+        if expression:
+            kwargs['Expression'] = expression
+
+        pages = queue.Queue(maxsize=2 * segments)
+        stop = threading.Event()
+        finished = 0
+
+        with ThreadPoolExecutor(max_workers=segments) as executor:
+            futures = [
+                executor.submit(
+                    self._scan_segment,
+                    pages,
+                    stop,
+                    Segment={'SegmentNumber': i, 'TotalSegments': segments},
+                    **kwargs
+                )
+                for i in range(segments)
+            ]
+
+            try:
+                while finished < segments:
+                    page = pages.get()
+
+                    if page is None:
+                        finished += 1
+                        continue
+
+                    for partition in page:
+                        location = partition.get('StorageDescriptor', {}).get('Location')
+                        yield tuple(partition['Values']), S3Url(location) if location else None
+            finally:
+                stop.set()
+
+                # drain the queue, so the segments blocked on a full queue can finish
+                while finished < segments:
+                    if pages.get() is None:
+                        finished += 1
+
+            for future in futures:
+                future.result()
+
+    def _scan_segment(
+        self,
+        pages: queue.Queue,
+        stop: threading.Event,
+        **kwargs
+    ) -> None:
+        """
+        Function to page through a segment of the partitions of a table, putting each page of partitions on the queue
+        followed by None once finished.
+
+        :param pages: the queue to put the pages of partitions on
+        :param stop: the event set when no more pages are needed
+        :param kwargs: the keyword arguments for get_partitions, including the Segment
+        """
+        try:
+            for response in self.glue.get_paginator('get_partitions').paginate(**kwargs):
+                if stop.is_set():
+                    break
+
+                pages.put(response['Partitions'])
+        finally:
+            pages.put(None)
+
+    @classmethod
+    def get_partition_expression(
+        cls,
+        schema: Schema,
+        filters: Dict[str, Any]
+    ) -> str:
+        """
+        Function to return the Glue expression to filter the partitions of a table by, for GetPartitions.
+        Values are quoted unless the partition column has a numeric data type in the PARTITION_SCHEMA.
+
+        :param schema: the Schema of the table, containing the PARTITION_SCHEMA
+        :param filters: a dictionary of {partition column: filter}, where the filter is either a value (=),
+            a list of values (IN) or a tuple of (lower, upper) inclusive bounds, either of which can be None, e.g.
+            {'dt': ('2023-01-01', None), 'region': ['EU', 'US']}
+        """
+        partition_schema = schema.metadata.get(C.PARTITION_SCHEMA, {})
+        unknown_columns = [col for col in filters if col not in partition_schema]
+
+        if unknown_columns:
+            raise UnexpectedParameterError(
+                param=unknown_columns,
+                possible_values=list(partition_schema),
+                context='get_partition_expression'
+            )
+
+        clauses = []
+        for col, filter_ in filters.items():
+            dtype = partition_schema[col]
+
+            if isinstance(filter_, list):
+                clauses.append(f"{col} IN ({', '.join(cls.format_literal(value, dtype) for value in filter_)})")
+            elif isinstance(filter_, tuple):
+                lower, upper = filter_
+                if lower is not None:
+                    clauses.append(f'{col} >= {cls.format_literal(lower, dtype)}')
+                if upper is not None:
+                    clauses.append(f'{col} <= {cls.format_literal(upper, dtype)}')
+            else:
+                clauses.append(f'{col} = {cls.format_literal(filter_, dtype)}')
+
+        return ' AND '.join(clauses)
+
+    @classmethod
+    def format_literal(
+        cls,
+        value: Any,
+        dtype: BaseDType
+    ) -> str:
+        """
+        Function to return the literal of a value in a Glue expression, quoted unless the data type is numeric.
+
+        :param value: the value of the partition column
+        :param dtype: the data type of the partition column
+        """
+        if isinstance(dtype, cls.NUMERIC_DTYPES):
+            return str(value)
+
+        return "'{}'".format(str(value).replace("'", "''"))
+
+    def scan_partitions(
+        self,
+        schema: Schema,
+        filters: Optional[Dict[str, Any]] = None,
+        segments: Optional[int] = MAX_SEGMENTS
+    ) -> Iterator[Tuple[PartitionValues, Optional[S3Url]]]:
+        """
+        Function to iterate over the partitions registered for a table, filtered on the server by the values of the
+        partition columns, see iter_partitions and get_partition_expression.
+
+        Required IAM permissions:
+            glue:GetPartitions
+
+        :param schema: the Schema of the table, containing the DATABASE_NAME, TABLE_NAME and PARTITION_SCHEMA
+        :param filters: a dictionary of {partition column: filter}, see get_partition_expression
+        :param segments: the number of segments to scan concurrently (between 1 and 10)
+        :return: an iterator of (partition values, S3Url of the partition or None if it has no location)
+        """
+        database, table = self.get_table_names(schema=schema, context='scan_partitions', required=[C.PARTITION_SCHEMA])
+        expression = self.get_partition_expression(schema=schema, filters=filters) if filters else None
+
+        return self.iter_partitions(database=database, table=table, expression=expression, segments=segments)
+
+    def find_partitions(
+        self,
+        schema: Schema,
+        since: Optional[str] = None,
+        max_concurrency: Optional[int] = 8
+    ) -> Dict[PartitionValues, S3Url]:
+        """
+        Function to find the Hive-style partition directories (col=value/) under the S3 location of a table,
+        see S3Client.list_partitions.
+
+        Required IAM permissions:
+            s3:ListBucket
+
+        :param schema: the Schema of the table, containing the S3_BUCKET, S3_PREFIX and PARTITION_SCHEMA
+        :param since: only find partitions where the first partition column is at least this value,
+            e.g. '2023-01-01' for a table partitioned by dt
+        :param max_concurrency: the maximum number of prefixes to list at once
+        :return: a dictionary of {partition values: S3Url of the partition}
+        """
+        metadata = schema.metadata
+
+        return self.s3_client.list_partitions(
+            s3_url=S3Url(bucket=metadata[C.S3_BUCKET], prefix=metadata[C.S3_PREFIX]),
+            columns=list(metadata[C.PARTITION_SCHEMA]),
+            since=since,
+            max_concurrency=max_concurrency
+        )
+
+    def batch_create_partitions(
+        self,
+        database: str,
+        table: str,
+        partitions: Dict[PartitionValues, S3Url],
+        batch_size: Optional[int] = 100,
+        max_concurrency: Optional[int] = 4
+    ) -> List[dict]:
+        """
+        Function to register partitions for a table in batches, using the storage descriptor of the table.
+
+        Required IAM permissions:
+            glue:GetTable
+            glue:BatchCreatePartition
+
+        :param database: the name of the database
+        :param table: the name of the table
+        :param partitions: a dictionary of {partition values: S3Url of the partition}
+        :param batch_size: the number of partitions per request (at most 100)
+        :param max_concurrency: the maximum number of requests to make at once
+        :return: the list of Errors as per the batch_create_partition response in boto3
+        """
+        storage_descriptor = self.get_table(database=database, table=table)['StorageDescriptor']
+
+        partition_inputs = [
+            {'Values': list(values), 'StorageDescriptor': {**storage_descriptor, 'Location': url.url}}
+            for values, url in partitions.items()
+        ]
+        batches = [partition_inputs[i:i + batch_size] for i in range(0, len(partition_inputs), batch_size)]
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            responses = executor.map(
+                lambda batch: self.glue.batch_create_partition(
+                    DatabaseName=database,
+                    TableName=table,
+                    PartitionInputList=batch
+                ),
+                batches
+            )
+
+            return [error for response in responses for error in response.get('Errors', [])]
+
+    def repair_partitions(
+        self,
+        schema: Schema,
+        since: Optional[str] = None,
+        batch_size: Optional[int] = 100,
+        max_concurrency: Optional[int] = 4
+    ) -> List[PartitionValues]:
+        """
+        Function to register the partitions in S3 which are not yet in the Glue Data Catalog; a faster alternative to
+        MSCK REPAIR TABLE, as only the partition prefixes are listed and only the new partitions are added.
+        This is not needed for tables using PARTITION_PROJECTION.
+
+        Required IAM permissions:
+            s3:ListBucket
+            glue:GetTable
+            glue:GetPartitions
+            glue:BatchCreatePartition
+
+        :param schema: the Schema of the table, containing the DATABASE_NAME, TABLE_NAME, S3_BUCKET, S3_PREFIX
+            and PARTITION_SCHEMA
+        :param since: only register partitions where the first partition column is at least this value; only these
+            partitions are listed in S3 and fetched from Glue
+        :param batch_size: the number of partitions per request (at most 100)
+        :param max_concurrency: the maximum number of requests to make at once
+        :return: the sorted list of the values of the partitions which were added; partitions which already exist
+            (e.g. added concurrently) are skipped, and a PartitionCreateError is raised for any other failure
+        """
+        database, table = self.get_table_names(
+            schema=schema,
+            context='repair_partitions',
+            required=[C.S3_BUCKET, C.S3_PREFIX, C.PARTITION_SCHEMA]
+        )
+
+        first_column = next(iter(schema.metadata[C.PARTITION_SCHEMA]))
+        expression = self.get_partition_expression(schema=schema, filters={first_column: (since, None)})
+
+        found = self.find_partitions(schema=schema, since=since, max_concurrency=max_concurrency)
+        known = self.get_partition_values(database=database, table=table, expression=expression or None)
+        new = {values: url for values, url in found.items() if values not in known}
+
+        errors = self.batch_create_partitions(
+            database=database,
+            table=table,
+            partitions=new,
+            batch_size=batch_size,
+            max_concurrency=max_concurrency
+        ) if new else []
+
+        failed = [
+            error for error in errors
+            if error.get('ErrorDetail', {}).get('ErrorCode') != 'AlreadyExistsException'
+        ]
+        if failed:
+            raise PartitionCreateError(errors=failed, context='repair_partitions')
+
+        existing = {tuple(error['PartitionValues']) for error in errors}
+
+        return sorted(values for values in new if values not in existing)
@@ -1,7 +1,9 @@
 from simpleboto.s3.s3_client import S3Client
+from simpleboto.s3.s3_multipart_upload import S3MultipartUpload
 from simpleboto.s3.s3_url import S3Url
 
 __all__ = [
     'S3Client',
+    'S3MultipartUpload',
     'S3Url'
 ]
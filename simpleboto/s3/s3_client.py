@@ -3,7 +3,9 @@
 (c) Charlie Collier, all rights reserved
 """
 
-from typing import Optional, Union, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union, List, Dict, Tuple, Iterator
+from urllib.parse import unquote
 
 import boto3
 
@@ -30,7 +32,8 @@ class S3Client(Boto3Base):
     def list(
         self,
         s3_url: S3Url,
-        with_meta: Optional[bool] = False
+        with_meta: Optional[bool] = False,
+        max_keys: Optional[int] = None
     ) -> Union[List[S3Url], List[dict]]:
         """
         Function to return all the objects listed from S3 based on the input URL.
@@ -42,11 +45,13 @@ class S3Client(Boto3Base):
         :param with_meta: whether to return the full metadata (True) or just the list of file locations (False)
             if True, will return a list of dictionaries as per the list_objects_v2 response in boto3
             if False, will return a list of S3Url objects
+        :param max_keys: the maximum number of objects to list (default all)
         """
         paginator = self.s3.get_paginator('list_objects_v2')
         response_iter = paginator.paginate(
             Bucket=s3_url.bucket,
-            Prefix=s3_url.key
+            Prefix=s3_url.key,
+            PaginationConfig={'MaxItems': max_keys}
         )
 
         output = []
@@ -76,3 +81,156 @@ class S3Client(Boto3Base):
         objects: List[dict] = self.list(s3_url=s3_url, with_meta=True)
 
         return sum(ele['Size'] for ele in objects)
+
+    def read_range(
+        self,
+        s3_url: S3Url,
+        start: Optional[int] = 0,
+        end: Optional[int] = None
+    ) -> bytes:
+        """
+        Function to read a range of bytes of an object with a ranged GET, rather than downloading the whole object.
+
+        Required IAM permissions:
+            s3:GetObject
+
+        :param s3_url: the S3Url object of the file
+        :param start: the first byte to read; if negative, the last -start bytes of the object are read instead
+        :param end: the last byte to read (inclusive; default the end of the object)
+        :return: the bytes read, which are fewer than requested if the object is smaller
+        """
+        byte_range = f'bytes={start}' if start < 0 else f"bytes={start}-{'' if end is None else end}"
+
+        return self.s3.get_object(Bucket=s3_url.bucket, Key=s3_url.key, Range=byte_range)['Body'].read()
+
+    def delete(
+        self,
+        s3_urls: List[S3Url],
+        max_concurrency: Optional[int] = 4
+    ) -> List[dict]:
+        """
+        Function to delete objects, with up to 1000 objects per DeleteObjects request.
+
+        Required IAM permissions:
+            s3:DeleteObject
+
+        :param s3_urls: the list of S3Url objects of the files to delete
+        :param max_concurrency: the maximum number of requests to make at once
+        :return: the list of Errors as per the delete_objects response in boto3
+        """
+        keys = {}
+        for s3_url in s3_urls:
+            keys.setdefault(s3_url.bucket, []).append({'Key': s3_url.key})
+
+        batches = [
+            (bucket, objects[i:i + 1000]) for bucket, objects in keys.items() for i in range(0, len(objects), 1000)
+        ]
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            responses = executor.map(
+                lambda batch: self.s3.delete_objects(Bucket=batch[0], Delete={'Objects': batch[1], 'Quiet': True}),
+                batches
+            )
+
+            return [error for response in responses for error in response.get('Errors', [])]
+
+    def list_prefixes(
+        self,
+        s3_url: S3Url,
+        start_after: Optional[str] = None
+    ) -> List[S3Url]:
+        """
+        Function to return the "directories" directly under the input URL, without listing the objects within them.
+
+        Required IAM permissions:
+            s3:ListBucket
+
+        :param s3_url: the S3Url object of the directory to list the prefixes of, e.g. s3://bucket/prefix/
+        :param start_after: only return prefixes after this key (lexicographically), e.g. prefix/dt=2023-01-01
+        :return: the list of S3Url objects of the prefixes, e.g. [s3://bucket/prefix/dt=2023-01-01/, ...]
+        """
+        kwargs = {'StartAfter': start_after} if start_after else {}
+
+        paginator = self.s3.get_paginator('list_objects_v2')
+        response_iter = paginator.paginate(
+            Bucket=s3_url.bucket,
+            Prefix=s3_url.key,
+            Delimiter='/',
+            **kwargs
+        )
+
+        output = []
+        for ele in response_iter:
+            output.extend(ele.get('CommonPrefixes', []))
+
+        return [S3Url(bucket=s3_url.bucket, key=ele['Prefix']) for ele in output]
+
+    def iter_partition_levels(
+        self,
+        s3_url: S3Url,
+        columns: List[str],
+        since: Optional[str] = None,
+        sample: Optional[int] = None,
+        max_concurrency: Optional[int] = 8
+    ) -> Iterator[Dict[Tuple[str, ...], S3Url]]:
+        """
+        Function to find the Hive-style partition directories (col=value/) under a URL, one partition column at a time,
+        by listing the prefixes of each level rather than every object.
+
+        Required IAM permissions:
+            s3:ListBucket
+
+        :param s3_url: the S3Url object of the table directory
+        :param columns: the partition columns, in the order of the directories
+        :param since: only find partitions where the first partition column is at least this value
+        :param sample: only list the next level under this many (evenly spaced) directories of each level
+        :param max_concurrency: the maximum number of prefixes to list at once
+        :return: an iterator of a dictionary of {partition values: S3Url} for each level, e.g. for the first level
+            {('2023-01-01',): S3Url(Bucket=bucket, Key=prefix/dt=2023-01-01/), ...}
+        """
+        level = {(): s3_url}
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            for i, column in enumerate(columns):
+                start_after = f'{s3_url.key}{column}={since}' if since and i == 0 else None
+
+                parents = list(level.items())
+                if sample and len(parents) > sample:
+                    step = (len(parents) - 1) / max(sample - 1, 1)
+                    parents = [parents[round(k * step)] for k in range(sample)]
+
+                listed = executor.map(lambda ele: self.list_prefixes(s3_url=ele[1], start_after=start_after), parents)
+
+                level = {}
+                for (values, url), prefixes in zip(parents, listed):
+                    for prefix in prefixes:
+                        name, _, value = prefix.key[len(url.key):].rstrip('/').partition('=')
+                        if name == column:
+                            level[(*values, unquote(value))] = prefix
+
+                yield level
+
+    def list_partitions(
+        self,
+        s3_url: S3Url,
+        columns: List[str],
+        since: Optional[str] = None,
+        max_concurrency: Optional[int] = 8
+    ) -> Dict[Tuple[str, ...], S3Url]:
+        """
+        Function to return all the Hive-style partitions under a URL, see iter_partition_levels.
+
+        Required IAM permissions:
+            s3:ListBucket
+
+        :param s3_url: the S3Url object of the table directory
+        :param columns: the partition columns, in the order of the directories
+        :param since: only find partitions where the first partition column is at least this value
+        :param max_concurrency: the maximum number of prefixes to list at once
+        :return: a dictionary of {partition values: S3Url of the partition}
+        """
+        level = {(): s3_url}
+        for level in self.iter_partition_levels(s3_url, columns, since=since, max_concurrency=max_concurrency):
+            pass
+
+        return level
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+(c) Charlie Collier, all rights reserved
+"""
+
+import io
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Optional, List
+
+from simpleboto.exceptions import S3PartLimitError
+from simpleboto.s3.s3_client import S3Client
+from simpleboto.s3.s3_url import S3Url
+
+
+class S3MultipartUpload(io.RawIOBase):
+    """
+    Writable file-like object which streams its contents to an S3 object with a multipart upload, uploading each
+    part in the background as soon as part_size bytes have been written, so the object is never staged locally.
+    Objects smaller than part_size are uploaded with a single PutObject request on close instead.
+    Existing S3 objects can also be appended server-side with copy, without downloading them.
+    An upload which is garbage collected without being closed is aborted rather than completed, so a partial object
+    is never written, and S3 allows at most MAX_PARTS parts, so objects are limited to MAX_PARTS * part_size bytes.
+    """
+    MIN_PART_SIZE = 5 * 1024 ** 2
+    MAX_PART_SIZE = 5 * 1024 ** 3
+    MAX_PARTS = 10000
+
+    def __init__(
+        self,
+        s3_url: S3Url,
+        part_size: Optional[int] = 8 * 1024 ** 2,
+        max_concurrency: Optional[int] = 4,
+        max_pending_parts: Optional[int] = None,
+        s3_client: Optional[S3Client] = None
+    ) -> None:
+        """
+        :param s3_url: the S3Url of the object to write
+        :param part_size: the size of each part in bytes (at least MIN_PART_SIZE, except for the last part)
+        :param max_concurrency: the maximum number of parts to upload at once
+        :param max_pending_parts: the maximum number of parts uploading or waiting to upload (default twice
+            max_concurrency); writes block until the oldest part is uploaded when exceeded, which bounds the memory
+            used to about (max_pending_parts + 1) * part_size if S3 is slower than the writer
+        :param s3_client: the S3Client to use (a new one if not given)
+        """
+        super().__init__()
+
+        self.s3_url = s3_url
+        self.part_size = max(part_size, self.MIN_PART_SIZE)
+        self.s3_client = s3_client if s3_client else S3Client()
+
+        self.upload_id = None
+        self.parts: List[Future] = []
+        self.size = 0
+        self.max_pending_parts = max_pending_parts if max_pending_parts else 2 * max_concurrency
+
+        self._uploaded = 0
+        self._buffer = bytearray()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    def writable(
+        self
+    ) -> bool:
+        return True
+
+    def tell(
+        self
+    ) -> int:
+        return self.size
+
+    def write(
+        self,
+        data: bytes
+    ) -> int:
+        """
+        Function to write bytes to the object, uploading a part whenever the buffer reaches part_size.
+
+        :param data: the bytes to write
+        :return: the number of bytes written
+        """
+        self._buffer.extend(data)
+        self.size += len(data)
+
+        while len(self._buffer) >= self.part_size:
+            self.upload_part(bytes(self._buffer[:self.part_size]))
+            del self._buffer[:self.part_size]
+
+        return len(data)
+
+    def upload_part(
+        self,
+        body: Optional[bytes] = None,
+        copy_source: Optional[S3Url] = None,
+        byte_range: Optional[str] = None
+    ) -> None:
+        """
+        Function to upload the next part of the object in the background, starting the multipart upload if needed.
+        The part is either the given bytes, or a range of an existing object copied server-side.
+        If more than max_pending_parts parts are pending, this waits for the oldest parts to be uploaded.
+        The upload is aborted if the part would exceed MAX_PARTS, as completing it would truncate the object.
+
+        Required IAM permissions:
+            s3:PutObject
+            s3:GetObject (to copy a part)
+
+        :param body: the bytes of the part
+        :param copy_source: the S3Url of the object to copy the part from
+        :param byte_range: the range of the object to copy, e.g. bytes=0-5242879
+        """
+        if len(self.parts) >= self.MAX_PARTS:
+            self.abort()
+            raise S3PartLimitError(url=str(self.s3_url), max_parts=self.MAX_PARTS, part_size=self.part_size)
+
+        s3 = self.s3_client.s3
+
+        if self.upload_id is None:
+            self.upload_id = s3.create_multipart_upload(Bucket=self.s3_url.bucket, Key=self.s3_url.key)['UploadId']
+
+        part_number = len(self.parts) + 1
+        kwargs = {
+            'Bucket': self.s3_url.bucket,
+            'Key': self.s3_url.key,
+            'UploadId': self.upload_id,
+            'PartNumber': part_number
+        }
+
+        if copy_source is None:
+            part = self._executor.submit(lambda: s3.upload_part(Body=body, **kwargs)['ETag'])
+        else:
+            part = self._executor.submit(lambda: s3.upload_part_copy(
+                CopySource={'Bucket': copy_source.bucket, 'Key': copy_source.key},
+                CopySourceRange=byte_range,
+                **kwargs
+            )['CopyPartResult']['ETag'])
+
+        self.parts.append(part)
+
+        while len(self.parts) - self._uploaded > self.max_pending_parts:
+            self.parts[self._uploaded].result()
+            self._uploaded += 1
+
+    def copy(
+        self,
+        s3_url: S3Url,
+        size: int
+    ) -> None:
+        """
+        Function to append the contents of an existing S3 object, copying it server-side with UploadPartCopy where
+        possible. Any buffered bytes are first topped up to a full part from the start of the object, and an end of
+        the object smaller than MIN_PART_SIZE is read and buffered, as only the last part can be smaller.
+
+        Required IAM permissions:
+            s3:GetObject
+            s3:PutObject
+
+        :param s3_url: the S3Url of the object to append
+        :param size: the size of the object in bytes
+        """
+        offset = min(self.part_size - len(self._buffer), size) if self._buffer else 0
+        if offset:
+            self.write(self.s3_client.read_range(s3_url, end=offset - 1))
+
+        while size - offset >= self.MIN_PART_SIZE:
+            end = min(offset + self.MAX_PART_SIZE, size)
+            if 0 < size - end < self.MIN_PART_SIZE:
+                end = size - self.MIN_PART_SIZE
+
+            self.upload_part(copy_source=s3_url, byte_range=f'bytes={offset}-{end - 1}')
+            self.size += end - offset
+            offset = end
+
+        if offset < size:
+            self.write(self.s3_client.read_range(s3_url, start=offset))
+
+    def close(
+        self
+    ) -> None:
+        """
+        Function to upload the rest of the object and complete the multipart upload (or abort it if a part failed).
+
+        Required IAM permissions:
+            s3:PutObject
+            s3:AbortMultipartUpload
+        """
+        if self.closed:
+            return
+
+        try:
+            if self.upload_id is None:
+                self.s3_client.s3.put_object(Bucket=self.s3_url.bucket, Key=self.s3_url.key, Body=bytes(self._buffer))
+            else:
+                if self._buffer:
+                    self.upload_part(bytes(self._buffer))
+
+                self.s3_client.s3.complete_multipart_upload(
+                    Bucket=self.s3_url.bucket,
+                    Key=self.s3_url.key,
+                    UploadId=self.upload_id,
+                    MultipartUpload={
+                        'Parts': [{'PartNumber': i, 'ETag': part.result()} for i, part in enumerate(self.parts, 1)]
+                    }
+                )
+        except Exception:
+            self.abort()
+            raise
+        finally:
+            self._buffer.clear()
+            self._executor.shutdown()
+            super().close()
+
+    def abort(
+        self
+    ) -> None:
+        """
+        Function to abort the multipart upload (if started), deleting the parts uploaded so far.
+
+        Required IAM permissions:
+            s3:AbortMultipartUpload
+        """
+        self._executor.shutdown(cancel_futures=True)
+
+        if self.upload_id is not None:
+            self.s3_client.s3.abort_multipart_upload(
+                Bucket=self.s3_url.bucket,
+                Key=self.s3_url.key,
+                UploadId=self.upload_id
+            )
+            self.upload_id = None
+
+        self._buffer.clear()
+        super().close()
+
+    def __del__(
+        self
+    ) -> None:
+        """
+        Function to abort the multipart upload if the object is garbage collected without being closed, instead of
+        completing it with whatever has been written so far as io.IOBase does.
+        """
+        if not self.closed and hasattr(self, '_executor'):
+            self.abort()
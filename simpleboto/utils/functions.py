@@ -3,9 +3,12 @@
 (c) Charlie Collier, all rights reserved
 """
 
+import hashlib
+import importlib
+from types import ModuleType
 from typing import Type, Any
 
-from simpleboto.exceptions import InvalidTypeError
+from simpleboto.exceptions import InvalidTypeError, MissingDependencyError
 
 
 class Utils:
@@ -38,3 +41,30 @@ class Utils:
         """
         if not isinstance(value, expected_type):
             raise InvalidTypeError(variable=key, expected_type=expected_type)
+
+    @classmethod
+    def import_module(
+        cls,
+        name: str
+    ) -> ModuleType:
+        """
+        Function to import an optional dependency, raising a helpful Exception if it is not installed.
+
+        :param name: the name of the module to import, e.g. numpy
+        """
+        try:
+            return importlib.import_module(name)
+        except ImportError:
+            raise MissingDependencyError(module=name)
+
+    @classmethod
+    def get_hash(
+        cls,
+        value: str
+    ) -> str:
+        """
+        Function to return the SHA-256 hex digest of a string.
+
+        :param value: the string to hash
+        """
+        return hashlib.sha256(value.encode('utf-8')).hexdigest()
@@ -3,9 +3,15 @@
 (c) Charlie Collier, all rights reserved
 """
 
+import datetime
+import json
 import os
+from decimal import Decimal
+from typing import List, Optional
+from unittest import mock
 
-from moto import mock_athena
+import numpy as np
+from moto import mock_athena, mock_s3
 
 from simpleboto.athena.athena_client import AthenaClient
 from simpleboto.athena.constants import C
@@ -14,14 +20,23 @@ from simpleboto.athena.utils.data_types import (
     IntegerDType,
     DecimalDType,
     BooleanDType,
-    VarCharDType
+    VarCharDType,
+    DateDType,
+    BigIntDType,
+    TimestampDType,
+    DoubleDType
 )
+from simpleboto.athena.utils.query_cache import QueryCache
 from simpleboto.athena.utils.schema import Schema
+from simpleboto.athena.utils.schema_registry import SchemaRegistry
 from simpleboto.exceptions import (
     NoParameterError,
     InvalidTypeError,
-    UnexpectedParameterError
+    UnexpectedParameterError,
+    QueryExecutionError,
+    QueryCostError
 )
+from simpleboto.s3 import S3Url
 from simpleboto.utils import Utils
 from tests.base_test import BaseTest
 
@@ -46,6 +61,41 @@ class TestAthenaClient(BaseTest):
 
         self.ac = AthenaClient(region_name=self.env_vars['REGION'])
 
+    @staticmethod
+    def _query_execution(
+        state: str,
+        reason: Optional[str] = None
+    ) -> dict:
+        status = {'State': state}
+        if reason:
+            status['StateChangeReason'] = reason
+
+        return {'QueryExecution': {'QueryExecutionId': 'QUERY_ID', 'Status': status}}
+
+    @staticmethod
+    def _result_pages(
+        column_info: List[dict],
+        *pages: List[list]
+    ) -> List[dict]:
+        return [
+            {
+                'ResultSet': {
+                    'Rows': [{'Data': [{'VarCharValue': v} if v is not None else {} for v in row]} for row in rows],
+                    'ResultSetMetadata': {'ColumnInfo': column_info}
+                }
+            }
+            for rows in pages
+        ]
+
+    def _mock_results(
+        self,
+        pages: List[dict]
+    ) -> mock.MagicMock:
+        paginator = mock.MagicMock()
+        paginator.paginate.return_value = pages
+
+        return mock.patch.object(self.ac.athena, 'get_paginator', return_value=paginator)
+
     def test_get_injected_projection(self) -> None:
         self.assertEqual(
             AthenaClient.get_injected_projection(column=TEST_COLUMN),
@@ -225,7 +275,7 @@ class TestAthenaClient(BaseTest):
             ),
             {
                 "'classification'": "'parquet'",
-                "'compressionType'": "'snappy'"
+                "'parquet.compression'": "'SNAPPY'"
             }
         )
 
@@ -275,7 +325,7 @@ class TestAthenaClient(BaseTest):
             ),
             {
                 "'classification'": "'parquet'",
-                "'compressionType'": "'snappy'",
+                "'parquet.compression'": "'SNAPPY'",
                 f"'projection.{TEST_COLUMN}.type'": "'enum'",
                 f"'projection.{TEST_COLUMN}.values'": "'A,B'",
                 "'projection.enabled'": "'TRUE'"
@@ -324,6 +374,28 @@ class TestAthenaClient(BaseTest):
             'org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe'
         )
 
+    def test_get_serde_other_formats(self) -> None:
+        self.assertEqual(
+            [AthenaClient.get_serde(metadata={C.FILE_FORMAT: f_format}) for f_format in [C.ORC_, C.AVRO_, C.JSON_]],
+            [
+                'org.apache.hadoop.hive.ql.io.orc.OrcSerde',
+                'org.apache.hadoop.hive.serde2.avro.AvroSerDe',
+                'org.openx.data.jsonserde.JsonSerDe'
+            ]
+        )
+
+    def test_get_bucket_info(self) -> None:
+        self.assertEqual(
+            AthenaClient.get_bucket_info(
+                metadata={
+                    C.BUCKETED_BY: ['COLUMN1', 'COLUMN2'],
+                    C.BUCKET_COUNT: 8
+                }
+            ),
+            '\nCLUSTERED BY (\n\t`COLUMN1`,\n\t`COLUMN2`\n) INTO 8 BUCKETS'
+        )
+        self.assertEqual(AthenaClient.get_bucket_info(metadata={}), '')
+
     def test_get_serde_csv(self) -> None:
         self.assertEqual(
             AthenaClient.get_serde(
@@ -334,6 +406,31 @@ class TestAthenaClient(BaseTest):
             'org.apache.hadoop.hive.serde2.OpenCSVSerde'
         )
 
+    def test_get_serde_info(self) -> None:
+        metadata = {
+            C.FILE_FORMAT: C.CSV_,
+            C.SERDE_INFO: {
+                'SerializationLibrary': 'org.apache.hadoop.hive.serde2.lazy.LazySimpleSerDe',
+                'Parameters': {'field.delim': '\t', 'quote': "'"}
+            }
+        }
+
+        self.assertEqual(AthenaClient.get_serde(metadata), 'org.apache.hadoop.hive.serde2.lazy.LazySimpleSerDe')
+        self.assertEqual(
+            AthenaClient.get_serde_properties(metadata),
+            "\nWITH SERDEPROPERTIES (\n    'field.delim' = '\\t',\n\t'quote' = '\\''\n)"
+        )
+        self.assertEqual(AthenaClient.get_serde_properties({C.FILE_FORMAT: C.CSV_}), '')
+
+        create_table = AthenaClient.get_create_table(Schema(
+            schema={'COLUMN1': StringDType()},
+            metadata={**self.req_athena_fields_dict, **metadata}
+        ))
+        self.assertIn(
+            "ROW FORMAT SERDE\n    'org.apache.hadoop.hive.serde2.lazy.LazySimpleSerDe'\nWITH SERDEPROPERTIES (\n",
+            create_table
+        )
+
     def test_format_dict(self) -> None:
         self.assertEqual(
             AthenaClient.format_dict(
@@ -405,6 +502,129 @@ class TestAthenaClient(BaseTest):
         )
         self.assertEqual(output_ct, expected_ct)
 
+    def test_get_create_table_with_db_orc_bucketed(self) -> None:
+        schema = Schema(
+            schema={
+                'COLUMN1': BigIntDType(),
+                'COLUMN2': StringDType()
+            },
+            metadata={
+                C.DATABASE_NAME: 'test_db',
+                C.TABLE_NAME: 'test_table',
+                C.S3_BUCKET: 'test-bucket',
+                C.S3_PREFIX: 'test_prefix',
+                C.FILE_FORMAT: C.ORC_,
+                C.FILE_COMPRESSION: C.ZLIB_,
+                C.PARTITION_SCHEMA: {'COLUMN3': StringDType()},
+                C.BUCKETED_BY: ['COLUMN1'],
+                C.BUCKET_COUNT: 16
+            }
+        )
+        output_ct = AthenaClient.get_create_table(schema=schema)
+
+        expected_ct = Utils.get_file(
+            location=os.path.join(self.test_data_dir, 'create_table', 'with_db_orc_bucketed.sql')
+        )
+        self.assertEqual(output_ct, expected_ct)
+
+    def test_get_create_table_avro(self) -> None:
+        schema = Schema(
+            schema={
+                'COLUMN1': IntegerDType(),
+                'COLUMN2': DecimalDType(10, 2),
+                'COLUMN3': DateDType()
+            },
+            metadata={**self.req_athena_fields_dict, C.FILE_FORMAT: C.AVRO_, C.FILE_COMPRESSION: C.DEFLATE_}
+        )
+        output_ct = AthenaClient.get_create_table(schema=schema)
+
+        self.assertIn("'org.apache.hadoop.hive.serde2.avro.AvroSerDe'", output_ct)
+        self.assertIn(
+            "STORED AS INPUTFORMAT\n    'org.apache.hadoop.hive.ql.io.avro.AvroContainerInputFormat'\n"
+            "OUTPUTFORMAT\n    'org.apache.hadoop.hive.ql.io.avro.AvroContainerOutputFormat'\n",
+            output_ct
+        )
+        self.assertTrue(output_ct.endswith(
+            "\t'compressionType' = 'deflate',\n"
+            "\t'avro.schema.literal' = '{\"type\": \"record\", \"name\": \"test_table\", \"fields\": ["
+            "{\"name\": \"COLUMN1\", \"type\": [\"null\", \"int\"], \"default\": null}, "
+            "{\"name\": \"COLUMN2\", \"type\": [\"null\", {\"type\": \"bytes\", \"logicalType\": \"decimal\", "
+            "\"precision\": 10, \"scale\": 2}], \"default\": null}, "
+            "{\"name\": \"COLUMN3\", \"type\": [\"null\", {\"type\": \"int\", \"logicalType\": \"date\"}], "
+            "\"default\": null}]}'\n)\n"
+        ))
+
+    def _iceberg_schema(
+        self,
+        **metadata
+    ) -> Schema:
+        return Schema(
+            schema={
+                'COLUMN1': BigIntDType(),
+                'COLUMN2': TimestampDType(),
+                'COLUMN3': StringDType()
+            },
+            metadata={
+                C.DATABASE_NAME: 'test_db',
+                C.TABLE_NAME: 'test_table',
+                C.S3_BUCKET: 'test-bucket',
+                C.S3_PREFIX: 'test_prefix',
+                C.FILE_FORMAT: C.PARQUET_,
+                C.FILE_COMPRESSION: C.SNAPPY_,
+                C.TABLE_TYPE: 'ICEBERG',
+                C.PARTITION_TRANSFORMS: ['day(COLUMN2)', 'bucket(16, COLUMN1)'],
+                **metadata
+            }
+        )
+
+    def test_get_create_table_with_db_iceberg(self) -> None:
+        output_ct = AthenaClient.get_create_table(schema=self._iceberg_schema())
+
+        expected_ct = Utils.get_file(
+            location=os.path.join(self.test_data_dir, 'create_table', 'with_db_iceberg.sql')
+        )
+        self.assertEqual(output_ct, expected_ct)
+
+    def test_get_create_table_iceberg_unpartitioned(self) -> None:
+        output_ct = AthenaClient.get_create_table(schema=Schema(
+            schema={'COLUMN1': BigIntDType()},
+            metadata={**self.req_athena_fields_dict, C.FILE_FORMAT: C.AVRO_, C.TABLE_TYPE: C.ICEBERG_}
+        ))
+
+        self.assertTrue(output_ct.startswith(
+            'CREATE TABLE IF NOT EXISTS test_table (\n    `COLUMN1` bigint\n)\nLOCATION'
+        ))
+        self.assertNotIn('avro.schema.literal', output_ct)
+
+    def test_validate_metadata_table_type(self) -> None:
+        invalid_metadata = [
+            (
+                {C.TABLE_TYPE: 'delta'},
+                r"The parameter TABLE_TYPE is unexpected for Schema metadata; must be one of \['hive', 'iceberg'\]"
+            ),
+            (
+                {C.PARTITION_TRANSFORMS: ['COLUMN1']},
+                'The parameter PARTITION_TRANSFORMS is unexpected for Schema metadata if TABLE_TYPE is not iceberg'
+            ),
+            (
+                {C.TABLE_TYPE: C.ICEBERG_, C.FILE_FORMAT: C.CSV_, C.FILE_COMPRESSION: C.GZIP_},
+                r"The parameter FILE_FORMAT is unexpected for Schema metadata if TABLE_TYPE is iceberg; "
+                r"must be one of \['parquet', 'orc', 'avro'\]"
+            ),
+            (
+                {C.TABLE_TYPE: C.ICEBERG_, C.BUCKETED_BY: ['COLUMN1'], C.BUCKET_COUNT: 4},
+                r"The parameters \['BUCKETED_BY', 'BUCKET_COUNT'\] are unexpected for Schema metadata if TABLE_TYPE"
+            ),
+            (
+                {C.TABLE_TYPE: C.ICEBERG_, C.PARTITION_TRANSFORMS: ['day(COLUMN1)', 'days(COLUMN2)']},
+                r"The parameters \['days\(COLUMN2\)'\] are unexpected for PARTITION_TRANSFORMS for Schema metadata"
+            )
+        ]
+
+        for metadata, regex in invalid_metadata:
+            with self.subTest(metadata=metadata), self.assertRaisesRegex(UnexpectedParameterError, regex):
+                AthenaClient.validate_metadata(metadata={**self.req_athena_fields_dict, **metadata})
+
     def test_get_create_table_without_db_csv(self) -> None:
         schema = Schema(
             schema={
@@ -453,7 +673,8 @@ class TestAthenaClient(BaseTest):
 
         with self.assertRaisesRegex(
             UnexpectedParameterError,
-            r"The parameter FILE_FORMAT is unexpected for Schema metadata; must be one of \['parquet', 'csv'\]"
+            r"The parameter FILE_FORMAT is unexpected for Schema metadata; "
+            r"must be one of \['parquet', 'csv', 'orc', 'avro', 'json'\]"
         ):
             AthenaClient.validate_metadata(metadata=self.req_athena_fields_dict)
 
@@ -462,7 +683,27 @@ class TestAthenaClient(BaseTest):
 
         with self.assertRaisesRegex(
             UnexpectedParameterError,
-            r"The parameter FILE_COMPRESSION is unexpected for Schema metadata; must be one of \['snappy', 'gzip'\]"
+            r"The parameter FILE_COMPRESSION is unexpected for Schema metadata; "
+            r"must be one of \['snappy', 'gzip', 'zstd'\]"
+        ):
+            AthenaClient.validate_metadata(metadata=self.req_athena_fields_dict)
+
+    def test_validate_metadata_compression_for_format(self) -> None:
+        self.req_athena_fields_dict[C.FILE_FORMAT] = C.AVRO_
+        self.req_athena_fields_dict[C.FILE_COMPRESSION] = C.ZSTD_
+
+        with self.assertRaisesRegex(
+            UnexpectedParameterError,
+            r"The parameter FILE_COMPRESSION is unexpected for Schema metadata; must be one of \['snappy', 'deflate'\]"
+        ):
+            AthenaClient.validate_metadata(metadata=self.req_athena_fields_dict)
+
+    def test_validate_metadata_bucketing(self) -> None:
+        self.req_athena_fields_dict[C.BUCKETED_BY] = ['COLUMN1']
+
+        with self.assertRaisesRegex(
+            NoParameterError,
+            r"Required parameter \['BUCKET_COUNT'\] for Schema metadata if bucketing is used"
         ):
             AthenaClient.validate_metadata(metadata=self.req_athena_fields_dict)
 
@@ -501,3 +742,1401 @@ class TestAthenaClient(BaseTest):
             f"as it is present in {C.PARTITION_SCHEMA}"
         ):
             AthenaClient.validate_metadata(metadata=self.req_athena_fields_dict)
+
+    def test_start_query(self) -> None:
+        with mock.patch.object(
+            self.ac.athena,
+            'start_query_execution',
+            return_value={'QueryExecutionId': 'QUERY_ID'}
+        ) as start_query_execution:
+            query_execution_id = self.ac.start_query(
+                sql='SELECT 1',
+                database='test_db',
+                workgroup='test_workgroup',
+                output_location=S3Url(bucket='test-bucket', prefix='results')
+            )
+
+        self.assertEqual(query_execution_id, 'QUERY_ID')
+        start_query_execution.assert_called_once_with(
+            QueryString='SELECT 1',
+            QueryExecutionContext={'Database': 'test_db'},
+            WorkGroup='test_workgroup',
+            ResultConfiguration={'OutputLocation': 's3://test-bucket/results/'}
+        )
+
+    def test_start_query_moto(self) -> None:
+        query_execution_id = self.ac.start_query(sql='SELECT 1')
+
+        self.assertEqual(
+            self.ac.athena.get_query_execution(QueryExecutionId=query_execution_id)['QueryExecution']['Query'],
+            'SELECT 1'
+        )
+
+    def test_wait_for_query(self) -> None:
+        with mock.patch.object(
+            self.ac.athena,
+            'get_query_execution',
+            side_effect=[self._query_execution('RUNNING'), self._query_execution(C.SUCCEEDED_)]
+        ) as get_query_execution:
+            execution = self.ac.wait_for_query(query_execution_id='QUERY_ID', poll_interval=0)
+
+        self.assertEqual(execution['Status']['State'], C.SUCCEEDED_)
+        self.assertEqual(get_query_execution.call_count, 2)
+
+    def test_wait_for_query_failed(self) -> None:
+        with mock.patch.object(
+            self.ac.athena,
+            'get_query_execution',
+            return_value=self._query_execution(C.FAILED_, reason='SYNTAX_ERROR')
+        ):
+            with self.assertRaisesRegex(QueryExecutionError, 'The query QUERY_ID finished with state FAILED: SYNTAX'):
+                self.ac.wait_for_query(query_execution_id='QUERY_ID')
+
+    def test_execute(self) -> None:
+        with mock.patch.object(self.ac, 'wait_for_query') as wait_for_query:
+            query_execution_id = self.ac.execute(sql='SELECT 1', database='test_db')
+
+        wait_for_query.assert_called_once_with(query_execution_id=query_execution_id, tag=None)
+        self.assertEqual(
+            self.ac.athena.get_query_execution(QueryExecutionId=query_execution_id)['QueryExecution'][
+                'QueryExecutionContext'
+            ],
+            {'Database': 'test_db'}
+        )
+
+    def test_get_query_results_rows(self) -> None:
+        column_info = [{'Name': 'COL1', 'Type': 'varchar'}, {'Name': 'COL2', 'Type': 'bigint'}]
+        pages = self._result_pages(
+            column_info,
+            [['COL1', 'COL2'], ['A', '1']],
+            [['B', None]]
+        )
+
+        with self._mock_results(pages):
+            self.assertEqual(
+                self.ac.get_query_results(query_execution_id='QUERY_ID'),
+                [('A', '1'), ('B', None)]
+            )
+
+    def test_get_query_results_columnar(self) -> None:
+        column_info = [
+            {'Name': 'COL1', 'Type': 'varchar'},
+            {'Name': 'COL2', 'Type': 'bigint'},
+            {'Name': 'COL3', 'Type': 'decimal', 'Precision': 10, 'Scale': 2}
+        ]
+        pages = self._result_pages(
+            column_info,
+            [['COL1', 'COL2', 'COL3'], ['A', '1', '1.50']],
+            [['B', None, None]]
+        )
+
+        with self._mock_results(pages):
+            output = self.ac.get_query_results(query_execution_id='QUERY_ID', columnar=True)
+
+        self.assertEqual(list(output.keys()), ['COL1', 'COL2', 'COL3'])
+        self.assertEqual(output['COL1'].tolist(), ['A', 'B'])
+        self.assertEqual(output['COL2'].dtype, np.int64)
+        self.assertEqual(output['COL2'].tolist(), [1, None])
+        self.assertEqual(str(output['COL3'][0]), '1.50')
+
+    def test_get_query_results_columnar_empty(self) -> None:
+        column_info = [{'Name': 'COL1', 'Type': 'integer'}]
+        pages = self._result_pages(column_info, [['COL1']])
+
+        with self._mock_results(pages):
+            output = self.ac.get_query_results(query_execution_id='QUERY_ID', columnar=True)
+
+        self.assertEqual(output['COL1'].dtype, np.int32)
+        self.assertEqual(len(output['COL1']), 0)
+
+    def test_execute_query_cache(self) -> None:
+        self.ac.query_cache = QueryCache(ttl=3600)
+        execution = self._query_execution(C.SUCCEEDED_)
+        execution['QueryExecution']['ResultConfiguration'] = {'OutputLocation': 's3://bucket/results.csv'}
+
+        with mock.patch.object(self.ac.athena, 'get_query_execution', return_value=execution):
+            with mock.patch.object(
+                self.ac.athena,
+                'start_query_execution',
+                return_value={'QueryExecutionId': 'QUERY_ID'}
+            ) as start_query_execution:
+                first = self.ac.execute(sql='SELECT 1', database='test_db')
+                second = self.ac.execute(sql='SELECT  1;', database='test_db')
+                self.ac.execute(sql='SELECT 1', database='test_db', use_cache=False)
+
+        self.assertEqual(first, second)
+        self.assertEqual(start_query_execution.call_count, 2)
+        self.assertEqual(
+            start_query_execution.call_args_list[0].kwargs['ResultReuseConfiguration'],
+            {'ResultReuseByAgeConfiguration': {'Enabled': True, 'MaxAgeInMinutes': 60}}
+        )
+        self.assertNotIn('ResultReuseConfiguration', start_query_execution.call_args_list[1].kwargs)
+        self.assertEqual(
+            list(self.ac.query_cache.entries.values())[0]['OutputLocation'],
+            's3://bucket/results.csv'
+        )
+
+    def test_execute_query_cache_ddl(self) -> None:
+        self.ac.query_cache = QueryCache()
+
+        with mock.patch.object(self.ac, 'wait_for_query', return_value={}):
+            with mock.patch.object(
+                self.ac.athena,
+                'start_query_execution',
+                return_value={'QueryExecutionId': 'QUERY_ID'}
+            ) as start_query_execution:
+                for sql in [
+                    'DROP TABLE test_table',
+                    'EXPLAIN SELECT 1',
+                    'CREATE TABLE test_table_2 AS SELECT 1',
+                    "UNLOAD (SELECT 1) TO 's3://bucket/unload/' WITH (format = 'PARQUET')"
+                ]:
+                    self.ac.execute(sql=sql)
+
+        self.assertEqual(self.ac.query_cache.entries, {})
+        for call in start_query_execution.call_args_list:
+            self.assertNotIn('ResultReuseConfiguration', call.kwargs)
+
+    def test_get_query_results_query_cache(self) -> None:
+        self.ac.query_cache = QueryCache(cache_dir=os.path.join(self.tmp_dir, 'query_cache'))
+        pages = self._result_pages([{'Name': 'COL1', 'Type': 'varchar'}], [['COL1'], ['A']])
+
+        with self._mock_results(pages) as get_paginator:
+            first = self.ac.get_query_results(query_execution_id='QUERY_ID')
+            second = self.ac.get_query_results(query_execution_id='QUERY_ID')
+
+        self.assertEqual(first, second)
+        self.assertEqual(get_paginator.call_count, 1)
+
+    @mock_s3
+    def test_unload(self) -> None:
+        self._set_up_s3(bucket_name='test-bucket')
+        destination = S3Url('s3://test-bucket/unload')
+
+        query_execution_ids = []
+
+        def _write_files(query_execution_id: str, **_) -> dict:
+            query_execution_ids.append(query_execution_id)
+            self.bucket.put_object(Body=b'a', Key='unload/dt=2023-01-01/file1.parquet')
+            self.bucket.put_object(Body=b'b', Key='unload/dt=2023-01-02/file2.parquet')
+            self.bucket.put_object(Body=b'', Key='unload/_temporary')
+            self.bucket.put_object(
+                Body=b's3://test-bucket/unload/dt=2023-01-01/file1.parquet\n'
+                     b's3://test-bucket/unload/dt=2023-01-02/file2.parquet\n',
+                Key=f'results/{query_execution_id}-manifest.csv'
+            )
+            return {'ResultConfiguration': {'OutputLocation': f's3://test-bucket/results/{query_execution_id}'}}
+
+        with mock.patch.object(self.ac, 'wait_for_query', side_effect=_write_files):
+            files = self.ac.unload(
+                sql='SELECT col1, dt FROM test_table;',
+                destination=destination,
+                partitioned_by=['dt'],
+                database='test_db'
+            )
+
+        self.assertEqual(files, [
+            S3Url(bucket='test-bucket', key='unload/dt=2023-01-01/file1.parquet'),
+            S3Url(bucket='test-bucket', key='unload/dt=2023-01-02/file2.parquet')
+        ])
+        self.assertEqual(
+            self.ac.athena.get_query_execution(QueryExecutionId=query_execution_ids[0])['QueryExecution']['Query'],
+            "UNLOAD (SELECT col1, dt FROM test_table)\n"
+            "TO 's3://test-bucket/unload/'\n"
+            "WITH (format = 'PARQUET', compression = 'SNAPPY', partitioned_by = ARRAY['dt'])"
+        )
+
+        with self.assertRaisesRegex(
+            UnexpectedParameterError,
+            'The parameter s3://test-bucket/unload/ is unexpected for UNLOAD; the destination must be empty'
+        ):
+            self.ac.unload(sql='SELECT 1', destination=destination)
+        self._tear_down_s3()
+
+    def test_unload_no_compression(self) -> None:
+        execution = {'Statistics': {'DataManifestLocation': 's3://test-bucket/results/QUERY_ID-manifest.csv'}}
+
+        with mock.patch.object(self.ac, 'start_query', return_value='QUERY_ID') as start_query:
+            with mock.patch.object(self.ac, 'wait_for_query', return_value=execution):
+                with mock.patch.object(self.ac.s3_client, 'list', return_value=[]):
+                    with mock.patch.object(self.ac.s3_client, 'read_range', return_value=b'') as read_range:
+                        files = self.ac.unload(
+                            sql='SELECT 1',
+                            destination=S3Url(bucket='test-bucket', prefix='unload'),
+                            format='JSON',
+                            compression=None
+                        )
+
+        self.assertEqual(files, [])
+        self.assertTrue(start_query.call_args.kwargs['sql'].endswith("WITH (format = 'JSON')"))
+        self.assertFalse(start_query.call_args.kwargs['use_cache'])
+        read_range.assert_called_once_with(S3Url('s3://test-bucket/results/QUERY_ID-manifest.csv'))
+
+    def test_unload_unsupported_compression(self) -> None:
+        with self.assertRaisesRegex(
+            UnexpectedParameterError,
+            r"The parameter zlib is unexpected for UNLOAD in textfile; must be one of \['snappy', 'gzip', 'zstd'\]"
+        ):
+            self.ac.unload(
+                sql='SELECT 1',
+                destination=S3Url(bucket='test-bucket', prefix='unload'),
+                format='textfile',
+                compression='zlib'
+            )
+
+    def test_unload_unsupported_format(self) -> None:
+        with self.assertRaisesRegex(
+            UnexpectedParameterError,
+            'The parameter csv is unexpected for UNLOAD; must be one of'
+        ):
+            self.ac.unload(sql='SELECT 1', destination=S3Url(bucket='test-bucket', prefix='unload'), format='csv')
+
+    def test_format_parameter(self) -> None:
+        self.assertEqual(
+            [
+                AthenaClient.format_parameter(param=param)
+                for param in [
+                    None, True, False, 10, 1.5, Decimal('2.50'), "O'Neil; DROP TABLE x", datetime.date(2023, 1, 2),
+                    datetime.datetime(2023, 1, 2, 3, 4, 5)
+                ]
+            ],
+            [
+                'NULL', 'true', 'false', '10', '1.5', '2.50', "'O''Neil; DROP TABLE x'", "DATE '2023-01-02'",
+                "TIMESTAMP '2023-01-02 03:04:05.000'"
+            ]
+        )
+
+    def test_format_parameter_non_finite(self) -> None:
+        self.assertEqual(
+            [
+                AthenaClient.format_parameter(param=param)
+                for param in [
+                    float('nan'), float('inf'), float('-inf'), Decimal('NaN'), Decimal('Infinity'), Decimal('-Infinity')
+                ]
+            ],
+            ['nan()', 'infinity()', '-infinity()', 'nan()', 'infinity()', '-infinity()']
+        )
+
+    def test_execute_params(self) -> None:
+        with mock.patch.object(self.ac, 'wait_for_query', return_value={}):
+            with mock.patch.object(
+                self.ac.athena,
+                'start_query_execution',
+                return_value={'QueryExecutionId': 'QUERY_ID'}
+            ) as start_query_execution:
+                self.ac.execute(sql='SELECT * FROM test_table WHERE col1 = ? AND col2 = ?', params=['A', 1])
+
+        start_query_execution.assert_called_once_with(
+            QueryString='SELECT * FROM test_table WHERE col1 = ? AND col2 = ?',
+            ExecutionParameters=["'A'", '1']
+        )
+
+    def test_prepare(self) -> None:
+        with mock.patch.object(self.ac.athena, 'create_prepared_statement') as create_prepared_statement:
+            self.ac.prepare(name='lookup', sql='SELECT * FROM test_table WHERE col1 = ?')
+            self.ac.prepare(name='lookup', sql='SELECT * FROM test_table WHERE col1 = ?')
+
+        create_prepared_statement.assert_called_once_with(
+            StatementName='lookup',
+            WorkGroup=C.PRIMARY_WORKGROUP_,
+            QueryStatement='SELECT * FROM test_table WHERE col1 = ?'
+        )
+        self.assertEqual(
+            self.ac.prepared_statements,
+            {(C.PRIMARY_WORKGROUP_, 'lookup'): 'SELECT * FROM test_table WHERE col1 = ?'}
+        )
+
+    def test_prepare_existing(self) -> None:
+        exception = self.ac.athena.exceptions.InvalidRequestException(
+            error_response={'Error': {'Code': 'InvalidRequestException', 'Message': 'already exists'}},
+            operation_name='CreatePreparedStatement'
+        )
+
+        with mock.patch.object(self.ac.athena, 'create_prepared_statement', side_effect=exception):
+            with mock.patch.object(self.ac.athena, 'update_prepared_statement') as update_prepared_statement:
+                self.ac.prepare(name='lookup', sql='SELECT 2', workgroup='test_workgroup')
+
+        update_prepared_statement.assert_called_once_with(
+            StatementName='lookup',
+            WorkGroup='test_workgroup',
+            QueryStatement='SELECT 2'
+        )
+
+    def test_execute_prepared(self) -> None:
+        with mock.patch.object(self.ac, 'execute', return_value='QUERY_ID') as execute:
+            self.assertEqual(self.ac.execute_prepared(name='lookup', params=['A']), 'QUERY_ID')
+
+        execute.assert_called_once_with(
+            sql='EXECUTE lookup',
+            database=None,
+            workgroup=C.PRIMARY_WORKGROUP_,
+            output_location=None,
+            params=['A'],
+            tag=None
+        )
+
+    def test_wait_for_query_records_metrics(self) -> None:
+        execution = self._query_execution(C.SUCCEEDED_)
+        execution['QueryExecution']['Query'] = 'SELECT 1'
+        execution['QueryExecution']['Statistics'] = {'DataScannedInBytes': 100, 'QueryQueueTimeInMillis': 5}
+        failed = self._query_execution(C.FAILED_)
+
+        with mock.patch.object(self.ac.athena, 'get_query_execution', side_effect=[execution, failed]):
+            self.ac.wait_for_query(query_execution_id='QUERY_ID', tag='dashboard')
+            with self.assertRaises(QueryExecutionError):
+                self.ac.wait_for_query(query_execution_id='QUERY_ID', tag='dashboard')
+
+        records = self.ac.query_metrics.query(tag='dashboard')
+        self.assertEqual([r['State'] for r in records], [C.SUCCEEDED_, C.FAILED_])
+        self.assertEqual(records[0]['DataScannedInBytes'], 100)
+        self.assertEqual(records[0]['QueryQueueTimeInMillis'], 5)
+
+    def _sharded_schema(self) -> Schema:
+        return Schema(
+            schema={'COLUMN1': StringDType()},
+            metadata={
+                C.DATABASE_NAME: 'test_db',
+                C.PARTITION_SCHEMA: {
+                    'dt': StringDType(),
+                    'region': StringDType(),
+                    'hour': StringDType(),
+                    'day': DateDType(),
+                    'year': IntegerDType()
+                },
+                C.PARTITION_PROJECTION: {
+                    'dt': {'type': 'date', 'format': 'yyyy/MM/dd', 'range': '2023/01/01,NOW'},
+                    'region': {'type': 'enum', 'values': ['EU', 'US']},
+                    'hour': {'type': 'integer', 'range': '0,23', 'digits': 2},
+                    'day': {'type': 'date', 'format': 'yyyy-MM-dd', 'range': '2023-01-01,NOW'},
+                    'year': {'type': 'integer', 'range': '2000,2030'}
+                }
+            }
+        )
+
+    def test_to_strftime(self) -> None:
+        self.assertEqual(AthenaClient.to_strftime(date_format="yyyy-MM-dd'T'HH:mm:ss"), '%Y-%m-%dT%H:%M:%S')
+        self.assertEqual(AthenaClient.to_strftime(date_format='yyMMdd'), '%y%m%d')
+
+    def test_split_date_range(self) -> None:
+        self.assertEqual(
+            AthenaClient.split_date_range(start=datetime.date(2023, 1, 1), end=datetime.date(2023, 1, 5), days=2),
+            [
+                (datetime.date(2023, 1, 1), datetime.date(2023, 1, 2)),
+                (datetime.date(2023, 1, 3), datetime.date(2023, 1, 4)),
+                (datetime.date(2023, 1, 5), datetime.date(2023, 1, 5))
+            ]
+        )
+
+    def test_format_partition_value(self) -> None:
+        schema = self._sharded_schema()
+
+        self.assertEqual(
+            [
+                AthenaClient.format_partition_value(schema, 'dt', datetime.date(2023, 1, 2)),
+                AthenaClient.format_partition_value(schema, 'dt', '2023/01/02'),
+                AthenaClient.format_partition_value(schema, 'hour', 5),
+                AthenaClient.format_partition_value(schema, 'region', 'EU'),
+                AthenaClient.format_partition_value(schema, 'day', datetime.date(2023, 1, 2)),
+                AthenaClient.format_partition_value(schema, 'day', '2023-01-02'),
+                AthenaClient.format_partition_value(schema, 'year', '2023')
+            ],
+            ["'2023/01/02'", "'2023/01/02'", "'05'", "'EU'", "DATE '2023-01-02'", "DATE '2023-01-02'", '2023']
+        )
+
+    def test_format_partition_value_typed(self) -> None:
+        schema = Schema(
+            schema={'id': IntegerDType()},
+            metadata={
+                C.PARTITION_SCHEMA: {'flag': BooleanDType(), 'ratio': DoubleDType(), 'price': DecimalDType(10, 2)}
+            }
+        )
+
+        self.assertEqual(
+            [
+                AthenaClient.format_partition_value(schema, 'flag', 'true'),
+                AthenaClient.format_partition_value(schema, 'flag', False),
+                AthenaClient.format_partition_value(schema, 'ratio', '0.5'),
+                AthenaClient.format_partition_value(schema, 'price', '12.50')
+            ],
+            ['true', 'false', '0.5', '12.50']
+        )
+
+    def test_get_partition_predicate(self) -> None:
+        schema = self._sharded_schema()
+
+        self.assertEqual(
+            AthenaClient.get_partition_predicate(schema, 'hour', (0, 11)),
+            "\"hour\" BETWEEN '00' AND '11'"
+        )
+        self.assertEqual(
+            AthenaClient.get_partition_predicate(schema, 'region', ['EU', 'US']),
+            "\"region\" IN ('EU', 'US')"
+        )
+        self.assertEqual(
+            AthenaClient.get_partition_predicate(schema, 'region', 'EU'),
+            "\"region\" = 'EU'"
+        )
+
+    def test_get_partition_predicate_unsortable_strings(self) -> None:
+        schema = Schema(
+            schema={'COLUMN1': StringDType()},
+            metadata={
+                C.PARTITION_SCHEMA: {'dt': StringDType(), 'dt_hour': StringDType(), 'bucket': StringDType()},
+                C.PARTITION_PROJECTION: {
+                    'dt': {'type': 'date', 'format': 'dd-MM-yyyy', 'range': '01-01-2023,NOW'},
+                    'dt_hour': {'type': 'date', 'format': "yyyy-MM-dd'T'HH:mm", 'range': '2023-01-01T00:00,NOW'},
+                    'bucket': {'type': 'integer', 'range': '0,99'}
+                }
+            }
+        )
+
+        self.assertEqual(
+            AthenaClient.get_partition_predicate(schema, 'dt', (datetime.datetime(2023, 1, 1, 6), '31-01-2023')),
+            "date_parse(\"dt\", '%d-%m-%Y') BETWEEN TIMESTAMP '2023-01-01 06:00:00.000' "
+            "AND TIMESTAMP '2023-01-31 00:00:00.000'"
+        )
+        self.assertEqual(
+            AthenaClient.get_partition_predicate(schema, 'dt', datetime.date(2023, 1, 1)),
+            "\"dt\" = '01-01-2023'"
+        )
+        self.assertEqual(
+            AthenaClient.get_partition_predicate(
+                schema, 'dt_hour', (datetime.datetime(2023, 1, 1, 12), datetime.datetime(2023, 1, 2, 6))
+            ),
+            "\"dt_hour\" BETWEEN '2023-01-01T12:00' AND '2023-01-02T06:00'"
+        )
+        self.assertEqual(
+            AthenaClient.get_partition_predicate(schema, 'bucket', (2, '10')),
+            'CAST("bucket" AS bigint) BETWEEN 2 AND 10'
+        )
+        self.assertEqual(
+            AthenaClient.to_datetime(value=datetime.date(2023, 1, 2), date_format='%d-%m-%Y'),
+            datetime.datetime(2023, 1, 2)
+        )
+
+    def test_is_sortable_date_format(self) -> None:
+        self.assertTrue(AthenaClient.is_sortable_date_format(date_format='yyyy-MM-dd'))
+        self.assertTrue(AthenaClient.is_sortable_date_format(date_format="yyyy/MM/dd'T'HH"))
+        self.assertTrue(AthenaClient.is_sortable_date_format(date_format='yyMM'))
+        self.assertFalse(AthenaClient.is_sortable_date_format(date_format='dd-MM-yyyy'))
+        self.assertFalse(AthenaClient.is_sortable_date_format(date_format='yyyy-dd-MM'))
+        self.assertFalse(AthenaClient.is_sortable_date_format(date_format='MM'))
+
+    def test_execute_sharded(self) -> None:
+        results = {'Q_EU': [('A', 'EU')], 'Q_US': [('B', 'US'), ('C', 'US')]}
+
+        def _execute(sql: str, **_) -> str:
+            return 'Q_EU' if "'EU'" in sql else 'Q_US'
+
+        with mock.patch.object(self.ac, 'execute', side_effect=_execute) as execute:
+            with mock.patch.object(self.ac, 'iter_query_results', side_effect=lambda query_execution_id: iter(
+                results[query_execution_id]
+            )):
+                rows = list(self.ac.execute_sharded(
+                    sql_template='SELECT * FROM test_table WHERE {predicate}',
+                    schema=self._sharded_schema(),
+                    shard_by='region'
+                ))
+
+        self.assertEqual(sorted(rows), [('A', 'EU'), ('B', 'US'), ('C', 'US')])
+        self.assertEqual(
+            sorted(call.kwargs['sql'] for call in execute.call_args_list),
+            [
+                "SELECT * FROM test_table WHERE \"region\" = 'EU'",
+                "SELECT * FROM test_table WHERE \"region\" = 'US'"
+            ]
+        )
+        self.assertEqual(execute.call_args.kwargs['database'], 'test_db')
+
+    def test_execute_sharded_retry(self) -> None:
+        error = QueryExecutionError(query_execution_id='Q1', state=C.FAILED_)
+
+        with mock.patch.object(self.ac, 'execute', side_effect=[error, 'Q2']) as execute:
+            with mock.patch.object(self.ac, 'iter_query_results', return_value=iter([('A',)])):
+                rows = list(self.ac.execute_sharded(
+                    sql_template='SELECT * FROM test_table WHERE {predicate}',
+                    schema=self._sharded_schema(),
+                    shard_by='dt',
+                    ranges=[(datetime.date(2023, 1, 1), datetime.date(2023, 1, 31))]
+                ))
+
+        self.assertEqual(rows, [('A',)])
+        self.assertEqual(execute.call_count, 2)
+
+    def test_execute_sharded_retries_exhausted(self) -> None:
+        error = QueryExecutionError(query_execution_id='Q1', state=C.FAILED_)
+
+        with mock.patch.object(self.ac, 'execute', side_effect=error):
+            with self.assertRaises(QueryExecutionError):
+                list(self.ac.execute_sharded(
+                    sql_template='SELECT * FROM test_table WHERE {predicate}',
+                    schema=self._sharded_schema(),
+                    shard_by='region',
+                    max_retries=1
+                ))
+
+    def test_execute_sharded_unexpected_column(self) -> None:
+        with self.assertRaisesRegex(
+            UnexpectedParameterError,
+            'The parameter COLUMN1 is unexpected for execute_sharded'
+        ):
+            list(self.ac.execute_sharded(sql_template='', schema=self._sharded_schema(), shard_by='COLUMN1'))
+
+    def test_execute_sharded_no_ranges(self) -> None:
+        with self.assertRaisesRegex(NoParameterError, 'Required parameter ranges for execute_sharded on column dt'):
+            list(self.ac.execute_sharded(sql_template='', schema=self._sharded_schema(), shard_by='dt'))
+
+    def test_iter_query_results(self) -> None:
+        pages = self._result_pages([{'Name': 'COL1', 'Type': 'varchar'}], [['COL1'], ['A']], [[None]])
+
+        with self._mock_results(pages):
+            self.assertEqual(list(self.ac.iter_query_results(query_execution_id='QUERY_ID')), [('A',), (None,)])
+
+    def _table_schema(
+        self,
+        table_name: str
+    ) -> Schema:
+        return Schema(
+            schema={'COLUMN1': StringDType()},
+            metadata={**self.req_athena_fields_dict, C.TABLE_NAME: table_name, C.S3_PREFIX: f'prefix/{table_name}'}
+        )
+
+    def test_get_create_tables(self) -> None:
+        schemas = [self._table_schema(f'table_{i}') for i in range(3)]
+
+        with mock.patch.object(AthenaClient, 'get_serde', wraps=AthenaClient.get_serde) as get_serde:
+            with mock.patch.object(
+                AthenaClient,
+                'validate_metadata',
+                wraps=AthenaClient.validate_metadata
+            ) as validate_metadata:
+                queries = AthenaClient.get_create_tables(schemas=schemas)
+
+        self.assertEqual(queries, [AthenaClient.get_create_table(schema=schema) for schema in schemas])
+        self.assertIn("LOCATION\n    's3://test-bucket/prefix/table_2/'", queries[2])
+        self.assertEqual(get_serde.call_count, 1)
+        self.assertEqual(validate_metadata.call_count, 1)
+
+    def test_get_create_tables_invalid(self) -> None:
+        schemas = [self._table_schema('table_1'), Schema(schema={'COLUMN1': StringDType()}, metadata={})]
+
+        with self.assertRaises(NoParameterError):
+            AthenaClient.get_create_tables(schemas=schemas)
+
+    def test_get_sql_template(self) -> None:
+        AthenaClient.get_sql_template.cache_clear()
+
+        with mock.patch.object(Utils, 'get_file', wraps=Utils.get_file) as get_file:
+            first = AthenaClient.get_sql_template(name='create_table.sql')
+            second = AthenaClient.get_sql_template(name='create_table.sql')
+
+        self.assertEqual(first, second)
+        self.assertEqual(get_file.call_count, 1)
+
+    def test_create_tables(self) -> None:
+        schemas = [self._table_schema(f'table_{i}') for i in range(3)]
+
+        with mock.patch.object(self.ac, 'execute', side_effect=lambda sql, **_: sql.split('(')[0]) as execute:
+            query_execution_ids = self.ac.create_tables(schemas=schemas, max_concurrency=2)
+
+        self.assertEqual(
+            query_execution_ids,
+            [f'CREATE EXTERNAL TABLE IF NOT EXISTS table_{i} ' for i in range(3)]
+        )
+        self.assertEqual(execute.call_count, 3)
+
+    def test_create_tables_with_registry(self) -> None:
+        self.ac.schema_registry = SchemaRegistry(location=os.path.join(self.tmp_dir, 'registry.json'))
+        schemas = [self._table_schema(f'table_{i}') for i in range(3)]
+        for schema in schemas:
+            schema.metadata[C.DATABASE_NAME] = 'test_db'
+
+        with mock.patch.object(self.ac, 'execute', return_value='QUERY_ID') as execute:
+            self.assertEqual(self.ac.create_tables(schemas=schemas[:2]), ['QUERY_ID'] * 2)
+            self.assertEqual(self.ac.create_tables(schemas=schemas), [None, None, 'QUERY_ID'])
+            self.assertEqual(self.ac.create_tables(schemas=schemas), [None] * 3)
+
+            schemas[1].raw['COLUMN2'] = IntegerDType()
+            with self.assertRaisesRegex(
+                UnexpectedParameterError,
+                r"The parameters \['test_db.table_1'\] are unexpected for create_tables as the tables exist with a "
+                r"different Schema; use migrate_table to change them"
+            ):
+                self.ac.create_tables(schemas=schemas)
+
+        self.assertEqual(execute.call_count, 3)
+        self.assertFalse(self.ac.schema_registry.is_applied(schemas[1]))
+        self.assertTrue(self.ac.schema_registry.is_registered(schemas[1]))
+
+    def test_infer_projection(self) -> None:
+        self.assertEqual(
+            AthenaClient.infer_projection(values=['2023-01-03', '2023-01-01']),
+            {'type': 'date', 'format': 'yyyy-MM-dd', 'range': '2023-01-01,2023-01-03', 'interval': 1,
+             'interval.unit': 'DAYS'}
+        )
+        self.assertEqual(
+            AthenaClient.infer_projection(values=['2023010100', '2023010123'], now_end=True),
+            {'type': 'date', 'format': 'yyyyMMddHH', 'range': '2023010100,NOW', 'interval': 1, 'interval.unit': 'HOURS'}
+        )
+        self.assertEqual(
+            AthenaClient.infer_projection(values=['00', '05', '10']),
+            {'type': 'integer', 'range': '0,10', 'digits': 2, 'interval': 5}
+        )
+        self.assertEqual(AthenaClient.infer_projection(values=['7', '12', '14']), {'type': 'integer', 'range': '7,14'})
+        self.assertEqual(
+            AthenaClient.infer_projection(values=['US', 'EU', 'US']),
+            {'type': 'enum', 'values': ['EU', 'US']}
+        )
+        self.assertEqual(AthenaClient.infer_projection(values=['A', 'B'], max_enum_values=1), {'type': 'injected'})
+
+    def test_infer_projection_date_dtype(self) -> None:
+        self.assertEqual(
+            AthenaClient.infer_projection(values=['20230101'], dtype=DateDType()),
+            {'type': 'integer', 'range': '20230101,20230101'}
+        )
+
+    def test_infer_projection_lenient_date(self) -> None:
+        self.assertEqual(
+            AthenaClient.infer_projection(values=['2023-1-1', '2023-01-02']),
+            {'type': 'enum', 'values': ['2023-01-02', '2023-1-1']}
+        )
+
+    @mock_s3
+    def test_infer_partition_projection(self) -> None:
+        self._set_up_s3(bucket_name='test-bucket')
+        for dt in ['2023-01-01', '2023-01-02', '2023-01-03']:
+            for hour in ['00', '12']:
+                self.bucket.put_object(Body=b'a', Key=f'test/prefix/dt={dt}/hour={hour}/region=EU/file')
+
+        schema = Schema(
+            schema={'COLUMN1': StringDType()},
+            metadata={
+                **self.req_athena_fields_dict,
+                C.PARTITION_SCHEMA: {'dt': StringDType(), 'hour': StringDType(), 'region': StringDType()}
+            }
+        )
+
+        metadata = self.ac.infer_partition_projection(schema=schema, sample=2)
+
+        self.assertEqual(metadata[C.PARTITION_PROJECTION], {
+            'dt': {'type': 'date', 'format': 'yyyy-MM-dd', 'range': '2023-01-01,2023-01-03', 'interval': 1,
+                   'interval.unit': 'DAYS'},
+            'hour': {'type': 'integer', 'range': '0,12', 'digits': 2, 'interval': 12},
+            'region': {'type': 'enum', 'values': ['EU']}
+        })
+        self.assertIn("'projection.dt.format' = 'yyyy-MM-dd'", AthenaClient.get_create_table(Schema(
+            schema=schema.raw,
+            metadata=metadata
+        )))
+        self._tear_down_s3()
+
+    @mock_s3
+    def test_infer_partition_projection_no_partitions(self) -> None:
+        self._set_up_s3(bucket_name='test-bucket')
+        schema = Schema(
+            schema={'COLUMN1': StringDType()},
+            metadata={**self.req_athena_fields_dict, C.PARTITION_SCHEMA: {'dt': StringDType()}}
+        )
+
+        with self.assertRaisesRegex(
+            NoParameterError,
+            'Required parameter dt= for partition directories under s3://test-bucket/test/prefix/'
+        ):
+            self.ac.infer_partition_projection(schema=schema)
+        self._tear_down_s3()
+
+    def test_infer_partition_projection_missing_metadata(self) -> None:
+        with self.assertRaisesRegex(
+            NoParameterError,
+            r"Required parameter \['PARTITION_SCHEMA'\] for infer_partition_projection"
+        ):
+            self.ac.infer_partition_projection(schema=Schema(
+                schema={'COLUMN1': StringDType()},
+                metadata=self.req_athena_fields_dict
+            ))
+
+    def _csv_schema(self) -> Schema:
+        return Schema(
+            schema={'id': IntegerDType(), 'name': StringDType()},
+            metadata={
+                **self.req_athena_fields_dict,
+                C.DATABASE_NAME: 'test_db',
+                C.TABLE_NAME: 'events',
+                C.FILE_FORMAT: C.CSV_,
+                C.FILE_COMPRESSION: C.GZIP_,
+                C.PARTITION_SCHEMA: {'dt': DateDType()},
+                C.PARTITION_PROJECTION: {
+                    'dt': {'type': 'date', 'format': 'yyyy-MM-dd', 'range': '2023-01-01,NOW'}
+                }
+            }
+        )
+
+    def test_convert_table(self) -> None:
+        with mock.patch.object(self.ac, 'execute', return_value='QUERY_ID') as execute, \
+                mock.patch.object(self.ac, 'iter_query_results', return_value=iter([('2023-01-01',)])):
+            schema = self.ac.convert_table(
+                source_schema=self._csv_schema(),
+                target_prefix=S3Url('s3://test-bucket/parquet/events/'),
+                bucketed_by=['id'],
+                bucket_count=8
+            )
+
+        self.assertEqual(
+            {col: type(dtype) for col, dtype in schema.raw.items()},
+            {'id': IntegerDType, 'name': StringDType}
+        )
+        self.assertIsInstance(schema.metadata.pop(C.PARTITION_SCHEMA)['dt'], DateDType)
+        self.assertEqual(schema.metadata, {
+            C.DATABASE_NAME: 'test_db',
+            C.TABLE_NAME: 'events_parquet',
+            C.S3_BUCKET: 'test-bucket',
+            C.S3_PREFIX: 'parquet/events',
+            C.FILE_FORMAT: C.PARQUET_,
+            C.FILE_COMPRESSION: C.SNAPPY_,
+            C.PARTITION_PROJECTION: {'dt': {'type': 'date', 'format': 'yyyy-MM-dd', 'range': '2023-01-01,NOW'}},
+            C.BUCKETED_BY: ['id'],
+            C.BUCKET_COUNT: 8
+        })
+
+        self.assertEqual(execute.call_count, 2)
+        self.assertEqual(execute.call_args_list[0].kwargs['sql'], 'SELECT DISTINCT "dt" FROM test_db.events')
+        self.assertEqual(
+            execute.call_args_list[1].kwargs['sql'],
+            "CREATE TABLE test_db.events_parquet\n"
+            "WITH (\n"
+            "    format = 'PARQUET',\n"
+            "\texternal_location = 's3://test-bucket/parquet/events/',\n"
+            "\twrite_compression = 'SNAPPY',\n"
+            "\tpartitioned_by = ARRAY['dt'],\n"
+            "\tbucketed_by = ARRAY['id'],\n"
+            "\tbucket_count = 8\n"
+            ") AS\n"
+            "SELECT\n"
+            '    "id",\n'
+            '\t"name",\n'
+            '\t"dt"\n'
+            "FROM test_db.events\n"
+            "WHERE (\"dt\" = DATE '2023-01-01')\n"
+        )
+
+    def test_convert_table_batched_inserts(self) -> None:
+        partitions = [('2023-01-01', 'EU'), ('2023-01-02', None), ('2023-01-03', 'US')]
+
+        with mock.patch.object(self.ac, 'execute', return_value='QUERY_ID') as execute, \
+                mock.patch.object(self.ac, 'iter_query_results', return_value=iter(partitions)):
+            schema = self.ac.convert_table(
+                source_schema=Schema(
+                    schema={'id': IntegerDType(), 'region': StringDType()},
+                    metadata={**self._csv_schema().metadata, C.PARTITION_PROJECTION: {
+                        'dt': {'type': 'date', 'format': 'yyyy-MM-dd', 'range': '2023-01-01,NOW'}
+                    }}
+                ),
+                target_prefix=S3Url(bucket='test-bucket', prefix='orc/events'),
+                compression=None,
+                partitioned_by=['dt', 'region'],
+                table_name='events_v2',
+                max_partitions=2
+            )
+
+        self.assertEqual(schema.metadata[C.TABLE_NAME], 'events_v2')
+        self.assertNotIn(C.FILE_COMPRESSION, schema.metadata)
+        self.assertNotIn(C.PARTITION_PROJECTION, schema.metadata)
+        self.assertEqual(list(schema.metadata[C.PARTITION_SCHEMA]), ['dt', 'region'])
+
+        queries = [call.kwargs['sql'] for call in execute.call_args_list]
+        self.assertEqual(len(queries), 3)
+        self.assertEqual(queries[0], 'SELECT DISTINCT "dt", "region" FROM test_db.events')
+        self.assertTrue(queries[1].startswith('CREATE TABLE test_db.events_v2\n'))
+        self.assertNotIn('write_compression', queries[1])
+        self.assertTrue(queries[1].endswith(
+            "WHERE (\"dt\" = DATE '2023-01-01' AND \"region\" = 'EU') OR "
+            "(\"dt\" = DATE '2023-01-02' AND \"region\" IS NULL)\n"
+        ))
+        self.assertEqual(
+            queries[2],
+            'INSERT INTO test_db.events_v2\n'
+            'SELECT\n'
+            '    "id",\n'
+            '\t"dt",\n'
+            '\t"region"\n'
+            'FROM test_db.events\n'
+            "WHERE (\"dt\" = DATE '2023-01-03' AND \"region\" = 'US')\n"
+        )
+
+    def test_convert_table_bucketed_batches(self) -> None:
+        partitions = [('2023-01-01',), ('2023-01-02',), ('2023-01-03',)]
+
+        with mock.patch.object(self.ac, 'execute', return_value='QUERY_ID') as execute, \
+                mock.patch.object(self.ac, 'iter_query_results', return_value=iter(partitions)):
+            with self.assertRaisesRegex(
+                UnexpectedParameterError,
+                r'The parameter bucketed_by is unexpected for convert_table with more than max_partitions \(2\) '
+                r'partitions, as INSERT INTO is not supported for bucketed tables'
+            ):
+                self.ac.convert_table(
+                    source_schema=self._csv_schema(),
+                    target_prefix=S3Url('s3://test-bucket/parquet/events/'),
+                    bucketed_by=['id'],
+                    bucket_count=8,
+                    max_partitions=2
+                )
+
+        self.assertEqual(execute.call_count, 1)
+
+    def test_convert_table_given_partitions(self) -> None:
+        with mock.patch.object(self.ac, 'execute', return_value='QUERY_ID') as execute:
+            self.ac.convert_table(
+                source_schema=self._csv_schema(),
+                target_prefix=S3Url('s3://test-bucket/parquet/events/'),
+                max_partitions=1,
+                partitions={('2023-01-02',), ('2023-01-01',)}
+            )
+
+        queries = [call.kwargs['sql'] for call in execute.call_args_list]
+        self.assertEqual(len(queries), 2)
+        self.assertTrue(queries[0].endswith("WHERE (\"dt\" = DATE '2023-01-01')\n"))
+        self.assertTrue(queries[1].endswith("WHERE (\"dt\" = DATE '2023-01-02')\n"))
+
+    def test_convert_table_max_partitions(self) -> None:
+        with mock.patch.object(self.ac, 'execute') as execute:
+            with self.assertRaisesRegex(
+                UnexpectedParameterError,
+                r'The parameter max_partitions=101 is unexpected for convert_table; must be between 1 and 100'
+            ):
+                self.ac.convert_table(
+                    source_schema=self._csv_schema(),
+                    target_prefix=S3Url('s3://test-bucket/parquet/events/'),
+                    max_partitions=101
+                )
+
+        execute.assert_not_called()
+
+    def test_convert_table_unpartitioned(self) -> None:
+        source_schema = Schema(
+            schema={'id': IntegerDType()},
+            metadata={**self.req_athena_fields_dict, C.DATABASE_NAME: 'test_db'}
+        )
+
+        with mock.patch.object(self.ac, 'execute', return_value='QUERY_ID') as execute:
+            schema = self.ac.convert_table(source_schema=source_schema, target_prefix=S3Url('s3://test-bucket/out/'))
+
+        self.assertNotIn(C.PARTITION_SCHEMA, schema.metadata)
+        self.assertEqual(execute.call_count, 1)
+        self.assertTrue(execute.call_args.kwargs['sql'].endswith('FROM test_db.test_table\n'))
+
+    def test_convert_table_errors(self) -> None:
+        target_prefix = S3Url('s3://test-bucket/out/')
+
+        with self.assertRaisesRegex(NoParameterError, r"Required parameter \['DATABASE_NAME'\] for convert_table"):
+            self.ac.convert_table(
+                source_schema=Schema(schema={'id': IntegerDType()}, metadata=self.req_athena_fields_dict),
+                target_prefix=target_prefix
+            )
+
+        with self.assertRaises(UnexpectedParameterError):
+            self.ac.convert_table(source_schema=self._csv_schema(), target_prefix=target_prefix, format=C.CSV_)
+
+        with self.assertRaises(UnexpectedParameterError):
+            self.ac.convert_table(source_schema=self._csv_schema(), target_prefix=target_prefix, bucketed_by=['x'])
+
+        with self.assertRaisesRegex(NoParameterError, 'bucket_count'):
+            self.ac.convert_table(source_schema=self._csv_schema(), target_prefix=target_prefix, bucketed_by=['id'])
+
+    def test_optimize(self) -> None:
+        schema = self._iceberg_schema()
+
+        with mock.patch.object(self.ac, 'execute', side_effect=lambda sql, **_: sql) as execute:
+            queries = self.ac.optimize(
+                schema=schema,
+                where='"COLUMN3" = \'A\'',
+                column='COLUMN2',
+                ranges=[('2023-01-01 00:00:00', '2023-01-01 23:59:59'), '2023-01-02 00:00:00'],
+                max_concurrency=1
+            )
+
+        self.assertEqual(execute.call_count, 2)
+        self.assertEqual(queries, [
+            "OPTIMIZE test_db.test_table REWRITE DATA USING BIN_PACK\n"
+            "WHERE \"COLUMN2\" BETWEEN TIMESTAMP '2023-01-01 00:00:00' AND TIMESTAMP '2023-01-01 23:59:59' "
+            "AND (\"COLUMN3\" = 'A')",
+            "OPTIMIZE test_db.test_table REWRITE DATA USING BIN_PACK\n"
+            "WHERE \"COLUMN2\" = TIMESTAMP '2023-01-02 00:00:00' AND (\"COLUMN3\" = 'A')"
+        ])
+
+        with mock.patch.object(self.ac, 'execute', side_effect=lambda sql, **_: sql):
+            self.assertEqual(
+                self.ac.optimize(schema=schema),
+                ['OPTIMIZE test_db.test_table REWRITE DATA USING BIN_PACK']
+            )
+            self.assertEqual(
+                self.ac.optimize(schema=schema, where='"COLUMN1" > 0'),
+                ['OPTIMIZE test_db.test_table REWRITE DATA USING BIN_PACK\nWHERE "COLUMN1" > 0']
+            )
+
+    def test_optimize_errors(self) -> None:
+        with self.assertRaisesRegex(NoParameterError, 'Required parameter column for OPTIMIZE if ranges are given'):
+            self.ac.optimize(schema=self._iceberg_schema(), ranges=['A'])
+
+        with self.assertRaisesRegex(
+            UnexpectedParameterError,
+            r"The parameter hive is unexpected for TABLE_TYPE for OPTIMIZE; must be one of \['iceberg'\]"
+        ):
+            self.ac.optimize(schema=Schema(schema={'COLUMN1': StringDType()}, metadata=self.req_athena_fields_dict))
+
+        with self.assertRaisesRegex(NoParameterError, 'Required parameter TABLE_NAME for VACUUM'):
+            self.ac.vacuum(schema=Schema(schema={'COLUMN1': StringDType()}, metadata={C.TABLE_TYPE: C.ICEBERG_}))
+
+    def test_vacuum(self) -> None:
+        schema = Schema(
+            schema={'COLUMN1': StringDType()},
+            metadata={**self.req_athena_fields_dict, C.TABLE_TYPE: C.ICEBERG_}
+        )
+
+        with mock.patch.object(self.ac, 'execute', return_value='QUERY_ID') as execute:
+            self.assertEqual(self.ac.vacuum(schema=schema, workgroup='test'), 'QUERY_ID')
+
+        execute.assert_called_once_with(sql='VACUUM test_table', workgroup='test', output_location=None)
+
+    def _select_schema(self) -> Schema:
+        schema = self._sharded_schema()
+        schema.metadata[C.TABLE_NAME] = 'events'
+
+        return schema
+
+    def test_get_select_query(self) -> None:
+        self.assertEqual(
+            AthenaClient.get_select_query(
+                schema=self._select_schema(),
+                columns=['COLUMN1', 'region'],
+                filters={
+                    'dt': (datetime.date(2023, 1, 1), datetime.date(2023, 1, 31)),
+                    'hour': [3, 4],
+                    'region': 'EU'
+                },
+                where='"COLUMN1" IS NOT NULL',
+                limit=10
+            ),
+            'SELECT\n'
+            '\t"COLUMN1",\n'
+            '\t"region"\n'
+            'FROM test_db.events\n'
+            "WHERE \"dt\" BETWEEN '2023/01/01' AND '2023/01/31' AND \"hour\" IN ('03', '04') AND \"region\" = 'EU' "
+            'AND ("COLUMN1" IS NOT NULL)\n'
+            'LIMIT 10'
+        )
+
+    def test_get_select_query_full_scan(self) -> None:
+        with self.assertRaisesRegex(
+            NoParameterError,
+            r'Required parameter filters for get_select_query on the partitioned table test_db.events '
+            r'\(or set allow_full_scan\)'
+        ):
+            AthenaClient.get_select_query(schema=self._select_schema())
+
+        self.assertEqual(
+            AthenaClient.get_select_query(schema=self._select_schema(), allow_full_scan=True),
+            'SELECT\n\t"COLUMN1",\n\t"dt",\n\t"region",\n\t"hour",\n\t"day",\n\t"year"\nFROM test_db.events'
+        )
+        self.assertEqual(
+            AthenaClient.get_select_query(schema=self._table_schema('table_1')),
+            'SELECT\n\t"COLUMN1"\nFROM table_1'
+        )
+
+    def test_get_select_query_invalid(self) -> None:
+        with self.assertRaisesRegex(UnexpectedParameterError, r"The parameters \['COLUMN2'\] are unexpected"):
+            AthenaClient.get_select_query(schema=self._select_schema(), columns=['COLUMN2'], filters={'year': 2023})
+
+        with self.assertRaisesRegex(
+            UnexpectedParameterError,
+            r"The parameters \['COLUMN1'\] are unexpected for get_select_query filters"
+        ):
+            AthenaClient.get_select_query(schema=self._select_schema(), filters={'COLUMN1': 'A'})
+
+        with self.assertRaisesRegex(NoParameterError, 'Required parameter TABLE_NAME for get_select_query'):
+            AthenaClient.get_select_query(schema=self._sharded_schema(), filters={'year': 2023})
+
+    def test_select(self) -> None:
+        with mock.patch.object(self.ac, 'execute', return_value='QUERY_ID') as execute, \
+                mock.patch.object(self.ac, 'get_query_results', return_value=[('A',)]) as get_query_results:
+            results = self.ac.select(schema=self._select_schema(), columns=['COLUMN1'], filters={'year': 2023})
+
+        self.assertEqual(results, [('A',)])
+        self.assertEqual(
+            execute.call_args.kwargs['sql'],
+            'SELECT\n\t"COLUMN1"\nFROM test_db.events\nWHERE "year" = 2023'
+        )
+        get_query_results.assert_called_once_with(query_execution_id='QUERY_ID', columnar=False)
+
+    @staticmethod
+    def _io_plan(
+        *sizes: float
+    ) -> dict:
+        return {
+            'inputTableColumnInfos': [
+                {
+                    'table': {'catalog': 'awsdatacatalog', 'schemaTable': {'schema': 'test_db', 'table': f'table_{i}'}},
+                    'constraint': {
+                        'none': False,
+                        'columnConstraints': [{
+                            'columnName': 'dt',
+                            'typeSignature': 'varchar',
+                            'domain': {'nullsAllowed': False, 'ranges': [{}, {}]}
+                        }]
+                    },
+                    'estimate': {'outputRowCount': 10.0, 'outputSizeInBytes': size}
+                }
+                for i, size in enumerate(sizes)
+            ],
+            'estimate': {}
+        }
+
+    def test_get_plan_estimate(self) -> None:
+        plan = self._io_plan(1024.0, 2048.0)
+        plan['inputTableColumnInfos'][1]['constraint']['none'] = True
+
+        self.assertEqual(AthenaClient.get_plan_estimate(plan), {
+            'EstimatedInputBytes': 3072.0,
+            'Tables': [
+                {'Table': 'test_db.table_0', 'EstimatedInputBytes': 1024.0, 'Partitions': {'dt': 2}},
+                {'Table': 'test_db.table_1', 'EstimatedInputBytes': 2048.0, 'Partitions': {'dt': 0}}
+            ],
+            'Plan': plan
+        })
+        self.assertIsNone(AthenaClient.get_plan_estimate(self._io_plan(1024.0, float('nan')))['EstimatedInputBytes'])
+        self.assertIsNone(AthenaClient.get_plan_estimate(self._io_plan(1024.0, 'NaN'))['EstimatedInputBytes'])
+        self.assertEqual(AthenaClient.get_plan_estimate(self._io_plan('1024', 2048.0))['EstimatedInputBytes'], 3072.0)
+        self.assertEqual(AthenaClient.get_plan_estimate({})['EstimatedInputBytes'], 0)
+
+    def test_parse_estimate(self) -> None:
+        self.assertEqual(
+            [AthenaClient.parse_estimate(size) for size in [1024, '2048.5', 'NaN', float('nan'), None, 'unknown']],
+            [1024.0, 2048.5, None, None, None, None]
+        )
+
+    def test_explain(self) -> None:
+        plan_json = json.dumps(self._io_plan(1024.0), indent=2)
+
+        with mock.patch.object(self.ac, 'execute', return_value='EXPLAIN_ID') as execute, \
+                mock.patch.object(self.ac, 'iter_query_results', side_effect=lambda _: iter(
+                    (line,) for line in plan_json.split('\n')
+                )):
+            first = self.ac.explain(sql='SELECT * FROM test_db.table_0', workgroup='test')
+            second = self.ac.explain(sql='SELECT *  FROM test_db.table_0;', workgroup='test')
+
+        self.assertEqual(first['EstimatedInputBytes'], 1024.0)
+        self.assertIs(first, second)
+        execute.assert_called_once_with(
+            sql='EXPLAIN (TYPE IO, FORMAT JSON) SELECT * FROM test_db.table_0',
+            database=None,
+            workgroup='test',
+            output_location=None,
+            params=None,
+            use_cache=False
+        )
+
+    def test_execute_max_scan_bytes(self) -> None:
+        estimate = {'EstimatedInputBytes': 2048.0}
+
+        with mock.patch.object(self.ac, 'explain', return_value=estimate), \
+                mock.patch.object(self.ac, 'start_query', return_value='QUERY_ID') as start_query, \
+                mock.patch.object(self.ac, 'wait_for_query', return_value={}):
+            with self.assertRaisesRegex(QueryCostError, 'more than the limit of 1024 bytes'):
+                self.ac.execute(sql='SELECT 1', max_scan_bytes=1024)
+            start_query.assert_not_called()
+
+            with self.assertWarnsRegex(RuntimeWarning, 'estimated to scan 2048 bytes'):
+                self.assertEqual(self.ac.execute(sql='SELECT 1', max_scan_bytes=1024, on_exceed='warn'), 'QUERY_ID')
+
+            self.assertEqual(self.ac.execute(sql='SELECT 1', max_scan_bytes=4096), 'QUERY_ID')
+
+            estimate['EstimatedInputBytes'] = None
+            self.assertEqual(self.ac.execute(sql='SELECT 1', max_scan_bytes=1024), 'QUERY_ID')
+
+            with self.assertRaisesRegex(UnexpectedParameterError, 'The parameter skip is unexpected for on_exceed'):
+                self.ac.execute(sql='SELECT 1', max_scan_bytes=1024, on_exceed='skip')
+
+        self.assertEqual(start_query.call_count, 3)
+
+    def _migration_schema(
+        self,
+        columns: Optional[dict] = None,
+        **metadata
+    ) -> Schema:
+        return Schema(
+            schema=columns or {'COLUMN1': BigIntDType(), 'COLUMN2': StringDType()},
+            metadata={
+                C.DATABASE_NAME: 'test_db',
+                C.TABLE_NAME: 'test_table',
+                C.S3_BUCKET: 'test-bucket',
+                C.S3_PREFIX: 'test_prefix',
+                C.FILE_FORMAT: C.PARQUET_,
+                C.PARTITION_SCHEMA: {'dt': StringDType()},
+                C.PARTITION_PROJECTION: {
+                    'dt': {'type': 'date', 'format': 'yyyy-MM-dd', 'range': '2023-01-01,NOW', 'interval': 1}
+                },
+                **metadata
+            }
+        )
+
+    def test_get_migration_add_columns(self) -> None:
+        old_schema = self._migration_schema()
+        new_schema = self._migration_schema(
+            columns={'COLUMN1': BigIntDType(), 'COLUMN2': StringDType(), 'COLUMN3': DecimalDType(10, 2)}
+        )
+
+        self.assertEqual(AthenaClient.get_migration(old_schema=old_schema, new_schema=old_schema), [])
+        self.assertEqual(
+            AthenaClient.get_migration(old_schema=old_schema, new_schema=new_schema),
+            ['ALTER TABLE test_db.test_table ADD COLUMNS (\n\t`COLUMN3` decimal(10, 2)\n)']
+        )
+
+    def test_get_migration_replace_columns_and_properties(self) -> None:
+        old_schema = self._migration_schema()
+        new_schema = self._migration_schema(
+            columns={'COLUMN0': IntegerDType(), 'COLUMN1': StringDType()},
+            S3_PREFIX='new_prefix',
+            FILE_COMPRESSION=C.ZSTD_,
+            PARTITION_PROJECTION={
+                'dt': {'type': 'date', 'format': 'yyyy-MM-dd', 'range': '2020-01-01,NOW', 'interval': 1}
+            }
+        )
+
+        self.assertEqual(
+            AthenaClient.get_migration(old_schema=old_schema, new_schema=new_schema),
+            [
+                'ALTER TABLE test_db.test_table REPLACE COLUMNS (\n\t`COLUMN0` integer,\n\t`COLUMN1` string\n)',
+                "ALTER TABLE test_db.test_table SET LOCATION 's3://test-bucket/new_prefix/'",
+                'ALTER TABLE test_db.test_table SET TBLPROPERTIES (\n'
+                "\t'parquet.compression' = 'ZSTD',\n"
+                "\t'projection.dt.range' = '2020-01-01,NOW'\n)"
+            ]
+        )
+
+        new_schema = self._migration_schema(columns={'COLUMN2': StringDType(), 'COLUMN1': BigIntDType()})
+        del new_schema.metadata[C.PARTITION_PROJECTION]
+
+        self.assertEqual(
+            AthenaClient.get_migration(old_schema=old_schema, new_schema=new_schema),
+            [
+                'ALTER TABLE test_db.test_table REPLACE COLUMNS (\n\t`COLUMN2` string,\n\t`COLUMN1` bigint\n)',
+                "ALTER TABLE test_db.test_table SET TBLPROPERTIES (\n\t'projection.enabled' = 'FALSE'\n)"
+            ]
+        )
+
+    def test_get_migration_avro(self) -> None:
+        metadata = {**self.req_athena_fields_dict, C.FILE_FORMAT: C.AVRO_, C.FILE_COMPRESSION: C.DEFLATE_}
+        old_schema = Schema(schema={'COLUMN1': IntegerDType()}, metadata=metadata)
+        new_schema = Schema(schema={'COLUMN1': IntegerDType(), 'COLUMN2': StringDType()}, metadata=metadata)
+
+        self.assertEqual(
+            AthenaClient.get_migration(old_schema=old_schema, new_schema=new_schema),
+            [
+                'ALTER TABLE test_table ADD COLUMNS (\n\t`COLUMN2` string\n)',
+                'ALTER TABLE test_table SET TBLPROPERTIES (\n'
+                "\t'avro.schema.literal' = '{\"type\": \"record\", \"name\": \"test_table\", \"fields\": ["
+                "{\"name\": \"COLUMN1\", \"type\": [\"null\", \"int\"], \"default\": null}, "
+                "{\"name\": \"COLUMN2\", \"type\": [\"null\", \"string\"], \"default\": null}]}'\n)"
+            ]
+        )
+
+    def test_get_migration_iceberg(self) -> None:
+        old_schema = self._iceberg_schema()
+        old_schema.raw['COLUMN5'] = StringDType()
+        new_schema = self._iceberg_schema(FILE_COMPRESSION=C.ZSTD_)
+        new_schema.raw.update({'COLUMN3': VarCharDType(10), 'COLUMN4': DateDType()})
+
+        self.assertEqual(
+            AthenaClient.get_migration(old_schema=old_schema, new_schema=new_schema),
+            [
+                'ALTER TABLE test_db.test_table DROP COLUMN `COLUMN5`',
+                'ALTER TABLE test_db.test_table CHANGE COLUMN `COLUMN3` `COLUMN3` varchar(10)',
+                'ALTER TABLE test_db.test_table ADD COLUMNS (\n\t`COLUMN4` date\n)',
+                "ALTER TABLE test_db.test_table SET TBLPROPERTIES (\n\t'write_compression' = 'zstd'\n)"
+            ]
+        )
+
+        with self.assertRaisesRegex(
+            UnexpectedParameterError,
+            r"The parameters \['S3_PREFIX'\] are unexpected for get_migration, as the table must be recreated"
+        ):
+            AthenaClient.get_migration(old_schema=old_schema, new_schema=self._iceberg_schema(S3_PREFIX='new'))
+
+    def test_get_migration_recreate(self) -> None:
+        old_schema = self._migration_schema()
+
+        with self.assertRaisesRegex(
+            UnexpectedParameterError,
+            r"The parameters \['TABLE_NAME', 'PARTITION_SCHEMA'\] are unexpected for get_migration"
+        ):
+            AthenaClient.get_migration(
+                old_schema=old_schema,
+                new_schema=self._migration_schema(
+                    TABLE_NAME='new_table',
+                    PARTITION_SCHEMA={'dt': DateDType()}
+                )
+            )
+
+    def test_get_migration_serde_info(self) -> None:
+        serde_info = {
+            'SerializationLibrary': 'org.apache.hadoop.hive.serde2.lazy.LazySimpleSerDe',
+            'Parameters': {'field.delim': ','}
+        }
+        old_schema = self._migration_schema(FILE_FORMAT=C.CSV_, SERDE_INFO=serde_info)
+
+        for new_serde_info in [
+            {**serde_info, 'Parameters': {'field.delim': '|'}},
+            {'SerializationLibrary': 'org.apache.hadoop.hive.serde2.OpenCSVSerde', 'Parameters': {}}
+        ]:
+            with self.assertRaisesRegex(
+                UnexpectedParameterError,
+                r"The parameters \['SERDE_INFO'\] are unexpected for get_migration, as the table must be recreated"
+            ):
+                AthenaClient.get_migration(
+                    old_schema=old_schema,
+                    new_schema=self._migration_schema(FILE_FORMAT=C.CSV_, SERDE_INFO=new_serde_info)
+                )
+
+    def test_migrate_table(self) -> None:
+        old_schema = self._migration_schema()
+        new_schema = self._migration_schema(FILE_COMPRESSION=C.GZIP_)
+
+        with mock.patch.object(self.ac, 'execute', return_value='QUERY_ID') as execute:
+            self.assertEqual(
+                self.ac.migrate_table(old_schema=old_schema, new_schema=new_schema, workgroup='test'),
+                ['QUERY_ID']
+            )
+
+        execute.assert_called_once_with(
+            sql=AthenaClient.get_migration(old_schema=old_schema, new_schema=new_schema)[0],
+            workgroup='test',
+            output_location=None
+        )
+
+    def test_migrate_table_with_registry(self) -> None:
+        self.ac.schema_registry = SchemaRegistry(location=os.path.join(self.tmp_dir, 'registry.json'))
+        old_schema = self._migration_schema()
+        new_schema = self._migration_schema(FILE_COMPRESSION=C.GZIP_)
+
+        with mock.patch.object(self.ac, 'execute', return_value='QUERY_ID') as execute:
+            self.assertEqual(self.ac.migrate_table(old_schema=old_schema, new_schema=new_schema), ['QUERY_ID'])
+            self.assertEqual(self.ac.migrate_table(old_schema=old_schema, new_schema=new_schema), [])
+
+        self.assertEqual(execute.call_count, 1)
+        self.assertTrue(self.ac.schema_registry.is_applied(new_schema))
+
+    def _symlink_schema(self) -> Schema:
+        return Schema(
+            schema={'COLUMN1': StringDType()},
+            metadata={
+                **self.req_athena_fields_dict,
+                C.DATABASE_NAME: 'test_db',
+                C.PARTITION_SCHEMA: {'dt': StringDType(), 'region': StringDType()}
+            }
+        )
+
+    def test_get_file_partitions(self) -> None:
+        schema = self._symlink_schema()
+        files = [
+            S3Url('s3://test-bucket/data/dt=2023-01-01/region=EU/file1.parquet'),
+            S3Url('s3://test-bucket/other/region=A%2FB/dt=2023-01-01/file2.parquet'),
+            S3Url('s3://test-bucket/data/dt=2023-01-01/region=EU/file3.parquet')
+        ]
+
+        self.assertEqual(AthenaClient.get_file_partitions(schema=schema, files=files), {
+            ('2023-01-01', 'EU'): [files[0], files[2]],
+            ('2023-01-01', 'A/B'): [files[1]]
+        })
+        self.assertEqual(
+            AthenaClient.get_file_partitions(schema=schema, files={('1', '2'): files}),
+            {('1', '2'): files}
+        )
+        self.assertEqual(
+            AthenaClient.get_file_partitions(schema=self._table_schema('test_table'), files=files),
+            {(): files}
+        )
+
+        with self.assertRaisesRegex(
+            NoParameterError,
+            r"Required parameter \['region'\] for the partition of s3://test-bucket/data/dt=2023-01-01/file.parquet"
+        ):
+            AthenaClient.get_file_partitions(
+                schema=schema,
+                files=[S3Url('s3://test-bucket/data/dt=2023-01-01/file.parquet')]
+            )
+
+    def test_get_symlink_table(self) -> None:
+        schema = self._symlink_schema()
+
+        sql = AthenaClient.get_symlink_table(schema=schema, manifest_url=S3Url('s3://test-bucket/manifests/run-1/'))
+
+        self.assertTrue(sql.startswith('CREATE EXTERNAL TABLE IF NOT EXISTS test_db.test_table (\n'))
+        self.assertIn("STORED AS INPUTFORMAT\n    'org.apache.hadoop.hive.ql.io.SymlinkTextInputFormat'", sql)
+        self.assertIn("ROW FORMAT SERDE\n    'org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe'", sql)
+        self.assertIn("LOCATION\n    's3://test-bucket/manifests/run-1/'", sql)
+        self.assertIn('PARTITIONED BY (\n\t`dt` string,\n\t`region` string\n)', sql)
+        self.assertEqual(schema.metadata[C.S3_PREFIX], 'test/prefix')
+
+        schema.metadata[C.TABLE_TYPE] = 'ICEBERG'
+        with self.assertRaisesRegex(
+            UnexpectedParameterError,
+            'The parameter TABLE_TYPE is unexpected for get_symlink_table, which is for HIVE tables'
+        ):
+            AthenaClient.get_symlink_table(schema=schema, manifest_url=S3Url('s3://test-bucket/manifests/'))
+
+    def test_get_add_partitions(self) -> None:
+        queries = AthenaClient.get_add_partitions(
+            schema=self._symlink_schema(),
+            locations={
+                ('2023-01-01', 'EU'): S3Url('s3://test-bucket/manifests/dt=2023-01-01/region=EU/'),
+                ('2023-01-01', "A'B"): S3Url('s3://test-bucket/manifests/dt=2023-01-01/region=A%27B/'),
+                ('2023-01-02', 'EU'): S3Url('s3://test-bucket/manifests/dt=2023-01-02/region=EU/')
+            },
+            batch_size=2
+        )
+
+        self.assertEqual(queries, [
+            "ALTER TABLE test_db.test_table ADD IF NOT EXISTS\n"
+            "PARTITION (`dt` = '2023-01-01', `region` = 'EU') "
+            "LOCATION 's3://test-bucket/manifests/dt=2023-01-01/region=EU/'\n"
+            "PARTITION (`dt` = '2023-01-01', `region` = 'A''B') "
+            "LOCATION 's3://test-bucket/manifests/dt=2023-01-01/region=A%27B/'",
+            "ALTER TABLE test_db.test_table ADD IF NOT EXISTS\n"
+            "PARTITION (`dt` = '2023-01-02', `region` = 'EU') "
+            "LOCATION 's3://test-bucket/manifests/dt=2023-01-02/region=EU/'"
+        ])
+
+    @mock_s3
+    def test_create_symlink_table(self) -> None:
+        self._set_up_s3(bucket_name='test-bucket')
+        schema = self._symlink_schema()
+        files = [
+            S3Url(f's3://test-bucket/data/dt=2023-01-0{day}/region=EU/run-1-{i}.parquet')
+            for day in [1, 2] for i in range(2)
+        ]
+
+        with mock.patch.object(self.ac, 'execute', side_effect=lambda sql, **_: sql.split('\n')[0]) as execute:
+            query_ids = self.ac.create_symlink_table(
+                schema=schema,
+                files=files,
+                manifest_url=S3Url('s3://test-bucket/manifests/run-1/')
+            )
+
+        self.assertEqual(query_ids, [
+            'CREATE EXTERNAL TABLE IF NOT EXISTS test_db.test_table (',
+            'ALTER TABLE test_db.test_table ADD IF NOT EXISTS'
+        ])
+        self.assertIn(
+            "LOCATION 's3://test-bucket/manifests/run-1/dt=2023-01-02/region=EU/'",
+            execute.call_args.kwargs['sql']
+        )
+        self.assertEqual(
+            self.bucket.Object('manifests/run-1/dt=2023-01-01/region=EU/symlink.txt').get()['Body'].read().decode(),
+            f'{files[0].url}\n{files[1].url}\n'
+        )
+
+        schema.metadata[C.PARTITION_PROJECTION] = {'dt': {'type': 'injected'}, 'region': {'type': 'injected'}}
+        with mock.patch.object(self.ac, 'execute', return_value='QUERY_ID') as execute:
+            self.ac.create_symlink_table(schema=schema, files=files, manifest_url=S3Url('s3://test-bucket/manifests/'))
+
+        self.assertEqual(execute.call_count, 1)
+        self._tear_down_s3()
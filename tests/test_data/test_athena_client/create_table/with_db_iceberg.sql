@@ -0,0 +1,16 @@
+CREATE TABLE IF NOT EXISTS test_db.test_table (
+    `COLUMN1` bigint,
+	`COLUMN2` timestamp,
+	`COLUMN3` string
+)
+PARTITIONED BY (
+	day(COLUMN2),
+	bucket(16, COLUMN1)
+)
+LOCATION
+    's3://test-bucket/test_prefix/'
+TBLPROPERTIES (
+    'table_type' = 'ICEBERG',
+	'format' = 'parquet',
+	'write_compression' = 'snappy'
+)
@@ -0,0 +1,22 @@
+CREATE EXTERNAL TABLE IF NOT EXISTS test_db.test_table (
+    `COLUMN1` bigint,
+	`COLUMN2` string
+)
+PARTITIONED BY (
+	`COLUMN3` string
+)
+CLUSTERED BY (
+	`COLUMN1`
+) INTO 16 BUCKETS
+ROW FORMAT SERDE
+    'org.apache.hadoop.hive.ql.io.orc.OrcSerde'
+STORED AS INPUTFORMAT
+    'org.apache.hadoop.hive.ql.io.orc.OrcInputFormat'
+OUTPUTFORMAT
+    'org.apache.hadoop.hive.ql.io.orc.OrcOutputFormat'
+LOCATION
+    's3://test-bucket/test_prefix/'
+TBLPROPERTIES (
+    'classification' = 'orc',
+	'orc.compress' = 'ZLIB'
+)
@@ -5,9 +5,13 @@ CREATE EXTERNAL TABLE IF NOT EXISTS test_db.test_table (
 )
 ROW FORMAT SERDE
     'org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe'
+STORED AS INPUTFORMAT
+    'org.apache.hadoop.hive.ql.io.parquet.MapredParquetInputFormat'
+OUTPUTFORMAT
+    'org.apache.hadoop.hive.ql.io.parquet.MapredParquetOutputFormat'
 LOCATION
     's3://test-bucket/test_prefix/'
 TBLPROPERTIES (
     'classification' = 'parquet',
-	'compressionType' = 'snappy'
+	'parquet.compression' = 'SNAPPY'
 )
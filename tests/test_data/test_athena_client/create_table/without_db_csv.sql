@@ -8,6 +8,10 @@ PARTITIONED BY (
 )
 ROW FORMAT SERDE
     'org.apache.hadoop.hive.serde2.OpenCSVSerde'
+STORED AS INPUTFORMAT
+    'org.apache.hadoop.mapred.TextInputFormat'
+OUTPUTFORMAT
+    'org.apache.hadoop.hive.ql.io.HiveIgnoreKeyTextOutputFormat'
 LOCATION
     's3://test-bucket/test_prefix/'
 TBLPROPERTIES (
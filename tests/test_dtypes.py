@@ -3,10 +3,29 @@
 (c) Charlie Collier, all rights reserved
 """
 
+import copy
+import pickle
+from decimal import Decimal
+
+import numpy as np
+import pyarrow as pa
+
 from simpleboto.athena import (
     VarCharDType,
-    DecimalDType
+    DecimalDType,
+    StringDType,
+    IntegerDType,
+    BigIntDType,
+    DoubleDType,
+    BooleanDType,
+    TimestampDType,
+    DateDType,
+    FloatDType,
+    TinyIntDType,
+    SmallIntDType,
+    CharDType
 )
+from simpleboto.athena.utils.data_types import BaseDType
 from tests.base_test import BaseTest
 
 
@@ -22,3 +41,275 @@ class TestDataTypes(BaseTest):
             DecimalDType(18, 8).__repr__(),
             'DecimalDType(18, 8)'
         )
+
+    def test_from_athena(self) -> None:
+        self.assertEqual(
+            [
+                BaseDType.from_athena(athena_type=type_).__repr__()
+                for type_ in ['varchar', 'INTEGER', 'bigint', 'double', 'real', 'boolean', 'date', 'timestamp', 'map']
+            ],
+            [
+                'StringDType', 'IntegerDType', 'BigIntDType', 'DoubleDType', 'FloatDType', 'BooleanDType',
+                'DateDType', 'TimestampDType', 'StringDType'
+            ]
+        )
+
+    def test_from_athena_decimal(self) -> None:
+        self.assertEqual(
+            BaseDType.from_athena(athena_type='decimal', precision=10, scale=2).__repr__(),
+            'DecimalDType(10, 2)'
+        )
+
+    def test_to_numpy_integer(self) -> None:
+        output = BigIntDType().to_numpy(['1', None, '-3'])
+
+        self.assertEqual(output.dtype, np.int64)
+        self.assertEqual(output.mask.tolist(), [False, True, False])
+        self.assertEqual(output.compressed().tolist(), [1, -3])
+        self.assertEqual(IntegerDType().to_numpy(['1']).dtype, np.int32)
+
+    def test_to_numpy_double(self) -> None:
+        output = DoubleDType().to_numpy(['1.5', 'NaN', None])
+
+        self.assertEqual(output.dtype, np.float64)
+        self.assertEqual(output.mask.tolist(), [False, False, True])
+        self.assertEqual(output[0], 1.5)
+        self.assertTrue(np.isnan(output[1]))
+
+    def test_to_numpy_boolean(self) -> None:
+        output = BooleanDType().to_numpy(['true', 'false', None])
+
+        self.assertEqual(output.dtype, np.bool_)
+        self.assertEqual(output.tolist(), [True, False, None])
+
+    def test_to_numpy_datetime(self) -> None:
+        timestamps = TimestampDType().to_numpy(['2023-01-01 12:34:56.789', None])
+        dates = DateDType().to_numpy(['2023-01-01'])
+
+        self.assertEqual(timestamps.dtype, np.dtype('datetime64[ms]'))
+        self.assertEqual(timestamps[0], np.datetime64('2023-01-01T12:34:56.789'))
+        self.assertEqual(timestamps.mask.tolist(), [False, True])
+        self.assertEqual(dates.dtype, np.dtype('datetime64[D]'))
+
+    def test_to_numpy_decimal(self) -> None:
+        output = DecimalDType(10, 2).to_numpy(['1.25', None])
+
+        self.assertEqual(output.dtype, np.dtype('O'))
+        self.assertEqual(output.tolist(), [Decimal('1.25'), None])
+
+    def test_to_numpy_string(self) -> None:
+        output = StringDType().to_numpy(['A', None, ''])
+
+        self.assertEqual(output.dtype, np.dtype('O'))
+        self.assertEqual(output.tolist(), ['A', None, ''])
+
+    def test_to_numpy_empty(self) -> None:
+        self.assertEqual(BigIntDType().to_numpy([]).tolist(), [])
+
+    def test_from_values(self) -> None:
+        samples = [
+            ['1', '-2', '', None],
+            ['3000000000'],
+            ['1' * 20],
+            ['1' * 40],
+            ['1.50', '-22.1', '3.'],
+            ['1e5', '2', '0.5'],
+            ['2023-01-01'],
+            ['2023-13-01'],
+            ['2023-01-01 10:00:00.123', '2023-01-01T10:00:00'],
+            ['True', 'false'],
+            ['abc', 'de'],
+            ['a' * 70_000],
+            [None, '']
+        ]
+
+        self.assertEqual(
+            [BaseDType.from_values(values).__repr__() for values in samples],
+            [
+                'IntegerDType', 'BigIntDType', 'DecimalDType(20, 0)', 'DoubleDType', 'DecimalDType(4, 2)',
+                'DoubleDType', 'DateDType', 'VarCharDType(10)', 'TimestampDType', 'BooleanDType', 'VarCharDType(3)',
+                'StringDType', 'StringDType'
+            ]
+        )
+        self.assertEqual(BaseDType.from_values(['0.' + '1' * 39]).__repr__(), 'DoubleDType')
+
+    def test_from_values_mixed_decimals(self) -> None:
+        self.assertEqual(BaseDType.from_values(['10', '10.5']).__repr__(), 'DecimalDType(3, 1)')
+        self.assertEqual(BaseDType.from_values(['-12345', '0.25', '0']).__repr__(), 'DecimalDType(7, 2)')
+
+    def test_from_values_leading_zeros(self) -> None:
+        samples = [['007', '123'], ['01.5', '2.5'], ['0', '-0', '0.5']]
+
+        self.assertEqual(
+            [BaseDType.from_values(values).__repr__() for values in samples],
+            ['VarCharDType(3)', 'VarCharDType(4)', 'DecimalDType(1, 1)']
+        )
+
+    def test_from_arrow(self) -> None:
+        arrow_types = [
+            pa.bool_(), pa.int8(), pa.int32(), pa.uint32(), pa.int64(), pa.float32(), pa.float64(),
+            pa.timestamp('ms'), pa.date32(), pa.string(), pa.list_(pa.int32()), pa.decimal128(10, 2)
+        ]
+
+        self.assertEqual(
+            [BaseDType.from_arrow(arrow_type).__repr__() for arrow_type in arrow_types],
+            [
+                'BooleanDType', 'IntegerDType', 'IntegerDType', 'BigIntDType', 'BigIntDType', 'FloatDType',
+                'DoubleDType', 'TimestampDType', 'DateDType', 'StringDType', 'StringDType', 'DecimalDType(10, 2)'
+            ]
+        )
+
+    def test_to_arrow(self) -> None:
+        dtypes = [
+            TinyIntDType(), SmallIntDType(), IntegerDType(), BigIntDType(), DoubleDType(), FloatDType(), BooleanDType(),
+            DateDType(), TimestampDType(), StringDType(), VarCharDType(10), CharDType(3), DecimalDType(10, 2)
+        ]
+
+        self.assertEqual([dtype.to_arrow() for dtype in dtypes], [
+            pa.int8(), pa.int16(), pa.int32(), pa.int64(), pa.float64(), pa.float32(), pa.bool_(), pa.date32(),
+            pa.timestamp('ms'), pa.string(), pa.string(), pa.string(), pa.decimal128(10, 2)
+        ])
+
+    def test_from_glue(self) -> None:
+        glue_types = [
+            'tinyint', 'smallint', 'INT', 'bigint', 'double', 'float', 'real', 'boolean', 'date', 'timestamp', 'string',
+            'char(5)', 'varchar(10)', 'decimal', 'decimal(10, 2)', 'decimal(12,4)', 'array<int>', 'geometry'
+        ]
+
+        self.assertEqual([BaseDType.from_glue(glue_type).__repr__() for glue_type in glue_types], [
+            'TinyIntDType', 'SmallIntDType', 'IntegerDType', 'BigIntDType', 'DoubleDType', 'FloatDType', 'FloatDType',
+            'BooleanDType', 'DateDType', 'TimestampDType', 'StringDType', 'CharDType(5)', 'VarCharDType(10)',
+            'DecimalDType(10, 0)', 'DecimalDType(10, 2)', 'DecimalDType(12, 4)', 'StringDType', 'StringDType'
+        ])
+
+    def test_to_glue(self) -> None:
+        dtypes = [
+            TinyIntDType(), SmallIntDType(), IntegerDType(), BigIntDType(), StringDType(), VarCharDType(10),
+            CharDType(3), DecimalDType(10, 2)
+        ]
+
+        self.assertEqual(
+            [dtype.to_glue() for dtype in dtypes],
+            ['tinyint', 'smallint', 'int', 'bigint', 'string', 'varchar(10)', 'char(3)', 'decimal(10,2)']
+        )
+        for dtype in dtypes:
+            self.assertIs(BaseDType.from_glue(dtype.to_glue()), dtype)
+
+    def test_interned(self) -> None:
+        self.assertIs(StringDType(), StringDType())
+        self.assertIs(DecimalDType(10), DecimalDType(precision=10, scale=0))
+        self.assertIsNot(DecimalDType(10, 2), DecimalDType(10, 3))
+        self.assertIs(VarCharDType(10), VarCharDType(length=10))
+        self.assertIs(pickle.loads(pickle.dumps(DecimalDType(10, 2))), DecimalDType(10, 2))
+        self.assertIs(copy.deepcopy(VarCharDType(10)), VarCharDType(10))
+        self.assertIs(copy.copy(DateDType()), DateDType())
+
+        columns = [[StringDType, BigIntDType][i % 2]() for i in range(10_000)]
+        columns += [DecimalDType(10 + i % 3, 2) for i in range(10_000)]
+        self.assertEqual(len({id(dtype) for dtype in columns}), 5)
+
+    def test_immutable(self) -> None:
+        self.assertFalse(hasattr(StringDType(), '__dict__'))
+        self.assertFalse(hasattr(DecimalDType(10, 2), '__dict__'))
+
+        with self.assertRaisesRegex(AttributeError, r'DecimalDType\(10, 2\) is immutable'):
+            DecimalDType(10, 2).precision = 12
+
+        with self.assertRaisesRegex(AttributeError, 'StringDType is immutable'):
+            del StringDType().ATHENA
+
+    def test_get_invalid_mask_integer(self) -> None:
+        self.assertEqual(
+            IntegerDType().get_invalid_mask(
+                ['1', '-2', '+3', '2147483647', '-2147483648', '00002147483647', '2147483648', '-2147483649', 'abc',
+                 '1.5', '--1', '1e3', '', None]
+            ).tolist(),
+            [False] * 6 + [True] * 6 + [False] * 2
+        )
+        self.assertEqual(
+            BigIntDType().get_invalid_mask(
+                ['9223372036854775807', '-9223372036854775808', '9223372036854775808', '99999999999999999999']
+            ).tolist(),
+            [False, False, True, True]
+        )
+        self.assertEqual(
+            IntegerDType().get_invalid_mask(np.array([1, 2 ** 31, -2 ** 31, -2 ** 31 - 1])).tolist(),
+            [False, True, False, True]
+        )
+        self.assertEqual(
+            BigIntDType().get_invalid_mask(np.array([1.0, 1.5, np.nan, np.inf, 2.0 ** 63])).tolist(),
+            [False, True, False, True, True]
+        )
+        self.assertEqual(
+            IntegerDType().get_invalid_mask(np.ma.MaskedArray(['x', '1'], mask=[True, False])).tolist(),
+            [False, False]
+        )
+        self.assertTrue(IntegerDType().get_invalid_mask(np.array(['2023-01-01'], dtype='datetime64[D]')).all())
+        self.assertEqual(
+            TinyIntDType().get_invalid_mask(['127', '-128', '128', '-129']).tolist(),
+            [False, False, True, True]
+        )
+        self.assertEqual(
+            SmallIntDType().get_invalid_mask(['32767', '-32768', '32768', '-32769']).tolist(),
+            [False, False, True, True]
+        )
+
+    def test_get_invalid_mask_floating(self) -> None:
+        self.assertEqual(
+            DoubleDType().get_invalid_mask(
+                ['1e5', 'nan', '-Inf', '.5', '5.', '1E+5', 'x', '1e', 'e5', '1.2.3', '1e--5']
+            ).tolist(),
+            [False] * 6 + [True] * 5
+        )
+        self.assertEqual(
+            FloatDType().get_invalid_mask(['1e39', '1' * 39, '3e38', 'inf']).tolist(),
+            [True, False, False, False]
+        )
+        self.assertEqual(FloatDType().get_invalid_mask(np.array([1e39, 1.0, np.inf])).tolist(), [True, False, False])
+        self.assertEqual(DoubleDType().get_invalid_mask(np.array([1, 2])).tolist(), [False, False])
+
+    def test_get_invalid_mask_decimal(self) -> None:
+        dtype = DecimalDType(5, 2)
+
+        self.assertEqual(
+            dtype.get_invalid_mask(
+                ['123.45', '1.230', '-0.5', Decimal('12.5'), '1234.5', '1.234', 'abc', '1e2']
+            ).tolist(),
+            [False] * 4 + [True] * 4
+        )
+        self.assertEqual(dtype.get_invalid_mask(np.array([999, -1000])).tolist(), [False, True])
+        self.assertEqual(dtype.get_invalid_mask(np.array([999.99, 1000.0, np.inf])).tolist(), [False, True, True])
+        self.assertTrue(dtype.get_invalid_mask(np.array(['2023-01-01'], dtype='datetime64[D]')).all())
+
+    def test_get_invalid_mask_boolean(self) -> None:
+        self.assertEqual(
+            BooleanDType().get_invalid_mask(['True', 'false', 'yes', True]).tolist(),
+            [False, False, True, False]
+        )
+        self.assertEqual(BooleanDType().get_invalid_mask(np.array([0, 1, 2])).tolist(), [False, False, True])
+        self.assertTrue(BooleanDType().get_invalid_mask(np.array(['2023-01-01'], dtype='datetime64[D]')).all())
+
+    def test_get_invalid_mask_datetime(self) -> None:
+        self.assertEqual(
+            DateDType().get_invalid_mask(['2023-01-01', '2023-02-30', '2023-01-01 10:00', 'x', '2023']).tolist(),
+            [False] + [True] * 4
+        )
+        self.assertEqual(
+            DateDType().get_invalid_mask(
+                np.array(['2023-01-01T10', '2023-01-01', 'NaT'], dtype='datetime64[h]')
+            ).tolist(),
+            [True, False, False]
+        )
+        self.assertEqual(
+            TimestampDType().get_invalid_mask(['2023-01-01 10:00:00.123', '2023-01-01T10:00', 'x', 'NaT']).tolist(),
+            [False, False, True, True]
+        )
+        self.assertTrue(TimestampDType().get_invalid_mask(np.array([1])).all())
+
+    def test_get_invalid_mask_string(self) -> None:
+        self.assertEqual(
+            VarCharDType(3).get_invalid_mask(['abc', 'abcd', 12345, None]).tolist(),
+            [False, True, True, False]
+        )
+        self.assertEqual(CharDType(2).get_invalid_mask(['a', 'ab', 'abc', None]).tolist(), [False, False, True, False])
+        self.assertFalse(StringDType().get_invalid_mask(np.array([1.5, 2])).any())
@@ -9,7 +9,12 @@ from simpleboto.exceptions import (
     AttributeConditionError,
     UnexpectedParameterError,
     InvalidSchemaTypeError,
-    NoParameterError
+    NoParameterError,
+    MissingDependencyError,
+    QueryExecutionError,
+    QueryCostError,
+    PartitionCreateError,
+    S3PartLimitError
 )
 from tests.base_test import BaseTest
 
@@ -91,3 +96,44 @@ class TestExceptions(BaseTest):
     def test_no_parameter_error_with_context_and_arguments(self) -> None:
         with self.assertRaisesRegex(NoParameterError, r'Required parameter TEST_PARAM for FUNCTION\(arg1, arg2\)'):
             raise NoParameterError(param='TEST_PARAM', context='FUNCTION', arguments=['arg1', 'arg2'])
+
+    def test_missing_dependency_error(self) -> None:
+        with self.assertRaisesRegex(MissingDependencyError, 'The module numpy is required for this functionality'):
+            raise MissingDependencyError(module='numpy')
+
+    def test_query_execution_error(self) -> None:
+        with self.assertRaisesRegex(QueryExecutionError, 'The query QUERY_ID finished with state CANCELLED$'):
+            raise QueryExecutionError(query_execution_id='QUERY_ID', state='CANCELLED')
+
+    def test_query_execution_error_with_reason(self) -> None:
+        with self.assertRaisesRegex(QueryExecutionError, 'The query QUERY_ID finished with state FAILED: REASON'):
+            raise QueryExecutionError(query_execution_id='QUERY_ID', state='FAILED', reason='REASON')
+
+    def test_query_cost_error(self) -> None:
+        with self.assertRaisesRegex(
+            QueryCostError,
+            'The query is estimated to scan 2048 bytes, which is more than the limit of 1024 bytes'
+        ):
+            raise QueryCostError(estimated_bytes=2048.0, max_scan_bytes=1024)
+
+    def test_partition_create_error(self) -> None:
+        with self.assertRaisesRegex(
+            PartitionCreateError,
+            r"Failed to create the partitions \[\('2023-01-01', 'EU'\), \('2023-01-02', 'EU'\)\] "
+            r"for repair_partitions: InternalServiceException, Unknown$"
+        ):
+            raise PartitionCreateError(
+                errors=[
+                    {'PartitionValues': ['2023-01-01', 'EU'], 'ErrorDetail': {'ErrorCode': 'InternalServiceException'}},
+                    {'PartitionValues': ['2023-01-02', 'EU']}
+                ],
+                context='repair_partitions'
+            )
+
+    def test_s3_part_limit_error(self) -> None:
+        with self.assertRaisesRegex(
+            S3PartLimitError,
+            'The multipart upload to s3://bucket/key exceeds the limit of 10000 parts of 5242880 bytes; '
+            'use a larger part_size'
+        ):
+            raise S3PartLimitError(url='s3://bucket/key', max_parts=10000, part_size=5242880)
@@ -0,0 +1,396 @@
+# -*- coding: utf-8 -*-
+"""
+(c) Charlie Collier, all rights reserved
+"""
+
+import os
+import time
+from typing import Any, Callable, Iterator, List
+from unittest import mock
+
+from moto import mock_glue, mock_s3
+
+from simpleboto import GlueClient, S3Url
+from simpleboto.athena import Schema, StringDType, DecimalDType, DateDType, IntegerDType, C
+from simpleboto.exceptions import NoParameterError, UnexpectedParameterError, PartitionCreateError
+from simpleboto.glue.glue_client import PartitionValues
+from tests.base_test import BaseTest, OS_ENVIRON
+
+
+@mock_s3
+@mock_glue
+class TestGlueClient(BaseTest):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.bucket_name = 'test-bucket'
+
+        with mock.patch.dict(OS_ENVIRON, self.env_vars):
+            self.glue_client = GlueClient(region_name=os.getenv('REGION'))
+            self._set_up_s3(bucket_name=self.bucket_name)
+
+        self.schema = Schema(
+            schema={'COLUMN1': StringDType()},
+            metadata={
+                C.DATABASE_NAME: 'test_db',
+                C.TABLE_NAME: 'test_table',
+                C.S3_BUCKET: self.bucket_name,
+                C.S3_PREFIX: 'table',
+                C.FILE_FORMAT: C.PARQUET_,
+                C.PARTITION_SCHEMA: {
+                    'dt': StringDType(),
+                    'region': StringDType()
+                }
+            }
+        )
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        self._tear_down_s3()
+
+    def _set_up_glue(self) -> None:
+        glue = self.glue_client.glue
+        glue.create_database(DatabaseInput={'Name': 'test_db'})
+        glue.create_table(
+            DatabaseName='test_db',
+            TableInput={
+                'Name': 'test_table',
+                'StorageDescriptor': {
+                    'Columns': [{'Name': 'COLUMN1', 'Type': 'string'}],
+                    'Location': f's3://{self.bucket_name}/table/',
+                    'SerdeInfo': {'SerializationLibrary': 'org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe'}
+                },
+                'PartitionKeys': [{'Name': 'dt', 'Type': 'string'}, {'Name': 'region', 'Type': 'string'}]
+            }
+        )
+
+    def _upload_to_s3(self) -> None:
+        for key in [
+            'table/dt=2023-01-01/region=EU/file1',
+            'table/dt=2023-01-01/region=US/file1',
+            'table/dt=2023-01-02/region=EU/file1',
+            'table/dt=2023-01-02/region=EU/file2',
+            'table/dt=2023-01-03/region=A%2FB/file1',
+            'table/dt=2023-01-03/_temporary/file1',
+            'table/_SUCCESS'
+        ]:
+            self.bucket.put_object(Body=b'a', Key=key)
+
+    def test_find_partitions(self) -> None:
+        self._upload_to_s3()
+
+        partitions = self.glue_client.find_partitions(schema=self.schema)
+
+        self.assertEqual(partitions, {
+            ('2023-01-01', 'EU'): S3Url(bucket=self.bucket_name, key='table/dt=2023-01-01/region=EU/'),
+            ('2023-01-01', 'US'): S3Url(bucket=self.bucket_name, key='table/dt=2023-01-01/region=US/'),
+            ('2023-01-02', 'EU'): S3Url(bucket=self.bucket_name, key='table/dt=2023-01-02/region=EU/'),
+            ('2023-01-03', 'A/B'): S3Url(bucket=self.bucket_name, key='table/dt=2023-01-03/region=A%2FB/')
+        })
+
+    def test_find_partitions_since(self) -> None:
+        self._upload_to_s3()
+
+        partitions = self.glue_client.find_partitions(schema=self.schema, since='2023-01-02')
+
+        self.assertEqual(sorted(partitions), [('2023-01-02', 'EU'), ('2023-01-03', 'A/B')])
+
+    def test_repair_partitions(self) -> None:
+        self._set_up_glue()
+        self._upload_to_s3()
+        self.glue_client.glue.create_partition(
+            DatabaseName='test_db',
+            TableName='test_table',
+            PartitionInput={'Values': ['2023-01-01', 'EU']}
+        )
+
+        added = self.glue_client.repair_partitions(schema=self.schema, batch_size=2)
+
+        self.assertEqual(added, [('2023-01-01', 'US'), ('2023-01-02', 'EU'), ('2023-01-03', 'A/B')])
+        self.assertEqual(
+            self.glue_client.get_partition_values(database='test_db', table='test_table'),
+            {('2023-01-01', 'EU'), ('2023-01-01', 'US'), ('2023-01-02', 'EU'), ('2023-01-03', 'A/B')}
+        )
+
+        partition = self.glue_client.glue.get_partition(
+            DatabaseName='test_db',
+            TableName='test_table',
+            PartitionValues=['2023-01-02', 'EU']
+        )['Partition']
+        self.assertEqual(
+            partition['StorageDescriptor']['Location'],
+            f's3://{self.bucket_name}/table/dt=2023-01-02/region=EU/'
+        )
+
+    def test_repair_partitions_nothing_new(self) -> None:
+        self._set_up_glue()
+
+        with mock.patch.object(self.glue_client, 'batch_create_partitions') as batch_create_partitions:
+            self.assertEqual(self.glue_client.repair_partitions(schema=self.schema), [])
+
+        batch_create_partitions.assert_not_called()
+
+    def test_repair_partitions_errors(self) -> None:
+        self._upload_to_s3()
+        errors = [{'PartitionValues': ['2023-01-02', 'EU'], 'ErrorDetail': {'ErrorCode': 'AlreadyExistsException'}}]
+
+        with mock.patch.object(self.glue_client, 'get_partition_values', return_value=set()) as get_partition_values:
+            with mock.patch.object(self.glue_client, 'batch_create_partitions', return_value=errors):
+                added = self.glue_client.repair_partitions(schema=self.schema, since='2023-01-02')
+
+            self.assertEqual(added, [('2023-01-03', 'A/B')])
+            self.assertEqual(get_partition_values.call_args.kwargs['expression'], "dt >= '2023-01-02'")
+
+            errors.append({'PartitionValues': ['2023-01-03', 'A/B'], 'ErrorDetail': {'ErrorCode': 'AccessDenied'}})
+            with mock.patch.object(self.glue_client, 'batch_create_partitions', return_value=errors):
+                with self.assertRaisesRegex(
+                    PartitionCreateError,
+                    r"Failed to create the partitions \[\('2023-01-03', 'A/B'\)\] for repair_partitions: AccessDenied"
+                ):
+                    self.glue_client.repair_partitions(schema=self.schema)
+
+            self.assertIsNone(get_partition_values.call_args.kwargs['expression'])
+
+    def test_repair_partitions_missing_metadata(self) -> None:
+        with self.assertRaisesRegex(
+            NoParameterError,
+            r"Required parameter \['DATABASE_NAME', 'PARTITION_SCHEMA'\] for repair_partitions"
+        ):
+            self.glue_client.repair_partitions(schema=Schema(
+                schema={'COLUMN1': StringDType()},
+                metadata={C.TABLE_NAME: 'test_table', C.S3_BUCKET: self.bucket_name, C.S3_PREFIX: 'table'}
+            ))
+
+    def test_get_schema(self) -> None:
+        self._set_up_glue()
+
+        with mock.patch.object(self.glue_client, 'get_table', wraps=self.glue_client.get_table) as get_table:
+            schema = self.glue_client.get_schema(database='test_db', table='Test_Table')
+            self.assertIs(self.glue_client.get_schema(database='test_db', table='test_table'), schema)
+            self.assertIsNot(self.glue_client.get_schema(database='test_db', table='test_table', refresh=True), schema)
+
+        self.assertEqual(get_table.call_count, 2)
+        self.assertEqual(schema.fingerprint(), self.schema.fingerprint())
+
+    def test_get_schemas(self) -> None:
+        self._set_up_glue()
+        glue = self.glue_client.glue
+        glue.create_database(DatabaseInput={'Name': 'other_db'})
+
+        for i in range(150):
+            glue.create_table(DatabaseName='other_db', TableInput={
+                'Name': f'table_{i:03d}',
+                'StorageDescriptor': {'Columns': [{'Name': 'id', 'Type': 'int'}]}
+            })
+        glue.create_table(DatabaseName='other_db', TableInput={'Name': 'view', 'TableType': 'VIRTUAL_VIEW'})
+
+        with mock.patch.object(glue, 'get_tables', wraps=glue.get_tables) as get_tables:
+            schemas = self.glue_client.get_schemas(databases=['test_db', 'Other_DB'])
+            self.assertEqual(self.glue_client.get_schemas(databases=['other_db']).keys(), schemas.keys() - {
+                'test_db.test_table'
+            })
+
+        self.assertEqual(get_tables.call_count, 2)
+        self.assertEqual(len(schemas), 151)
+        self.assertEqual(repr(schemas['other_db.table_149'].raw['id']), 'IntegerDType')
+        self.assertEqual(schemas['test_db.test_table'].fingerprint(), self.schema.fingerprint())
+        self.assertIs(
+            self.glue_client.get_schema(database='other_db', table='table_000'),
+            schemas['other_db.table_000']
+        )
+
+    def test_get_schemas_invalid_table(self) -> None:
+        self._set_up_glue()
+        self.glue_client.glue.create_table(DatabaseName='test_db', TableInput={
+            'Name': 'other_table',
+            'StorageDescriptor': {'Columns': [{'Name': 'tags', 'Type': 'array<string>'}]}
+        })
+
+        with self.assertWarnsRegex(
+            RuntimeWarning,
+            'Skipping the table test_db.other_table: The data type array<string> is not valid for column tags'
+        ):
+            schemas = self.glue_client.get_schemas(databases=['test_db'])
+
+        self.assertEqual(schemas.keys(), {'test_db.test_table'})
+
+    def test_get_schemas_refresh(self) -> None:
+        self._set_up_glue()
+        self.glue_client.glue.create_table(DatabaseName='test_db', TableInput={
+            'Name': 'other_table',
+            'StorageDescriptor': {'Columns': [{'Name': 'id', 'Type': 'int'}]}
+        })
+        self.assertEqual(
+            self.glue_client.get_schemas(databases=['test_db']).keys(),
+            {'test_db.test_table', 'test_db.other_table'}
+        )
+
+        self.glue_client.glue.delete_table(DatabaseName='test_db', Name='other_table')
+        self.assertEqual(len(self.glue_client.get_schemas(databases=['test_db'])), 2)
+        self.assertEqual(self.glue_client.get_schemas(databases=['test_db'], refresh=True).keys(), {
+            'test_db.test_table'
+        })
+
+    def test_put_table(self) -> None:
+        self.glue_client.glue.create_database(DatabaseInput={'Name': 'test_db'})
+        self.schema.metadata.update({
+            C.FILE_FORMAT: C.CSV_,
+            C.FILE_COMPRESSION: C.GZIP_,
+            C.SKIP_HEADER: True,
+            C.PARTITION_PROJECTION: {
+                'dt': {'type': 'date', 'range': '2023-01-01,NOW', 'format': 'yyyy-MM-dd'},
+                'region': {'type': 'enum', 'values': ['EU', 'US']}
+            }
+        })
+
+        self.glue_client.put_table(schema=self.schema)
+        self.assertEqual(
+            self.glue_client.get_schema(database='test_db', table='test_table', refresh=True).fingerprint(),
+            self.schema.fingerprint()
+        )
+
+        self.schema.raw['COLUMN2'] = DecimalDType(10, 2)
+        self.schema.metadata[C.FILE_FORMAT] = C.AVRO_
+        del self.schema.metadata[C.FILE_COMPRESSION], self.schema.metadata[C.SKIP_HEADER]
+        self.glue_client.put_table(schema=self.schema)
+
+        table = self.glue_client.get_table(database='test_db', table='test_table')
+        self.assertEqual(table['StorageDescriptor']['Columns'][1], {'Name': 'COLUMN2', 'Type': 'decimal(10,2)'})
+        self.assertIn('COLUMN2', table['Parameters']['avro.schema.literal'])
+        self.assertEqual(Schema.from_glue(table).fingerprint(), self.schema.fingerprint())
+
+    def _create_partitions(self) -> List[PartitionValues]:
+        self._set_up_glue()
+        partitions = [(f'2023-01-{day:02d}', region) for day in range(1, 11) for region in ['EU', 'US']]
+
+        for dt, region in partitions:
+            self.glue_client.glue.create_partition(
+                DatabaseName='test_db',
+                TableName='test_table',
+                PartitionInput={
+                    'Values': [dt, region],
+                    'StorageDescriptor': {'Location': f's3://{self.bucket_name}/table/dt={dt}/region={region}/'}
+                }
+            )
+
+        return partitions
+
+    def _segmented_get_partitions(self) -> Callable:
+        get_partitions = self.glue_client.glue.get_partitions
+
+        def _get_partitions(Segment: dict, **kwargs) -> dict:
+            partitions = get_partitions(**kwargs)['Partitions']
+
+            return {'Partitions': [
+                partition for i, partition in enumerate(partitions)
+                if i % Segment['TotalSegments'] == Segment['SegmentNumber']
+            ]}
+
+        return _get_partitions
+
+    def test_iter_partitions(self) -> None:
+        partitions = self._create_partitions()
+        self.glue_client.glue.create_partition(
+            DatabaseName='test_db',
+            TableName='test_table',
+            PartitionInput={'Values': ['2023-02-01', 'EU']}
+        )
+
+        with mock.patch.object(
+            self.glue_client.glue,
+            'get_partitions',
+            side_effect=self._segmented_get_partitions()
+        ) as get_partitions:
+            found = list(self.glue_client.iter_partitions(database='test_db', table='test_table', segments=20))
+
+        self.assertEqual(get_partitions.call_count, 10)
+        self.assertTrue(all(call.kwargs['ExcludeColumnSchema'] for call in get_partitions.call_args_list))
+        self.assertEqual(len(found), 21)
+        self.assertEqual(dict(found), {
+            **{
+                values: S3Url(f's3://{self.bucket_name}/table/dt={values[0]}/region={values[1]}/')
+                for values in partitions
+            },
+            ('2023-02-01', 'EU'): None
+        })
+
+    def test_iter_partitions_stop(self) -> None:
+        self._set_up_glue()
+        stops = []
+        scan_segment = self.glue_client._scan_segment
+
+        def _scan_segment(pages: Any, stop: Any, **kwargs) -> None:
+            stops.append(stop)
+            scan_segment(pages, stop, **kwargs)
+
+        def _paginate(**_) -> Iterator[dict]:
+            yield {'Partitions': [{'Values': ['2023-01-01', 'EU']}]}
+            stops[0].wait(timeout=10)
+            yield {'Partitions': [{'Values': ['2023-01-02', 'EU']}]}
+
+        paginator = mock.Mock(paginate=_paginate)
+
+        with mock.patch.object(self.glue_client, '_scan_segment', side_effect=_scan_segment):
+            with mock.patch.object(self.glue_client.glue, 'get_paginator', return_value=paginator):
+                partitions = self.glue_client.iter_partitions(database='test_db', table='test_table', segments=1)
+                self.assertEqual(next(partitions), (('2023-01-01', 'EU'), None))
+                partitions.close()
+
+        self.assertTrue(stops[0].is_set())
+
+    def test_iter_partitions_backpressure(self) -> None:
+        pages = []
+
+        def _paginate(**_) -> Iterator[dict]:
+            for i in range(100):
+                pages.append(i)
+                yield {'Partitions': [{'Values': [str(i), 'EU']}]}
+
+        paginator = mock.Mock(paginate=_paginate)
+
+        with mock.patch.object(self.glue_client.glue, 'get_paginator', return_value=paginator):
+            partitions = self.glue_client.iter_partitions(database='test_db', table='test_table', segments=1)
+            self.assertEqual(next(partitions), (('0', 'EU'), None))
+            time.sleep(0.2)
+            # the page yielded, two queued and one blocked on the full queue
+            self.assertEqual(len(pages), 4)
+            partitions.close()
+
+        self.assertLess(len(pages), 100)
+
+    def test_iter_partitions_error(self) -> None:
+        with self.assertRaises(self.glue_client.glue.exceptions.EntityNotFoundException):
+            list(self.glue_client.iter_partitions(database='test_db', table='test_table', segments=2))
+
+    def test_scan_partitions(self) -> None:
+        self._create_partitions()
+
+        partitions = self.glue_client.scan_partitions(
+            schema=self.schema,
+            filters={'dt': ('2023-01-09', None), 'region': ['EU']},
+            segments=1
+        )
+
+        self.assertEqual(sorted(values for values, _ in partitions), [('2023-01-09', 'EU'), ('2023-01-10', 'EU')])
+        self.assertEqual(len(list(self.glue_client.scan_partitions(schema=self.schema, segments=1))), 20)
+
+    def test_get_partition_expression(self) -> None:
+        schema = Schema(schema={}, metadata={C.PARTITION_SCHEMA: {
+            'dt': DateDType(),
+            'hour': IntegerDType(),
+            'region': StringDType()
+        }})
+
+        self.assertEqual(
+            GlueClient.get_partition_expression(
+                schema=schema,
+                filters={'dt': (None, '2023-01-31'), 'hour': [0, 12], 'region': "A'B"}
+            ),
+            "dt <= '2023-01-31' AND hour IN (0, 12) AND region = 'A''B'"
+        )
+
+        with self.assertRaisesRegex(
+            UnexpectedParameterError,
+            r"The parameters \['country'\] are unexpected for get_partition_expression"
+        ):
+            GlueClient.get_partition_expression(schema=schema, filters={'country': 'UK'})
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+(c) Charlie Collier, all rights reserved
+"""
+
+import os
+from unittest import mock
+
+from simpleboto.athena import QueryCache
+from tests.base_test import BaseTest
+
+
+class TestQueryCache(BaseTest):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.cache_dir = os.path.join(self.tmp_dir, 'query_cache')
+        self.cache = QueryCache(ttl=60, cache_dir=self.cache_dir)
+
+    def test_normalize_sql(self) -> None:
+        self.assertEqual(
+            QueryCache.normalize_sql(sql='-- comment\nSELECT  *\n\tFROM /* inline */ table_name;\n'),
+            'SELECT * FROM table_name'
+        )
+
+    def test_normalize_sql_literals(self) -> None:
+        self.assertEqual(
+            QueryCache.normalize_sql(sql="SELECT  'x  y', \"a--b\" FROM t WHERE a = '--x''s' -- comment\n"),
+            "SELECT 'x  y', \"a--b\" FROM t WHERE a = '--x''s'"
+        )
+        self.assertNotEqual(
+            QueryCache.get_key(sql="SELECT * FROM t WHERE a = '--x' AND b = 1"),
+            QueryCache.get_key(sql="SELECT * FROM t WHERE a = '--x' AND b = 2")
+        )
+        self.assertNotEqual(
+            QueryCache.get_key(sql="SELECT * FROM t WHERE a = 'x  y'"),
+            QueryCache.get_key(sql="SELECT * FROM t WHERE a = 'x y'")
+        )
+
+    def test_is_cacheable(self) -> None:
+        self.assertTrue(QueryCache.is_cacheable(sql='  select 1'))
+        self.assertTrue(QueryCache.is_cacheable(sql='/* c */ WITH a AS (SELECT 1) SELECT * FROM a'))
+        self.assertFalse(QueryCache.is_cacheable(sql='CREATE TABLE a AS SELECT 1'))
+
+    def test_get_key(self) -> None:
+        self.assertEqual(
+            QueryCache.get_key(sql='SELECT 1;', database='db'),
+            QueryCache.get_key(sql='SELECT\n1', database='db')
+        )
+        self.assertNotEqual(
+            QueryCache.get_key(sql='SELECT 1', database='db'),
+            QueryCache.get_key(sql='SELECT 1', database='db', workgroup='wg')
+        )
+        self.assertNotEqual(
+            QueryCache.get_key(sql='SELECT ?', params=['1']),
+            QueryCache.get_key(sql='SELECT ?', params=['2'])
+        )
+
+    def test_get_reuse_configuration(self) -> None:
+        self.assertEqual(
+            self.cache.get_reuse_configuration(),
+            {'ResultReuseByAgeConfiguration': {'Enabled': True, 'MaxAgeInMinutes': 1}}
+        )
+        self.assertEqual(
+            QueryCache(ttl=10 ** 9).get_reuse_configuration()['ResultReuseByAgeConfiguration']['MaxAgeInMinutes'],
+            QueryCache.MAX_REUSE_MINUTES
+        )
+        self.assertIsNone(QueryCache(result_reuse=False).get_reuse_configuration())
+
+    def test_put_get(self) -> None:
+        self.cache.put(key='KEY', query_execution_id='QUERY_ID', output_location='s3://bucket/QUERY_ID.csv')
+
+        entry = self.cache.get(key='KEY')
+        self.assertEqual(entry['QueryExecutionId'], 'QUERY_ID')
+        self.assertEqual(entry['OutputLocation'], 's3://bucket/QUERY_ID.csv')
+        self.assertIsNone(self.cache.get(key='MISSING_KEY'))
+
+    def test_get_expired(self) -> None:
+        self.cache.put(key='KEY', query_execution_id='QUERY_ID')
+
+        with mock.patch('time.time', return_value=self.cache.entries['KEY']['Time'] + 61):
+            self.assertIsNone(self.cache.get(key='KEY'))
+
+        self.assertNotIn('KEY', self.cache.entries)
+
+    def test_put_prunes_expired(self) -> None:
+        self.cache.put(key='OLD_KEY', query_execution_id='OLD_QUERY_ID')
+        self.cache.put(key='KEY', query_execution_id='QUERY_ID')
+
+        with mock.patch('time.time', return_value=self.cache.entries['OLD_KEY']['Time'] + 61):
+            self.cache.put(key='NEW_KEY', query_execution_id='NEW_QUERY_ID')
+
+        self.assertEqual(list(self.cache.entries), ['NEW_KEY'])
+
+    def test_put_get_results(self) -> None:
+        self.assertIsNone(self.cache.get_results(query_execution_id='QUERY_ID', columnar=False))
+
+        self.cache.put_results(query_execution_id='QUERY_ID', columnar=False, results=[('A', '1')])
+
+        self.assertEqual(self.cache.get_results(query_execution_id='QUERY_ID', columnar=False), [('A', '1')])
+        self.assertIsNone(self.cache.get_results(query_execution_id='QUERY_ID', columnar=True))
+
+    def test_get_results_unpickles_outside_lock(self) -> None:
+        self.cache.put_results(query_execution_id='QUERY_ID', columnar=False, results=[('A', '1')])
+
+        def loads(data: bytes) -> list:
+            self.assertFalse(self.cache._lock.locked())
+            return [('B', '2')]
+
+        with mock.patch('pickle.loads', side_effect=loads):
+            self.assertEqual(self.cache.get_results(query_execution_id='QUERY_ID', columnar=False), [('B', '2')])
+
+    def test_results_without_cache_dir(self) -> None:
+        cache = QueryCache()
+        cache.put_results(query_execution_id='QUERY_ID', columnar=False, results=[('A', '1')])
+
+        self.assertIsNone(cache.get_results(query_execution_id='QUERY_ID', columnar=False))
+
+    def test_put_results_evicts_least_recently_used(self) -> None:
+        results = ['X' * 40]
+
+        self.cache.put_results(query_execution_id='QUERY_1', columnar=False, results=results)
+        self.cache.max_size_bytes = 2 * os.path.getsize(self.cache.get_results_path('QUERY_1', False))
+        os.utime(self.cache.get_results_path('QUERY_1', False), (0, 0))
+        self.cache.put_results(query_execution_id='QUERY_2', columnar=False, results=results)
+        self.cache.put_results(query_execution_id='QUERY_3', columnar=False, results=results)
+
+        self.assertEqual(sorted(os.listdir(self.cache_dir)), ['QUERY_2.rows.pkl', 'QUERY_3.rows.pkl'])
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+(c) Charlie Collier, all rights reserved
+"""
+
+import json
+import os
+from typing import Optional
+
+from simpleboto.athena import QueryMetrics
+from simpleboto.exceptions import UnexpectedParameterError
+from tests.base_test import BaseTest
+
+
+class TestQueryMetrics(BaseTest):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.metrics = QueryMetrics()
+
+    @staticmethod
+    def _execution(
+        query_execution_id: str,
+        scanned: int,
+        state: Optional[str] = 'SUCCEEDED',
+        query: Optional[str] = 'SELECT 1'
+    ) -> dict:
+        return {
+            'QueryExecutionId': query_execution_id,
+            'Query': query,
+            'Status': {'State': state},
+            'Statistics': {
+                'DataScannedInBytes': scanned,
+                'EngineExecutionTimeInMillis': 10,
+                'ResultReuseInformation': {'ReusedPreviousResult': True}
+            }
+        }
+
+    def _record_all(self) -> None:
+        self.metrics.record(self._execution('Q1', 100), tag='A')
+        self.metrics.record(self._execution('Q2', 300, query='SELECT  1;'), tag='A')
+        self.metrics.record(self._execution('Q3', 200, state='FAILED', query='SELECT 2'), tag='B')
+
+    def test_record(self) -> None:
+        record = self.metrics.record(self._execution('Q1', 100), tag='A')
+
+        self.assertEqual(record['QueryExecutionId'], 'Q1')
+        self.assertEqual(record['Tag'], 'A')
+        self.assertEqual(record['DataScannedInBytes'], 100)
+        self.assertEqual(record['QueryQueueTimeInMillis'], 0)
+        self.assertTrue(record['ReusedPreviousResult'])
+        self.assertEqual(len(record['SqlHash']), 64)
+
+    def test_record_max_records(self) -> None:
+        metrics = QueryMetrics(max_records=2)
+        for i in range(3):
+            metrics.record(self._execution(f'Q{i}', i))
+
+        self.assertEqual([r['QueryExecutionId'] for r in metrics.records], ['Q1', 'Q2'])
+
+    def test_query(self) -> None:
+        self._record_all()
+
+        self.assertEqual([r['QueryExecutionId'] for r in self.metrics.query(tag='A')], ['Q1', 'Q2'])
+        self.assertEqual([r['QueryExecutionId'] for r in self.metrics.query(state='FAILED')], ['Q3'])
+
+        sql_hash = self.metrics.records[0]['SqlHash']
+        self.assertEqual([r['QueryExecutionId'] for r in self.metrics.query(sql_hash=sql_hash)], ['Q1', 'Q2'])
+
+    def test_top(self) -> None:
+        self._record_all()
+
+        self.assertEqual([r['QueryExecutionId'] for r in self.metrics.top(n=2)], ['Q2', 'Q3'])
+
+    def test_aggregate(self) -> None:
+        self._record_all()
+
+        self.assertEqual(
+            self.metrics.aggregate(percentiles=[50, 90]),
+            {
+                'A': {'count': 2, 'sum': 400, 'mean': 200.0, 'max': 300, 'p50': 200.0, 'p90': 280.0},
+                'B': {'count': 1, 'sum': 200, 'mean': 200.0, 'max': 200, 'p50': 200.0, 'p90': 200.0}
+            }
+        )
+
+    def test_aggregate_unexpected_metric(self) -> None:
+        with self.assertRaisesRegex(UnexpectedParameterError, 'The parameter FAKE_METRIC is unexpected'):
+            self.metrics.aggregate(metric='FAKE_METRIC')
+
+    def test_to_json_lines(self) -> None:
+        self._record_all()
+        location = os.path.join(self.tmp_dir, 'metrics.jsonl')
+
+        self.metrics.to_json_lines(location=location)
+
+        with open(location, 'r') as f:
+            lines = [json.loads(line) for line in f]
+
+        self.assertEqual([r['QueryExecutionId'] for r in lines], ['Q1', 'Q2', 'Q3'])
@@ -80,3 +80,80 @@ class TestS3Client(BaseTest):
             self.s3_client.size(s3_url=S3Url(bucket=self.bucket_name, key='prefix2/file4')),
             4
         )
+
+    def test_list_prefixes(self) -> None:
+        self.bucket.put_object(Body=b'a', Key='table/dt=2023-01-01/file1')
+        self.bucket.put_object(Body=b'a', Key='table/dt=2023-01-01/file2')
+        self.bucket.put_object(Body=b'a', Key='table/dt=2023-01-02/file1')
+        self.bucket.put_object(Body=b'a', Key='table/dt=2023-01-03/file1')
+        self.bucket.put_object(Body=b'a', Key='table/file0')
+
+        table_url = S3Url(bucket=self.bucket_name, prefix='table')
+
+        self.assertEqual(self.s3_client.list_prefixes(s3_url=table_url), [
+            S3Url(bucket=self.bucket_name, key='table/dt=2023-01-01/'),
+            S3Url(bucket=self.bucket_name, key='table/dt=2023-01-02/'),
+            S3Url(bucket=self.bucket_name, key='table/dt=2023-01-03/')
+        ])
+        self.assertEqual(self.s3_client.list_prefixes(s3_url=table_url, start_after='table/dt=2023-01-02'), [
+            S3Url(bucket=self.bucket_name, key='table/dt=2023-01-02/'),
+            S3Url(bucket=self.bucket_name, key='table/dt=2023-01-03/')
+        ])
+
+    def test_iter_partition_levels_sample(self) -> None:
+        for i in range(5):
+            self.bucket.put_object(Body=b'a', Key=f'table/dt=2023-01-0{i + 1}/hour=0{i}/file')
+
+        levels = list(self.s3_client.iter_partition_levels(
+            s3_url=S3Url(bucket=self.bucket_name, prefix='table'),
+            columns=['dt', 'hour'],
+            sample=3
+        ))
+
+        self.assertEqual(len(levels[0]), 5)
+        self.assertEqual(sorted(levels[1]), [('2023-01-01', '00'), ('2023-01-03', '02'), ('2023-01-05', '04')])
+
+    def test_list_partitions(self) -> None:
+        self.bucket.put_object(Body=b'a', Key='table/dt=2023-01-01/file')
+        self.bucket.put_object(Body=b'a', Key='table/other=1/file')
+
+        self.assertEqual(
+            self.s3_client.list_partitions(s3_url=S3Url(bucket=self.bucket_name, prefix='table'), columns=['dt']),
+            {('2023-01-01',): S3Url(bucket=self.bucket_name, key='table/dt=2023-01-01/')}
+        )
+
+    def test_list_max_keys(self) -> None:
+        self._upload_to_s3()
+
+        self.assertEqual(
+            self.s3_client.list(S3Url(bucket=self.bucket_name, prefix='prefix1'), max_keys=2),
+            [S3Url(bucket=self.bucket_name, key='prefix1/file1'), S3Url(bucket=self.bucket_name, key='prefix1/file2')]
+        )
+
+    def test_read_range(self) -> None:
+        self.bucket.put_object(Body=b'0123456789', Key='file')
+        s3_url = S3Url(bucket=self.bucket_name, key='file')
+
+        self.assertEqual(self.s3_client.read_range(s3_url, end=3), b'0123')
+        self.assertEqual(self.s3_client.read_range(s3_url, start=5), b'56789')
+        self.assertEqual(self.s3_client.read_range(s3_url, start=-2), b'89')
+        self.assertEqual(self.s3_client.read_range(s3_url, start=-20), b'0123456789')
+
+    def test_delete(self) -> None:
+        self._upload_to_s3()
+
+        errors = self.s3_client.delete([
+            S3Url(bucket=self.bucket_name, key='prefix1/file1'),
+            S3Url(bucket=self.bucket_name, key='prefix2/file4')
+        ])
+
+        self.assertEqual(errors, [])
+        self.assertEqual([obj.key for obj in self.bucket.objects.all()], ['prefix1/file2', 'prefix1/file3'])
+
+        with mock.patch.object(
+            self.s3_client.s3, 'delete_objects', return_value={'Errors': [{'Key': 'file', 'Code': 'AccessDenied'}]}
+        ) as delete_objects:
+            errors = self.s3_client.delete([S3Url(bucket=self.bucket_name, key=f'file{i}') for i in range(1001)])
+
+        self.assertEqual(delete_objects.call_count, 2)
+        self.assertEqual(errors, [{'Key': 'file', 'Code': 'AccessDenied'}] * 2)
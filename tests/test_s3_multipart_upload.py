@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+(c) Charlie Collier, all rights reserved
+"""
+
+import gc
+import os
+import threading
+from unittest import mock
+
+from moto import mock_s3
+
+from simpleboto.exceptions import S3PartLimitError
+from simpleboto.s3 import S3Client, S3MultipartUpload, S3Url
+from tests.base_test import BaseTest, OS_ENVIRON
+
+
+class TestS3MultipartUpload(BaseTest):
+    def _set_up_upload(self) -> S3MultipartUpload:
+        with mock.patch.dict(OS_ENVIRON, self.env_vars):
+            self._set_up_s3(bucket_name='test-bucket')
+            s3_client = S3Client(region_name=os.getenv('REGION'))
+
+        return S3MultipartUpload(s3_url=S3Url('s3://test-bucket/data/file.bin'), part_size=1, s3_client=s3_client)
+
+    def _get_object(self) -> bytes:
+        return self.bucket.Object('data/file.bin').get()['Body'].read()
+
+    @mock_s3
+    def test_put_object(self) -> None:
+        upload = self._set_up_upload()
+
+        with mock.patch.object(upload.s3_client.s3, 'create_multipart_upload') as create_multipart_upload:
+            with upload:
+                self.assertTrue(upload.writable())
+                upload.write(b'abc')
+                upload.write(b'def')
+                self.assertEqual(upload.tell(), 6)
+
+        create_multipart_upload.assert_not_called()
+        self.assertEqual(upload.part_size, S3MultipartUpload.MIN_PART_SIZE)
+        self.assertEqual(upload.max_pending_parts, 8)
+        self.assertTrue(upload.closed)
+        self.assertEqual(self._get_object(), b'abcdef')
+
+        upload.close()
+        self._tear_down_s3()
+
+    @mock_s3
+    def test_multipart_upload(self) -> None:
+        upload = self._set_up_upload()
+        data = os.urandom(S3MultipartUpload.MIN_PART_SIZE)
+
+        with upload:
+            upload.write(data[:100])
+            upload.write(data[100:] + data)
+            upload.write(b'end')
+
+        self.assertEqual(len(upload.parts), 3)
+        self.assertEqual(self._get_object(), data + data + b'end')
+        self._tear_down_s3()
+
+    @mock_s3
+    def test_max_pending_parts(self) -> None:
+        upload = self._set_up_upload()
+        upload.max_pending_parts = 1
+        part = os.urandom(S3MultipartUpload.MIN_PART_SIZE)
+        release = threading.Event()
+
+        def upload_part(**kwargs) -> dict:
+            release.wait()
+            return {'ETag': str(kwargs['PartNumber'])}
+
+        with mock.patch.object(upload.s3_client.s3, 'upload_part', side_effect=upload_part):
+            writer = threading.Thread(target=upload.write, args=(part * 3,))
+            writer.start()
+            writer.join(timeout=0.5)
+
+            self.assertTrue(writer.is_alive())
+            self.assertEqual(len(upload.parts), 2)
+
+            release.set()
+            writer.join()
+
+        self.assertEqual(len(upload.parts), 3)
+        upload.abort()
+        self._tear_down_s3()
+
+    @mock_s3
+    def test_copy(self) -> None:
+        upload = self._set_up_upload()
+        min_size = S3MultipartUpload.MIN_PART_SIZE
+        data = os.urandom(2 * min_size + 100)
+        self.bucket.put_object(Body=data, Key='source/large.bin')
+        self.bucket.put_object(Body=b'small', Key='source/small.bin')
+
+        with mock.patch.object(S3MultipartUpload, 'MAX_PART_SIZE', 2 * min_size):
+            with mock.patch.object(upload, 'upload_part', wraps=upload.upload_part) as upload_part:
+                with upload:
+                    upload.write(b'head')
+                    upload.copy(S3Url('s3://test-bucket/source/large.bin'), size=len(data))
+                    upload.copy(S3Url('s3://test-bucket/source/small.bin'), size=5)
+                    self.assertEqual(upload.tell(), len(data) + 9)
+
+        self.assertEqual([call.kwargs.get('byte_range') for call in upload_part.call_args_list], [
+            None, f'bytes={min_size - 4}-{2 * min_size + 99}', None
+        ])
+        self.assertEqual(self._get_object(), b'head' + data + b'small')
+        self._tear_down_s3()
+
+    @mock_s3
+    def test_copy_adjusts_last_part(self) -> None:
+        upload = self._set_up_upload()
+        min_size = S3MultipartUpload.MIN_PART_SIZE
+        data = os.urandom(2 * min_size + 100)
+        self.bucket.put_object(Body=data, Key='source/large.bin')
+
+        with mock.patch.object(S3MultipartUpload, 'MAX_PART_SIZE', 2 * min_size):
+            with upload:
+                upload.copy(S3Url('s3://test-bucket/source/large.bin'), size=len(data))
+
+        self.assertEqual(len(upload.parts), 2)
+        self.assertEqual(self._get_object(), data)
+        self._tear_down_s3()
+
+    @mock_s3
+    def test_abort(self) -> None:
+        upload = self._set_up_upload()
+        upload.write(os.urandom(S3MultipartUpload.MIN_PART_SIZE))
+
+        with mock.patch.object(upload.s3_client.s3, 'complete_multipart_upload', side_effect=ValueError('failed')):
+            with self.assertRaisesRegex(ValueError, 'failed'):
+                upload.close()
+
+        self.assertTrue(upload.closed)
+        self.assertIsNone(upload.upload_id)
+        self.assertEqual(upload.s3_client.s3.list_multipart_uploads(Bucket='test-bucket').get('Uploads', []), [])
+        self.assertEqual(list(self.bucket.objects.all()), [])
+
+        upload.abort()
+        self._tear_down_s3()
+
+    @mock_s3
+    def test_max_parts(self) -> None:
+        upload = self._set_up_upload()
+        upload.write(os.urandom(S3MultipartUpload.MIN_PART_SIZE))
+
+        with mock.patch.object(upload, 'MAX_PARTS', 1):
+            with self.assertRaisesRegex(S3PartLimitError, 'exceeds the limit of 1 parts of 5242880 bytes'):
+                upload.write(os.urandom(S3MultipartUpload.MIN_PART_SIZE))
+
+        self.assertTrue(upload.closed)
+        self.assertEqual(len(upload.parts), 1)
+        self.assertEqual(upload.s3_client.s3.list_multipart_uploads(Bucket='test-bucket').get('Uploads', []), [])
+
+        upload.close()
+        self.assertEqual(list(self.bucket.objects.all()), [])
+        self._tear_down_s3()
+
+    @mock_s3
+    def test_del_aborts(self) -> None:
+        upload = self._set_up_upload()
+        upload.write(os.urandom(S3MultipartUpload.MIN_PART_SIZE + 1))
+        s3 = upload.s3_client.s3
+
+        with mock.patch.object(s3, 'complete_multipart_upload') as mock_complete:
+            del upload
+            gc.collect()
+
+        mock_complete.assert_not_called()
+        self.assertEqual(s3.list_multipart_uploads(Bucket='test-bucket').get('Uploads', []), [])
+        self.assertEqual(list(self.bucket.objects.all()), [])
+        self._tear_down_s3()
@@ -3,21 +3,37 @@
 (c) Charlie Collier, all rights reserved
 """
 
+import gzip
+import io
+import os
+from unittest import mock
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from moto import mock_s3
+
 from simpleboto.athena import Schema
 from simpleboto.athena.constants import C
 from simpleboto.athena.utils import (
     StringDType,
     TimestampDType,
     DecimalDType,
-    VarCharDType
+    VarCharDType,
+    BigIntDType,
+    DateDType,
+    IntegerDType,
+    CharDType
 )
 from simpleboto.exceptions import (
     InvalidSchemaTypeError,
     AttributeConditionError,
     UnexpectedParameterError,
-    InvalidTypeError
+    InvalidTypeError,
+    NoParameterError
 )
-from tests.base_test import BaseTest
+from simpleboto.s3 import S3Client, S3Url
+from tests.base_test import BaseTest, OS_ENVIRON
 
 
 class TestSchema(BaseTest):
@@ -37,6 +53,15 @@ class TestSchema(BaseTest):
 
         self.assertTrue(valid)
 
+    def test_validate_schema_once_per_dtype(self) -> None:
+        Schema._VALID_DTYPES.discard(DecimalDType(11, 3))
+
+        with mock.patch.object(Schema, 'validate_dtype', wraps=Schema.validate_dtype) as validate_dtype:
+            Schema.validate_schema(schema={f'COL{i}': DecimalDType(11, 3) for i in range(1000)})
+            Schema.validate_schema(schema={'COL': DecimalDType(11, 3)})
+
+        validate_dtype.assert_called_once_with(DecimalDType(11, 3))
+
     def test_validate_schema_invalid(self) -> None:
         with self.assertRaisesRegex(InvalidSchemaTypeError, "The data type string is not valid for column COL2"):
             Schema.validate_schema(schema={
@@ -82,6 +107,13 @@ class TestSchema(BaseTest):
         ):
             Schema.validate_dtype(current_dtype=VarCharDType(99_999))
 
+    def test_validate_dtype_invalid_char_length(self) -> None:
+        with self.assertRaisesRegex(
+            AttributeConditionError,
+            r"The attribute length of the class CharDType does not satisfy 0 < x \(256\) <= 255"
+        ):
+            Schema.validate_dtype(current_dtype=CharDType(256))
+
     def test_validate_metadata_missing_keys(self) -> None:
         with self.assertRaisesRegex(UnexpectedParameterError, r"The parameters \['FAKE_KEY'\] are unexpected"):
             Schema.validate_metadata(metadata={'FAKE_KEY': ''})
@@ -115,3 +147,391 @@ class TestSchema(BaseTest):
                     'COLUMN1': 'String'
                 }
             })
+
+    def test_validate_metadata_bucketing_types(self) -> None:
+        with self.assertRaisesRegex(InvalidTypeError, rf"Variable {C.BUCKETED_BY} should have type <class 'list'>"):
+            Schema.validate_metadata(metadata={C.BUCKETED_BY: 'COLUMN1'})
+
+        with self.assertRaisesRegex(InvalidTypeError, rf"Variable {C.BUCKET_COUNT} should have type <class 'int'>"):
+            Schema.validate_metadata(metadata={C.BUCKET_COUNT: '8'})
+
+    def test_validate_bucketing(self) -> None:
+        with self.assertRaisesRegex(UnexpectedParameterError, r"\['COLUMN2'\] are unexpected for BUCKETED_BY"):
+            Schema(
+                schema={'COLUMN1': StringDType()},
+                metadata={C.BUCKETED_BY: ['COLUMN2'], C.BUCKET_COUNT: 4, C.PARTITION_SCHEMA: {'COLUMN2': StringDType()}}
+            )
+
+    def test_validate_metadata_iceberg_types(self) -> None:
+        with self.assertRaisesRegex(InvalidTypeError, rf"Variable {C.TABLE_TYPE} should have type <class 'str'>"):
+            Schema.validate_metadata(metadata={C.TABLE_TYPE: 1})
+
+        with self.assertRaisesRegex(
+            InvalidTypeError,
+            rf"Variable {C.PARTITION_TRANSFORMS} should have type <class 'list'>"
+        ):
+            Schema.validate_metadata(metadata={C.PARTITION_TRANSFORMS: 'day(ts)'})
+
+    def _set_up_infer(self) -> S3Client:
+        with mock.patch.dict(OS_ENVIRON, self.env_vars):
+            self._set_up_s3(bucket_name='test-bucket')
+            return S3Client(region_name=os.getenv('REGION'))
+
+    @staticmethod
+    def _dtypes(
+        schema: Schema
+    ) -> dict:
+        return {col: repr(dtype) for col, dtype in schema.raw.items()}
+
+    @mock_s3
+    def test_infer_csv(self) -> None:
+        s3_client = self._set_up_infer()
+        rows = [f'{i},{i / 4:.2f},name_{i},2023-01-0{i % 9 + 1},{i % 2 == 0}' for i in range(200)]
+        self.bucket.put_object(Body='\n'.join(['id,price,name,dt,flag', *rows]).encode(), Key='data/part-0.csv')
+        self.bucket.put_object(Body=b'', Key='data/_SUCCESS')
+        self.bucket.put_object(
+            Body=b'id,price,name,dt,flag\n1,2.5,a_much_longer_name,2023-02-01,',
+            Key='data/part-1.csv'
+        )
+
+        with mock.patch.object(s3_client, 'read_range', wraps=s3_client.read_range) as read_range:
+            schema = Schema.infer(s3_url=S3Url('s3://test-bucket/data/'), sample_bytes=1024, s3_client=s3_client)
+
+        self.assertEqual(read_range.call_count, 2)
+        self.assertEqual(self._dtypes(schema), {
+            'id': 'IntegerDType',
+            'price': 'DecimalDType(3, 2)',
+            'name': 'VarCharDType(18)',
+            'dt': 'DateDType',
+            'flag': 'BooleanDType'
+        })
+        self.assertEqual(schema.metadata, {
+            C.S3_BUCKET: 'test-bucket',
+            C.S3_PREFIX: 'data',
+            C.FILE_FORMAT: C.CSV_,
+            C.SKIP_HEADER: True
+        })
+        self._tear_down_s3()
+
+    @mock_s3
+    def test_infer_csv_gzip_without_header(self) -> None:
+        s3_client = self._set_up_infer()
+        for i in range(4):
+            body = gzip.compress('\n'.join(f'{j},x{j}' for j in range(i * 1000, (i + 1) * 1000)).encode())
+            self.bucket.put_object(Body=body, Key=f'data/part-{i}.csv.gz')
+
+        schema = Schema.infer(
+            s3_url=S3Url('s3://test-bucket/data/'),
+            sample_files=2,
+            sample_bytes=512,
+            header=False,
+            s3_client=s3_client
+        )
+
+        self.assertEqual(self._dtypes(schema), {'col1': 'IntegerDType', 'col2': 'VarCharDType(5)'})
+        self.assertEqual(schema.metadata[C.FILE_COMPRESSION], C.GZIP_)
+        self.assertNotIn(C.SKIP_HEADER, schema.metadata)
+        self._tear_down_s3()
+
+    @mock_s3
+    def test_infer_parquet(self) -> None:
+        s3_client = self._set_up_infer()
+        tables = [
+            pa.table({'id': pa.array([1, 2], pa.int64()), 'price': pa.array([1, 2], pa.decimal128(10, 2))}),
+            pa.table({'id': pa.array([3], pa.int64()), 'ts': pa.array([1], pa.timestamp('ms'))})
+        ]
+        for i, table in enumerate(tables):
+            buffer = io.BytesIO()
+            pq.write_table(table, buffer, compression='zstd')
+            self.bucket.put_object(Body=buffer.getvalue(), Key=f'data/part-{i}.parquet')
+
+        with mock.patch.object(s3_client, 'read_range', wraps=s3_client.read_range) as read_range:
+            schema = Schema.infer(s3_url=S3Url('s3://test-bucket/data/'), sample_bytes=16, s3_client=s3_client)
+
+        self.assertEqual(read_range.call_count, 4)
+        self.assertEqual(
+            self._dtypes(schema),
+            {'id': 'BigIntDType', 'price': 'DecimalDType(10, 2)', 'ts': 'TimestampDType'}
+        )
+        self.assertEqual(schema.metadata[C.FILE_FORMAT], C.PARQUET_)
+        self.assertEqual(schema.metadata[C.FILE_COMPRESSION], C.ZSTD_)
+        self._tear_down_s3()
+
+    @mock_s3
+    def test_infer_errors(self) -> None:
+        s3_client = self._set_up_infer()
+        s3_url = S3Url('s3://test-bucket/data/')
+
+        with self.assertRaisesRegex(
+            NoParameterError,
+            'Required parameter files for Schema.infer under s3://test-bucket/data/'
+        ):
+            Schema.infer(s3_url=s3_url, s3_client=s3_client)
+
+        self.bucket.put_object(Body=b'a,b\n1,2', Key='data/file.csv')
+
+        with self.assertRaisesRegex(UnexpectedParameterError, 'The parameter orc is unexpected for Schema.infer'):
+            Schema.infer(s3_url=s3_url, file_format='ORC', s3_client=s3_client)
+
+        with self.assertRaisesRegex(
+            UnexpectedParameterError,
+            'The parameter s3://test-bucket/data/file.csv is unexpected for parquet files in Schema.infer'
+        ):
+            Schema.infer(s3_url=s3_url, file_format=C.PARQUET_, s3_client=s3_client)
+        self._tear_down_s3()
+
+    def test_infer_parquet_uncompressed(self) -> None:
+        buffer = io.BytesIO()
+        pq.write_table(pa.table({'id': [1]}), buffer, compression='none')
+
+        self.assertEqual(Schema.infer_parquet(footers=[buffer.getvalue()])[1], None)
+
+    def test_from_glue(self) -> None:
+        table = {
+            'Name': 'test_table',
+            'DatabaseName': 'test_db',
+            'StorageDescriptor': {
+                'Columns': [{'Name': 'id', 'Type': 'int'}, {'Name': 'price', 'Type': 'decimal(10,2)'}],
+                'Location': 's3://test-bucket/table',
+                'SerdeInfo': {'SerializationLibrary': 'org.apache.hadoop.hive.serde2.lazy.LazySimpleSerDe'},
+                'BucketColumns': ['id'],
+                'NumberOfBuckets': 4
+            },
+            'PartitionKeys': [{'Name': 'region', 'Type': 'string'}, {'Name': 'dt', 'Type': 'string'}],
+            'Parameters': {
+                'compressionType': 'none',
+                'skip.header.line.count': '1',
+                'projection.enabled': 'true',
+                'projection.region.type': 'enum',
+                'projection.region.values': 'EU,US',
+                'storage.location.template': 's3://test-bucket/table/${region}/'
+            }
+        }
+
+        schema = Schema.from_glue(table)
+
+        self.assertEqual(self._dtypes(schema), {'id': 'IntegerDType', 'price': 'DecimalDType(10, 2)'})
+        self.assertEqual(schema.metadata, {
+            C.DATABASE_NAME: 'test_db',
+            C.TABLE_NAME: 'test_table',
+            C.S3_BUCKET: 'test-bucket',
+            C.S3_PREFIX: 'table',
+            C.FILE_FORMAT: C.CSV_,
+            C.SKIP_HEADER: True,
+            C.SERDE_INFO: {
+                'SerializationLibrary': 'org.apache.hadoop.hive.serde2.lazy.LazySimpleSerDe',
+                'Parameters': {}
+            },
+            C.PARTITION_SCHEMA: {'region': StringDType(), 'dt': StringDType()},
+            C.BUCKETED_BY: ['id'],
+            C.BUCKET_COUNT: 4,
+            C.PARTITION_PROJECTION: {'region': {'type': 'enum', 'values': ['EU', 'US']}}
+        })
+
+        iceberg = Schema.from_glue({
+            'Name': 'test_table',
+            'DatabaseName': 'test_db',
+            'Parameters': {'table_type': 'ICEBERG', 'write_compression': 'ZSTD'}
+        })
+        self.assertEqual(iceberg.raw, {})
+        self.assertEqual(
+            iceberg.metadata,
+            {**iceberg.metadata, C.TABLE_TYPE: C.ICEBERG_, C.FILE_FORMAT: C.PARQUET_, C.FILE_COMPRESSION: C.ZSTD_}
+        )
+
+        unknown = Schema.from_glue({
+            'Name': 'test_table',
+            'DatabaseName': 'test_db',
+            'StorageDescriptor': {'SerdeInfo': {'SerializationLibrary': 'com.example.UnknownSerDe'}}
+        })
+        self.assertNotIn(C.FILE_FORMAT, unknown.metadata)
+
+    def test_from_glue_columns(self) -> None:
+        self.assertEqual(
+            self._dtypes(Schema(Schema.from_glue_columns([
+                {'Name': 'flag', 'Type': 'tinyint'},
+                {'Name': 'count', 'Type': 'smallint'},
+                {'Name': 'code', 'Type': 'char(3)'},
+                {'Name': 'name', 'Type': 'STRING'}
+            ]))),
+            {'flag': 'TinyIntDType', 'count': 'SmallIntDType', 'code': 'CharDType(3)', 'name': 'StringDType'}
+        )
+
+        with self.assertRaisesRegex(InvalidSchemaTypeError, 'The data type map<string,int> is not valid for column m'):
+            Schema.from_glue_columns([{'Name': 'm', 'Type': 'map<string,int>'}])
+
+    def test_to_glue_input(self) -> None:
+        schema = Schema(
+            schema={'id': IntegerDType(), 'price': DecimalDType(10, 2)},
+            metadata={
+                C.TABLE_NAME: 'Test_Table',
+                C.S3_BUCKET: 'test-bucket',
+                C.S3_PREFIX: 'table',
+                C.FILE_FORMAT: 'PARQUET',
+                C.PARTITION_SCHEMA: {'dt': DateDType()},
+                C.BUCKETED_BY: ['id'],
+                C.BUCKET_COUNT: 4
+            }
+        )
+
+        table_input = schema.to_glue_input(parameters={'parquet.compression': 'SNAPPY'})
+
+        self.assertEqual(table_input['Name'], 'test_table')
+        self.assertEqual(table_input['PartitionKeys'], [{'Name': 'dt', 'Type': 'date'}])
+        self.assertEqual(
+            table_input['Parameters'],
+            {'EXTERNAL': 'TRUE', 'classification': C.PARQUET_, 'parquet.compression': 'SNAPPY'}
+        )
+        self.assertEqual(table_input['StorageDescriptor'], {
+            'Columns': [{'Name': 'id', 'Type': 'int'}, {'Name': 'price', 'Type': 'decimal(10,2)'}],
+            'Location': 's3://test-bucket/table/',
+            'InputFormat': 'org.apache.hadoop.hive.ql.io.parquet.MapredParquetInputFormat',
+            'OutputFormat': 'org.apache.hadoop.hive.ql.io.parquet.MapredParquetOutputFormat',
+            'SerdeInfo': {'SerializationLibrary': 'org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe'},
+            'BucketColumns': ['id'],
+            'NumberOfBuckets': 4
+        })
+
+    def test_glue_serde_round_trip(self) -> None:
+        serde_info = {
+            'SerializationLibrary': 'org.apache.hadoop.hive.serde2.lazy.LazySimpleSerDe',
+            'Parameters': {'field.delim': '\t', 'serialization.format': '\t'}
+        }
+        table = {
+            'Name': 'test_table',
+            'DatabaseName': 'test_db',
+            'StorageDescriptor': {
+                'Columns': [{'Name': 'id', 'Type': 'int'}],
+                'Location': 's3://test-bucket/table/',
+                'SerdeInfo': serde_info
+            },
+            'Parameters': {'classification': 'csv'}
+        }
+
+        schema = Schema.from_glue(table)
+
+        self.assertEqual(schema.metadata[C.SERDE_INFO], serde_info)
+        self.assertEqual(schema.to_glue_input()['StorageDescriptor']['SerdeInfo'], serde_info)
+
+        parquet = Schema.from_glue({**table, 'StorageDescriptor': {
+            'SerdeInfo': {'SerializationLibrary': 'org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe'}
+        }})
+        self.assertNotIn(C.SERDE_INFO, parquet.metadata)
+
+    def test_to_glue_input_errors(self) -> None:
+        metadata = {C.TABLE_NAME: 'test_table', C.S3_BUCKET: 'test-bucket', C.S3_PREFIX: 'table'}
+
+        with self.assertRaisesRegex(
+            NoParameterError,
+            r"Required parameter \['FILE_FORMAT'\] for Schema.to_glue_input"
+        ):
+            Schema(schema={}, metadata=metadata).to_glue_input()
+
+        with self.assertRaisesRegex(
+            UnexpectedParameterError,
+            'The parameter xml is unexpected for Schema.to_glue_input'
+        ):
+            Schema(schema={}, metadata={**metadata, C.FILE_FORMAT: 'xml'}).to_glue_input()
+
+        with self.assertRaisesRegex(
+            UnexpectedParameterError,
+            'The parameter TABLE_TYPE is unexpected for Schema.to_glue_input, as ICEBERG tables must be created'
+        ):
+            Schema(schema={}, metadata={**metadata, C.FILE_FORMAT: C.PARQUET_, C.TABLE_TYPE: 'ICEBERG'}).to_glue_input()
+
+    def test_diff(self) -> None:
+        metadata = {C.TABLE_NAME: 'test_table', C.PARTITION_SCHEMA: {'dt': StringDType()}}
+        schema = Schema(
+            schema={'col1': StringDType(), 'col2': DecimalDType(10, 2), 'col3': TimestampDType()},
+            metadata=metadata
+        )
+        other = Schema(
+            schema={'col3': TimestampDType(), 'col2': DecimalDType(12, 2), 'col4': VarCharDType(10)},
+            metadata={**metadata, C.PARTITION_SCHEMA: {'dt': StringDType()}, C.FILE_FORMAT: C.CSV_}
+        )
+
+        diff = schema.diff(other)
+
+        self.assertEqual(list(diff['added']), ['col4'])
+        self.assertEqual(list(diff['removed']), ['col1'])
+        self.assertEqual([(col, repr(a), repr(b)) for col, (a, b) in diff['changed'].items()], [
+            ('col2', 'DecimalDType(10, 2)', 'DecimalDType(12, 2)')
+        ])
+        self.assertTrue(diff['reordered'])
+        self.assertEqual(diff['metadata'], {C.FILE_FORMAT: (None, C.CSV_)})
+        self.assertEqual(
+            schema.diff(schema),
+            {'added': {}, 'removed': {}, 'changed': {}, 'reordered': False, 'metadata': {}}
+        )
+
+    def test_fingerprint(self) -> None:
+        schema = Schema(
+            schema={'col1': StringDType(), 'col2': DecimalDType(10, 2)},
+            metadata={C.TABLE_NAME: 'test_table', C.PARTITION_SCHEMA: {'dt': StringDType()}}
+        )
+        same = Schema(
+            schema={'col1': StringDType(), 'col2': DecimalDType(10, 2)},
+            metadata={C.PARTITION_SCHEMA: {'dt': StringDType()}, C.TABLE_NAME: 'test_table'}
+        )
+
+        self.assertEqual(schema.fingerprint(), same.fingerprint())
+        self.assertEqual(len(schema.fingerprint()), 64)
+
+        same.raw['col2'] = DecimalDType(12, 2)
+        self.assertNotEqual(schema.fingerprint(), same.fingerprint())
+
+        reordered = Schema(schema={'col2': DecimalDType(10, 2), 'col1': StringDType()}, metadata=schema.metadata)
+        self.assertNotEqual(schema.fingerprint(), reordered.fingerprint())
+
+    def test_fingerprint_nested_metadata(self) -> None:
+        schema = Schema(
+            schema={'col1': StringDType()},
+            metadata={
+                C.PARTITION_SCHEMA: {'dt': StringDType(), 'region': StringDType()},
+                C.SERDE_INFO: {'SerializationLibrary': 'serde', 'Parameters': {'a': '1', 'b': '2'}}
+            }
+        )
+        same = Schema(
+            schema={'col1': StringDType()},
+            metadata={
+                C.SERDE_INFO: {'Parameters': {'b': '2', 'a': '1'}, 'SerializationLibrary': 'serde'},
+                C.PARTITION_SCHEMA: {'dt': StringDType(), 'region': StringDType()}
+            }
+        )
+        reordered = Schema(
+            schema={'col1': StringDType()},
+            metadata={
+                C.PARTITION_SCHEMA: {'region': StringDType(), 'dt': StringDType()},
+                C.SERDE_INFO: {'SerializationLibrary': 'serde', 'Parameters': {'a': '1', 'b': '2'}}
+            }
+        )
+
+        self.assertEqual(schema.fingerprint(), same.fingerprint())
+        self.assertNotEqual(schema.fingerprint(), reordered.fingerprint())
+
+    def test_validate_batch(self) -> None:
+        schema = Schema(
+            schema={'id': BigIntDType(), 'price': DecimalDType(6, 2), 'name': VarCharDType(5)},
+            metadata={C.PARTITION_SCHEMA: {'dt': DateDType()}}
+        )
+
+        output = schema.validate_batch(columns={
+            'id': ['1', 'abc', None],
+            'price': np.array([1.5, 12345.0, np.nan]),
+            'name': ['a', 'b', 'toolong'],
+            'dt': np.array(['2023-01-01', '2023-01-01', '2023-13-01'])
+        })
+
+        self.assertEqual({col: output[col]['mask'].tolist() for col in output}, {
+            'id': [False, True, False],
+            'price': [False, True, False],
+            'name': [False, False, True],
+            'dt': [False, False, True]
+        })
+        self.assertEqual({col: output[col]['count'] for col in output}, {'id': 1, 'price': 1, 'name': 1, 'dt': 1})
+
+        with self.assertRaisesRegex(
+            UnexpectedParameterError,
+            r"The parameters \['other'\] are unexpected for validate_batch"
+        ):
+            schema.validate_batch(columns={'other': [1]})
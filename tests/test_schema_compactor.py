@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+(c) Charlie Collier, all rights reserved
+"""
+
+import gzip
+import io
+import os
+from unittest import mock
+
+import pyarrow.parquet as pq
+from moto import mock_s3
+
+from simpleboto.athena import (
+    Schema,
+    SchemaCompactor,
+    C,
+    BigIntDType,
+    DateDType,
+    StringDType
+)
+from simpleboto.exceptions import NoParameterError, S3DeleteError
+from simpleboto.s3 import S3Client, S3MultipartUpload, S3Url
+from tests.base_test import BaseTest, OS_ENVIRON
+
+
+class TestSchemaCompactor(BaseTest):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.schema = Schema(
+            schema={'id': BigIntDType(), 'name': StringDType()},
+            metadata={
+                C.S3_BUCKET: 'test-bucket',
+                C.S3_PREFIX: 'data',
+                C.FILE_FORMAT: C.CSV_,
+                C.FILE_COMPRESSION: C.GZIP_,
+                C.PARTITION_SCHEMA: {'dt': DateDType()}
+            }
+        )
+
+    def _set_up_compactor(self) -> S3Client:
+        with mock.patch.dict(OS_ENVIRON, self.env_vars):
+            self._set_up_s3(bucket_name='test-bucket')
+            return S3Client(region_name=os.getenv('REGION'))
+
+    def _get_object(self, s3_url: S3Url) -> bytes:
+        return self.bucket.Object(s3_url.key).get()['Body'].read()
+
+    def _keys(self) -> list:
+        return sorted(obj.key for obj in self.bucket.objects.all())
+
+    def _put_gzip_files(self, large: bytes) -> int:
+        large_body = gzip.compress(large, compresslevel=0)
+
+        self.bucket.put_object(Body=gzip.compress(b'1,a\n2,b'), Key='data/dt=2023-01-01/file-1.csv.gz')
+        self.bucket.put_object(Body=large_body, Key='data/dt=2023-01-01/file-2.csv.gz')
+        self.bucket.put_object(Body=gzip.compress(b'3,c\n'), Key='data/dt=2023-01-01/file-3.csv.gz')
+
+        return len(large_body)
+
+    @mock_s3
+    def test_compact_concatenate(self) -> None:
+        s3_client = self._set_up_compactor()
+        del self.schema.metadata[C.FILE_COMPRESSION]
+        large = b'0,' + os.urandom(S3MultipartUpload.MIN_PART_SIZE).hex().encode() + b'\n'
+
+        self.bucket.put_object(Body=b'1,a\n2,b', Key='data/dt=2023-01-01/file-1.csv')
+        self.bucket.put_object(Body=large, Key='data/dt=2023-01-01/file-2.csv')
+        self.bucket.put_object(Body=b'3,c\n', Key='data/dt=2023-01-01/file-3.csv')
+        self.bucket.put_object(Body=b'', Key='data/dt=2023-01-01/_SUCCESS')
+        self.bucket.put_object(Body=b'4,d\n', Key='data/dt=2023-01-02/file-4.csv')
+        self.bucket.put_object(Body=b'5,e', Key='data/dt=2023-01-03/file-5.csv')
+        self.bucket.put_object(Body=b'6,f', Key='data/dt=2023-01-03/file-6.csv')
+
+        compactor = SchemaCompactor(
+            schema=self.schema,
+            target_file_size=len(large) + 100,
+            part_size=1,
+            s3_client=s3_client
+        )
+        self.assertTrue(compactor.concatenate)
+
+        with mock.patch.object(s3_client.s3, 'upload_part_copy', wraps=s3_client.s3.upload_part_copy) as part_copy:
+            results = compactor.compact(since='2023-01-01')
+
+        self.assertEqual(part_copy.call_count, 1)
+        self.assertEqual(sorted(results), [('2023-01-01',), ('2023-01-03',)])
+        self.assertEqual(len(results[('2023-01-01',)]['sources']), 3)
+
+        output = results[('2023-01-01',)]['outputs'][0]
+        self.assertTrue(output.key.startswith('data/dt=2023-01-01/part-'))
+        self.assertTrue(output.key.endswith('.csv'))
+        self.assertEqual(self._get_object(output), b'1,a\n2,b\n' + large + b'3,c\n')
+        self.assertEqual(self._get_object(results[('2023-01-03',)]['outputs'][0]), b'5,e\n6,f\n')
+        self.assertEqual(self._keys(), sorted([
+            'data/dt=2023-01-01/_SUCCESS',
+            'data/dt=2023-01-02/file-4.csv',
+            output.key,
+            results[('2023-01-03',)]['outputs'][0].key
+        ]))
+        self._tear_down_s3()
+
+    @mock_s3
+    def test_compact_concatenate_gzip(self) -> None:
+        s3_client = self._set_up_compactor()
+        large = b'0,' + os.urandom(S3MultipartUpload.MIN_PART_SIZE).hex().encode() + b'\n'
+        large_size = self._put_gzip_files(large)
+
+        compactor = SchemaCompactor(
+            schema=self.schema,
+            target_file_size=large_size + 100,
+            part_size=1,
+            s3_client=s3_client
+        )
+        self.assertTrue(compactor.concatenate)
+
+        with mock.patch.object(s3_client.s3, 'upload_part_copy', wraps=s3_client.s3.upload_part_copy) as part_copy:
+            with mock.patch.object(s3_client, 'delete', return_value=[
+                {'Key': 'data/dt=2023-01-01/file-3.csv.gz', 'Code': 'AccessDenied'}
+            ]):
+                result = compactor.compact()[('2023-01-01',)]
+
+        self.assertEqual(part_copy.call_count, 1)
+        self.assertEqual(result['undeleted'], [S3Url('s3://test-bucket/data/dt=2023-01-01/file-3.csv.gz')])
+
+        output = result['outputs'][0]
+        self.assertTrue(output.key.endswith('.csv.gz'))
+        self.assertEqual(gzip.decompress(self._get_object(output)), b'1,a\n2,b\n' + large + b'3,c\n')
+        self._tear_down_s3()
+
+    @mock_s3
+    def test_compact_concatenate_gzip_unterminated(self) -> None:
+        s3_client = self._set_up_compactor()
+        large = b'0,' + os.urandom(S3MultipartUpload.MIN_PART_SIZE).hex().encode()
+        large_size = self._put_gzip_files(large)
+
+        compactor = SchemaCompactor(
+            schema=self.schema,
+            target_file_size=large_size + 100,
+            part_size=1,
+            newline_terminated=False,
+            s3_client=s3_client
+        )
+
+        with mock.patch.object(s3_client.s3, 'upload_part_copy', wraps=s3_client.s3.upload_part_copy) as part_copy:
+            result = compactor.compact()[('2023-01-01',)]
+
+        self.assertEqual(part_copy.call_count, 1)
+        self.assertEqual(result['undeleted'], [])
+        self.assertEqual(
+            gzip.decompress(self._get_object(result['outputs'][0])),
+            b'1,a\n2,b\n' + large + b'\n3,c\n'
+        )
+        self._tear_down_s3()
+
+    @mock_s3
+    def test_compact_merge_parquet(self) -> None:
+        s3_client = self._set_up_compactor()
+        self.schema.metadata[C.FILE_FORMAT] = C.PARQUET_
+        self.schema.metadata[C.FILE_COMPRESSION] = C.SNAPPY_
+        del self.schema.metadata[C.PARTITION_SCHEMA]
+
+        with self.schema.writer(s3_client=s3_client, target_file_size=1) as writer:
+            writer.write([{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}])
+            writer.write([{'id': 3, 'name': None}])
+
+        manifest_url = S3Url('s3://test-bucket/manifests/')
+        results = SchemaCompactor(schema=self.schema, manifest_url=manifest_url, s3_client=s3_client).compact()
+
+        self.assertEqual(sorted(results[()]['sources']), sorted(writer.written))
+        self.assertEqual(len(results[()]['outputs']), 1)
+
+        output = results[()]['outputs'][0]
+        self.assertEqual(pq.read_table(io.BytesIO(self._get_object(output))).to_pydict(), {
+            'id': [1, 2, 3],
+            'name': ['a', 'b', None]
+        })
+        self.assertEqual(results[()]['undeleted'], [])
+        self.assertEqual(self._keys(), sorted([output.key, 'manifests/symlink.txt']))
+        self.assertEqual(self._get_object(S3Url('s3://test-bucket/manifests/symlink.txt')), f'{output}\n'.encode())
+        self._tear_down_s3()
+
+    @mock_s3
+    def test_compact_merge_header(self) -> None:
+        s3_client = self._set_up_compactor()
+        self.schema.metadata[C.SKIP_HEADER] = True
+
+        self.bucket.put_object(Body=gzip.compress(b'id,name\n1,a\n'), Key='data/dt=2023-01-01/file-1.csv.gz')
+        self.bucket.put_object(Body=gzip.compress(b'id,name\n2,b\n'), Key='data/dt=2023-01-01/file-2.csv.gz')
+
+        compactor = SchemaCompactor(schema=self.schema, delete_sources=False, s3_client=s3_client)
+        self.assertFalse(compactor.concatenate)
+
+        results = compactor.compact()
+        output = results[('2023-01-01',)]['outputs'][0]
+
+        self.assertTrue(output.key.startswith('data/dt=2023-01-01/part-'))
+        self.assertEqual(gzip.decompress(self._get_object(output)), b'id,name\r\n1,a\r\n2,b\r\n')
+        self.assertEqual(len(self._keys()), 3)
+        self._tear_down_s3()
+
+    @mock_s3
+    def test_compact_merge_json(self) -> None:
+        s3_client = self._set_up_compactor()
+        self.schema.metadata[C.FILE_FORMAT] = C.JSON_
+        del self.schema.metadata[C.FILE_COMPRESSION]
+
+        compactor = SchemaCompactor(schema=self.schema, s3_client=s3_client)
+        self.bucket.put_object(Body=b'{"id": 1, "name": "a"}\n\n', Key='data/file.json')
+
+        self.assertEqual(compactor.reader.read_rows(S3Url('s3://test-bucket/data/file.json')), [{'id': 1, 'name': 'a'}])
+        self._tear_down_s3()
+
+    @mock_s3
+    def test_compact_failure(self) -> None:
+        s3_client = self._set_up_compactor()
+        del self.schema.metadata[C.FILE_COMPRESSION]
+        for i in range(4):
+            self.bucket.put_object(Body=f'{i},{"x" * 15}\n'.encode(), Key=f'data/dt=2023-01-01/file-{i}.csv')
+        keys = self._keys()
+
+        write = S3MultipartUpload.write
+        writes = []
+
+        def failing_write(upload: S3MultipartUpload, data: bytes) -> int:
+            writes.append(data)
+            if len(writes) > 2:
+                raise ValueError('failed')
+            return write(upload, data)
+
+        compactor = SchemaCompactor(schema=self.schema, target_file_size=40, s3_client=s3_client)
+        with mock.patch.object(S3MultipartUpload, 'write', autospec=True, side_effect=failing_write):
+            with self.assertRaisesRegex(ValueError, 'failed'):
+                compactor.compact()
+
+        self.assertEqual(len(writes), 3)
+        self.assertEqual(self._keys(), keys)
+
+        writes.clear()
+        with mock.patch.object(S3MultipartUpload, 'write', autospec=True, side_effect=failing_write):
+            with mock.patch.object(s3_client, 'delete', return_value=[{'Key': 'data/part', 'Code': 'AccessDenied'}]):
+                with self.assertRaisesRegex(
+                    S3DeleteError,
+                    r"Failed to delete the objects \['data/part'\] for the outputs of the partition"
+                ) as context:
+                    compactor.compact()
+
+        self.assertIsInstance(context.exception.__cause__, ValueError)
+        self._tear_down_s3()
+
+    def test_get_groups(self) -> None:
+        compactor = SchemaCompactor(schema=self.schema, target_file_size=10, s3_client=mock.Mock())
+        objects = [{'Key': str(size), 'Size': size} for size in [4, 12, 4, 4, 3, 9]]
+
+        self.assertEqual(
+            [[obj['Size'] for obj in group] for group in compactor.get_groups(objects)],
+            [[4, 4, 4], [3, 9]]
+        )
+
+    def test_errors(self) -> None:
+        del self.schema.metadata[C.S3_PREFIX]
+
+        with self.assertRaisesRegex(
+            NoParameterError,
+            r"Required parameter \['S3_PREFIX'\] for SchemaCompactor if s3_url is not given"
+        ):
+            SchemaCompactor(schema=self.schema, s3_client=mock.Mock())
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+(c) Charlie Collier, all rights reserved
+"""
+
+import gzip
+import os
+from unittest import mock
+
+from moto import mock_s3
+
+from simpleboto.athena import Schema, SchemaReader, C, BigIntDType, StringDType
+from simpleboto.s3 import S3Client, S3Url
+from tests.base_test import BaseTest, OS_ENVIRON
+
+
+class TestSchemaReader(BaseTest):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.schema = Schema(
+            schema={'id': BigIntDType(), 'name': StringDType()},
+            metadata={C.FILE_FORMAT: C.CSV_, C.FILE_COMPRESSION: C.GZIP_, C.SKIP_HEADER: True}
+        )
+
+    @mock_s3
+    def test_read(self) -> None:
+        with mock.patch.dict(OS_ENVIRON, self.env_vars):
+            self._set_up_s3(bucket_name='test-bucket')
+            s3_client = S3Client(region_name=os.getenv('REGION'))
+
+        s3_urls = []
+        for i in range(5):
+            self.bucket.put_object(Body=gzip.compress(f'id,name\n{i},a\n'.encode()), Key=f'data/{i}.csv.gz')
+            s3_urls.append(S3Url(f's3://test-bucket/data/{i}.csv.gz'))
+
+        reader = self.schema.reader(max_concurrency=2, s3_client=s3_client)
+        self.assertIsInstance(reader, SchemaReader)
+
+        self.assertEqual(list(reader.read(s3_urls)), [
+            (s3_url, [{'id': str(i), 'name': 'a'}]) for i, s3_url in enumerate(s3_urls)
+        ])
+        self._tear_down_s3()
+
+    @mock_s3
+    def test_read_batches(self) -> None:
+        with mock.patch.dict(OS_ENVIRON, self.env_vars):
+            self._set_up_s3(bucket_name='test-bucket')
+            s3_client = S3Client(region_name=os.getenv('REGION'))
+
+        self.bucket.put_object(Body=b'{"id": 1}\r\n\n{"id": 2}\n{"id": 3}', Key='data/1.json')
+        self.bucket.put_object(Body=b'', Key='data/2.json')
+        s3_urls = [S3Url('s3://test-bucket/data/1.json'), S3Url('s3://test-bucket/data/2.json')]
+
+        self.schema.metadata = {C.FILE_FORMAT: C.JSON_}
+        reader = self.schema.reader(max_concurrency=1, s3_client=s3_client)
+
+        self.assertEqual(list(reader.read(s3_urls, batch_size=2)), [
+            (s3_urls[0], [{'id': 1}, {'id': 2}]),
+            (s3_urls[0], [{'id': 3}])
+        ])
+        self.assertEqual(reader.read_rows(s3_urls[1]), [])
+        self._tear_down_s3()
+
+    @mock_s3
+    def test_read_close(self) -> None:
+        with mock.patch.dict(OS_ENVIRON, self.env_vars):
+            self._set_up_s3(bucket_name='test-bucket')
+            s3_client = S3Client(region_name=os.getenv('REGION'))
+
+        s3_urls = []
+        for i in range(4):
+            self.bucket.put_object(Body=gzip.compress(b'id,name\n' + b'1,a\n' * 10), Key=f'data/{i}.csv.gz')
+            s3_urls.append(S3Url(f's3://test-bucket/data/{i}.csv.gz'))
+
+        reader = self.schema.reader(max_concurrency=2, s3_client=s3_client)
+
+        with mock.patch.object(reader, 'iter_rows', wraps=reader.iter_rows) as iter_rows:
+            batches = reader.read(s3_urls, batch_size=1)
+            self.assertEqual(next(batches), (s3_urls[0], [{'id': '1', 'name': 'a'}]))
+            batches.close()
+
+        # only max_concurrency files are read ahead of the rows consumed
+        self.assertEqual(iter_rows.call_count, 2)
+        self._tear_down_s3()
+
+    def test_read_error(self) -> None:
+        s3_client = mock.Mock()
+        s3_client.s3.get_object.side_effect = ValueError('failed')
+        reader = self.schema.reader(s3_client=s3_client)
+
+        with self.assertRaisesRegex(ValueError, 'failed'):
+            list(reader.read([S3Url('s3://test-bucket/data/1.csv.gz')]))
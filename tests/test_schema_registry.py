@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+(c) Charlie Collier, all rights reserved
+"""
+
+import json
+import os
+from unittest import mock
+
+from moto import mock_s3
+
+from simpleboto.athena import SchemaRegistry, Schema, StringDType, C
+from simpleboto.exceptions import NoParameterError
+from simpleboto.s3 import S3Client, S3Url
+from tests.base_test import BaseTest, OS_ENVIRON
+
+
+class TestSchemaRegistry(BaseTest):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.location = os.path.join(self.tmp_dir, 'registry.json')
+        self.schema = Schema(
+            schema={'COLUMN1': StringDType()},
+            metadata={C.DATABASE_NAME: 'Test_DB', C.TABLE_NAME: 'test_table'}
+        )
+
+    def test_get_key(self) -> None:
+        self.assertEqual(SchemaRegistry.get_key(self.schema), 'test_db.test_table')
+
+        with self.assertRaisesRegex(NoParameterError, r"Required parameter \['DATABASE_NAME'\] for SchemaRegistry"):
+            SchemaRegistry.get_key(Schema(schema={}, metadata={C.TABLE_NAME: 'test_table'}))
+
+    def test_put_is_applied(self) -> None:
+        registry = SchemaRegistry(location=self.location)
+
+        self.assertEqual(registry.entries, {})
+        self.assertFalse(registry.is_applied(self.schema))
+
+        registry.put(schemas=[])
+        self.assertFalse(os.path.exists(self.location))
+
+        registry.put(schemas=[self.schema])
+        self.assertTrue(registry.is_applied(self.schema))
+
+        with open(self.location, 'r') as f:
+            self.assertEqual(json.load(f)['test_db.test_table']['Fingerprint'], self.schema.fingerprint())
+
+        self.schema.raw['COLUMN2'] = StringDType()
+        self.assertFalse(SchemaRegistry(location=self.location).is_applied(self.schema))
+        self.assertTrue(SchemaRegistry(location=self.location).is_registered(self.schema))
+
+    @mock_s3
+    def test_s3_location(self) -> None:
+        with mock.patch.dict(OS_ENVIRON, self.env_vars):
+            self._set_up_s3(bucket_name='test-bucket')
+            location = S3Url('s3://test-bucket/registry/schemas.json')
+
+            registry = SchemaRegistry(location=location, s3_client=S3Client(region_name=os.getenv('REGION')))
+            self.assertEqual(registry.entries, {})
+            registry.put(schemas=[self.schema])
+
+            with mock.patch.dict(OS_ENVIRON, {'AWS_DEFAULT_REGION': os.getenv('REGION')}):
+                self.assertTrue(SchemaRegistry(location=location).is_applied(self.schema))
+
+            self._tear_down_s3()
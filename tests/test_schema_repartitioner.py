@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+(c) Charlie Collier, all rights reserved
+"""
+
+import gzip
+import json
+import os
+import pickle
+from collections import defaultdict
+from unittest import mock
+
+from moto import mock_s3
+
+from simpleboto.athena import (
+    Schema,
+    SchemaRepartitioner,
+    C,
+    BigIntDType,
+    DateDType,
+    StringDType
+)
+from simpleboto.exceptions import NoParameterError
+from simpleboto.s3 import S3Client, S3Url
+from tests.base_test import BaseTest, OS_ENVIRON
+
+
+class TestSchemaRepartitioner(BaseTest):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.schema = Schema(
+            schema={'id': BigIntDType(), 'name': StringDType()},
+            metadata={
+                C.TABLE_NAME: 'events',
+                C.S3_BUCKET: 'test-bucket',
+                C.S3_PREFIX: 'partitioned',
+                C.FILE_FORMAT: C.JSON_,
+                C.PARTITION_SCHEMA: {'dt': DateDType(), 'region': StringDType()}
+            }
+        )
+        self.source_schema = Schema(
+            schema={'id': BigIntDType(), 'name': StringDType(), 'ts': StringDType(), 'region': StringDType()},
+            metadata={
+                C.S3_BUCKET: 'test-bucket',
+                C.S3_PREFIX: 'flat',
+                C.FILE_FORMAT: C.CSV_,
+                C.FILE_COMPRESSION: C.GZIP_
+            }
+        )
+
+    def _set_up_repartitioner(self) -> S3Client:
+        with mock.patch.dict(OS_ENVIRON, self.env_vars):
+            self._set_up_s3(bucket_name='test-bucket')
+            s3_client = S3Client(region_name=os.getenv('REGION'))
+
+        self.bucket.put_object(
+            Body=gzip.compress(b'1,a,2023-01-01 10:00:00,EU\n2,b,2023-01-02 11:00:00,US\n'),
+            Key='flat/file-1.csv.gz'
+        )
+        self.bucket.put_object(
+            Body=gzip.compress(b'3,c,2023-01-01 12:00:00,EU\n4,d,2023-01-03 13:00:00,\n'),
+            Key='flat/file-2.csv.gz'
+        )
+        self.bucket.put_object(Body=b'', Key='flat/_SUCCESS')
+
+        return s3_client
+
+    def _get_rows(self, s3_url: S3Url) -> list:
+        return [json.loads(line) for line in self.bucket.Object(s3_url.key).get()['Body'].read().splitlines()]
+
+    @staticmethod
+    def _transform(row: dict) -> dict:
+        return {**row, 'dt': row['ts'][:10], 'region': row['region'] or None}
+
+    @mock_s3
+    def test_repartition(self) -> None:
+        s3_client = self._set_up_repartitioner()
+
+        repartitioner = SchemaRepartitioner(
+            schema=self.schema,
+            source_schema=self.source_schema,
+            transform=self._transform,
+            max_memory=1,
+            spill_dir=self.tmp_dir,
+            s3_client=s3_client
+        )
+
+        with mock.patch.object(repartitioner, 'spill', wraps=repartitioner.spill) as spill:
+            written = repartitioner.repartition()
+
+        self.assertEqual(spill.call_count, 4)
+        self.assertEqual(os.listdir(self.tmp_dir), [])
+        self.assertEqual([s3_url.key.rsplit('/', 1)[0] for s3_url in written], [
+            'partitioned/dt=2023-01-01/region=EU',
+            'partitioned/dt=2023-01-02/region=US',
+            'partitioned/dt=2023-01-03/region=__HIVE_DEFAULT_PARTITION__'
+        ])
+        self.assertEqual(self._get_rows(written[0]), [{'id': '1', 'name': 'a'}, {'id': '3', 'name': 'c'}])
+        self.assertEqual(self._get_rows(written[2]), [{'id': '4', 'name': 'd'}])
+
+        create_table = repartitioner.get_create_table()
+        self.assertIn("LOCATION\n    's3://test-bucket/partitioned/'", create_table)
+        self.assertIn("'projection.dt.range' = '2023-01-01,2023-01-03'", create_table)
+        self.assertIn("'projection.region.values' = 'EU,US'", create_table)
+        self._tear_down_s3()
+
+    @mock_s3
+    def test_repartition_while_reading(self) -> None:
+        s3_client = self._set_up_repartitioner()
+
+        repartitioner = SchemaRepartitioner(
+            schema=self.schema,
+            source_schema=self.source_schema,
+            transform=self._transform,
+            target_file_size=1,
+            max_memory=1,
+            s3_client=s3_client
+        )
+
+        with mock.patch.object(repartitioner, 'spill', wraps=repartitioner.spill) as spill:
+            with mock.patch.object(repartitioner, 'flush', wraps=repartitioner.flush) as flush:
+                written = repartitioner.repartition()
+
+        spill.assert_not_called()
+        # the second rows of EU are written straight to its open file
+        self.assertEqual([call.args[0] for call in flush.call_args_list], [
+            ('2023-01-01', 'EU'), ('2023-01-02', 'US'), ('2023-01-03', None)
+        ])
+        self.assertEqual(repartitioner.buffers, {})
+        self.assertEqual(
+            sorted(row['id'] for s3_url in written for row in self._get_rows(s3_url)),
+            ['1', '2', '3', '4']
+        )
+        self._tear_down_s3()
+
+    @mock_s3
+    def test_repartition_file_sizes(self) -> None:
+        s3_client = self._set_up_repartitioner()
+        self.bucket.objects.filter(Prefix='flat/').delete()
+
+        for i in range(20):
+            lines = ''.join(
+                f'{i * 100 + j},{"x" * 100},2023-01-0{1 + j % 2} 10:00:00,EU\n' for j in range(100)
+            )
+            self.bucket.put_object(Body=gzip.compress(lines.encode()), Key=f'flat/file-{i:02d}.csv.gz')
+
+        for max_open_files in [1, 2]:
+            with self.subTest(max_open_files=max_open_files):
+                repartitioner = SchemaRepartitioner(
+                    schema=self.schema,
+                    source_schema=self.source_schema,
+                    s3_url=S3Url(f's3://test-bucket/partitioned-{max_open_files}/'),
+                    transform=self._transform,
+                    target_file_size=32 * 1024,
+                    max_open_files=max_open_files,
+                    spill_dir=self.tmp_dir,
+                    s3_client=s3_client
+                )
+                written = repartitioner.repartition()
+
+                sizes = defaultdict(list)
+                for s3_url in written:
+                    sizes[s3_url.key.rsplit('/', 1)[0]].append(self.bucket.Object(s3_url.key).content_length)
+
+                # the partitions are interleaved in every source file, but only the last file of each is small
+                self.assertEqual(len(sizes), 2)
+                for partition_sizes in sizes.values():
+                    self.assertGreater(len(partition_sizes), 2)
+                    self.assertTrue(all(size >= 32 * 1024 for size in partition_sizes[:-1]))
+
+                self.assertEqual(
+                    sum(len(self._get_rows(s3_url)) for s3_url in written),
+                    2000
+                )
+
+        self._tear_down_s3()
+
+    @mock_s3
+    def test_repartition_in_memory(self) -> None:
+        s3_client = self._set_up_repartitioner()
+        self.schema.metadata[C.PARTITION_SCHEMA] = {'region': StringDType()}
+
+        repartitioner = SchemaRepartitioner(
+            schema=self.schema,
+            source_schema=self.source_schema,
+            source_url=S3Url('s3://test-bucket/flat/'),
+            s3_url=S3Url('s3://test-bucket/other'),
+            s3_client=s3_client
+        )
+        written = repartitioner.repartition()
+
+        self.assertEqual(repartitioner.spill_files, {})
+        self.assertEqual(
+            [s3_url.key.rsplit('/', 1)[0] for s3_url in written],
+            ['other/region=', 'other/region=EU', 'other/region=US']
+        )
+        self.assertEqual(len(self._get_rows(written[1])), 2)
+        self.assertIn("LOCATION\n    's3://test-bucket/other/'", repartitioner.get_create_table())
+
+        repartitioner.partitions = {(None,)}
+        with self.assertRaisesRegex(
+            NoParameterError,
+            'Required parameter region= for the partitions written by SchemaRepartitioner'
+        ):
+            repartitioner.get_create_table()
+
+        self._tear_down_s3()
+
+    def test_iter_rows(self) -> None:
+        repartitioner = SchemaRepartitioner(
+            schema=self.schema,
+            source_schema=self.source_schema,
+            s3_client=mock.Mock()
+        )
+        repartitioner._spill_path = self.tmp_dir
+        values = ('2023-01-01', 'EU')
+
+        for rows in [[{'id': 1}], [{'id': 2}]]:
+            repartitioner.buffers[values].append(pickle.dumps(rows))
+            repartitioner.buffer_sizes[values] += 1
+            repartitioner.spill(values)
+        repartitioner.buffers[values].append(pickle.dumps([{'id': 3}]))
+
+        self.assertEqual(len(os.listdir(self.tmp_dir)), 1)
+        self.assertEqual(list(repartitioner.iter_rows(values)), [[{'id': 1}], [{'id': 2}], [{'id': 3}]])
+        self.assertEqual(repartitioner.spill_files, {})
+        self.assertEqual(os.listdir(self.tmp_dir), [])
+
+    def test_errors(self) -> None:
+        del self.source_schema.metadata[C.S3_PREFIX]
+
+        with self.assertRaisesRegex(
+            NoParameterError,
+            r"Required parameter \['S3_PREFIX'\] for SchemaRepartitioner if source_url is not given"
+        ):
+            SchemaRepartitioner(schema=self.schema, source_schema=self.source_schema, s3_client=mock.Mock())
+
+        del self.schema.metadata[C.PARTITION_SCHEMA]
+
+        with self.assertRaisesRegex(NoParameterError, 'Required parameter PARTITION_SCHEMA for SchemaRepartitioner'):
+            SchemaRepartitioner(schema=self.schema, source_schema=self.source_schema, s3_client=mock.Mock())
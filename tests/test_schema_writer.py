@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+(c) Charlie Collier, all rights reserved
+"""
+
+import datetime
+import gzip
+import io
+import json
+import os
+from decimal import Decimal
+from unittest import mock
+
+import pyarrow.parquet as pq
+from moto import mock_s3
+
+from simpleboto.athena import (
+    Schema,
+    SchemaWriter,
+    C,
+    BigIntDType,
+    BooleanDType,
+    DateDType,
+    DecimalDType,
+    StringDType
+)
+from simpleboto.exceptions import NoParameterError, UnexpectedParameterError
+from simpleboto.s3 import S3Client, S3Url
+from tests.base_test import BaseTest, OS_ENVIRON
+
+
+class TestSchemaWriter(BaseTest):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.schema = Schema(
+            schema={'id': BigIntDType(), 'price': DecimalDType(10, 2), 'flag': BooleanDType()},
+            metadata={
+                C.S3_BUCKET: 'test-bucket',
+                C.S3_PREFIX: 'data',
+                C.FILE_FORMAT: C.CSV_,
+                C.PARTITION_SCHEMA: {'dt': DateDType()}
+            }
+        )
+        self.rows = [
+            {'id': i, 'price': Decimal('1.50'), 'flag': i % 2 == 0, 'dt': datetime.date(2023, 1, 1 + i % 2)}
+            for i in range(4)
+        ]
+
+    def _set_up_writer(self) -> S3Client:
+        with mock.patch.dict(OS_ENVIRON, self.env_vars):
+            self._set_up_s3(bucket_name='test-bucket')
+            return S3Client(region_name=os.getenv('REGION'))
+
+    def _get_object(self, s3_url: S3Url) -> bytes:
+        return self.bucket.Object(s3_url.key).get()['Body'].read()
+
+    @mock_s3
+    def test_write_csv(self) -> None:
+        s3_client = self._set_up_writer()
+        self.schema.metadata[C.SKIP_HEADER] = True
+
+        with self.schema.writer(s3_client=s3_client) as writer:
+            writer.write(self.rows)
+            writer.write([{'id': 4, 'dt': None}])
+
+        prefixes = [s3_url.key.rsplit('/', 1)[0] for s3_url in writer.written]
+        self.assertEqual(prefixes, [
+            'data/dt=2023-01-01', 'data/dt=2023-01-02', 'data/dt=__HIVE_DEFAULT_PARTITION__'
+        ])
+        self.assertTrue(all(s3_url.key.endswith('.csv') for s3_url in writer.written))
+        self.assertEqual(
+            self._get_object(writer.written[0]),
+            b'id,price,flag\r\n0,1.50,true\r\n2,1.50,true\r\n'
+        )
+        self.assertEqual(self._get_object(writer.written[2]), b'id,price,flag\r\n4,,\r\n')
+        self._tear_down_s3()
+
+    @mock_s3
+    def test_write_json_gzip(self) -> None:
+        s3_client = self._set_up_writer()
+        self.schema.metadata.update({C.FILE_FORMAT: 'JSON', C.FILE_COMPRESSION: 'GZIP'})
+        del self.schema.metadata[C.PARTITION_SCHEMA]
+
+        writer = SchemaWriter(
+            schema=self.schema,
+            s3_url=S3Url('s3://test-bucket/other/'),
+            target_file_size=1,
+            s3_client=s3_client
+        )
+        writer.write(self.rows[:2])
+        writer.write(self.rows[2:])
+        written = writer.close()
+
+        self.assertEqual(len(written), 2)
+        self.assertTrue(all(s3_url.key.startswith('other/part-') for s3_url in written))
+        self.assertTrue(all(s3_url.key.endswith('.json.gz') for s3_url in written))
+        self.assertEqual(
+            [json.loads(line) for line in gzip.decompress(self._get_object(written[0])).splitlines()],
+            [{'id': 0, 'price': '1.50', 'flag': True}, {'id': 1, 'price': '1.50', 'flag': False}]
+        )
+        self._tear_down_s3()
+
+    @mock_s3
+    def test_write_parquet(self) -> None:
+        s3_client = self._set_up_writer()
+        self.schema.metadata.update({C.FILE_FORMAT: C.PARQUET_, C.FILE_COMPRESSION: C.ZSTD_})
+
+        with self.schema.writer(s3_client=s3_client, row_group_size=2, max_open_files=1) as writer:
+            writer.write(self.rows)
+            writer.write(self.rows)
+
+        self.assertEqual(len(writer.written), 3)
+        self.assertTrue(all(s3_url.key.endswith('.parquet') for s3_url in writer.written))
+
+        parquet_file = pq.ParquetFile(io.BytesIO(self._get_object(writer.written[2])))
+        self.assertEqual(parquet_file.metadata.num_row_groups, 2)
+        self.assertEqual(parquet_file.metadata.row_group(0).column(0).compression, 'ZSTD')
+        self.assertEqual(parquet_file.read().to_pydict(), {
+            'id': [1, 3, 1, 3],
+            'price': [Decimal('1.50')] * 4,
+            'flag': [False] * 4
+        })
+        self._tear_down_s3()
+
+    @mock_s3
+    def test_abort(self) -> None:
+        s3_client = self._set_up_writer()
+        self.schema.metadata[C.PARTITION_SCHEMA] = {'region': StringDType()}
+
+        with self.assertRaisesRegex(ValueError, 'failed'):
+            with self.schema.writer(s3_client=s3_client, max_open_files=1) as writer:
+                writer.write([{'id': 1, 'region': 'EU'}, {'id': 2, 'region': 'US'}])
+                raise ValueError('failed')
+
+        self.assertEqual(len(writer.written), 1)
+        self.assertEqual(writer.files, {})
+        self.assertEqual([obj.key for obj in self.bucket.objects.all()], [writer.written[0].key])
+        self._tear_down_s3()
+
+    def test_errors(self) -> None:
+        with self.assertRaisesRegex(
+            UnexpectedParameterError,
+            'The parameter orc is unexpected for FILE_FORMAT for SchemaWriter'
+        ):
+            SchemaWriter.validate_format('orc', None)
+
+        with self.assertRaisesRegex(
+            UnexpectedParameterError,
+            'The parameter snappy is unexpected for FILE_COMPRESSION for SchemaWriter with csv files'
+        ):
+            SchemaWriter.validate_format(C.CSV_, C.SNAPPY_)
+
+        with self.assertRaisesRegex(
+            NoParameterError,
+            r"Required parameter \['S3_PREFIX'\] for SchemaWriter if s3_url is not given"
+        ):
+            Schema(schema={}, metadata={C.S3_BUCKET: 'test-bucket', C.FILE_FORMAT: C.CSV_}).writer()
+
+    def test_format_value(self) -> None:
+        self.assertEqual(
+            [SchemaWriter.format_value(value) for value in [None, True, 1.5, 'EU']],
+            ['', 'true', '1.5', 'EU']
+        )
+
+    def test_get_partition_path(self) -> None:
+        self.schema.metadata[C.PARTITION_SCHEMA] = {'dt': DateDType(), 'region': StringDType()}
+        writer = SchemaWriter(schema=self.schema, s3_client=mock.Mock())
+
+        self.assertEqual(
+            writer.get_partition_path((datetime.date(2023, 1, 1), 'EU/West a//b')),
+            'dt=2023-01-01/region=EU%2FWest%20a%2F%2Fb/'
+        )
+        self.assertEqual(writer.get_partition_path((None, True)), 'dt=__HIVE_DEFAULT_PARTITION__/region=true/')
@@ -4,9 +4,11 @@
 """
 
 import os
+from unittest import mock
 
 from simpleboto.exceptions import (
-    InvalidTypeError
+    InvalidTypeError,
+    MissingDependencyError
 )
 from simpleboto.utils import Utils
 from tests.base_test import BaseTest
@@ -44,3 +46,20 @@ class TestUtils(BaseTest):
                 value='6',
                 expected_type=int
             )
+
+    def test_import_module(self) -> None:
+        self.assertEqual(Utils.import_module(name='os'), os)
+
+    def test_import_module_missing(self) -> None:
+        with mock.patch('importlib.import_module', side_effect=ImportError):
+            with self.assertRaisesRegex(
+                MissingDependencyError,
+                'The module FAKE_MODULE is required for this functionality; install it with pip'
+            ):
+                Utils.import_module(name='FAKE_MODULE')
+
+    def test_get_hash(self) -> None:
+        self.assertEqual(
+            Utils.get_hash(value='TEST'),
+            '94ee059335e587e501cc4bf90613e0814f00a7b08bc7c648fd865a2af6a22cc2'
+        )